@@ -1,3 +1,24 @@
 from .adb_client import ADBClient
 from .key_codes import KeyCodes
-from .android_tv_controller import AndroidTVController
\ No newline at end of file
+from .android_tv_controller import AndroidTVController
+from .fleet_controller import FleetController
+from .adb_device import ADBDevice
+from .command_executor import CommandResult, gather, as_completed
+from .deadline import deadline, DeadlineExceeded
+from .metrics import MetricsSink, PrometheusMetrics, set_metrics_sink, get_metrics_sink
+from .tracing import Span, Tracer, OpenTelemetryTracer, set_tracer, get_tracer
+from .device_watcher import DeviceWatcher, DeviceEvent, DeviceEventType
+
+
+
+# the asyncio twins import asyncio, which only their users pay for
+_ASYNC_EXPORTS = {'AsyncADBClient': 'async_adb_client', 'AsyncADBDevice': 'async_adb_device',
+                  'AsyncAndroidTVController': 'async_android_tv_controller'}
+
+
+
+def __getattr__(name):
+    if name in _ASYNC_EXPORTS:
+        from importlib import import_module
+        return getattr(import_module(f'.{_ASYNC_EXPORTS[name]}', __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,11 +1,32 @@
-import re
 import sys
 import shlex
 import time
+import threading
 import subprocess
-from typing import Any
+import contextvars
+from concurrent.futures import Executor, Future
+from typing import Any, Callable
 from .logger import Logger
 from .key_codes import KeyCodes
+from .adb_transport import ADB_SERVER_HOST, ADB_SERVER_PORT, SubprocessTransport, SocketTransport, create_transport
+from .shell_session import ShellSession
+from .package_index import PackageIndex
+from .launcher_catalog import LauncherCatalog
+from .device_snapshot import DeviceSnapshot
+from .adb_device import ADBDevice, DeviceState
+from .adb_commands import parse_connect_result, parse_disconnect_result, parse_devices, find_connected_device
+from .logcat import LogcatStream
+from .device_watcher import DeviceWatcher
+from .screen_capture import RawFrame
+from .screen_stream import SEGMENT_TIME_LIMIT, ScreenStream
+from .ui_index import UIIndex
+from .command_executor import CommandResult, shared_executor
+from .input_scheduler import InputScheduler
+from .volume import Volume
+from .text_input import TEXT_CHUNK_SIZE
+from .deadline import remaining_time
+from .metrics import command_kind, measure_command
+from .tracing import trace_command
 
 
 
@@ -13,7 +34,11 @@ class ADBClient:
  
 
 
-    def __init__(self, verbose: bool=False, show_command: bool=False):
+    def __init__(self, verbose: bool=False, show_command: bool=False, transport: str|SubprocessTransport|SocketTransport='subprocess',
+                 server_host: str=ADB_SERVER_HOST, server_port: int=ADB_SERVER_PORT, persistent_shell: bool=False,
+                 server_start_timeout: float=10.0, package_cache_ttl: float|None=300.0,
+                 launcher_catalog: LauncherCatalog|None=None, executor: Executor|None=None,
+                 command_timeout: float|None=None):
         """Pythonic way to execute adb commands on Android TV devices.
         
         The ADBClient class is used to interact with the ADB command-line tool in Python, allowing for
@@ -36,15 +61,37 @@ class ADBClient:
             verbose (bool): The `verbose` parameter is a boolean flag that determines whether or not to
                 enable verbose logging. If set to `True`, it will display additional information during the
                 execution of the code. If set to `False` (default), it will not display any additional
-                information. Defaults to False.
+                information, only the warnings and errors unless a level is set with `Logger.set_level`.
+                Defaults to False.
             show_command (bool): The `show_command` parameter is a boolean flag that determines whether or
                 not to display the executed ADB commands. If `show_command` is set to `True`, the executed ADB
                 commands will be shown. If `show_command` is set to `False`, the executed ADB commands will.
                 Defaults to False.
+            transport (str|SubprocessTransport|SocketTransport): How commands reach the adb server. `subprocess`
+                spawns the adb tool for every command, `socket` speaks the adb host protocol directly to the
+                server and only spawns the adb tool for commands without a socket equivalent (push, pull,
+                install, ..). A ready transport object can be passed as well. Defaults to subprocess.
+            server_host (str): Host of the adb server. Defaults to 127.0.0.1
+            server_port (int): Port of the adb server. Defaults to 5037
+            persistent_shell (bool): If set to `True`, `execute_shell_command` keeps one shell open per device
+                and pipes every command into it, instead of opening a new `adb shell` for each command.
+                Defaults to False.
+            server_start_timeout (float): Maximum seconds to wait for a newly started adb server to answer.
+                A server that is already running is reused immediately. Defaults to 10.
+            package_cache_ttl (float|None): Seconds the installed packages listing of a device is reused by
+                `is_installed`/`start_app` before listing the packages again, `None` keeps it until install or
+                uninstall and 0 lists the packages on every check. Defaults to 300.
+            launcher_catalog (LauncherCatalog|None): Catalog of the apps launcher activities used by `start_app`
+                when no activity is given, pass the same catalog to keep it across clients. Defaults to a new catalog.
+            executor (Executor|None): Executor running the commands given to `submit`. Defaults to the thread pool
+                shared by all clients.
+            command_timeout (float|None): Default seconds an adb command may take before it is killed, file
+                transfers and installs are only bounded by an explicit timeout or a `deadline`. Defaults to None (no limit).
         """
         # logs verbose 
         self.__verbose = verbose
         self.__show_command = show_command
+        Logger.set_verbose(verbose)
         if self.__verbose:
             Logger.welcome('use ADB command-line tool with python.')
         
@@ -52,6 +99,15 @@ class ADBClient:
         self.__devices = []
         self.__selected_device = None
         self.__server_process = None
+        self.__server_start_timeout = server_start_timeout
+        self.__transport = create_transport(transport, server_host, server_port)
+        self.__persistent_shell = persistent_shell
+        self.__package_cache_ttl = package_cache_ttl
+        self.__launcher_catalog = launcher_catalog or LauncherCatalog()
+        self.__device_states = {}
+        self.__device_states_lock = threading.Lock()
+        self.__executor = executor
+        self.__command_timeout = command_timeout
         
         # start adb server to start sending commands to devices
         self.start_server()
@@ -85,30 +141,67 @@ class ADBClient:
             TimeoutExpired: if the timeout expires before the process exits.
         """
         
-        # adb base command
-        command = 'adb '
-        
         # specify a device serial
-        if self.__selected_device and include_selected_serial:
-            command += f'-s {self.__selected_device} '
-            
-        # append the command to base adb
-        command += command_str
+        serial = self.__selected_device if include_selected_serial else None
+        
+        # convert command string to list of splitted tokens
+        command_parts = shlex.split(command_str, posix="win" not in sys.platform)
         
         # show executed command if needed
         if self.__verbose and self.__show_command:
-            Logger.info(f'[bold]Command:[/bold] [blue]{command}[/blue]')
-            
-        # convert command string to list of splitted tokens
-        command_parts = shlex.split(command, posix="win" not in sys.platform)
+            command = ' '.join(['adb'] + (['-s', serial] if serial else []) + [command_str])
+            Logger.info('[bold]Command:[/bold] [blue]%s[/blue] [dim](%s)[/dim]', command, self.__transport.name)
         
         if blocking:
             # run the command and waits for full execution
-            proc = subprocess.run(command_parts, check=True, capture_output=True, text=True)
-            return proc.stdout.strip()
+            with trace_command(command_parts, serial), measure_command(command_kind(command_parts), serial):
+                return self.__transport.execute(command_parts, serial, remaining_time(self.__command_timeout))
         else:
             # run the process in background and continue the python script
-            return subprocess.Popen(command_parts, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+            return self.__transport.spawn(command_parts, serial)
+    
+    
+    
+    def __run_command(self, command_str: str, serial: str|None) -> CommandResult:
+        command_parts = shlex.split(command_str, posix="win" not in sys.platform)
+        if self.__verbose and self.__show_command:
+            command = ' '.join(['adb'] + (['-s', serial] if serial else []) + [command_str])
+            Logger.info('[bold]Submitted command:[/bold] [blue]%s[/blue] [dim](%s)[/dim]', command, self.__transport.name)
+        started = time.perf_counter()
+        try:
+            with trace_command(command_parts, serial), measure_command(command_kind(command_parts), serial):
+                output = self.__transport.execute(command_parts, serial, remaining_time(self.__command_timeout))
+        except subprocess.CalledProcessError as error:
+            return CommandResult(command_str, (error.output or '').strip(), error.returncode, (error.stderr or '').strip(),
+                                 time.perf_counter() - started)
+        return CommandResult(command_str, output, 0, '', time.perf_counter() - started)
+    
+    
+    
+    def submit(self, command: str|Callable, *args, include_selected_serial: bool=True, **kwargs) -> Future:
+        """
+        The function runs a command in the background and returns at once, so slow calls (install,
+        dumpsys, pull ..) overlap with other work like key input. Collect the results with
+        `future.result()` or the `gather`/`as_completed` helpers.
+        
+        Args:
+            command (str|Callable): An adb command, for example `shell dumpsys package`, it runs on the device
+                selected at submission time. Or a function called as `command(*args, **kwargs)`, for example
+                `client.device().install`.
+            args: Positional arguments of the function.
+            include_selected_serial (bool): Whether an adb command targets the selected device. Defaults to True.
+            kwargs: Keyword arguments of the function.
+        
+        Returns:
+            `Future` of a `CommandResult` (output, exit code, error output and duration) for an adb command, or
+            of the function result. Exceptions (unreachable server, missing adb tool ..) are raised by `result()`.
+        """
+        executor = self.__executor or shared_executor()
+        if callable(command):
+            return executor.submit(contextvars.copy_context().run, command, *args, **kwargs)
+        serial = self.__selected_device if include_selected_serial else None
+        # the copied context carries the current deadline to the worker thread
+        return executor.submit(contextvars.copy_context().run, self.__run_command, command, serial)
     
     
     
@@ -119,24 +212,37 @@ class ADBClient:
     def start_server(self) -> bool:
         """
         The function `start_server` starts an ADB server and waits for it to start up.
+        A server already answering on its port is reused immediately, otherwise the server
+        port is probed with a short backoff until it answers or `server_start_timeout` expires.
         
         Returns:
             Boolean indicating whether the server is running or not.
         """
         Logger.info('Starting ADB server..')
         
+        # reuse a server that already answers on its socket
+        if self.__transport.server_version() is not None:
+            Logger.success('ADB server is already running')
+            return True
+        
         # start the adb server as background process
         self.__server_process = self.__execute_command('start-server', blocking=False, include_selected_serial=False)
         
-        # give time to start up
-        time.sleep(5)
-        
-        if self.__server_process:
-            Logger.success('ADB server is started')
-            return True
-        else:
-            Logger.error(f'Unable to start ADB server')
-            return False
+        # probe the server until it answers
+        deadline = time.monotonic() + self.__server_start_timeout
+        delay = 0.01
+        while True:
+            if self.__transport.server_version() is not None:
+                Logger.success('ADB server is started')
+                return True
+            exit_code = self.__server_process.poll()
+            remaining = deadline - time.monotonic()
+            if (exit_code is not None and exit_code != 0) or remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+        Logger.error('Unable to start ADB server')
+        return False
 
 
 
@@ -148,15 +254,17 @@ class ADBClient:
             Boolean indicating whether the server is stopped or not.
         """
         Logger.info('Stopping ADB server..')
+        server_running = self.__server_process is not None or self.__transport.server_version() is not None
         self.__execute_command('kill-server', include_selected_serial=False)
-        if self.__server_process:
-            self.__server_process.terminate()
+        if server_running:
+            if self.__server_process:
+                self.__server_process.terminate()
             self.__server_process = None
             self.clean()
             Logger.success('ADB server is stopped')
             return True
         else:
-            Logger.error(f'No ADB server process running')
+            Logger.error('No ADB server process running')
             return False
     
     
@@ -164,6 +272,10 @@ class ADBClient:
     def clean(self):
         """Resets and clean"""
         Logger.info('Cleaning up')
+        with self.__device_states_lock:
+            states, self.__device_states = list(self.__device_states.values()), {}
+        for state in states:
+            state.close()
         self.__devices = []
         self.__selected_device = None
         self.__server_process = None
@@ -185,15 +297,16 @@ class ADBClient:
         Returns:
             Boolean: True if the connection succeeded, False if the connection failed.
         """
-        Logger.info(f'Connecting to [bold green]{ip}[/bold green] ..')
+        Logger.info('Connecting to [bold green]%s[/bold green] ..', ip)
         result = self.__execute_command(f'connect {ip}', include_selected_serial=False)
-        if "connected" in result:
-            self.__devices = self.get_devices()
-            self.__selected_device = self.__devices[-1]
-            Logger.success(f'Device: [bold blue]{self.__selected_device}[/bold blue] is connected successfully')
+        if parse_connect_result(result):
+            # serials only, the `devices -l` listing of a big fleet overflows the 64 KiB adb host protocol payload
+            self.__devices = self.get_devices(include_descriptions=False)
+            self.__selected_device = find_connected_device(self.__devices, ip)
+            Logger.success('Device: [bold blue]%s[/bold blue] is connected successfully', self.__selected_device)
             return True
         else: # "failed" in result
-            Logger.error(f'Connection with [bold blue]{ip}[/bold blue] failed')
+            Logger.error('Connection with [bold blue]%s[/bold blue] failed', ip)
             return False
     
 
@@ -211,9 +324,9 @@ class ADBClient:
         """
         for device in self.__devices:
             if device.split(':')[0] == ip:
-                Logger.success(f'Device: [bold blue]{ip}[/bold blue] is connected')
+                Logger.success('Device: [bold blue]%s[/bold blue] is connected', ip)
                 return True
-        Logger.error(f'Device [bold blue]{ip}[/bold blue] is not connected')
+        Logger.error('Device [bold blue]%s[/bold blue] is not connected', ip)
         return False
 
 
@@ -225,14 +338,15 @@ class ADBClient:
         Returns:
             Boolean: True if the device is disconnected.
         """
-        Logger.info(f'Disconnecting device..')
-        if 'disconnected' in self.__execute_command('disconnect'):
-            self.__devices = self.get_devices()
+        Logger.info('Disconnecting device..')
+        if parse_disconnect_result(self.__execute_command('disconnect')):
+            self.close_shell_sessions(self.__selected_device)
+            self.__devices = self.get_devices(include_descriptions=False)
             self.__selected_device = None
-            Logger.success(f'Device: [bold blue]{self.__selected_device}[/bold blue] is disconnected')
+            Logger.success('Device: [bold blue]%s[/bold blue] is disconnected', self.__selected_device)
             return True
         else:
-            Logger.error(f'Error while disconnecting device: [bold blue]{self.__selected_device}[/bold blue]')
+            Logger.error('Error while disconnecting device: [bold blue]%s[/bold blue]', self.__selected_device)
             return False
 
 
@@ -257,20 +371,15 @@ class ADBClient:
             connected device. Each dictionary contains the following keys: 'ip', 'serial_number', 'state',
             and 'description'.
         """
-        Logger.info(f'Getting connected devices..')
-        self.__devices = []
+        Logger.info('Getting connected devices..')
         command = 'devices'
         if include_descriptions:
             command += ' -l'
-        result = self.__execute_command(command, include_selected_serial=False)
-        devices = result.split("\n")[1:]
-        Logger.info(f'There are [bold green]{len(devices)}[/bold green] connected devices')
-        for i, device in enumerate(devices):
-            data = device.split()
-            serial_number = data[0]
-            self.__devices.append(serial_number)
-            if self.__verbose:
-                Logger.print(f'[bold green]Device[/bold green] ({i+1}): [yellow]{serial_number}[/yellow]')
+        self.__devices = parse_devices(self.__execute_command(command, include_selected_serial=False))
+        Logger.info('There are [bold green]%s[/bold green] connected devices', len(self.__devices))
+        if self.__verbose:
+            for i, serial_number in enumerate(self.__devices):
+                Logger.print('[bold green]Device[/bold green] (%s): [yellow]%s[/yellow]', i+1, serial_number)
         return self.__devices
     
     
@@ -288,10 +397,10 @@ class ADBClient:
         """
         if device_serial in self.__devices:
             self.__selected_device = device_serial
-            Logger.success(f'Selected device: [bold blue]{self.__selected_device}[/bold blue]')
+            Logger.success('Selected device: [bold blue]%s[/bold blue]', self.__selected_device)
             return True
         else:
-            Logger.error(f'Device: [bold blue]{device_serial}[/bold blue] is not found')
+            Logger.error('Device: [bold blue]%s[/bold blue] is not found', device_serial)
             return False
     
     
@@ -304,10 +413,44 @@ class ADBClient:
             Selected device serial number. `None` if no device found.
         """
         if self.__selected_device:
-            Logger.success(f'Selected device: [bold blue]{self.__selected_device}[/bold blue]')
+            Logger.success('Selected device: [bold blue]%s[/bold blue]', self.__selected_device)
         else:
-            Logger.error(f'No device found')
+            Logger.error('No device found')
         return self.__selected_device
+
+    
+    
+    @property
+    def selected_device(self) -> str|None:
+        """Serial of the selected device, `None` if no device is selected. Unlike `get_selected_device` it logs nothing."""
+        return self.__selected_device
+
+
+
+    def device(self, device_serial: str|None=None) -> ADBDevice:
+        """
+        The function returns a handle bound to one device. The handle carries its own serial, so
+        unlike the selected device API it can be used from many threads at the same time, all the
+        handles of a device share its package index and persistent shell.
+        
+        Args:
+            device_serial (str|None): Serial of the device, for example '192.168.1.28:5555'. Defaults to
+                the selected device.
+        
+        Returns:
+            `ADBDevice` handle of the device.
+        """
+        serial = device_serial or self.__selected_device
+        return ADBDevice(serial, self.__transport, self.__get_device_state(serial), self.__launcher_catalog,
+                         self.__verbose, self.__show_command, self.__persistent_shell, self.__command_timeout)
+    
+    
+    
+    def __get_device_state(self, serial: str|None) -> DeviceState:
+        with self.__device_states_lock:
+            if serial not in self.__device_states:
+                self.__device_states[serial] = DeviceState(serial, self.__package_cache_ttl)
+            return self.__device_states[serial]
         
         
         
@@ -320,17 +463,7 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        device_info = {}
-        results = self.execute_shell_command('getprop').split('\n')
-        for data in results:
-            match = re.match(r"\[([^:]+)\]: \[([^:]+)\]", data)
-            if match:
-                prop = match.group(1)
-                value = match.group(2)
-                device_info[prop] = value
-                if self.__verbose:
-                    Logger.print(f'[bold green]{prop}[/bold green]: [yellow]{value}[/yellow]')
-        return device_info
+        return self.device().get_device_info()
        
        
        
@@ -343,9 +476,7 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        device_state = self.__execute_command('get-state')
-        Logger.info(f'Device: ({self.__selected_device}) state is {device_state}')
-        return device_state
+        return self.device().get_state()
 
 
 
@@ -358,9 +489,7 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        device_serialno = self.__execute_command('get-serialno')
-        Logger.info(f'Device Serial number: {device_serialno}')
-        return device_serialno
+        return self.device().get_serialno()
 
 
 
@@ -373,9 +502,7 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        device_devpath = self.__execute_command('get-devpath')
-        Logger.info(f'Device dev_path: {device_devpath}')
-        return device_devpath
+        return self.device().get_devpath()
     
     
     
@@ -393,12 +520,32 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        device_ip = ''
-        if result := self.execute_shell_command(f'ifconfig {interface}'):
-            if match_obj := re.search(r"inet addr:(.+)  Bcast", result, re.M | re.I):
-                device_ip = match_obj[1]
-                Logger.info(f'Device ip: {device_ip}')
-        return device_ip
+        return self.device().get_ip_address(interface)
+    
+    
+    
+    def snapshot(self, fields: tuple|list|None=None, properties: list|None=None, interface: str='wlan0') -> DeviceSnapshot|None:
+        """
+        The function gathers the state of the selected device in a single adb round trip, instead of
+        calling `get_state`, `is_powered_on`, `get_device_info`, `get_ip_address` and a foreground app
+        lookup one by one.
+        
+        Args:
+            fields (tuple|list|None): Fields to gather, any of [state | power | properties | ip_address | foreground_app].
+                Defaults to all of them.
+            properties (list|None): System properties to read for the `properties` field, for example
+                `['ro.product.model']`. Defaults to None (all the properties).
+            interface (str): Network interface of the `ip_address` field. Defaults to wlan0
+        
+        Returns:
+            `DeviceSnapshot` of the selected device. `None` if no device found.
+        
+        Raises:
+            ValueError: if a field is unknown.
+        """
+        if self.__selected_device is None:
+            return
+        return self.device().snapshot(fields, properties, interface)
     
     
 
@@ -425,14 +572,7 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        Logger.info(f'Uploading: [bold green]{local}[/bold green] to [bold green]{remote}[/bold green] ..')
-        result = self.__execute_command(f'push {local} {remote}') 
-        if '1 file pushed' in result:
-            Logger.success(f'File [bold blue]{local}[/bold blue] uploaded to [bold blue]{remote}[/bold blue] successfully')
-            return True
-        else:
-            Logger.error(f'Uploading [bold blue]{local}[/bold blue] to [bold blue]{remote}[/bold blue] failed')
-            return False
+        return self.device().push(local, remote)
         
 
 
@@ -457,44 +597,63 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        command = 'pull '
-        if preserve_meta:
-            command += '-k '
-        command += f'{remote} {local}'
-        Logger.info(f'Downloading: [bold green]{remote}[/bold green] to [bold green]{local}[/bold green] ..')
-        result = self.__execute_command(command)
-        if '1 file pulled,' in result:
-            Logger.success(f'File [bold blue]{remote}[/bold blue] downloaded to [bold blue]{local}[/bold blue] successfully')
-            return True
-        else:
-            Logger.error(f'Downloading [bold blue]{remote}[/bold blue] to [bold blue]{local}[/bold blue] failed')
-            return False
+        return self.device().pull(remote, local, preserve_meta)
 
 
     # ------------------------------[ Apps Operations Commands ]------------------------------
     
 
 
-    def is_installed(self, package_name: str) -> bool|None:
+    def is_installed(self, package_name: str, refresh: bool=False) -> bool|None:
         """
         The function checks if the specified package is installed or not.
         
+        The answer comes from the device package index, built from one `pm list packages` and kept for
+        `package_cache_ttl` seconds. Packages missing from the index are confirmed with a cheap
+        `pm path <package>` before answering `False`.
+        
         Args:
             package_name (str): The name of the package, for example 'com.google.chrome'
+            refresh (bool): If set to `True`, the package is checked on the device with `pm path <package>`
+                instead of trusting the index. Defaults to False.
         
         Returns:
             Boolean indicates if app is installed or not. `None` if no device found.
         """
         if self.__selected_device is None:
             return
-        command = f'pm list packages'
-        app_installed =  package_name in self.execute_shell_command(command)
-        if app_installed:
-            Logger.success(f'App [bold blue]{package_name}[/bold blue] is installed')
-            return True
-        else:
-            Logger.error(f'App [bold blue]{package_name}[/bold blue] is not installed')
-            return False
+        return self.device().is_installed(package_name, refresh)
+        
+        
+        
+    def refresh_package(self, package_name: str) -> bool|None:
+        """
+        The function checks a single package on the device with `pm path <package>` and updates the
+        device package index with the result.
+        
+        Args:
+            package_name (str): The name of the package, for example 'com.google.chrome'
+        
+        Returns:
+            Boolean indicates if app is installed or not. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return self.device().refresh_package(package_name)
+        
+        
+        
+    def get_package_index(self, device_serial: str|None=None) -> PackageIndex:
+        """
+        The function returns the installed packages index of a device, creating it on first use.
+        
+        Args:
+            device_serial (str|None): Serial of the device. Defaults to the selected device.
+        
+        Returns:
+            The `PackageIndex` of the device.
+        """
+        return self.__get_device_state(device_serial or self.__selected_device).package_index
         
         
         
@@ -516,18 +675,7 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        command = 'install '
-        if replace:
-            command += '-r '
-        command += apk_file
-        Logger.info(f'Installing APK file [bold green]{apk_file}[/bold green], it will took up to 2 minutes to complete..')
-        result = self.__execute_command(command)
-        if 'Success' in result:
-            Logger.success(f'APK [bold blue]{apk_file}[/bold blue] is installed successfully')
-            return True
-        else:
-            Logger.error(f'Installation process failed')
-            return False
+        return self.device().install(apk_file, replace)
 
 
 
@@ -549,25 +697,11 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        command = 'uninstall '
-        if keep_data:
-            command += '-k '
-        command += package
-        message = f'Uninstalling package [bold green]{package}[/bold green]'
-        message += 'while keeping the data' if keep_data else ''
-        message += ', it will took up to 2 minutes to complete..'
-        Logger.info(message)
-        result = self.__execute_command(command)
-        if 'Success' in result:
-            Logger.success(f'Package [bold blue]{package}[/bold blue] is uninstalled successfully')
-            return True
-        else:
-            Logger.error(f'Uninstalling process failed')
-            return False
+        return self.device().uninstall(package, keep_data)
     
     
     
-    def start_app(self, package: str, activity: str, wait: bool=True, stop: bool=True) -> bool|None:
+    def start_app(self, package: str, activity: str|None=None, wait: bool=True, stop: bool=True, timeout: float|None=None) -> bool|None:
         """
         The function starts an Android app with the specified package and activity, optionally waiting
         for the launch to complete and stopping the app before starting the activity.
@@ -576,10 +710,11 @@ class ADBClient:
             package (str): The package parameter is a string that represents the package name of the
                 Android application you want to start. This is typically the unique identifier for the app and
                 is specified in the AndroidManifest.xml file of the app.
-            activity (str): The "activity" parameter refers to the specific activity or screen within the
+            activity (str|None): The "activity" parameter refers to the specific activity or screen within the
                 Android app that you want to start. An activity represents a single screen with a user
                 interface, and it is the basic building block of an Android app. Each activity has a unique name
-                that is specified in the AndroidManifest.xml file
+                that is specified in the AndroidManifest.xml file. If `None`, the app launcher activity is
+                resolved with `get_launcher_activity`. Defaults to None
             wait (bool): The "wait" parameter is a boolean value that determines whether the command
                 should wait for the launch to complete before returning. If set to True, the command will wait
                 for the launch to complete. If set to False, the command will not wait and will return
@@ -588,31 +723,18 @@ class ADBClient:
                 target app before starting the activity. If it is set to True, the target app will be stopped
                 before starting the activity. If it is set to False, the target app will not be stopped.
                 Defaults to True
+            timeout (float|None): Seconds the whole start may take (installation check, HOME press and
+                `am start`), the running command is killed when it expires. Defaults to None (no limit).
         
         Returns:
             Boolean indicates if app starting process is successful. `None` if no device found.
+        
+        Raises:
+            DeadlineExceeded: if the app did not start in time.
         """
         if self.__selected_device is None:
             return
-        # check if app is installed
-        if not self.is_installed(package):
-            return False
-        self.send_keyevent_input(KeyCodes.KEYCODE_HOME)
-        command = 'am start '
-        # wait for launch to complete
-        if wait:
-            command += '-W '
-        if stop: # force stop the target app before starting the activity
-            command += '-S '
-        command += f'{package}/{activity}'
-        Logger.info(f'Starting app: [bold green]{package}[/bold green] ..')
-        result = self.execute_shell_command(command)
-        if 'Error' in result:
-            Logger.error(f'Starting app [bold blue]{package}[/bold blue] failed')
-            return False
-        else:
-            Logger.success(f'App: [bold blue]{package}[/bold blue] started successfully')
-            return True
+        return self.device().start_app(package, activity, wait, stop, timeout)
 
 
 
@@ -629,14 +751,7 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        Logger.info(f'Stopping app: [bold green]{package}[/bold green] ..')
-        result =  self.execute_shell_command(f'am force-stop {package}')
-        if 'Error' in result:
-            Logger.error(f'Stopping app [bold blue]{package}[/bold blue] failed')
-            return False
-        else:
-            Logger.success(f'App: [bold blue]{package}[/bold blue] stopped successfully')
-            return True
+        return self.device().stop_app(package)
 
 
 
@@ -655,18 +770,7 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        packages = []
-        if self.__selected_device:
-            package_type_flags = {'all': '', 'enabled': '-e', 'disabled': '-d', 'system': '-s', 'third-party': '-3'}
-            if package_type not in package_type_flags:
-                package_type = 'all'
-            results = self.execute_shell_command(f'pm list packages {package_type_flags[package_type]}').split("\n")
-            packages = sorted([x.replace('package:', '') for x in results])
-            Logger.info(f'There are [bold green]{len(packages)}[/bold green] [bold blue]{package_type}[/bold blue] packages')
-            if self.__verbose:
-                for package in packages:
-                    Logger.print(f'[bold green]{package}[/bold green]')
-        return packages
+        return self.device().list_packages(package_type)
     
     
     
@@ -684,20 +788,29 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        results = self.execute_shell_command(f'dumpsys package {package}').split()
-        activities = []
-        for res in results:
-            if f'{package}/' in res:
-                activity = res.replace('"', '').replace(':', '').replace('}', '').strip()
-                activities.append(activity)
-                if self.__verbose:
-                    Logger.print(f'[bold green]{activity}[/bold green]')
-        unique_activities = []
-        for activity in activities:
-            if activity not in unique_activities and activity.startswith(package):
-                unique_activities.append(activity) 
-        Logger.info(f'There are [bold green]{len(unique_activities)}[/bold green] activities for package: {package}')
-        return unique_activities
+        return self.device().get_package_activities(package)
+
+    
+    
+    def get_launcher_activity(self, package: str, refresh: bool=False) -> str|None:
+        """
+        The function returns the launcher activity of an app, used to start it.
+        
+        The launcher activities of all the device apps are resolved together with one shell query and
+        kept in the launcher catalog, keyed by the device build fingerprint and the app version code, so
+        the device is queried again only when the app is updated or the package index expires.
+        
+        Args:
+            package (str): The package name, for example 'com.netflix.ninja'
+            refresh (bool): If set to `True`, the device is queried even if the catalog knows the app. Defaults to False.
+        
+        Returns:
+            The launcher component in form of package/activity. `None` if no device found or the app
+            has no launcher activity.
+        """
+        if self.__selected_device is None:
+            return
+        return self.device().get_launcher_activity(package, refresh)
 
 
 
@@ -719,17 +832,7 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        command = 'reboot '
-        if mode:
-            command += mode
-        Logger.info(f'Rebooting TV' + f' in mode [bold green]{mode}[bold green]' if mode else '' + ' ..')
-        result =  self.__execute_command(command)
-        if 'error' in result:
-            Logger.error(f'Rebooting failed')
-            return False
-        else:
-            Logger.success(f'Rebooted successfully')
-            return True
+        return self.device().reboot(mode)
     
     
     
@@ -742,30 +845,165 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        try:
-            # results = self.execute_shell_command(f'dumpsys power | grep mHoldingDisplaySuspendBlocker') (true, false)
-            # results = self.execute_shell_command(f'dumpsys power | grep mWakefulness') (Asleep | Awake | Dreaming)
-            results = self.execute_shell_command(f'dumpsys power | grep "Display Power"')
-            return 'ON' in results
-        except:
-            return
+        return self.device().is_powered_on()
         
         
         
         
         
-    def execute_shell_command(self, command: str) -> str:
+    def execute_shell_command(self, command: str, timeout: float|None=None) -> str:
         """
         The function executes an adb shell command by calling `adb shell` command.
         
         Args:
             command (str): The `command` parameter is a string that represents the shell command that you
                 want to execute.
+            timeout (float|None): Seconds the command may take, it is killed after. Defaults to the client `command_timeout`.
         
         Returns:
             String of the output results of executing the shell command.
+            
+        Raises:
+            CalledProcessError: if the command returns a non-zero exit code in a persistent shell.
+            DeadlineExceeded: if the command did not complete in time.
         """
-        return self.__execute_command(f'shell {command}')
+        return self.device(self.__selected_device).execute_shell_command(command, timeout)
+    
+    
+    
+    def exec_out(self, command: str, sink: Any=None, timeout: float|None=None) -> memoryview|int|None:
+        """
+        The function executes a shell command with `adb exec-out` and returns its raw binary output,
+        without decoding it or translating line endings.
+        
+        Args:
+            command (str): The shell command, for example `screencap -p`.
+            sink (Any): Where the output goes. `None` returns it, a file-like object (with `write`) receives it
+                chunk by chunk and a writable buffer is filled in place. Defaults to None.
+            timeout (float|None): Seconds the command may take, it is killed after. Defaults to the client `command_timeout`.
+        
+        Returns:
+            A `memoryview` of the output if no sink is given, otherwise the number of bytes written to the sink.
+            `None` if no device found.
+        
+        Raises:
+            BufferError: if the output does not fit in a buffer sink.
+            DeadlineExceeded: if the command did not complete in time.
+        """
+        if self.__selected_device is None:
+            return
+        return self.device().exec_out(command, sink, timeout)
+    
+    
+    
+    def get_shell_session(self, device_serial: str|None=None) -> ShellSession:
+        """
+        The function returns the persistent shell session of a device, creating it on first use.
+        The shell itself is only started by its first command.
+        
+        Args:
+            device_serial (str|None): Serial of the device. Defaults to the selected device.
+        
+        Returns:
+            The `ShellSession` of the device.
+        """
+        return self.__get_device_state(device_serial or self.__selected_device).get_shell_session(self.__transport)
+    
+    
+    
+    def close_shell_sessions(self, device_serial: str|None=None):
+        """
+        The function ends the persistent shells.
+        
+        Args:
+            device_serial (str|None): Serial of the device whose shell should end. Defaults to all devices.
+        """
+        with self.__device_states_lock:
+            states = list(self.__device_states.values())
+        for state in states:
+            if device_serial is None or state.serial == device_serial:
+                state.close_shell_session()
+
+
+
+    # ------------------------------[ Screen Commands ]------------------------------
+
+
+
+    def screencap(self, format: str='png', sink: Any=None, display: int|None=None) -> memoryview|RawFrame|int|None:
+        """
+        The function captures the screen of the selected device in one binary round trip.
+        
+        Args:
+            format (str): Capture format [png | raw]. Defaults to png
+            sink (Any): File-like object or writable buffer receiving the capture. Defaults to None.
+            display (int|None): Physical display id to capture, `None` for the default display.
+        
+        Returns:
+            The PNG image as a `memoryview` for `png`, a `RawFrame` for `raw`, or the number of bytes
+            written if a sink is given. `None` if no device found.
+        
+        Raises:
+            ValueError: if the format is unknown or the raw capture can not be parsed.
+        """
+        if self.__selected_device is None:
+            return
+        return self.device().screencap(format, sink, display)
+
+
+
+    def screen_stream(self, duration: float|None=None, bit_rate: int|None=None, size: str|None=None, sink: Any=None,
+                      segment_time_limit: int=SEGMENT_TIME_LIMIT, capacity: int=64, policy: str='block') -> ScreenStream|int|None:
+        """
+        The function records the screen of the selected device as a raw H.264 elementary stream
+        (`screenrecord --output-format=h264 -`). Recordings longer than the `screenrecord` 3 minutes
+        limit are chained segments.
+        
+        Args:
+            duration (float|None): Seconds to record, at least 1 and rounded down to whole seconds. Defaults to
+                None (until the stream is closed).
+            bit_rate (int|None): Video bit rate in bits per second, for example 4000000. Defaults to the device default.
+            size (str|None): Video size as `WIDTHxHEIGHT`, for example '1280x720'. Defaults to the screen size.
+            sink (Any): File-like object the video is written into, the call then blocks until the recording
+                ends. Defaults to None (return the stream).
+            segment_time_limit (int): Seconds of one `screenrecord` segment, at most 180. Defaults to 180
+            capacity (int): Maximum number of chunks waiting for the consumer. Defaults to 64
+            policy (str): What to do when the consumer is too slow [drop_oldest | drop_newest | block]. Defaults to block
+        
+        Returns:
+            `ScreenStream` iterator of byte chunks. The number of bytes written if a sink is given.
+            `None` if no device found.
+        
+        Raises:
+            ValueError: if the policy is unknown or the duration is shorter than 1 second.
+        """
+        if self.__selected_device is None:
+            return
+        return self.device().screen_stream(duration, bit_rate, size, sink, segment_time_limit, capacity, policy)
+
+
+
+    # ------------------------------[ UI Commands ]------------------------------
+
+
+
+    def ui_snapshot(self, compressed: bool=False) -> UIIndex|None:
+        """
+        The function dumps the UI hierarchy of the selected device screen (`uiautomator dump`) in one
+        binary round trip and indexes its focusable nodes.
+        
+        Args:
+            compressed (bool): Whether to skip the views that are not important for accessibility. Defaults to False.
+        
+        Returns:
+            `UIIndex` of the screen. `None` if no device found.
+        
+        Raises:
+            ValueError: if the device did not return a UI hierarchy, for example while the screen is off.
+        """
+        if self.__selected_device is None:
+            return
+        return self.device().ui_snapshot(compressed)
 
 
 
@@ -783,22 +1021,196 @@ class ADBClient:
         """
         if self.__selected_device is None:
             return
-        command = f'input keyevent {keycode.name}'
-        if long_press:
-            command += ' --longpress'
-        self.execute_shell_command(command)
+        self.device().send_keyevent_input(keycode, long_press)
     
     
     
-    def send_text_input(self, text: str, encode_spaces: bool=True):
+    def send_keyevent_sequence(self, keys: list, inter_key_delay: float|None=None):
         """
-        The function executes an adb shell command to send text input.
+        The function sends a whole sequence of key events in a single adb round trip. Without delay
+        all keys go to one `input keyevent K1 K2 ..` invocation, with a delay the sequence runs as one
+        on-device script that sleeps between the keys.
+        
+        Args:
+            keys (list): List of `KeyCodes` to press in order.
+            inter_key_delay (float|None): Seconds to wait on the device between two key presses. Defaults to None.
+        """
+        if self.__selected_device is None:
+            return
+        self.device().send_keyevent_sequence(keys, inter_key_delay)
+    
+    
+    
+    def input_queue(self, max_rate: float|None=None, max_batch: int=32) -> InputScheduler|None:
+        """
+        The function returns the input queue of the selected device, for remotes pressed faster than adb
+        delivers. Queued keys are coalesced into batched calls, `POWER`/`HOME` go first and drop the
+        stale navigation, and the key rate is limited.
+        
+        Example:
+            queue = adb_client.input_queue(max_rate=10)
+            queue.press(KeyCodes.KEYCODE_VOLUME_UP)
+            queue.press([KeyCodes.KEYCODE_DPAD_DOWN, KeyCodes.KEYCODE_DPAD_CENTER], supersede=True)
+            print(queue.stats().mean_wait)
+        
+        Args:
+            max_rate (float|None): Maximum keys per second, applied when the queue is created. Defaults to None (no limit).
+            max_batch (int): Maximum keys sent in one call, applied when the queue is created. Defaults to 32
+        
+        Returns:
+            The `InputScheduler` of the device, shared by all its handles. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return self.device().input_queue(max_rate, max_batch)
+    
+    
+    
+    def send_text_input(self, text: str, encode_spaces: bool=True, mode: str='auto', chunk_size: int=TEXT_CHUNK_SIZE):
+        """
+        The function types a text in the focused input field, in one round trip.
+        
+        The `input` mode types with `input text`: shell metacharacters are escaped, long texts are sent in
+        chunks and new lines or tabs are pressed as keys, but only printable ASCII can be typed. The
+        `adbkeyboard` mode commits any Unicode text at once through the ADBKeyboard input method, which must
+        be installed and selected (see `enable_adb_keyboard`). The `auto` mode uses ADBKeyboard for long or
+        non-ASCII texts when it is the current keyboard, and `input text` otherwise.
         
         Args:
             text (str): the text string to send.
-            encode_spaces (bool): specify if spaces should be replaced by `%s` or not. Defaults to True.
+            encode_spaces (bool): specify if the text should be escaped. `False` sends it as is to `input text`,
+                spaces included, for texts already escaped. Defaults to True.
+            mode (str): How the text is typed [auto | input | adbkeyboard]. Defaults to auto
+            chunk_size (int): Maximum characters of one `input text` call. Defaults to 256
+        
+        Raises:
+            ValueError: if the mode is unknown, or the text is not ASCII and ADBKeyboard is not the current keyboard.
         """
         if self.__selected_device is None:
             return
-        processed_text = text.replace(' ', '%s') if encode_spaces else text
-        self.execute_shell_command(f'input text {processed_text}')
+        self.device().send_text_input(text, encode_spaces, mode, chunk_size)
+    
+    
+    
+    def enable_adb_keyboard(self) -> bool|None:
+        """
+        The function makes the installed ADBKeyboard (https://github.com/senzhk/ADBKeyBoard) the current input
+        method of the selected device, for the fast `adbkeyboard` text mode.
+        
+        Returns:
+            Boolean indicates if ADBKeyboard is now the current input method, `False` if it is not installed.
+            `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return self.device().enable_adb_keyboard()
+
+
+
+    # ------------------------------[ Volume Commands ]------------------------------
+    
+    
+    
+    def get_volume(self, stream: int|str='music', refresh: bool=True) -> Volume|None:
+        """
+        The function reads the volume of an audio stream of the selected device in one command.
+        
+        Args:
+            stream (int|str): Stream id or name [music | system | ring | alarm | notification | voice_call]. Defaults to music
+            refresh (bool): Whether to ask the device, otherwise the last known volume is returned when there
+                is one. It follows the volume keys sent by this library. Defaults to True.
+        
+        Returns:
+            The `Volume` of the stream, with its level and range. `None` if no device found.
+        
+        Raises:
+            ValueError: if the stream is unknown or the device reports no volume.
+        """
+        if self.__selected_device is None:
+            return
+        return self.device().get_volume(stream, refresh)
+    
+    
+    
+    def set_volume(self, level: int, stream: int|str='music') -> Volume|None:
+        """
+        The function sets the volume of an audio stream of the selected device in one command, instead of
+        pressing the volume keys once per step.
+        
+        Args:
+            level (int): The volume index, clamped into the stream range when it is known.
+            stream (int|str): Stream id or name [music | system | ring | alarm | notification | voice_call]. Defaults to music
+        
+        Returns:
+            The `Volume` of the stream after the change. `None` if no device found.
+        
+        Raises:
+            ValueError: if the stream is unknown or the device reports no volume.
+        """
+        if self.__selected_device is None:
+            return
+        return self.device().set_volume(level, stream)
+
+
+
+    # ------------------------------[ Logs Commands ]------------------------------
+
+
+
+    def logcat_stream(self, filters: list|None=None, binary: bool=False, buffers: list|None=None, pid: int|None=None,
+                      regex: str|None=None, tail: int|None=None, capacity: int=10000, policy: str='drop_oldest') -> LogcatStream|None:
+        """
+        The function follows the log of the selected device, yielding parsed records as they are written.
+        
+        Filters run on the device, so only the wanted entries cross the network. The records wait for
+        the consumer in a ring buffer of `capacity` records, when it is full the `policy` drops the
+        oldest (`drop_oldest`) or the newest (`drop_newest`) record, or pauses the reading (`block`).
+        
+        Args:
+            filters (list|None): logcat filter specs, for example `['ActivityManager:I', '*:S']`.
+            binary (bool): Whether to read the binary log format (`logcat -B`) instead of `-v threadtime`. Defaults to False.
+            buffers (list|None): Log buffers to read, for example `['main', 'system']`. Defaults to the device defaults.
+            pid (int|None): Only read the entries of this process id.
+            regex (str|None): Only read the entries whose message matches this regular expression.
+            tail (int|None): Start with the last `tail` entries instead of the whole buffer.
+            capacity (int): Maximum number of records waiting for the consumer. Defaults to 10000
+            policy (str): What to do when the consumer is too slow [drop_oldest | drop_newest | block].
+                Defaults to drop_oldest
+        
+        Returns:
+            `LogcatStream` iterator of `LogcatRecord`. `None` if no device found.
+        
+        Raises:
+            ValueError: if the policy is unknown.
+        """
+        if self.__selected_device is None:
+            return
+        return self.device().logcat_stream(filters, binary, buffers, pid, regex, tail, capacity, policy)
+
+
+
+
+    # ------------------------------[ Watch Commands ]------------------------------
+
+
+
+    def watch(self, serials: list|None=None, callback: Callable|None=None, reconnect_interval: float=1.0,
+              max_reconnect_interval: float=30.0) -> DeviceWatcher|None:
+        """
+        The function watches devices for power changes, foreground app changes, disconnections and
+        reconnections, with one streaming `logcat` per device instead of polling `is_powered_on`.
+
+        Args:
+            serials (list|None): Serials of the devices to watch. Defaults to the selected device.
+            callback (Callable|None): Listener called as `callback(event)` with every `DeviceEvent`. Defaults to None.
+            reconnect_interval (float): Seconds before the first reconnection attempt of a dropped device,
+                doubled after every failed attempt. Defaults to 1
+            max_reconnect_interval (float): Longest wait between reconnection attempts. Defaults to 30
+
+        Returns:
+            The running `DeviceWatcher`, close it (or use it as a context manager) to stop watching.
+            `None` if no device found.
+        """
+        if not serials and self.__selected_device is None:
+            return
+        return DeviceWatcher(self, serials or [self.__selected_device], callback, reconnect_interval, max_reconnect_interval)
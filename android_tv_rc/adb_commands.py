@@ -0,0 +1,467 @@
+import re
+from .key_codes import KeyCodes
+
+
+
+# flags of `pm list packages` per package type
+PACKAGE_TYPE_FLAGS = {'all': '', 'enabled': '-e', 'disabled': '-d', 'system': '-s', 'third-party': '-3'}
+
+POWER_STATE_COMMAND = 'dumpsys power | grep "Display Power"'
+
+# `[name]: [value]`, values may hold ':' (build fingerprints, urls ..) or be empty
+PROPERTY_PATTERN = re.compile(r'\[([^\]]+)\]: \[(.*)\]')
+
+IP_ADDRESS_PATTERN = re.compile(r'inet addr:(.+)  Bcast', re.MULTILINE | re.IGNORECASE)
+
+
+
+# ------------------------------[ Connectivity Commands ]------------------------------
+
+
+
+def parse_connect_result(output: str) -> bool:
+    """
+    The function checks the output of `adb connect`.
+
+    Args:
+        output (str): Output of `adb connect <ip>`.
+
+    Returns:
+        Boolean indicates if the device is connected, `already connected` included.
+    """
+    return 'connected' in output
+
+
+
+def parse_disconnect_result(output: str) -> bool:
+    """
+    The function checks the output of `adb disconnect`.
+
+    Args:
+        output (str): Output of `adb disconnect`.
+
+    Returns:
+        Boolean indicates if the device is disconnected.
+    """
+    return 'disconnected' in output
+
+
+
+def parse_devices(output: str) -> list:
+    """
+    The function parses the output of `adb devices` (with or without `-l`) into device serials.
+
+    Args:
+        output (str): Output of `adb devices`, a header line then one device per line.
+
+    Returns:
+        List of device serials, in the order of the listing.
+    """
+    return [line.split()[0] for line in output.split('\n')[1:] if line.strip()]
+
+
+
+def find_connected_device(serials: list, ip: str) -> str|None:
+    """
+    The function picks the device just connected to in a devices listing, the adb server may hold
+    other devices too.
+
+    Args:
+        serials (list): Serials of the connected devices.
+        ip (str): The address given to `adb connect`, with or without its port.
+
+    Returns:
+        Serial of the connected device, the last listed device if none matches. `None` if there is no device.
+    """
+    connected = [serial for serial in serials if serial == ip or serial.split(':')[0] == ip]
+    return (connected or serials or [None])[-1]
+
+
+
+# ------------------------------[ Info Commands ]------------------------------
+
+
+
+def parse_properties(output: str) -> dict:
+    """
+    The function parses the output of `getprop` into system properties.
+
+    Args:
+        output (str): Output of `getprop`, one `[name]: [value]` per line.
+
+    Returns:
+        Dictionary of property name to value.
+    """
+    properties = {}
+    for line in output.split('\n'):
+        if match := PROPERTY_PATTERN.match(line):
+            properties[match.group(1)] = match.group(2)
+    return properties
+
+
+
+def build_ip_address_command(interface: str='wlan0') -> str:
+    """
+    The function builds the shell command describing a network interface.
+
+    Args:
+        interface (str): The network interface. Defaults to wlan0
+
+    Returns:
+        The shell command.
+    """
+    return f'ifconfig {interface}'
+
+
+
+def parse_ip_address(output: str) -> str:
+    """
+    The function parses the IP address out of the output of `ifconfig <interface>`.
+
+    Args:
+        output (str): Output of `ifconfig <interface>`.
+
+    Returns:
+        The IP address, an empty string if the interface has none.
+    """
+    match = IP_ADDRESS_PATTERN.search(output)
+    return match[1] if match else ''
+
+
+
+# ------------------------------[ File Operations Commands ]------------------------------
+
+
+
+def build_push_command(local: str, remote: str='/data/local/tmp/') -> str:
+    """
+    The function builds the `adb push` command.
+
+    Args:
+        local (str): Path of the local file or directory.
+        remote (str): Destination on the device. Defaults to /data/local/tmp/
+
+    Returns:
+        The adb command.
+    """
+    return f'push {local} {remote}'
+
+
+
+def build_pull_command(remote: str, local: str, preserve_meta: bool=False) -> str:
+    """
+    The function builds the `adb pull` command.
+
+    Args:
+        remote (str): Path of the file or directory on the device.
+        local (str): Local destination path.
+        preserve_meta (bool): Whether to preserve the file time stamp and mode. Defaults to False
+
+    Returns:
+        The adb command.
+    """
+    return f'pull -k {remote} {local}' if preserve_meta else f'pull {remote} {local}'
+
+
+
+def parse_transfer_result(output: str, direction: str) -> bool:
+    """
+    The function checks the output of `adb push` or `adb pull` of a single file.
+
+    Args:
+        output (str): Output of the transfer.
+        direction (str): [pushed | pulled]
+
+    Returns:
+        Boolean indicates if the file was transferred.
+    """
+    return f'1 file {direction}' in output
+
+
+
+# ------------------------------[ Apps Operations Commands ]------------------------------
+
+
+
+def build_install_command(apk_file: str, replace: bool=True) -> str:
+    """
+    The function builds the `adb install` command.
+
+    Args:
+        apk_file (str): The file path of the APK file.
+        replace (bool): Whether to replace an existing installation. Defaults to True
+
+    Returns:
+        The adb command.
+    """
+    return f'install -r {apk_file}' if replace else f'install {apk_file}'
+
+
+
+def build_uninstall_command(package: str, keep_data: bool=False) -> str:
+    """
+    The function builds the `adb uninstall` command.
+
+    Args:
+        package (str): The app package name.
+        keep_data (bool): Whether to keep the data and cache directories. Defaults to False
+
+    Returns:
+        The adb command.
+    """
+    return f'uninstall -k {package}' if keep_data else f'uninstall {package}'
+
+
+
+def parse_package_manager_result(output: str) -> bool:
+    """
+    The function checks the output of an install or uninstall.
+
+    Args:
+        output (str): Output of `adb install` or `adb uninstall`.
+
+    Returns:
+        Boolean indicates if the package manager reported a success.
+    """
+    return 'Success' in output
+
+
+
+def build_package_path_command(package: str) -> str:
+    """
+    The function builds the `pm path` shell command, the cheap check of a single package.
+
+    Args:
+        package (str): The package name.
+
+    Returns:
+        The shell command.
+    """
+    return f'pm path {package}'
+
+
+
+def parse_package_path(output: str) -> bool:
+    """
+    The function checks the output of `pm path <package>`.
+
+    Args:
+        output (str): Output of `pm path <package>`.
+
+    Returns:
+        Boolean indicates if the package is installed.
+    """
+    return output.startswith('package:')
+
+
+
+def resolve_package_type(package_type: str) -> str:
+    """
+    The function resolves a package type of `list_packages`, unknown types list all the packages.
+
+    Args:
+        package_type (str): [all | enabled | disabled | system | third-party]
+
+    Returns:
+        The package type.
+    """
+    return package_type if package_type in PACKAGE_TYPE_FLAGS else 'all'
+
+
+
+def build_list_packages_command(package_type: str='all') -> str:
+    """
+    The function builds the `pm list packages` shell command.
+
+    Args:
+        package_type (str): [all | enabled | disabled | system | third-party]. Defaults to all
+
+    Returns:
+        The shell command.
+    """
+    return f'pm list packages {PACKAGE_TYPE_FLAGS[resolve_package_type(package_type)]}'
+
+
+
+def parse_packages(output: str) -> list:
+    """
+    The function parses the output of `pm list packages` into sorted package names.
+
+    Args:
+        output (str): Output of `pm list packages`, one `package:<name>` per line.
+
+    Returns:
+        Sorted list of package names.
+    """
+    return sorted(line.replace('package:', '') for line in output.split('\n'))
+
+
+
+def build_package_dump_command(package: str) -> str:
+    """
+    The function builds the `dumpsys package` shell command.
+
+    Args:
+        package (str): The package name.
+
+    Returns:
+        The shell command.
+    """
+    return f'dumpsys package {package}'
+
+
+
+def parse_package_activities(output: str, package: str) -> list:
+    """
+    The function parses the activities of a package out of the output of `dumpsys package <package>`.
+
+    Args:
+        output (str): Output of `dumpsys package <package>`.
+        package (str): The package name.
+
+    Returns:
+        List of the package activities, in the order of the dump.
+    """
+    activities = {}  # dict keeps the insertion order
+    for word in output.split():
+        if f'{package}/' in word:
+            activity = word.replace('"', '').replace(':', '').replace('}', '').strip()
+            if activity.startswith(package):
+                activities[activity] = None
+    return list(activities)
+
+
+
+def build_start_app_command(component: str, wait: bool=True, stop: bool=True) -> str:
+    """
+    The function builds the `am start` shell command.
+
+    Args:
+        component (str): The activity to start, in form of package/activity.
+        wait (bool): Whether to wait for the launch to complete. Defaults to True
+        stop (bool): Whether to force stop the app before starting the activity. Defaults to True
+
+    Returns:
+        The shell command.
+    """
+    command = 'am start '
+    if wait:
+        command += '-W '
+    if stop:
+        command += '-S '
+    return command + component
+
+
+
+def build_stop_app_command(package: str) -> str:
+    """
+    The function builds the `am force-stop` shell command.
+
+    Args:
+        package (str): The package name.
+
+    Returns:
+        The shell command.
+    """
+    return f'am force-stop {package}'
+
+
+
+def parse_activity_manager_result(output: str) -> bool:
+    """
+    The function checks the output of `am start` or `am force-stop`, they exit with 0 on errors.
+
+    Args:
+        output (str): Output of the activity manager command.
+
+    Returns:
+        Boolean indicates if the command succeeded.
+    """
+    return 'Error' not in output
+
+
+
+# ------------------------------[ Device related Commands ]------------------------------
+
+
+
+def build_reboot_command(mode: str|None=None) -> str:
+    """
+    The function builds the `adb reboot` command.
+
+    Args:
+        mode (str|None): [bootloader | recovery | sideload | sideload-auto-reboot]
+
+    Returns:
+        The adb command.
+    """
+    return f'reboot {mode}' if mode else 'reboot'
+
+
+
+def parse_reboot_result(output: str) -> bool:
+    """
+    The function checks the output of `adb reboot`.
+
+    Args:
+        output (str): Output of `adb reboot`.
+
+    Returns:
+        Boolean indicates if the device is rebooting.
+    """
+    return 'error' not in output
+
+
+
+def parse_power_state(output: str) -> bool:
+    """
+    The function parses the output of `POWER_STATE_COMMAND`.
+
+    Args:
+        output (str): The `Display Power` line of `dumpsys power`.
+
+    Returns:
+        Boolean indicates if the screen is on.
+    """
+    return 'ON' in output
+
+
+
+# ------------------------------[ Inputs Commands ]------------------------------
+
+
+
+def build_keyevent_command(keycode: KeyCodes, long_press: bool=False) -> str:
+    """
+    The function builds the `input keyevent` shell command of one key press.
+
+    Args:
+        keycode (KeyCodes): The key to press.
+        long_press (bool): Whether to simulate a long press. Defaults to False.
+
+    Returns:
+        The shell command.
+    """
+    command = f'input keyevent {keycode.name}'
+    if long_press:
+        command += ' --longpress'
+    return command
+
+
+
+def build_keyevent_sequence_command(keys: list, inter_key_delay: float|None=None) -> str:
+    """
+    The function builds one shell command pressing a sequence of keys. Without delay all keys go to
+    one `input keyevent K1 K2 ..` invocation, with a delay the sequence is a script that sleeps
+    between the keys.
+
+    Args:
+        keys (list): List of `KeyCodes` to press in order.
+        inter_key_delay (float|None): Seconds to wait on the device between two key presses. Defaults to None.
+
+    Returns:
+        The shell command.
+    """
+    if inter_key_delay:
+        return f'; sleep {inter_key_delay:g}; '.join(f'input keyevent {keycode.name}' for keycode in keys)
+    return 'input keyevent ' + ' '.join(keycode.name for keycode in keys)
@@ -0,0 +1,1107 @@
+import sys
+import shlex
+import threading
+import subprocess
+from typing import Any
+from .logger import Logger
+from .key_codes import KeyCodes
+from .shell_session import ShellSession
+from .input_scheduler import InputScheduler
+from .text_input import (TEXT_CHUNK_SIZE, INPUT_METHOD_QUERY, ENABLE_ADB_KEYBOARD_COMMAND, check_text_input_mode,
+                         prefers_adb_keyboard, is_adb_keyboard, build_text_input_command)
+from .volume import VOLUME_STREAMS, VOLUME_KEYS, Volume, resolve_stream, build_volume_command, parse_volume
+from .adb_commands import (POWER_STATE_COMMAND, parse_connect_result, parse_properties, build_ip_address_command, parse_ip_address,
+                           build_push_command, build_pull_command, parse_transfer_result, build_install_command, build_uninstall_command,
+                           parse_package_manager_result, build_package_path_command, parse_package_path, resolve_package_type,
+                           build_list_packages_command, parse_packages, build_package_dump_command, parse_package_activities,
+                           build_start_app_command, build_stop_app_command, parse_activity_manager_result, build_reboot_command,
+                           parse_reboot_result, parse_power_state, build_keyevent_command, build_keyevent_sequence_command)
+from .package_index import PackageIndex
+from .launcher_catalog import LauncherCatalog
+from .device_snapshot import DeviceSnapshot
+from .logcat import LogcatStream, build_logcat_command
+from .deadline import deadline, remaining_time
+from .metrics import command_kind, measure_command, measure_parse
+from .tracing import trace_command
+from .screen_capture import RawFrame, build_screencap_command, parse_raw_frame
+from .screen_stream import SEGMENT_TIME_LIMIT, ScreenStream, build_screenrecord_command
+from .ui_index import UIIndex, build_ui_dump_command
+
+
+
+class DeviceState:
+    """
+    State cached for one device serial and shared by all its `ADBDevice` handles: the installed
+    packages index, the build fingerprint, the last known volumes, the persistent shell session and
+    the input queue.
+    """
+
+
+
+    def __init__(self, serial: str|None, package_cache_ttl: float|None=300.0):
+        """
+        Args:
+            serial (str|None): Serial of the device.
+            package_cache_ttl (float|None): Seconds the installed packages listing is reused. Defaults to 300.
+        """
+        self.serial = serial
+        self.package_index = PackageIndex(package_cache_ttl)
+        self.fingerprint = None
+        self.volumes = {}
+        self.adb_keyboard = None
+        self.__shell_session = None
+        self.__input_scheduler = None
+        self.__lock = threading.Lock()
+
+
+
+    def get_shell_session(self, transport: Any) -> ShellSession:
+        """
+        The function returns the persistent shell session of the device, creating it on first use.
+        The shell itself is only started by its first command.
+
+        Args:
+            transport (SubprocessTransport|SocketTransport): Transport the shell is opened with.
+
+        Returns:
+            The `ShellSession` of the device.
+        """
+        with self.__lock:
+            if self.__shell_session is None:
+                self.__shell_session = ShellSession(transport, self.serial)
+            return self.__shell_session
+
+
+
+    def get_input_scheduler(self, device: 'ADBDevice', max_rate: float|None=None, max_batch: int=32) -> InputScheduler:
+        """
+        The function returns the input queue of the device, creating it on first use.
+
+        Args:
+            device (ADBDevice): Handle the keys are sent with.
+            max_rate (float|None): Maximum keys per second, used when the queue is created. Defaults to None.
+            max_batch (int): Maximum keys sent in one call, used when the queue is created. Defaults to 32
+
+        Returns:
+            The `InputScheduler` of the device.
+        """
+        with self.__lock:
+            if self.__input_scheduler is None:
+                self.__input_scheduler = InputScheduler(device.send_keyevent_sequence, device.send_keyevent_input, max_rate, max_batch)
+            return self.__input_scheduler
+
+
+
+    def track_volume_keys(self, keys: list, long_press: bool=False):
+        """
+        The function updates the last known volumes after volume keys were sent. Volume keys change the
+        music stream on TVs, a mute or a long press makes its volume unknown until it is read again.
+
+        Args:
+            keys (list): The sent `KeyCodes`.
+            long_press (bool): Whether the keys were long pressed. Defaults to False.
+        """
+        with self.__lock:
+            volume = self.volumes.get(VOLUME_STREAMS['music'])
+            if volume is None:
+                return
+            for keycode in keys:
+                volume = None if long_press and keycode in VOLUME_KEYS else volume.step(keycode)
+                if volume is None:
+                    del self.volumes[VOLUME_STREAMS['music']]
+                    return
+            self.volumes[VOLUME_STREAMS['music']] = volume
+
+
+
+    def close_shell_session(self):
+        """Ends the persistent shell session of the device, if any."""
+        with self.__lock:
+            shell_session, self.__shell_session = self.__shell_session, None
+        if shell_session is not None:
+            shell_session.close()
+
+
+
+    def close(self):
+        """Ends the persistent shell session and the input queue of the device, if any."""
+        self.close_shell_session()
+        with self.__lock:
+            input_scheduler, self.__input_scheduler = self.__input_scheduler, None
+        if input_scheduler is not None:
+            input_scheduler.close()
+
+
+
+class ADBDevice:
+    """
+    Handle bound to one device serial, it runs every command on that device only. Handles have no
+    mutable state of their own, so one handle (or many handles of the same device) can be used from
+    many threads at the same time. Get them from `ADBClient.device(serial)`.
+
+    Example:
+        client = ADBClient(transport='socket')
+        client.connect('192.168.1.28')
+        tv = client.device('192.168.1.28:5555')
+        tv.send_keyevent_input(KeyCodes.KEYCODE_HOME)
+    """
+
+
+
+    def __init__(self, serial: str|None, transport: Any, state: DeviceState, launcher_catalog: LauncherCatalog,
+                 verbose: bool=False, show_command: bool=False, persistent_shell: bool=False, command_timeout: float|None=None):
+        """
+        Args:
+            serial (str|None): Serial of the device, `None` to let adb pick the only connected device.
+            transport (SubprocessTransport|SocketTransport): Transport the commands reach the adb server with.
+            state (DeviceState): State shared by the handles of the device.
+            launcher_catalog (LauncherCatalog): Catalog of the apps launcher activities.
+            verbose (bool): Whether to display additional information during the execution. Defaults to False.
+            show_command (bool): Whether to display the executed ADB commands. Defaults to False.
+            persistent_shell (bool): Whether shell commands go through the device persistent shell. Defaults to False.
+            command_timeout (float|None): Default seconds an adb command may take, file transfers and installs
+                are only bounded by an explicit timeout or deadline. Defaults to None (no limit).
+        """
+        self.__serial = serial
+        self.__transport = transport
+        self.__state = state
+        self.__launcher_catalog = launcher_catalog
+        self.__verbose = verbose
+        self.__show_command = show_command
+        self.__persistent_shell = persistent_shell
+        self.__command_timeout = command_timeout
+
+
+
+    @property
+    def serial(self) -> str|None:
+        """Serial of the device."""
+        return self.__serial
+
+
+
+    def __repr__(self) -> str:
+        return f'ADBDevice({self.__serial!r}, transport={self.__transport.name!r})'
+
+
+
+    def __timeout(self, timeout: float|None=None, transfer: bool=False) -> float|None:
+        # explicit timeout, else the client default (except for transfers), capped by the current deadline
+        if timeout is None and not transfer:
+            timeout = self.__command_timeout
+        return remaining_time(timeout)
+
+
+
+    def __execute_command(self, command_str: str|list, blocking: bool=True, timeout: float|None=None, transfer: bool=False) -> Any:
+        """
+        The function executes an adb command on the device, with the option to run it in blocking
+        or non-blocking mode.
+
+        Args:
+            command_str (str|list): The adb command, for example `shell getprop`, or its arguments list
+                which is passed as is.
+            blocking (bool): Whether to wait for the command to finish. Defaults to True.
+            timeout (float|None): Seconds the command may take. Defaults to the client `command_timeout`.
+            transfer (bool): Whether the command is a file transfer or install, which the client
+                `command_timeout` does not bound. Defaults to False.
+
+        Returns:
+            The stdout of the command as a string if `blocking`, otherwise a `subprocess.Popen` object.
+
+        Raises:
+            OSError: This occurs, for example, when trying to execute a non-existent file.
+            CalledProcessError: if the called process returns a non-zero return code.
+            DeadlineExceeded: if the command did not complete in time, it is killed.
+        """
+        if isinstance(command_str, list):
+            command_parts, command_str = command_str, ' '.join(command_str)
+        else:
+            command_parts = shlex.split(command_str, posix="win" not in sys.platform)
+        if self.__verbose and self.__show_command:
+            command = ' '.join(['adb'] + (['-s', self.__serial] if self.__serial else []) + [command_str])
+            Logger.info('[bold]Command:[/bold] [blue]%s[/blue] [dim](%s)[/dim]', command, self.__transport.name)
+        if blocking:
+            with trace_command(command_parts, self.__serial), measure_command(command_kind(command_parts), self.__serial):
+                return self.__transport.execute(command_parts, self.__serial, self.__timeout(timeout, transfer))
+        return self.__transport.spawn(command_parts, self.__serial)
+
+
+
+    # ------------------------------[ Info Commands ]------------------------------
+
+
+
+    def get_device_info(self) -> dict:
+        """
+        The function `get_device_info` retrieves device information.
+        
+        Returns:
+            Dictionary containing device information.
+        """
+        output = self.execute_shell_command('getprop')
+        with measure_parse('getprop', self.__serial):
+            device_info = parse_properties(output)
+        if self.__verbose:
+            for prop, value in device_info.items():
+                Logger.print('[bold green]%s[/bold green]: [yellow]%s[/yellow]', prop, value)
+        return device_info
+
+
+
+    def get_state(self) -> str:
+        """
+        The function `get_state` returns the state of connected device.
+        
+        Returns:
+            String represents device state.
+        """
+        device_state = self.__execute_command('get-state')
+        Logger.info('Device: (%s) state is %s', self.__serial, device_state)
+        return device_state
+
+
+
+
+    def reconnect(self) -> bool:
+        """
+        The function connects the network device again, after it dropped off, without changing the
+        device selected in the client.
+
+        Returns:
+            Boolean indicates if the device is connected.
+        """
+        return parse_connect_result(self.__execute_command(['connect', self.__serial]))
+
+
+
+    def get_serialno(self) -> str:
+        """
+        The function `get_serialno` returns the serial number of the device.
+        
+        Returns:
+            String represents device serial number of the device.
+        """
+        device_serialno = self.__execute_command('get-serialno')
+        Logger.info('Device Serial number: %s', device_serialno)
+        return device_serialno
+
+
+
+    def get_devpath(self) -> str:
+        """
+        The function `get_devpath` retrieves the device path of a connected Android device'.
+        
+        Returns:
+            String represents the device path, for example usb:1-4.3 for usb connected device.
+        """
+        device_devpath = self.__execute_command('get-devpath')
+        Logger.info('Device dev_path: %s', device_devpath)
+        return device_devpath
+
+
+
+    def get_ip_address(self, interface: str='wlan0') -> str:
+        """
+        The function `get_ip_address` returns the device IP address of a specified network interface.
+        
+        Args:
+            interface (str): The `interface` parameter is a string that specifies the network interface to
+                retrieve the IP address from. In this case, the default value is set to "wlan0", which is a
+                common interface name for wireless LAN connections on Linux-based systems. Defaults to wlan0
+        
+        Returns:
+            The IP address of the device.
+        """
+        device_ip = parse_ip_address(self.execute_shell_command(build_ip_address_command(interface)))
+        if device_ip:
+            Logger.info('Device ip: %s', device_ip)
+        return device_ip
+
+
+
+    def snapshot(self, fields: tuple|list|None=None, properties: list|None=None, interface: str='wlan0') -> DeviceSnapshot:
+        """
+        The function gathers the state of the device in a single adb round trip, instead of
+        calling `get_state`, `is_powered_on`, `get_device_info`, `get_ip_address` and a foreground app
+        lookup one by one.
+        
+        Args:
+            fields (tuple|list|None): Fields to gather, any of [state | power | properties | ip_address | foreground_app].
+                Defaults to all of them.
+            properties (list|None): System properties to read for the `properties` field, for example
+                `['ro.product.model']`. Defaults to None (all the properties).
+            interface (str): Network interface of the `ip_address` field. Defaults to wlan0
+        
+        Returns:
+            `DeviceSnapshot` of the device.
+        
+        Raises:
+            ValueError: if a field is unknown.
+        """
+        script = DeviceSnapshot.build_script(fields, properties, interface)
+        snapshot = DeviceSnapshot.parse(self.__serial, self.execute_shell_command(script), fields)
+        if self.__verbose:
+            Logger.info('Device: (%s) snapshot: [bold green]%s[/bold green]', self.__serial, snapshot)
+        return snapshot
+
+
+
+    # ------------------------------[ File Operations Commands ]------------------------------
+
+
+
+    def push(self, local: str, remote: str='/data/local/tmp/') -> bool:
+        """
+        Copy files and directories from the local device (computer) to
+        a remote location on the device.
+        
+        Args:
+            local (str): The `local` parameter is a string that represents the path of the file or
+                directory on the local device (computer) that you want to copy to the remote location on the
+                device.
+            remote (str): The `remote` parameter is a string that specifies the destination location on
+                the device where the files or directories from the local device will be copied to. By default,
+                the destination location is set to `/data/local/tmp/`, but you can provide a different path if
+                needed. Defaults to /data/local/tmp/
+        
+        Returns:
+            Boolean indicating whether the upload operation was successful.
+        """
+        Logger.info('Uploading: [bold green]%s[/bold green] to [bold green]%s[/bold green] ..', local, remote)
+        result = self.__execute_command(build_push_command(local, remote), transfer=True)
+        if parse_transfer_result(result, 'pushed'):
+            Logger.success('File [bold blue]%s[/bold blue] uploaded to [bold blue]%s[/bold blue] successfully', local, remote)
+            return True
+        else:
+            Logger.error('Uploading [bold blue]%s[/bold blue] to [bold blue]%s[/bold blue] failed', local, remote)
+            return False
+
+
+
+    def pull(self, remote: str, local: str, preserve_meta: bool=False) -> bool:
+        """
+        The function `pull` copies remote files and directories to a device, with an option to preserve
+        file metadata like time stamp and mode.
+        
+        Args:
+            remote (str): The `remote` parameter is a string that represents the path of the remote file
+                or directory that you want to copy to the device.
+            local (str): The "local" parameter is a string that represents the local directory or file
+                path where the remote files and directories will be copied to.
+            preserve_meta (bool): The `preserve_meta` parameter is a boolean flag that determines whether
+                to preserve the file time stamp and mode during the file transfer process. If `preserve_meta` is
+                set to `True`, the `-k` option will be added to the command, indicating that the file time stamp
+                and mode should be. Defaults to False
+        
+        Returns:
+            Boolean indicating whether the download operation was successful.
+        """
+        Logger.info('Downloading: [bold green]%s[/bold green] to [bold green]%s[/bold green] ..', remote, local)
+        result = self.__execute_command(build_pull_command(remote, local, preserve_meta), transfer=True)
+        if parse_transfer_result(result, 'pulled'):
+            Logger.success('File [bold blue]%s[/bold blue] downloaded to [bold blue]%s[/bold blue] successfully', remote, local)
+            return True
+        else:
+            Logger.error('Downloading [bold blue]%s[/bold blue] to [bold blue]%s[/bold blue] failed', remote, local)
+            return False
+
+
+
+    # ------------------------------[ Apps Operations Commands ]------------------------------
+
+
+
+    def is_installed(self, package_name: str, refresh: bool=False) -> bool:
+        """
+        The function checks if the specified package is installed or not.
+        
+        The answer comes from the device package index, built from one `pm list packages` and kept for
+        `package_cache_ttl` seconds. Packages missing from the index are confirmed with a cheap
+        `pm path <package>` before answering `False`.
+        
+        Args:
+            package_name (str): The name of the package, for example 'com.google.chrome'
+            refresh (bool): If set to `True`, the package is checked on the device with `pm path <package>`
+                instead of trusting the index. Defaults to False.
+        
+        Returns:
+            Boolean indicates if app is installed or not.
+        """
+        index = self.__state.package_index
+        app_installed = None if refresh else index.contains(package_name)
+        if app_installed is None and not refresh and index.ttl != 0:
+            output = self.execute_shell_command(PackageIndex.QUERY)
+            with measure_parse('pm', self.__serial):
+                index.update(PackageIndex.parse(output), PackageIndex.parse_version_codes(output))
+            app_installed = index.contains(package_name)
+        if not app_installed:
+            app_installed = self.refresh_package(package_name)
+        if app_installed:
+            Logger.success('App [bold blue]%s[/bold blue] is installed', package_name)
+            return True
+        else:
+            Logger.error('App [bold blue]%s[/bold blue] is not installed', package_name)
+            return False
+
+
+
+    def refresh_package(self, package_name: str) -> bool:
+        """
+        The function checks a single package on the device with `pm path <package>` and updates the
+        device package index with the result.
+        
+        Args:
+            package_name (str): The name of the package, for example 'com.google.chrome'
+        
+        Returns:
+            Boolean indicates if app is installed or not.
+        """
+        try:
+            app_installed = parse_package_path(self.execute_shell_command(build_package_path_command(package_name)))
+        except subprocess.CalledProcessError:
+            app_installed = False  # pm exits with 1 for unknown packages
+        self.__state.package_index.set_installed(package_name, app_installed)
+        return app_installed
+
+
+
+    def install(self, apk_file: str, replace: bool=True) -> bool:
+        """
+        The function installs an APK file on a device, with an option to replace/update an existing
+        installation.
+        
+        Args:
+            apk_file (str): The `apk_file` parameter is a string that represents the file path of the APK
+                file that you want to install.
+            replace (bool): The `replace` parameter is a boolean value that determines whether to replace
+                an existing installation of the APK file. If `replace` is set to `True`, the existing
+                installation will be replaced. If `replace` is set to `False`, the existing installation will
+                not be replaced and an error will. Defaults to True
+        
+        Returns:
+            Boolean indicates if installation process is successful.
+        """
+        Logger.info('Installing APK file [bold green]%s[/bold green], it will took up to 2 minutes to complete..', apk_file)
+        result = self.__execute_command(build_install_command(apk_file, replace), transfer=True)
+        # the package name of the apk is unknown here, so the whole index is outdated
+        self.__state.package_index.invalidate()
+        if parse_package_manager_result(result):
+            Logger.success('APK [bold blue]%s[/bold blue] is installed successfully', apk_file)
+            return True
+        else:
+            Logger.error('Installation process failed')
+            return False
+
+
+
+    def uninstall(self, package: str, keep_data: bool=False) -> bool:
+        """
+        The `uninstall` function removes an app package from a device, with an option to keep the data
+        and cache directories.
+        
+        Args:
+            package (str): The package parameter is a string that represents the app package name that you
+                want to uninstall from the device.
+            keep_data (bool): A boolean parameter that determines whether to keep the data and cache
+                directories of the app package when uninstalling. If set to True, the directories will be kept.
+                If set to False (default), the directories will be removed along with the app package. Defaults
+                to False
+        
+        Returns:
+            Boolean indicates if uninstalling process is successful.
+        """
+        Logger.info('Uninstalling package [bold green]%s[/bold green]%s, it will took up to 2 minutes to complete..',
+                    package, ' while keeping the data' if keep_data else '')
+        result = self.__execute_command(build_uninstall_command(package, keep_data), transfer=True)
+        if parse_package_manager_result(result):
+            self.__state.package_index.set_installed(package, False)
+            Logger.success('Package [bold blue]%s[/bold blue] is uninstalled successfully', package)
+            return True
+        else:
+            Logger.error('Uninstalling process failed')
+            return False
+
+
+
+    def start_app(self, package: str, activity: str|None=None, wait: bool=True, stop: bool=True, timeout: float|None=None) -> bool:
+        """
+        The function starts an Android app with the specified package and activity, optionally waiting
+        for the launch to complete and stopping the app before starting the activity.
+        
+        Args:
+            package (str): The package parameter is a string that represents the package name of the
+                Android application you want to start. This is typically the unique identifier for the app and
+                is specified in the AndroidManifest.xml file of the app.
+            activity (str|None): The "activity" parameter refers to the specific activity or screen within the
+                Android app that you want to start. An activity represents a single screen with a user
+                interface, and it is the basic building block of an Android app. Each activity has a unique name
+                that is specified in the AndroidManifest.xml file. If `None`, the app launcher activity is
+                resolved with `get_launcher_activity`. Defaults to None
+            wait (bool): The "wait" parameter is a boolean value that determines whether the command
+                should wait for the launch to complete before returning. If set to True, the command will wait
+                for the launch to complete. If set to False, the command will not wait and will return
+                immediately after starting the activity. Defaults to True
+            stop (bool): The "stop" parameter is a boolean value that determines whether to force stop the
+                target app before starting the activity. If it is set to True, the target app will be stopped
+                before starting the activity. If it is set to False, the target app will not be stopped.
+                Defaults to True
+            timeout (float|None): Seconds the whole start may take (installation check, HOME press and
+                `am start`), the running command is killed when it expires. Defaults to None (no limit).
+        
+        Returns:
+            Boolean indicates if app starting process is successful.
+        
+        Raises:
+            DeadlineExceeded: if the app did not start in time.
+        """
+        with deadline(timeout):
+            # check if app is installed
+            if not self.is_installed(package):
+                return False
+            component = f'{package}/{activity}' if activity else self.get_launcher_activity(package)
+            if component is None:
+                Logger.error('App [bold blue]%s[/bold blue] has no launcher activity', package)
+                return False
+            self.send_keyevent_input(KeyCodes.KEYCODE_HOME)
+            Logger.info('Starting app: [bold green]%s[/bold green] ..', package)
+            result = self.execute_shell_command(build_start_app_command(component, wait, stop))
+            if not parse_activity_manager_result(result):
+                # the index may be outdated if the app was removed outside of this client
+                self.refresh_package(package)
+                Logger.error('Starting app [bold blue]%s[/bold blue] failed', package)
+                return False
+            else:
+                Logger.success('App: [bold blue]%s[/bold blue] started successfully', package)
+                return True
+
+
+
+    def stop_app(self, package: str) -> bool:
+        """
+        The function stops an Android app with the specified package.
+        
+        Args:
+            package (str): The package parameter is a string that represents the package name of the app
+                you want to stop.
+        
+        Returns:
+            Boolean indicates if app stopping process is successful.
+        """
+        Logger.info('Stopping app: [bold green]%s[/bold green] ..', package)
+        result = self.execute_shell_command(build_stop_app_command(package))
+        if not parse_activity_manager_result(result):
+            Logger.error('Stopping app [bold blue]%s[/bold blue] failed', package)
+            return False
+        else:
+            Logger.success('App: [bold blue]%s[/bold blue] stopped successfully', package)
+            return True
+
+
+
+    def list_packages(self, package_type: str='all') -> list:
+        """
+        The function "list_packages" lists device android packages, you can also filter package type.
+        
+        Args:
+            package_type (str): The `package_type` parameter is a string that specifies the type of
+                packages to list. It has a default value of `all` that gets all packages on the device,
+                but it can also take the following values: [all | enabled | disabled | system | third-party].
+                Defaults to all
+        
+        Returns:
+            List of packages.
+        """
+        package_type = resolve_package_type(package_type)
+        output = self.execute_shell_command(build_list_packages_command(package_type))
+        packages = parse_packages(output)
+        if package_type == 'all':
+            self.__state.package_index.update(PackageIndex.parse(output))
+        Logger.info('There are [bold green]%s[/bold green] [bold blue]%s[/bold blue] packages', len(packages), package_type)
+        if self.__verbose:
+            for package in packages:
+                Logger.print('[bold green]%s[/bold green]', package)
+        return packages
+
+
+
+    def get_package_activities(self, package: str) -> list:
+        """
+        The function `get_package_activities` retrieves the activities associated with a given package
+        in order to start the app. this is useful to be able to start the app
+        
+        Args:
+            package (str): The "package" parameter is a string that represents the name of the package for
+                which you want to retrieve the activities.
+        
+        Returns:
+            List of package activities.
+        """
+        activities = parse_package_activities(self.execute_shell_command(build_package_dump_command(package)), package)
+        if self.__verbose:
+            for activity in activities:
+                Logger.print('[bold green]%s[/bold green]', activity)
+        Logger.info('There are [bold green]%s[/bold green] activities for package: %s', len(activities), package)
+        return activities
+
+
+
+    def get_launcher_activity(self, package: str, refresh: bool=False) -> str|None:
+        """
+        The function returns the launcher activity of an app, used to start it.
+        
+        The launcher activities of all the device apps are resolved together with one shell query and
+        kept in the launcher catalog, keyed by the device build fingerprint and the app version code, so
+        the device is queried again only when the app is updated or the package index expires.
+        
+        Args:
+            package (str): The package name, for example 'com.netflix.ninja'
+            refresh (bool): If set to `True`, the device is queried even if the catalog knows the app. Defaults to False.
+        
+        Returns:
+            The launcher component in form of package/activity. `None` if the app has no
+            launcher activity.
+        """
+        index = self.__state.package_index
+        fingerprint = self.__state.fingerprint
+        version_code = index.version_code(package)
+        # the version code is `None` on devices without `pm list packages --show-versioncode`
+        known = fingerprint is not None and index.contains(package) and self.__launcher_catalog.is_known(fingerprint, package, version_code)
+        if refresh or not known:
+            fingerprint, version_codes, components = LauncherCatalog.parse_query(self.execute_shell_command(LauncherCatalog.QUERY))
+            self.__state.fingerprint = fingerprint
+            self.__launcher_catalog.update(fingerprint, version_codes, components)
+            if version_codes and index.ttl != 0:
+                index.update(version_codes, version_codes)
+            component = components.get(package)
+        else:
+            component = self.__launcher_catalog.lookup(fingerprint, package, version_code)
+        if component and self.__verbose:
+            Logger.info('Launcher activity of [bold blue]%s[/bold blue]: [bold green]%s[/bold green]', package, component)
+        return component
+
+
+
+    # ------------------------------[ Device related Commands ]------------------------------
+
+
+
+    def reboot(self, mode: str|None=None) -> bool:
+        """
+        The function `reboot` reboots the device with the specified mode, or with no mode if none is
+        provided.
+        
+        Args:
+            mode (str|None): The `mode` parameter is a string that specifies the type of reboot to
+                perform. It can have one of the following values: [bootloader | recovery | sideload | sideload-auto-reboot]
+        
+        Returns:
+            Boolean indicates if tv is rebooted successfully.
+        """
+        if mode:
+            Logger.info('Rebooting TV in mode [bold green]%s[/bold green] ..', mode)
+        else:
+            Logger.info('Rebooting TV ..')
+        result = self.__execute_command(build_reboot_command(mode))
+        if not parse_reboot_result(result):
+            Logger.error('Rebooting failed')
+            return False
+        else:
+            Logger.success('Rebooted successfully')
+            return True
+
+
+
+    def is_powered_on(self) -> bool|None:
+        """
+        Check if device is working or not. (Power ON/OFF)
+        
+        Return:
+            Statues of device power on or off.
+        """
+        try:
+            # results = self.execute_shell_command(f'dumpsys power | grep mHoldingDisplaySuspendBlocker') (true, false)
+            # results = self.execute_shell_command(f'dumpsys power | grep mWakefulness') (Asleep | Awake | Dreaming)
+            return parse_power_state(self.execute_shell_command(POWER_STATE_COMMAND))
+        except:
+            return
+
+
+
+    def execute_shell_command(self, command: str, timeout: float|None=None) -> str:
+        """
+        The function executes an adb shell command by calling `adb shell` command.
+        
+        Args:
+            command (str): The `command` parameter is a string that represents the shell command that you
+                want to execute.
+            timeout (float|None): Seconds the command may take, it is killed after. Defaults to the client `command_timeout`.
+        
+        Returns:
+            String of the output results of executing the shell command.
+            
+        Raises:
+            CalledProcessError: if the command returns a non-zero exit code in a persistent shell.
+            DeadlineExceeded: if the command did not complete in time.
+        """
+        if not self.__persistent_shell:
+            # the whole command goes to the device shell, its quoting is left to it
+            return self.__execute_command(['shell', command], timeout=timeout)
+        if self.__verbose and self.__show_command:
+            Logger.info('[bold]Shell command:[/bold] [blue]%s[/blue] [dim](persistent shell of %s)[/dim]', command, self.__serial)
+        with trace_command(['shell', command], self.__serial), measure_command(command_kind(['shell', command]), self.__serial):
+            output, exit_code = self.__state.get_shell_session(self.__transport).run(command, self.__timeout(timeout))
+            if exit_code != 0:
+                raise subprocess.CalledProcessError(exit_code, command, output)
+        return output
+
+
+
+    def exec_out(self, command: str, sink: Any=None, timeout: float|None=None) -> memoryview|int:
+        """
+        The function executes a shell command with `adb exec-out` and returns its raw binary output,
+        without decoding it or translating line endings. Large outputs are read straight into their
+        destination instead of being joined and copied.
+        
+        Args:
+            command (str): The shell command, for example `screencap -p` or `cat /sdcard/video.mp4`.
+            sink (Any): Where the output goes. `None` returns it, a file-like object (with `write`) receives it
+                chunk by chunk and a writable buffer (`bytearray`, `memoryview`, numpy array ..) is filled in place.
+                Defaults to None.
+            timeout (float|None): Seconds the command may take, it is killed after. Defaults to the client `command_timeout`.
+        
+        Returns:
+            A `memoryview` of the output if no sink is given, otherwise the number of bytes written to the sink.
+        
+        Raises:
+            BufferError: if the output does not fit in a buffer sink.
+            DeadlineExceeded: if the command did not complete in time.
+        """
+        if self.__verbose and self.__show_command:
+            Logger.info('[bold]Binary command:[/bold] [blue]%s[/blue] [dim](%s)[/dim]', command, self.__serial)
+        # one argument keeps the shell quoting of the command, adb joins the arguments with spaces anyway
+        with trace_command(['exec-out', command], self.__serial), measure_command(command_kind(['exec-out', command]), self.__serial):
+            return self.__transport.execute_binary(['exec-out', command], self.__serial, sink, self.__timeout(timeout))
+
+
+
+    # ------------------------------[ Screen Commands ]------------------------------
+
+
+
+    def screencap(self, format: str='png', sink: Any=None, display: int|None=None) -> memoryview|RawFrame|int:
+        """
+        The function captures the screen of the device in one binary round trip.
+        
+        Args:
+            format (str): Capture format [png | raw]. `png` is compressed on the device, `raw` skips the
+                compression and is parsed into a `RawFrame` of the pixels. Defaults to png
+            sink (Any): File-like object or writable buffer receiving the capture, see `exec_out`. Defaults to None.
+            display (int|None): Physical display id to capture, `None` for the default display.
+        
+        Returns:
+            The PNG image as a `memoryview` for `png`, a `RawFrame` for `raw`, or the number of bytes
+            written if a sink is given.
+        
+        Raises:
+            ValueError: if the format is unknown or the raw capture can not be parsed.
+        """
+        output = self.exec_out(build_screencap_command(format, display), sink)
+        if isinstance(output, int):
+            return output
+        if self.__verbose:
+            Logger.info('Captured screen of [bold blue]%s[/bold blue]: %s bytes (%s)', self.__serial, len(output), format)
+        if format != 'raw':
+            return output
+        with measure_parse('screencap', self.__serial):
+            return parse_raw_frame(output)
+
+
+
+    def screen_stream(self, duration: float|None=None, bit_rate: int|None=None, size: str|None=None, sink: Any=None,
+                      segment_time_limit: int=SEGMENT_TIME_LIMIT, capacity: int=64, policy: str='block') -> ScreenStream|int:
+        """
+        The function records the screen as a raw H.264 elementary stream (`screenrecord --output-format=h264 -`),
+        read incrementally through `exec-out`. Recordings longer than the `screenrecord` 3 minutes limit
+        are chained segments.
+        
+        Args:
+            duration (float|None): Seconds to record, at least 1 and rounded down to whole seconds. Defaults to
+                None (until the stream is closed).
+            bit_rate (int|None): Video bit rate in bits per second, for example 4000000. Defaults to the device default.
+            size (str|None): Video size as `WIDTHxHEIGHT`, for example '1280x720'. Defaults to the screen size.
+            sink (Any): File-like object the video is written into, the call then blocks until the recording
+                ends. Defaults to None (return the stream).
+            segment_time_limit (int): Seconds of one `screenrecord` segment, at most 180. Defaults to 180
+            capacity (int): Maximum number of chunks waiting for the consumer. Defaults to 64
+            policy (str): What to do when the consumer is too slow [drop_oldest | drop_newest | block]. Defaults to block
+        
+        Returns:
+            `ScreenStream` iterator of byte chunks, close it (or use it as a context manager) to stop recording.
+            The number of bytes written if a sink is given.
+        
+        Raises:
+            ValueError: if the policy is unknown or the duration is shorter than 1 second.
+        """
+        def open_segment(time_limit: int) -> Any:
+            command = build_screenrecord_command(time_limit, bit_rate, size)
+            if self.__verbose and self.__show_command:
+                Logger.info('[bold]Screen stream:[/bold] [blue]%s[/blue] [dim](%s)[/dim]', command, self.__serial)
+            return self.__transport.open_stream(['exec-out', command], self.__serial)
+
+        stream = ScreenStream(open_segment, duration, segment_time_limit, capacity, policy)
+        if sink is None:
+            return stream
+        with stream:
+            return stream.write_to(sink)
+
+
+
+    # ------------------------------[ UI Commands ]------------------------------
+
+
+
+    def ui_snapshot(self, compressed: bool=False) -> UIIndex:
+        """
+        The function dumps the UI hierarchy of the screen (`uiautomator dump`) in one binary round trip
+        and indexes its focusable nodes, to find the focused node and plan D-pad navigation.
+        
+        Args:
+            compressed (bool): Whether to skip the views that are not important for accessibility. Defaults to False.
+        
+        Returns:
+            `UIIndex` of the screen.
+        
+        Raises:
+            ValueError: if the device did not return a UI hierarchy, for example while the screen is off.
+        """
+        output = self.exec_out(build_ui_dump_command(compressed=compressed))
+        with measure_parse('uiautomator', self.__serial):
+            ui = UIIndex.parse(output)
+        if self.__verbose:
+            focused = ui.focused.resource_id or ui.focused.text if ui.focused else None
+            Logger.info('UI of [bold blue]%s[/bold blue]: %s focusable nodes, focused: [bold green]%s[/bold green]', self.__serial, len(ui.focusable), focused)
+        return ui
+
+
+
+    # ------------------------------[ Inputs Commands ]------------------------------
+
+
+
+    def send_keyevent_input(self, keycode: KeyCodes, long_press: bool=False):
+        """
+        The function executes an adb shell command to send key event input that simulates pressing button keys.
+        
+        Args:
+            keycode (KeyCode): the keycode to send, table of key codes: https://www.temblast.com/ref/akeyscode.htm
+            long_press (bool): specify if simulate a long press for the key or not. Defaults to False.
+        """
+        self.execute_shell_command(build_keyevent_command(keycode, long_press))
+        self.__state.track_volume_keys([keycode], long_press)
+
+
+
+    def send_keyevent_sequence(self, keys: list, inter_key_delay: float|None=None):
+        """
+        The function sends a whole sequence of key events in a single adb round trip. Without delay
+        all keys go to one `input keyevent K1 K2 ..` invocation, with a delay the sequence runs as one
+        on-device script that sleeps between the keys.
+        
+        Args:
+            keys (list): List of `KeyCodes` to press in order.
+            inter_key_delay (float|None): Seconds to wait on the device between two key presses. Defaults to None.
+        """
+        if not keys:
+            return
+        self.execute_shell_command(build_keyevent_sequence_command(keys, inter_key_delay))
+        self.__state.track_volume_keys(keys)
+
+
+
+    def input_queue(self, max_rate: float|None=None, max_batch: int=32) -> InputScheduler:
+        """
+        The function returns the input queue of the device, shared by all its handles. Keys pressed
+        through it are coalesced into batched calls, `POWER`/`HOME` go first and drop the stale
+        navigation, and the key rate is limited. See `InputScheduler`.
+
+        Args:
+            max_rate (float|None): Maximum keys per second, applied when the queue is created. Defaults to None (no limit).
+            max_batch (int): Maximum keys sent in one call, applied when the queue is created. Defaults to 32
+
+        Returns:
+            The `InputScheduler` of the device.
+        """
+        return self.__state.get_input_scheduler(self, max_rate, max_batch)
+
+
+
+    def send_text_input(self, text: str, encode_spaces: bool=True, mode: str='auto', chunk_size: int=TEXT_CHUNK_SIZE):
+        """
+        The function types a text in the focused input field, in one round trip.
+
+        The `input` mode types with `input text`: shell metacharacters are escaped, long texts are
+        sent in chunks and new lines or tabs are pressed as keys, but it only types printable ASCII
+        and every character is a key event. The `adbkeyboard` mode commits the text through the
+        ADBKeyboard input method (https://github.com/senzhk/ADBKeyBoard), which must be installed and
+        selected (see `enable_adb_keyboard`): any Unicode text, chunks of thousands of characters at
+        once. The `auto` mode uses ADBKeyboard for long or non-ASCII texts when it is the current
+        keyboard, and `input text` otherwise.
+        
+        Args:
+            text (str): the text string to send.
+            encode_spaces (bool): specify if the text should be escaped. `False` sends it as is to `input text`,
+                spaces included, for texts already escaped. Defaults to True.
+            mode (str): How the text is typed [auto | input | adbkeyboard]. Defaults to auto
+            chunk_size (int): Maximum characters of one `input text` call. Defaults to 256
+
+        Raises:
+            ValueError: if the mode is unknown, or the text is not ASCII and ADBKeyboard is not the current keyboard.
+        """
+        if not encode_spaces:
+            self.execute_shell_command(f'input text {text}')
+            return
+        check_text_input_mode(mode)
+        if not text:
+            return
+        if mode == 'auto':
+            mode = 'adbkeyboard' if prefers_adb_keyboard(text) and self.is_adb_keyboard_active() else 'input'
+        self.execute_shell_command(build_text_input_command(text, mode, chunk_size))
+
+
+
+    def is_adb_keyboard_active(self, refresh: bool=False) -> bool:
+        """
+        The function checks whether ADBKeyboard is the current input method of the device.
+
+        Args:
+            refresh (bool): Whether to ask the device again, the answer is kept per device. Defaults to False.
+
+        Returns:
+            Boolean indicates if texts can be typed through ADBKeyboard.
+        """
+        if refresh or self.__state.adb_keyboard is None:
+            self.__state.adb_keyboard = is_adb_keyboard(self.execute_shell_command(INPUT_METHOD_QUERY))
+        return self.__state.adb_keyboard
+
+
+
+    def enable_adb_keyboard(self) -> bool:
+        """
+        The function makes the installed ADBKeyboard the current input method, for the fast `adbkeyboard`
+        text mode. The on-screen keyboard of the TV is replaced until another input method is selected.
+
+        Returns:
+            Boolean indicates if ADBKeyboard is now the current input method, `False` if it is not installed.
+        """
+        try:
+            self.execute_shell_command(ENABLE_ADB_KEYBOARD_COMMAND)
+        except subprocess.CalledProcessError:
+            pass
+        return self.is_adb_keyboard_active(refresh=True)
+
+
+
+    # ------------------------------[ Volume Commands ]------------------------------
+
+
+
+    def get_volume(self, stream: int|str='music', refresh: bool=True) -> Volume:
+        """
+        The function reads the volume of an audio stream from the device audio service.
+
+        Args:
+            stream (int|str): Stream id or name [music | system | ring | alarm | notification | voice_call]. Defaults to music
+            refresh (bool): Whether to ask the device, otherwise the last known volume is returned when there
+                is one. It is kept by `get_volume`/`set_volume` and follows the volume keys sent by this library.
+                Defaults to True.
+
+        Returns:
+            The `Volume` of the stream, with its level and range.
+
+        Raises:
+            ValueError: if the stream is unknown or the device reports no volume.
+        """
+        stream = resolve_stream(stream)
+        volume = None if refresh else self.__state.volumes.get(stream)
+        if volume is None:
+            output = self.execute_shell_command(build_volume_command(stream))
+            with measure_parse('cmd', self.__serial):
+                volume = parse_volume(output, stream)
+            self.__state.volumes[stream] = volume
+        return volume
+
+
+
+    def set_volume(self, level: int, stream: int|str='music') -> Volume:
+        """
+        The function sets the volume of an audio stream in one round trip, instead of pressing the volume
+        keys once per step. The level is clamped into the stream range when it is known.
+
+        Args:
+            level (int): The volume index, for example 0 to 15 on most TVs.
+            stream (int|str): Stream id or name [music | system | ring | alarm | notification | voice_call]. Defaults to music
+
+        Returns:
+            The `Volume` of the stream after the change, as read back from the device.
+
+        Raises:
+            ValueError: if the stream is unknown or the device reports no volume.
+        """
+        stream = resolve_stream(stream)
+        known = self.__state.volumes.get(stream)
+        if known is not None:
+            level = min(max(level, known.min_level), known.max_level)
+        output = self.execute_shell_command(build_volume_command(stream, level))
+        with measure_parse('cmd', self.__serial):
+            volume = parse_volume(output, stream)
+        self.__state.volumes[stream] = volume
+        if self.__verbose:
+            Logger.info('Volume of stream %s set to [bold]%s[/bold] of %s', stream, volume.level, volume.max_level)
+        return volume
+
+
+
+    # ------------------------------[ Logs Commands ]------------------------------
+
+
+
+    def logcat_stream(self, filters: list|None=None, binary: bool=False, buffers: list|None=None, pid: int|None=None,
+                      regex: str|None=None, tail: int|None=None, capacity: int=10000, policy: str='drop_oldest') -> LogcatStream:
+        """
+        The function follows the device log, yielding parsed records as they are written.
+        
+        Filters run on the device, so only the wanted entries cross the network. The records wait for
+        the consumer in a ring buffer of `capacity` records, when it is full the `policy` drops the
+        oldest (`drop_oldest`) or the newest (`drop_newest`) record, or pauses the reading (`block`).
+        
+        Args:
+            filters (list|None): logcat filter specs, for example `['ActivityManager:I', '*:S']`.
+            binary (bool): Whether to read the binary log format (`logcat -B`) instead of `-v threadtime`,
+                it is cheaper to parse and gives the exact timestamps. Defaults to False.
+            buffers (list|None): Log buffers to read, for example `['main', 'system']`. Defaults to the device defaults.
+            pid (int|None): Only read the entries of this process id.
+            regex (str|None): Only read the entries whose message matches this regular expression.
+            tail (int|None): Start with the last `tail` entries instead of the whole buffer.
+            capacity (int): Maximum number of records waiting for the consumer. Defaults to 10000
+            policy (str): What to do when the consumer is too slow [drop_oldest | drop_newest | block].
+                Defaults to drop_oldest
+        
+        Returns:
+            `LogcatStream` iterator of `LogcatRecord`, close it (or use it as a context manager) to stop logcat.
+        
+        Raises:
+            ValueError: if the policy is unknown.
+        """
+        command = build_logcat_command(filters, binary, buffers, pid, regex, tail)
+        if self.__verbose and self.__show_command:
+            Logger.info('[bold]Log stream:[/bold] [blue]%s[/blue] [dim](%s)[/dim]', command, self.__serial)
+        # exec-out keeps the binary entries intact, shell may translate line endings
+        # one argument keeps the shell quoting of the command, adb joins the arguments with spaces anyway
+        args = ['exec-out' if binary else 'shell', command]
+        stream = self.__transport.open_stream(args, self.__serial)
+        try:
+            return LogcatStream(stream, binary, capacity, policy)
+        except ValueError:
+            stream.close()
+            raise
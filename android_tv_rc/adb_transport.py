@@ -0,0 +1,826 @@
+import time
+import socket
+import threading
+import subprocess
+from typing import Any, Callable
+from .deadline import DeadlineExceeded
+from .metrics import command_kind, observe_phase
+
+
+
+ADB_SERVER_HOST = '127.0.0.1'
+ADB_SERVER_PORT = 5037
+
+# packet ids of the shell protocol v2, every packet is the id, a 4 bytes little endian length and the data
+SHELL_V2_STDOUT = 1
+SHELL_V2_STDERR = 2
+SHELL_V2_EXIT = 3
+
+
+
+class ADBProtocolError(Exception):
+    """Raised when the adb server answers a request with `FAIL` or breaks the host protocol."""
+
+
+
+class ProcessStream:
+    """Bidirectional byte stream over the stdin/stdout pipes of a running adb process."""
+
+
+
+    def __init__(self, process: subprocess.Popen):
+        self.__process = process
+
+
+
+    def write(self, data: bytes):
+        """Writes bytes to the stdin of the remote command."""
+        self.__process.stdin.write(data)
+        self.__process.stdin.flush()
+
+
+
+    def read(self, size: int=65536) -> bytes:
+        """Reads the bytes available up to `size`, `b''` once the remote command ended."""
+        return self.__process.stdout.read1(size)
+
+
+
+    def readline(self) -> bytes:
+        """Reads one line, `b''` once the remote command ended."""
+        return self.__process.stdout.readline()
+
+
+
+    def close(self):
+        """Ends the remote command and releases the pipes."""
+        if self.__process.poll() is None:
+            self.__process.kill()
+        self.__process.wait()
+        for pipe in (self.__process.stdin, self.__process.stdout):
+            if pipe:
+                pipe.close()
+
+
+
+    def __enter__(self):
+        return self
+
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+
+class SocketStream:
+    """Bidirectional byte stream over an adb server socket switched to a device service."""
+
+
+
+    def __init__(self, sock: socket.socket):
+        self.__socket = sock
+        self.__reader = sock.makefile('rb')
+
+
+
+    def write(self, data: bytes):
+        """Writes bytes to the stdin of the remote command."""
+        self.__socket.sendall(data)
+
+
+
+    def read(self, size: int=65536) -> bytes:
+        """Reads the bytes available up to `size`, `b''` once the remote command ended."""
+        return self.__reader.read1(size)
+
+
+
+    def readline(self) -> bytes:
+        """Reads one line, `b''` once the remote command ended."""
+        return self.__reader.readline()
+
+
+
+    def close(self):
+        """Closes the connection, which ends the remote command."""
+        # shutdown first, it wakes up a thread blocked reading the stream
+        try:
+            self.__socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # already disconnected
+        self.__reader.close()
+        self.__socket.close()
+
+
+
+    def __enter__(self):
+        return self
+
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+
+def encode_request(service: str) -> bytes:
+    """
+    The function encodes a service request the way the adb host protocol expects it,
+    a 4 hex digits length prefix followed by the service name.
+
+    Args:
+        service (str): The service name, for example `host:version` or `shell:getprop`.
+
+    Returns:
+        The encoded request bytes.
+    """
+    payload = service.encode('utf-8')
+    return b'%04x' % len(payload) + payload
+
+
+
+def read_into(readinto: Callable, sink: Any=None, chunk_size: int=1 << 20) -> memoryview|int:
+    """
+    The function reads a binary output until its end straight into its destination, without
+    joining or decoding chunks.
+
+    Args:
+        readinto (Callable): Function filling a writable buffer and returning the number of bytes read,
+            0 at the end of the output, like `socket.recv_into` or `BufferedReader.readinto`.
+        sink (Any): Where the output goes. `None` reads it into a new buffer, a file-like object (with `write`)
+            receives it chunk by chunk and a writable buffer (`bytearray`, `memoryview`, numpy array ..) is filled
+            in place. Defaults to None.
+        chunk_size (int): Size of the first buffer and of the file chunks. Defaults to 1 MiB.
+
+    Returns:
+        A `memoryview` of the output if no sink is given, otherwise the number of bytes written to the sink.
+
+    Raises:
+        BufferError: if the output does not fit in a buffer sink.
+    """
+    if sink is not None and hasattr(sink, 'write'):
+        view, total = memoryview(bytearray(chunk_size)), 0
+        while size := readinto(view):
+            sink.write(view[:size])
+            total += size
+        return total
+    if sink is not None:
+        view, total = memoryview(sink).cast('B'), 0
+        while total < len(view) and (size := readinto(view[total:])):
+            total += size
+        if total == len(view) and readinto(memoryview(bytearray(1))):
+            raise BufferError(f'Output is larger than the {len(view)} bytes sink buffer')
+        return total
+    buffer, total = bytearray(chunk_size), 0
+    while True:
+        if total == len(buffer):
+            buffer.extend(bytes(len(buffer)))
+        size = readinto(memoryview(buffer)[total:])
+        if not size:
+            return memoryview(buffer)[:total]
+        total += size
+
+
+
+def decode_shell_v2(data: bytes) -> tuple[bytes, bytes, int|None]:
+    """
+    The function splits the output of a shell protocol v2 service (`shell,v2,raw:`) into the stdout,
+    the stderr and the exit status of the command, which the plain `shell:` service does not report.
+
+    Args:
+        data (bytes): The packets read until the device closed the stream.
+
+    Returns:
+        Tuple of the stdout bytes, the stderr bytes and the exit status. The status is `None` if the
+        stream ended before the exit packet.
+    """
+    view, offset = memoryview(data), 0
+    stdout, stderr, exit_code = bytearray(), bytearray(), None
+    while offset + 5 <= len(view):
+        packet_id = view[offset]
+        length = int.from_bytes(view[offset + 1:offset + 5], 'little')
+        payload = view[offset + 5:offset + 5 + length]
+        offset += 5 + length
+        if packet_id == SHELL_V2_STDOUT:
+            stdout += payload
+        elif packet_id == SHELL_V2_STDERR:
+            stderr += payload
+        elif packet_id == SHELL_V2_EXIT and len(payload):
+            exit_code = payload[0]
+    return bytes(stdout), bytes(stderr), exit_code
+
+
+
+def probe_server(server_host: str=ADB_SERVER_HOST, server_port: int=ADB_SERVER_PORT, timeout: float=0.5) -> int|None:
+    """
+    The function checks whether an adb server answers on its port by asking for its version
+    (`host:version`), it is cheap enough to be polled while the server starts.
+
+    Args:
+        server_host (str): Host of the adb server. Defaults to 127.0.0.1
+        server_port (int): Port of the adb server. Defaults to 5037
+        timeout (float): Seconds to wait for the connection and the answer. Defaults to 0.5
+
+    Returns:
+        The server version number. `None` if no server is answering.
+    """
+    try:
+        with socket.create_connection((server_host, server_port), timeout=timeout) as sock:
+            sock.sendall(encode_request('host:version'))
+            answer = b''
+            while len(answer) < 12 and (chunk := sock.recv(12 - len(answer))):
+                answer += chunk
+    except OSError:
+        return None
+    if len(answer) < 12 or not answer.startswith(b'OKAY'):
+        return None
+    try:
+        return int(answer[8:12], 16)
+    except ValueError:
+        return None
+
+
+
+def plan_socket_command(args: list, serial: str|None=None) -> tuple[str, str]|None:
+    """
+    The function maps adb command arguments to the adb server service that runs them.
+
+    Args:
+        args (list): adb command arguments, for example `['shell', 'getprop']`.
+        serial (str|None): Serial of the target device.
+
+    Returns:
+        Tuple of the request kind and the service. The kind is `device` for device services read
+        until the end of stream, `reboot` for device services without output, `command` for host
+        services answering with the status only, and `query`/`devices`/`version` for host services
+        answering with a payload. `None` if the command has no socket equivalent.
+    """
+    if not args:
+        return None
+    name, params = args[0], list(args[1:])
+    if name in ('shell', 'exec-out'):
+        return 'device', ('shell:' if name == 'shell' else 'exec:') + ' '.join(params)
+    if name == 'devices':
+        return 'devices', 'host:devices-l' if '-l' in params else 'host:devices'
+    if name == 'connect' and len(params) == 1:
+        return 'query', f'host:connect:{params[0]}'
+    if name == 'disconnect' and len(params) <= 1:
+        return 'query', f'host:disconnect:{"".join(params) or serial or ""}'
+    if name in ('get-state', 'get-serialno', 'get-devpath') and not params:
+        return 'query', (f'host-serial:{serial}:' if serial else 'host:') + name
+    if name == 'reboot' and len(params) <= 1:
+        return 'reboot', f'reboot:{"".join(params)}'
+    if name == 'kill-server' and not params:
+        return 'command', 'host:kill'
+    if name == 'version' and not params:
+        return 'version', 'host:version'
+    return None
+
+
+
+def format_query_output(kind: str, payload: str) -> str:
+    """
+    The function formats the payload of a host service the way the adb tool prints it.
+
+    Args:
+        kind (str): The request kind given by `plan_socket_command`.
+        payload (str): The payload answered by the adb server.
+
+    Returns:
+        The stripped command output.
+    """
+    if kind == 'devices':
+        return f'List of devices attached\n{payload}'.strip()
+    if kind == 'version':
+        return f'Android Debug Bridge version 1.0.{int(payload, 16)}'
+    return payload.strip()
+
+
+
+class SubprocessTransport:
+    """Runs every adb command by spawning the `adb` command-line tool."""
+
+
+    name = 'subprocess'
+
+
+
+    def __init__(self, adb_path: str='adb', server_host: str=ADB_SERVER_HOST, server_port: int=ADB_SERVER_PORT):
+        """
+        Args:
+            adb_path (str): Path of the adb executable. Defaults to `adb` found on the PATH.
+            server_host (str): Host of the adb server the adb tool should talk to. Defaults to 127.0.0.1
+            server_port (int): Port of the adb server the adb tool should talk to. Defaults to 5037
+        """
+        self.__adb_path = adb_path
+        self.__server_host = server_host
+        self.__server_port = server_port
+
+
+
+    def build_command(self, args: list, serial: str|None=None) -> list:
+        """
+        The function builds the full argument list of the adb process.
+
+        Args:
+            args (list): adb command arguments, for example `['shell', 'getprop']`.
+            serial (str|None): Serial of the target device, `None` to let adb pick it.
+
+        Returns:
+            List of the process arguments.
+        """
+        command = [self.__adb_path]
+        if self.__server_host != ADB_SERVER_HOST:
+            command += ['-H', self.__server_host]
+        if self.__server_port != ADB_SERVER_PORT:
+            command += ['-P', str(self.__server_port)]
+        if serial:
+            command += ['-s', serial]
+        return command + list(args)
+
+
+
+    def execute(self, args: list, serial: str|None=None, timeout: float|None=None) -> str:
+        """
+        The function runs an adb command and waits for its output.
+
+        Args:
+            args (list): adb command arguments, for example `['shell', 'getprop']`.
+            serial (str|None): Serial of the target device, `None` to let adb pick it.
+            timeout (float|None): Seconds to wait for the command, it is killed after. Defaults to None (no limit).
+
+        Returns:
+            The stripped stdout of the command.
+
+        Raises:
+            CalledProcessError: if the called process returns a non-zero return code.
+            DeadlineExceeded: if the command did not complete in time.
+        """
+        command = self.build_command(args, serial)
+        started = time.perf_counter()
+        with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True) as process:
+            observe_phase('spawn', command_kind(args), serial, time.perf_counter() - started)
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired as error:
+                process.kill()
+                raise DeadlineExceeded(f'adb command timed out after {timeout:g}s: {" ".join(args)}') from error
+            except BaseException:
+                process.kill()
+                raise
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, command, stdout, stderr)
+        return stdout.strip()
+
+
+
+    def execute_binary(self, args: list, serial: str|None=None, sink: Any=None, timeout: float|None=None) -> memoryview|int:
+        """
+        The function runs an adb command and reads its raw binary stdout, for `exec-out` commands
+        like `screencap`.
+
+        Args:
+            args (list): adb command arguments, for example `['exec-out', 'screencap -p']`.
+            serial (str|None): Serial of the target device, `None` to let adb pick it.
+            sink (Any): File-like object or writable buffer receiving the output, see `read_into`. Defaults to None.
+            timeout (float|None): Seconds to wait for the command, it is killed after. Defaults to None (no limit).
+
+        Returns:
+            A `memoryview` of the output if no sink is given, otherwise the number of bytes written to the sink.
+
+        Raises:
+            CalledProcessError: if the called process returns a non-zero return code.
+            BufferError: if the output does not fit in a buffer sink.
+            DeadlineExceeded: if the command did not complete in time.
+        """
+        command = self.build_command(args, serial)
+        started = time.perf_counter()
+        with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as process:
+            observe_phase('spawn', command_kind(args), serial, time.perf_counter() - started)
+            # killing the process ends the blocked read, a pipe read has no timeout of its own
+            expired = threading.Event()
+            killer = threading.Timer(timeout, lambda: (expired.set(), process.kill())) if timeout is not None else None
+            if killer:
+                killer.start()
+            try:
+                output = read_into(process.stdout.readinto, sink)
+                stderr = process.stderr.read()
+            except BaseException:
+                process.kill()
+                raise
+            finally:
+                if killer:
+                    killer.cancel()
+        if expired.is_set():
+            raise DeadlineExceeded(f'adb command timed out after {timeout:g}s: {" ".join(args)}')
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, command, None, stderr)
+        return output
+
+
+
+    def spawn(self, args: list, serial: str|None=None) -> subprocess.Popen:
+        """
+        The function runs an adb command in background and returns without waiting for it.
+
+        Args:
+            args (list): adb command arguments.
+            serial (str|None): Serial of the target device, `None` to let adb pick it.
+
+        Returns:
+            The `subprocess.Popen` object of the running command.
+        """
+        return subprocess.Popen(self.build_command(args, serial), stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+
+
+    def open_stream(self, args: list, serial: str|None=None) -> ProcessStream:
+        """
+        The function runs an adb command keeping its stdin and stdout open, for long-lived commands
+        like an interactive shell or a log stream.
+
+        Args:
+            args (list): adb command arguments, for example `['shell', 'sh']`.
+            serial (str|None): Serial of the target device, `None` to let adb pick it.
+
+        Returns:
+            The `ProcessStream` of the running command.
+        """
+        process = subprocess.Popen(self.build_command(args, serial), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        return ProcessStream(process)
+
+
+
+    def server_version(self) -> int|None:
+        """
+        The function asks the adb server the adb tool talks to for its protocol version.
+
+        Returns:
+            The server version number. `None` if no server is answering.
+        """
+        return probe_server(self.__server_host, self.__server_port)
+
+
+
+class SocketTransport:
+    """
+    Talks to the adb server directly over TCP using the adb host protocol (smart sockets),
+    which saves the process spawn and argument parsing paid by the adb tool for every command.
+
+    Every request opens one connection to the server, sends `<4 hex length><service>` and reads
+    the `OKAY`/`FAIL` status. Device services are reached by switching the connection with
+    `host:transport:<serial>` first. Commands without a socket equivalent (push, pull, install, ..)
+    are handed over to the fallback transport.
+
+    Protocol reference: https://android.googlesource.com/platform/packages/modules/adb/+/refs/heads/main/SERVICES.TXT
+    """
+
+
+    name = 'socket'
+
+    def __init__(self, server_host: str=ADB_SERVER_HOST, server_port: int=ADB_SERVER_PORT, fallback: SubprocessTransport|None=None):
+        """
+        Args:
+            server_host (str): Host of the adb server. Defaults to 127.0.0.1
+            server_port (int): Port of the adb server. Defaults to 5037
+            fallback (SubprocessTransport|None): Transport used for commands that have no socket
+                equivalent. Defaults to a `SubprocessTransport` talking to the same server.
+        """
+        self.__server_host = server_host
+        self.__server_port = server_port
+        self.__fallback = fallback or SubprocessTransport(server_host=server_host, server_port=server_port)
+        self.__features = {}
+
+
+
+    def __connect(self, timeout: float|None=None) -> socket.socket:
+        sock = socket.create_connection((self.__server_host, self.__server_port), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+
+
+    @staticmethod
+    def __bounded(sock: socket.socket, receive: Callable, end: float|None) -> Callable:
+        # every receive only waits for the time left until the end of the command
+        if end is None:
+            return receive
+
+        def bounded_receive(*args) -> Any:
+            left = end - time.monotonic()
+            if left <= 0:
+                raise TimeoutError('adb command timed out')
+            sock.settimeout(left)
+            return receive(*args)
+
+        return bounded_receive
+
+
+
+    @staticmethod
+    def __recv_exactly(sock: socket.socket, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise ADBProtocolError(f'Connection closed by adb server after {len(data)} of {size} bytes')
+            data += chunk
+        return bytes(data)
+
+
+
+    def __recv_all(self, sock: socket.socket, end: float|None=None) -> bytes:
+        receive = self.__bounded(sock, sock.recv, end)
+        chunks = []
+        while chunk := receive(65536):
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+
+
+    def __read_payload(self, sock: socket.socket) -> str:
+        length = int(self.__recv_exactly(sock, 4), 16)
+        return self.__recv_exactly(sock, length).decode('utf-8', errors='replace')
+
+
+
+    def __request(self, sock: socket.socket, service: str):
+        sock.sendall(encode_request(service))
+        status = self.__recv_exactly(sock, 4)
+        if status == b'OKAY':
+            return
+        if status == b'FAIL':
+            raise ADBProtocolError(self.__read_payload(sock))
+        raise ADBProtocolError(f'Unexpected adb server status: {status!r}')
+
+
+
+    def __switch_transport(self, sock: socket.socket, serial: str|None):
+        self.__request(sock, f'host:transport:{serial}' if serial else 'host:transport-any')
+
+
+
+    def query(self, service: str, timeout: float|None=None) -> str:
+        """
+        The function sends a host service request that answers with a length prefixed payload.
+
+        Args:
+            service (str): The host service, for example `host:devices-l`.
+            timeout (float|None): Seconds to wait for each network operation. Defaults to None (no limit).
+
+        Returns:
+            The payload string of the answer.
+        """
+        with self.__connect(timeout) as sock:
+            self.__request(sock, service)
+            return self.__read_payload(sock)
+
+
+
+    def command(self, service: str, timeout: float|None=None):
+        """
+        The function sends a host service request that answers with the status only.
+
+        Args:
+            service (str): The host service, for example `host:kill`.
+            timeout (float|None): Seconds to wait for each network operation. Defaults to None (no limit).
+        """
+        with self.__connect(timeout) as sock:
+            self.__request(sock, service)
+
+
+
+    def device_service(self, service: str, serial: str|None=None, timeout: float|None=None) -> bytes:
+        """
+        The function runs a device service (`shell:`, `exec:`, `reboot:` ..) and reads its
+        raw output until the device closes the stream.
+
+        Args:
+            service (str): The device service, for example `shell:input keyevent KEYCODE_HOME`.
+            serial (str|None): Serial of the target device, `None` to use the only connected device.
+            timeout (float|None): Seconds to wait for the whole output, the connection is closed after,
+                which ends the command on the device. Defaults to None (no limit).
+
+        Returns:
+            The raw output bytes of the service.
+        """
+        end = time.monotonic() + timeout if timeout is not None else None
+        started = time.perf_counter()
+        with self.__connect(timeout) as sock:
+            self.__switch_transport(sock, serial)
+            observe_phase('spawn', command_kind(service), serial, time.perf_counter() - started)
+            self.__request(sock, service)
+            return self.__recv_all(sock, end)
+
+
+
+    def __forget_features(self, args: list):
+        # connecting or disconnecting may change the only connected device, or the device at an address
+        if len(args) < 2:
+            self.__features.clear()  # `disconnect` alone drops every device
+            return
+        host = args[1].split(':')[0]
+        for serial in list(self.__features):
+            if serial is None or serial.split(':')[0] == host:
+                self.__features.pop(serial, None)
+
+
+
+    def features(self, serial: str|None=None, timeout: float|None=None) -> frozenset:
+        """
+        The function returns the features a device supports (`shell_v2`, `cmd` ..), asked once per device
+        until it is connected or disconnected again.
+
+        Args:
+            serial (str|None): Serial of the device, `None` for the only connected device.
+            timeout (float|None): Seconds to wait for each network operation. Defaults to None (no limit).
+
+        Returns:
+            Set of the feature names, empty if the server does not know the device or the request.
+        """
+        features = self.__features.get(serial)
+        if features is None:
+            try:
+                payload = self.query(f'host-serial:{serial}:features' if serial else 'host:features', timeout)
+            except ADBProtocolError:
+                return frozenset()  # not cached, the device may not be connected yet
+            self.__features[serial] = features = frozenset(payload.strip().split(','))
+        return features
+
+
+
+    def __shell_v2(self, args: list, service: str, serial: str|None, timeout: float|None) -> str:
+        # unlike `shell:`, the shell protocol v2 reports the exit status, so failures raise like the adb tool
+        data = self.device_service('shell,v2,raw:' + service[len('shell:'):], serial, timeout)
+        stdout, stderr, exit_code = decode_shell_v2(data)
+        if exit_code is None:
+            raise ADBProtocolError(f'Shell of {serial or "the device"} closed without an exit status: {" ".join(args)}')
+        stdout, stderr = stdout.decode('utf-8', errors='replace'), stderr.decode('utf-8', errors='replace')
+        if exit_code:
+            raise subprocess.CalledProcessError(exit_code, list(args), stdout, stderr)
+        return stdout.strip()
+
+
+
+    def open_device_service(self, service: str, serial: str|None=None) -> SocketStream:
+        """
+        The function opens a device service and keeps the connection open as a stream.
+
+        Args:
+            service (str): The device service, for example `shell:sh`.
+            serial (str|None): Serial of the target device, `None` to use the only connected device.
+
+        Returns:
+            The `SocketStream` of the service.
+        """
+        sock = self.__connect()
+        try:
+            self.__switch_transport(sock, serial)
+            self.__request(sock, service)
+        except BaseException:
+            sock.close()
+            raise
+        return SocketStream(sock)
+
+
+
+    def open_stream(self, args: list, serial: str|None=None) -> SocketStream|ProcessStream:
+        """
+        The function runs an adb `shell`/`exec-out` command keeping the connection open, for long-lived
+        commands like an interactive shell or a log stream. Other commands use the fallback transport.
+
+        Args:
+            args (list): adb command arguments, for example `['shell', 'sh']`.
+            serial (str|None): Serial of the target device, `None` to let the server pick it.
+
+        Returns:
+            The stream of the running command.
+        """
+        if args and args[0] in ('shell', 'exec-out'):
+            service = 'shell:' if args[0] == 'shell' else 'exec:'
+            return self.open_device_service(service + ' '.join(args[1:]), serial)
+        return self.__fallback.open_stream(args, serial)
+
+
+
+    def execute(self, args: list, serial: str|None=None, timeout: float|None=None) -> str:
+        """
+        The function runs an adb command through the adb server socket, producing the same output
+        the adb tool prints for it. Commands without a socket equivalent go to the fallback transport.
+
+        Args:
+            args (list): adb command arguments, for example `['shell', 'getprop']`.
+            serial (str|None): Serial of the target device, `None` to let the server pick it.
+            timeout (float|None): Seconds to wait for the command, the connection is closed after. Defaults to None (no limit).
+
+        Returns:
+            The stripped output of the command.
+
+        Raises:
+            ADBProtocolError: if the adb server refuses the request.
+            CalledProcessError: if a shell command returns a non-zero exit code, on devices with the shell protocol v2.
+            DeadlineExceeded: if the command did not complete in time.
+        """
+        plan = plan_socket_command(args, serial)
+        if plan is None:
+            return self.__fallback.execute(args, serial, timeout)
+        kind, service = plan
+        if args[0] in ('connect', 'disconnect'):
+            self.__forget_features(args)
+        try:
+            if kind == 'device' and args[0] == 'shell' and 'shell_v2' in self.features(serial, timeout):
+                return self.__shell_v2(args, service, serial, timeout)
+            if kind == 'device':
+                return self.device_service(service, serial, timeout).decode('utf-8', errors='replace').strip()
+            if kind == 'reboot':
+                self.device_service(service, serial, timeout)
+                return ''
+            if kind == 'command':
+                self.command(service, timeout)
+                return ''
+            return format_query_output(kind, self.query(service, timeout))
+        except DeadlineExceeded:
+            raise
+        except TimeoutError as error:
+            if timeout is None:
+                raise
+            raise DeadlineExceeded(f'adb command timed out after {timeout:g}s: {" ".join(args)}') from error
+
+
+
+    def execute_binary(self, args: list, serial: str|None=None, sink: Any=None, timeout: float|None=None) -> memoryview|int:
+        """
+        The function runs an adb `shell`/`exec-out` command through the adb server socket and reads its
+        raw binary output with `recv_into`, without intermediate copies. Other commands use the fallback transport.
+
+        Args:
+            args (list): adb command arguments, for example `['exec-out', 'screencap -p']`.
+            serial (str|None): Serial of the target device, `None` to let the server pick it.
+            sink (Any): File-like object or writable buffer receiving the output, see `read_into`. Defaults to None.
+            timeout (float|None): Seconds to wait for the whole output, the connection is closed after. Defaults to None (no limit).
+
+        Returns:
+            A `memoryview` of the output if no sink is given, otherwise the number of bytes written to the sink.
+
+        Raises:
+            ADBProtocolError: if the adb server refuses the request.
+            BufferError: if the output does not fit in a buffer sink.
+            DeadlineExceeded: if the command did not complete in time.
+        """
+        plan = plan_socket_command(args, serial)
+        if plan is None or plan[0] != 'device':
+            return self.__fallback.execute_binary(args, serial, sink, timeout)
+        end = time.monotonic() + timeout if timeout is not None else None
+        started = time.perf_counter()
+        try:
+            with self.__connect(timeout) as sock:
+                self.__switch_transport(sock, serial)
+                observe_phase('spawn', command_kind(args), serial, time.perf_counter() - started)
+                self.__request(sock, plan[1])
+                return read_into(self.__bounded(sock, sock.recv_into, end), sink)
+        except TimeoutError as error:
+            if timeout is None or isinstance(error, DeadlineExceeded):
+                raise
+            raise DeadlineExceeded(f'adb command timed out after {timeout:g}s: {" ".join(args)}') from error
+
+
+
+    def spawn(self, args: list, serial: str|None=None) -> subprocess.Popen:
+        """Background commands need a process to hand back, so they always use the fallback transport."""
+        return self.__fallback.spawn(args, serial)
+
+
+
+    def server_version(self) -> int|None:
+        """
+        The function asks the adb server for its protocol version.
+
+        Returns:
+            The server version number. `None` if no server is answering.
+        """
+        return probe_server(self.__server_host, self.__server_port)
+
+
+
+def create_transport(transport: str|SubprocessTransport|SocketTransport='subprocess', server_host: str=ADB_SERVER_HOST,
+                     server_port: int=ADB_SERVER_PORT) -> SubprocessTransport|SocketTransport:
+    """
+    The function creates the transport used by `ADBClient` to reach the adb server.
+
+    Args:
+        transport (str|SubprocessTransport|SocketTransport): Transport name [subprocess | socket] or a
+            ready transport object that is returned as is. Defaults to subprocess
+        server_host (str): Host of the adb server. Defaults to 127.0.0.1
+        server_port (int): Port of the adb server. Defaults to 5037
+
+    Returns:
+        The transport object.
+    """
+    if not isinstance(transport, str):
+        return transport
+    if transport == 'subprocess':
+        return SubprocessTransport(server_host=server_host, server_port=server_port)
+    if transport == 'socket':
+        return SocketTransport(server_host, server_port)
+    raise ValueError(f'Unknown adb transport: {transport}, use one of [subprocess | socket]')
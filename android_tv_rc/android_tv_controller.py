@@ -1,13 +1,19 @@
 from .adb_client import ADBClient
 from .tv_apps import AndroidTVApps
 from .key_codes import KeyCodes
+from .deadline import deadline
+from .metrics import instrument_methods
+from .tracing import trace_methods
+from .frame_capture import FrameCapture
 
 
+@trace_methods
+@instrument_methods
 class AndroidTVController:
 
 
 
-    def __init__(self, ip: str, verbose: bool=False, show_command: bool=False):
+    def __init__(self, ip: str, verbose: bool=False, show_command: bool=False, adb_client: ADBClient|None=None, **client_options):
         """
         The class has many important utils to interact with android TV using adb.
         
@@ -21,9 +27,17 @@ class AndroidTVController:
                 not to display the executed ADB commands. If `show_command` is set to `True`, the executed ADB
                 commands will be shown. If `show_command` is set to `False`, the executed ADB commands will.
                 Defaults to False.
+            adb_client (ADBClient|None): Client shared with other controllers, for example by a `FleetController`.
+                The TV is then driven through a device handle of the client instead of its selected device.
+                Defaults to a new client built with `verbose`, `show_command` and `client_options`.
+            client_options: Extra keyword arguments passed to `ADBClient`, for example `transport='socket'`.
         """
-        self.__adb_client = ADBClient(verbose, show_command)
+        self.__adb_client = adb_client if adb_client is not None else ADBClient(verbose, show_command, **client_options)
         self.__ip = ip
+        # a shared client drives many TVs, so its selected device is not this one
+        self.__device = adb_client.device(ip if ':' in ip else f'{ip}:5555') if adb_client is not None else None
+        self.__tv = self.__device if self.__device is not None else self.__adb_client
+        self.__frame_capture = None
     
     
     
@@ -31,6 +45,9 @@ class AndroidTVController:
         """
         Start connection to TV IP.
         """
+        if self.__device is not None:
+            # no devices listing, which a shared client would repeat for every TV
+            return self.__device.reconnect()
         return self.__adb_client.connect(self.__ip)
     
     
@@ -39,6 +56,11 @@ class AndroidTVController:
         """
         Check if connection is successfully established.
         """
+        if self.__device is not None:
+            try:
+                return self.__device.get_state() == 'device'
+            except Exception:
+                return False
         return self.__adb_client.is_connected(self.__ip)
         
         
@@ -48,6 +70,15 @@ class AndroidTVController:
         Return the adb session client.
         """
         return self.__adb_client
+
+
+
+    @property
+    def serial(self) -> str|None:
+        """Serial of the TV the commands go to, `None` if not connected."""
+        if self.__device is not None:
+            return self.__device.serial
+        return self.__adb_client.selected_device
         
 
 
@@ -57,49 +88,90 @@ class AndroidTVController:
 
     def press_home(self):
         """Simulates pressing home button on Android TV device remote control."""
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_HOME)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_HOME)
 
 
 
     def press_tv(self):
         """Simulates pressing TV input button on Android TV device remote control."""
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_TV)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_TV)
         
         
         
     def press_back(self):
         """Simulates pressing back button on Android TV device remote control."""
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_BACK)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_BACK)
 
 
 
     def press_dpad_up(self):
         """Simulates pressing up button on Android TV device remote control."""
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_DPAD_UP)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_DPAD_UP)
 
 
 
     def press_dpad_down(self):
         """Simulates pressing down button on Android TV device remote control."""
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_DPAD_DOWN)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_DPAD_DOWN)
 
 
 
     def press_dpad_left(self):
         """Simulates pressing left button on Android TV device remote control."""
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_DPAD_LEFT)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_DPAD_LEFT)
 
 
 
     def press_dpad_right(self):
         """Simulates pressing right button on Android TV device remote control."""
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_DPAD_RIGHT)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_DPAD_RIGHT)
 
 
 
     def press_enter(self):
         """Simulates pressing enter button on Android TV device remote control."""
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_ENTER)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_ENTER)
+
+
+
+    def press_keys(self, keys: list, inter_key_delay: float|None=None):
+        """
+        Simulates pressing a sequence of buttons on Android TV device remote control in a single adb round trip.
+        
+        Args:
+            keys (list): List of `KeyCodes` to press in order.
+            inter_key_delay (float|None): Seconds to wait between two key presses. Defaults to None.
+        """
+        self.__tv.send_keyevent_sequence(keys, inter_key_delay)
+
+
+
+    def navigate_to(self, text: str|None=None, resource_id: str|None=None, content_desc: str|None=None,
+                    select: bool=False, inter_key_delay: float|None=None) -> bool|None:
+        """
+        Moves the focus to a visible UI element with the shortest D-pad key sequence, planned from one
+        UI dump and sent as a single batch.
+        
+        Args:
+            text (str|None): Exact text of the element, for example 'Settings'.
+            resource_id (str|None): Resource id of the element, with or without its package prefix.
+            content_desc (str|None): Exact content description of the element.
+            select (bool): Whether to press enter once the element is focused. Defaults to False.
+            inter_key_delay (float|None): Seconds to wait between two key presses, for UIs that animate. Defaults to None.
+        
+        Return:
+            Whether the element was found and reachable. `None` if not connected.
+        """
+        ui = self.__tv.ui_snapshot()
+        if ui is None:
+            return
+        keys = ui.path_to(ui.find(text, resource_id, content_desc))
+        if keys is None:
+            return False
+        if select:
+            keys.append(KeyCodes.KEYCODE_ENTER)
+        self.press_keys(keys, inter_key_delay)
+        return True
 
     
     
@@ -109,19 +181,53 @@ class AndroidTVController:
     
     def press_volume_up(self):
         """Simulates pressing volume up button on Android TV device remote control."""
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_VOLUME_UP)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_VOLUME_UP)
 
 
 
     def press_volume_down(self):
         """Simulates pressing volume down button on Android TV device remote control."""
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_VOLUME_DOWN)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_VOLUME_DOWN)
 
 
 
     def press_volume_mute(self):
         """Simulates pressing volume mute button on Android TV device remote control."""
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_VOLUME_MUTE)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_VOLUME_MUTE)
+
+
+
+
+    def set_volume(self, level: int, stream: int|str='music') -> int|None:
+        """
+        Set the volume to a level in one command, instead of pressing volume up or down once per step.
+        
+        Args:
+            level (int): The volume level, clamped into the TV range (often 0 to 15).
+            stream (int|str): Audio stream [music | system | ring | alarm | notification | voice_call]. Defaults to music
+        
+        Return:
+            The volume level after the change. `None` if not connected.
+        """
+        volume = self.__tv.set_volume(level, stream)
+        return None if volume is None else volume.level
+
+
+
+    def get_volume(self, stream: int|str='music', refresh: bool=True) -> int|None:
+        """
+        Get the volume level in one command.
+        
+        Args:
+            stream (int|str): Audio stream [music | system | ring | alarm | notification | voice_call]. Defaults to music
+            refresh (bool): Whether to ask the TV, otherwise the last known level is returned when there is one,
+                it follows the volume buttons pressed through this library. Defaults to True.
+        
+        Return:
+            The volume level. `None` if not connected.
+        """
+        volume = self.__tv.get_volume(stream, refresh)
+        return None if volume is None else volume.level
 
 
 
@@ -136,16 +242,32 @@ class AndroidTVController:
         Return:
             Statues of TV power on or off.
         """
-        return self.__adb_client.is_powered_on()
+        return self.__tv.is_powered_on()
     
     
     
+    def watch(self, callback=None):
+        """
+        Watches the TV power, foreground app and connection as they change, instead of polling `is_powered_on`.
+
+        Args:
+            callback (Callable|None): Listener called with every `DeviceEvent`. Defaults to None.
+
+        Return:
+            The running `DeviceWatcher`, iterate it (`for` or `async for`) or close it. `None` if not connected.
+        """
+        if self.__device is not None:
+            return self.__adb_client.watch([self.__device.serial], callback=callback)
+        return self.__adb_client.watch(callback=callback)
+
+
+
     def press_power(self):
         """
         Simulates pressing power button on Android TV device remote control.
         you can use it to power on/off the TV device.
         """
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_POWER)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_POWER)
         
         
         
@@ -154,7 +276,7 @@ class AndroidTVController:
         Puts the TV into a low-power state. The TV will still be able to receive
         signals from the remote control, and it will wake up quickly when you press a button. 
         """
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_SLEEP)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_SLEEP)
         
         
         
@@ -164,7 +286,7 @@ class AndroidTVController:
         The TV will not be able to receive signals from the remote control while in soft sleep,
         and it will take a few seconds to wake up when you press a button.
         """
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_SOFT_SLEEP)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_SOFT_SLEEP)
 
 
 
@@ -172,7 +294,84 @@ class AndroidTVController:
         """
         Tell the TV when you want it to wake up from sleep.
         """
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_WAKEUP)
+        self.__tv.send_keyevent_input(KeyCodes.KEYCODE_WAKEUP)
+
+
+
+    def snapshot(self, fields: tuple|list|None=None):
+        """
+        Get the TV state (power, foreground app, ip address, ..) in a single adb round trip.
+        
+        Args:
+            fields (tuple|list|None): Fields to gather, any of [state | power | properties | ip_address | foreground_app].
+                Defaults to all of them.
+        
+        Return:
+            `DeviceSnapshot` of the TV. `None` if not connected.
+        """
+        return self.__tv.snapshot(fields)
+
+
+
+    # ------------------------------[ Screen Commands ]------------------------------
+
+
+
+    def screenshot(self, format: str='png', sink=None):
+        """
+        Capture the TV screen.
+        
+        Args:
+            format (str): Capture format [png | raw]. Defaults to png
+            sink: File-like object or writable buffer receiving the capture, for example `open('screen.png', 'wb')`.
+        
+        Return:
+            The PNG image as a `memoryview`, a `RawFrame` for `raw`, or the number of bytes written to the sink.
+            `None` if not connected.
+        """
+        return self.__tv.screencap(format, sink)
+
+
+
+    def get_frame_capture(self, fps: float=4.0) -> FrameCapture|None:
+        """
+        Return the frame capture of the TV screen (needs NumPy), created on first use.
+        
+        Args:
+            fps (float): Target capture rate. Defaults to 4
+        
+        Return:
+            `FrameCapture` yielding the screen frames as NumPy arrays. `None` if not connected.
+        """
+        device = self.__device or self.__adb_client.device()
+        if device.serial is None:
+            return
+        if self.__frame_capture is None or self.__frame_capture.serial != device.serial:
+            self.__frame_capture = FrameCapture(device, fps)
+        return self.__frame_capture
+
+
+
+    def press_and_wait(self, keys: KeyCodes|list, timeout: float=5.0, settle_time: float=0.3) -> bool|None:
+        """
+        Press buttons then wait until the screen changed and settled, instead of sleeping a fixed time.
+        
+        Args:
+            keys (KeyCodes|list): Key, or list of keys pressed in order.
+            timeout (float): Seconds to wait for the screen to change, then for it to settle. Defaults to 5
+            settle_time (float): Seconds the screen must stay unchanged once it changed. Defaults to 0.3
+        
+        Return:
+            Whether the screen changed and settled in time. `None` if not connected.
+        """
+        capture = self.get_frame_capture()
+        if capture is None:
+            return
+        capture.snapshot_reference()
+        self.press_keys(keys if isinstance(keys, list) else [keys])
+        if capture.wait_for_change(timeout=timeout) is None:
+            return False
+        return capture.wait_for_settle(settle_time, timeout=timeout) is not None
 
 
 
@@ -182,20 +381,27 @@ class AndroidTVController:
 
     def press_channel_up(self):
         """Simulates pressing channel up button on Android TV device remote control."""
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_TV)
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_CHANNEL_UP)
+        self.__tv.send_keyevent_sequence([KeyCodes.KEYCODE_TV, KeyCodes.KEYCODE_CHANNEL_UP])
 
 
 
     def press_channel_down(self):
         """Simulates pressing channel down button on Android TV device remote control."""
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_TV)
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_CHANNEL_DOWN)
+        self.__tv.send_keyevent_sequence([KeyCodes.KEYCODE_TV, KeyCodes.KEYCODE_CHANNEL_DOWN])
         
         
         
-    def press_channel_number(self, channel_number: str):
-        """Simulates pressing channel number digits buttons on Android TV device remote control."""
+    def press_channel_number(self, channel_number: str, timeout: float|None=None):
+        """
+        Simulates pressing channel number digits buttons on Android TV device remote control.
+
+        Args:
+            channel_number (str): The channel digits, for example '105'.
+            timeout (float|None): Seconds all the key presses may take together. Defaults to None (no limit).
+
+        Raises:
+            DeadlineExceeded: if the key presses did not complete in time.
+        """
         numbers_key_codes = {
             '0': KeyCodes.KEYCODE_0,
             '1': KeyCodes.KEYCODE_1,
@@ -208,9 +414,9 @@ class AndroidTVController:
             '8': KeyCodes.KEYCODE_8,
             '9': KeyCodes.KEYCODE_9,
         }
-        self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_TV)
-        for digit in channel_number:
-            self.__adb_client.send_keyevent_input(numbers_key_codes[digit])
+        keys = [KeyCodes.KEYCODE_TV] + [numbers_key_codes[digit] for digit in channel_number]
+        with deadline(timeout):
+            self.__tv.send_keyevent_sequence(keys)
         
     
     
@@ -218,20 +424,30 @@ class AndroidTVController:
 
     
     
-    def open_app(self, app: AndroidTVApps):
+    def open_app(self, app: AndroidTVApps|str, timeout: float|None=None) -> bool|None:
         """
-        The function starts app with the specified package and activity.
+        The function starts an app from its package name, its launcher activity is resolved
+        from the device launcher catalog.
         
         To get the package name for an app search for it on google, or
         if the app is installed use `adb_client.list_packages()` method.
-        To get main activity name use `adb_client.get_package_activities(package_name)`
-        and try to interpret the output dump to extract the main launcher activity.
     
         Args:
-            app (AndroidTVApps): The app name in form of package/activity.
+            app (AndroidTVApps|str): The app package name, for example 'com.netflix.ninja', or an app
+                in form of package/activity.
+            timeout (float|None): Seconds the whole start may take, every adb command of it included.
+                Defaults to None (no limit).
+        
+        Returns:
+            Boolean indicates if app starting process is successful. `None` if no device found.
+
+        Raises:
+            DeadlineExceeded: if the app did not start in time.
         """
-        package, activity = app.value.split('/')
-        self.__adb_client.start_app(package, activity)
+        app = app.value if isinstance(app, AndroidTVApps) else app
+        package, _, activity = app.partition('/')
+        with deadline(timeout):
+            return self.__tv.start_app(package, activity or None)
 
     
     
@@ -0,0 +1,1021 @@
+import sys
+import shlex
+import asyncio
+import threading
+import subprocess
+from typing import Any, Callable
+from .logger import Logger
+from .key_codes import KeyCodes
+from .adb_transport import ADB_SERVER_HOST, ADB_SERVER_PORT
+from .package_index import PackageIndex
+from .launcher_catalog import LauncherCatalog
+from .device_snapshot import DeviceSnapshot
+from .adb_client import ADBClient
+from .adb_device import DeviceState
+from .async_adb_device import AsyncADBDevice, wait_command
+from .adb_commands import parse_connect_result, parse_disconnect_result, parse_devices, find_connected_device
+from .device_watcher import DeviceWatcher
+from .metrics import command_kind, measure_command
+from .tracing import trace_command
+from .text_input import TEXT_CHUNK_SIZE
+from .volume import Volume
+from .async_logcat import AsyncLogcatStream
+from .screen_capture import RawFrame
+from .screen_stream import SEGMENT_TIME_LIMIT
+from .async_screen_stream import AsyncScreenStream
+from .ui_index import UIIndex
+from .async_adb_transport import AsyncSubprocessTransport, AsyncSocketTransport, create_async_transport
+
+
+
+class AsyncADBClient:
+    """
+    `asyncio` twin of `ADBClient` with the same methods as coroutines. Commands run as `asyncio`
+    subprocesses or over `asyncio` sockets, so hundreds of commands to many TVs can be in flight on
+    one event loop. Like `ADBClient`, the commands of the selected device go through an `AsyncADBDevice`
+    handle, get one per device with `device(serial)` to drive many devices from many tasks.
+
+    Every command can be cancelled, the adb process is killed (or the socket closed) when the
+    awaiting task is cancelled. Use `command_timeout` for a timeout per adb command, or wrap any call
+    in `with deadline(seconds):` for a timeout over a whole operation, the deadline follows the task.
+
+    Example:
+        async with AsyncADBClient(transport='socket') as client:
+            await client.connect('192.168.1.28')
+            await client.send_keyevent_input(KeyCodes.KEYCODE_HOME)
+    """
+
+
+
+    def __init__(self, verbose: bool=False, show_command: bool=False, transport: str|AsyncSubprocessTransport|AsyncSocketTransport='subprocess',
+                 server_host: str=ADB_SERVER_HOST, server_port: int=ADB_SERVER_PORT, command_timeout: float|None=None,
+                 max_concurrent_commands: int|None=None, server_start_timeout: float=10.0, package_cache_ttl: float|None=300.0,
+                 launcher_catalog: LauncherCatalog|None=None):
+        """
+        Args:
+            verbose (bool): Whether to display additional information during the execution. Defaults to False.
+            show_command (bool): Whether to display the executed ADB commands. Defaults to False.
+            transport (str|AsyncSubprocessTransport|AsyncSocketTransport): How commands reach the adb server,
+                `subprocess` or `socket` like `ADBClient`, or a ready transport object. Defaults to subprocess.
+            server_host (str): Host of the adb server. Defaults to 127.0.0.1
+            server_port (int): Port of the adb server. Defaults to 5037
+            command_timeout (float|None): Seconds after which a single adb command is cancelled and
+                `DeadlineExceeded` (a `TimeoutError`) is raised, file transfers and installs are only bounded
+                by an explicit timeout or a `deadline`. Defaults to None (no timeout).
+            max_concurrent_commands (int|None): Maximum number of adb commands of this client running at
+                the same time, useful to bound the number of adb processes. Defaults to None (no limit).
+            server_start_timeout (float): Maximum seconds to wait for a newly started adb server to answer.
+                A server that is already running is reused immediately. Defaults to 10.
+            package_cache_ttl (float|None): Seconds the installed packages listing of a device is reused,
+                like `ADBClient`. Defaults to 300.
+            launcher_catalog (LauncherCatalog|None): Catalog of the apps launcher activities used by `start_app`
+                when no activity is given. Defaults to a new catalog.
+        """
+        # logs verbose
+        self.__verbose = verbose
+        self.__show_command = show_command
+        Logger.set_verbose(verbose)
+        if self.__verbose:
+            Logger.welcome('use ADB command-line tool with python asyncio.')
+
+        # adb params
+        self.__devices = []
+        self.__selected_device = None
+        self.__server_started = False
+        self.__server_host = server_host
+        self.__server_port = server_port
+        self.__transport = create_async_transport(transport, server_host, server_port)
+        self.__command_timeout = command_timeout
+        self.__server_start_timeout = server_start_timeout
+        self.__semaphore = asyncio.Semaphore(max_concurrent_commands) if max_concurrent_commands else None
+        self.__package_cache_ttl = package_cache_ttl
+        self.__launcher_catalog = launcher_catalog or LauncherCatalog()
+        self.__device_states = {}
+        self.__device_states_lock = threading.Lock()
+        # blocking client of the device watchers, created by the first `watch`
+        self.__watch_client = None
+
+
+
+    async def __aenter__(self):
+        await self.start_server()
+        return self
+
+
+
+    async def __aexit__(self, *exc_info):
+        self.clean()
+
+
+
+    async def __execute_command(self, command_str: str, include_selected_serial: bool=True, timeout: float|None=None) -> str:
+        """
+        The function executes a server command (start-server, connect, devices ..) and waits for its output
+        without blocking the event loop, the device commands go through `device()` handles.
+
+        Args:
+            command_str (str): The adb command, for example `devices -l`.
+            include_selected_serial (bool): Whether to include selected device serial in the command. Defaults to True.
+            timeout (float|None): Seconds to wait for the command. Defaults to the client `command_timeout`.
+
+        Returns:
+            The stdout of the command as a string.
+
+        Raises:
+            DeadlineExceeded: if the command did not complete in time or the current `deadline` passed,
+                the command is killed.
+            CalledProcessError: if the called process returns a non-zero return code.
+        """
+        serial = self.__selected_device if include_selected_serial else None
+        command_parts = shlex.split(command_str, posix="win" not in sys.platform)
+        if self.__verbose and self.__show_command:
+            command = ' '.join(['adb'] + (['-s', serial] if serial else []) + [command_str])
+            Logger.info('[bold]Command:[/bold] [blue]%s[/blue] [dim](%s, async)[/dim]', command, self.__transport.name)
+        timeout = self.__command_timeout if timeout is None else timeout
+        with trace_command(command_parts, serial), measure_command(command_kind(command_parts), serial):
+            return await wait_command(self.__transport.execute(command_parts, serial), timeout, command_str, self.__semaphore)
+
+
+
+    # ------------------------------[ Server Commands ]------------------------------
+
+
+
+    async def start_server(self) -> bool:
+        """
+        The function `start_server` starts an ADB server and waits until it is up. A server
+        already answering on its port is reused immediately, otherwise the server port is probed
+        with a short backoff until it answers or `server_start_timeout` expires.
+
+        Returns:
+            Boolean indicating whether the server is running or not.
+        """
+        Logger.info('Starting ADB server..')
+        if await self.__transport.server_version() is not None:
+            Logger.success('ADB server is already running')
+            self.__server_started = True
+            return True
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.__server_start_timeout
+        try:
+            await self.__execute_command('start-server', include_selected_serial=False, timeout=self.__server_start_timeout)
+        except (OSError, TimeoutError, subprocess.CalledProcessError):
+            pass  # the probe below decides
+        delay = 0.01
+        while True:
+            if await self.__transport.server_version() is not None:
+                Logger.success('ADB server is started')
+                self.__server_started = True
+                return True
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+        Logger.error('Unable to start ADB server')
+        return False
+
+
+
+    async def kill_server(self) -> bool:
+        """
+        The function `kill_server` stops the ADB server.
+
+        Returns:
+            Boolean indicating whether the server is stopped or not.
+        """
+        Logger.info('Stopping ADB server..')
+        await self.__execute_command('kill-server', include_selected_serial=False)
+        self.clean()
+        Logger.success('ADB server is stopped')
+        return True
+
+
+
+    def clean(self):
+        """Resets and clean"""
+        with self.__device_states_lock:
+            self.__device_states = {}
+        self.__devices = []
+        self.__selected_device = None
+        self.__server_started = False
+
+
+
+    # ------------------------------[ Connectivity Commands ]------------------------------
+
+
+
+    async def connect(self, ip: str) -> bool:
+        """
+        The function connects to an IP address, starting the ADB server first if needed.
+
+        Args:
+            ip (str): The IP address of the device you want to connect.
+
+        Returns:
+            Boolean: True if the connection succeeded, False if the connection failed.
+        """
+        if not self.__server_started:
+            await self.start_server()
+        Logger.info('Connecting to [bold green]%s[/bold green] ..', ip)
+        result = await self.__execute_command(f'connect {ip}', include_selected_serial=False)
+        if parse_connect_result(result):
+            # serials only, the `devices -l` listing of a big fleet overflows the 64 KiB adb host protocol payload
+            self.__devices = await self.get_devices(include_descriptions=False)
+            self.__selected_device = find_connected_device(self.__devices, ip)
+            Logger.success('Device: [bold blue]%s[/bold blue] is connected successfully', self.__selected_device)
+            return True
+        else: # "failed" in result
+            Logger.error('Connection with [bold blue]%s[/bold blue] failed', ip)
+            return False
+
+
+
+    def is_connected(self, ip: str) -> bool:
+        """
+        The function checks if a device with a given IP address is connected to adb server.
+
+        Args:
+            ip (str): The IP address of the device.
+
+        Returns:
+            Boolean value. True if there is a device with the specified IP address.
+        """
+        for device in self.__devices:
+            if device.split(':')[0] == ip:
+                Logger.success('Device: [bold blue]%s[/bold blue] is connected', ip)
+                return True
+        Logger.error('Device [bold blue]%s[/bold blue] is not connected', ip)
+        return False
+
+
+
+    async def disconnect(self) -> bool:
+        """
+        Disconnect selected device.
+
+        Returns:
+            Boolean: True if the device is disconnected.
+        """
+        Logger.info('Disconnecting device..')
+        if parse_disconnect_result(await self.__execute_command('disconnect')):
+            self.__devices = await self.get_devices(include_descriptions=False)
+            self.__selected_device = None
+            Logger.success('Device is disconnected')
+            return True
+        else:
+            Logger.error('Error while disconnecting device: [bold blue]%s[/bold blue]', self.__selected_device)
+            return False
+
+
+
+    # ------------------------------[ Info Commands ]------------------------------
+
+
+
+    async def get_devices(self, include_descriptions: bool=True) -> list:
+        """
+        The function `get_devices` retrieves the serial numbers of the connected devices.
+
+        Args:
+            include_descriptions (bool): Whether to ask adb for the devices descriptions. Defaults to True
+
+        Returns:
+            List of connected devices serial numbers.
+        """
+        Logger.info('Getting connected devices..')
+        command = 'devices -l' if include_descriptions else 'devices'
+        self.__devices = parse_devices(await self.__execute_command(command, include_selected_serial=False))
+        Logger.info('There are [bold green]%s[/bold green] connected devices', len(self.__devices))
+        if self.__verbose:
+            for i, serial_number in enumerate(self.__devices):
+                Logger.print('[bold green]Device[/bold green] (%s): [yellow]%s[/yellow]', i+1, serial_number)
+        return self.__devices
+
+
+
+    def select_device(self, device_serial: str) -> bool:
+        """
+        The function selects a device based on its serial number.
+
+        Args:
+            device_serial (str): The serial number of a device.
+
+        Returns:
+            Boolean: True if the device is found and selected.
+        """
+        if device_serial in self.__devices:
+            self.__selected_device = device_serial
+            Logger.success('Selected device: [bold blue]%s[/bold blue]', self.__selected_device)
+            return True
+        else:
+            Logger.error('Device: [bold blue]%s[/bold blue] is not found', device_serial)
+            return False
+
+
+
+    def get_selected_device(self) -> str|None:
+        """
+        Get current selected device.
+
+        Returns:
+            Selected device serial number. `None` if no device found.
+        """
+        return self.__selected_device
+
+
+
+    @property
+    def selected_device(self) -> str|None:
+        """Serial of the selected device, `None` if no device is selected."""
+        return self.__selected_device
+
+
+
+    def device(self, device_serial: str|None=None) -> AsyncADBDevice:
+        """
+        The function returns a handle bound to one device, like `ADBClient.device`. The handle carries
+        its own serial, so many tasks can drive different devices at the same time, all the handles of
+        a device share its package index, launcher fingerprint and last known volumes.
+
+        Args:
+            device_serial (str|None): Serial of the device, for example '192.168.1.28:5555'. Defaults to
+                the selected device.
+
+        Returns:
+            `AsyncADBDevice` handle of the device.
+        """
+        serial = device_serial or self.__selected_device
+        return AsyncADBDevice(serial, self.__transport, self.__get_device_state(serial), self.__launcher_catalog,
+                              self.__verbose, self.__show_command, self.__command_timeout, self.__semaphore)
+
+
+
+    def __get_device_state(self, serial: str|None) -> DeviceState:
+        with self.__device_states_lock:
+            if serial not in self.__device_states:
+                self.__device_states[serial] = DeviceState(serial, self.__package_cache_ttl)
+            return self.__device_states[serial]
+
+
+
+    async def get_device_info(self) -> dict|None:
+        """
+        The function `get_device_info` retrieves device information.
+
+        Returns:
+            Dictionary containing device information. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().get_device_info()
+
+
+
+    async def get_state(self) -> str|None:
+        """
+        The function `get_state` returns the state of connected device.
+
+        Returns:
+            String represents device state. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().get_state()
+
+
+
+    async def get_serialno(self) -> str|None:
+        """
+        The function `get_serialno` returns the serial number of a selected device.
+
+        Returns:
+            String represents device serial number. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().get_serialno()
+
+
+
+    async def get_devpath(self) -> str|None:
+        """
+        The function `get_devpath` retrieves the device path of a connected Android device.
+
+        Returns:
+            String represents the device path. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().get_devpath()
+
+
+
+    async def get_ip_address(self, interface: str='wlan0') -> str|None:
+        """
+        The function `get_ip_address` returns the device IP address of a specified network interface.
+
+        Args:
+            interface (str): The network interface. Defaults to wlan0
+
+        Returns:
+            The IP address of the selected device. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().get_ip_address(interface)
+
+
+
+    async def snapshot(self, fields: tuple|list|None=None, properties: list|None=None, interface: str='wlan0') -> DeviceSnapshot|None:
+        """
+        The function gathers the state of the selected device in a single adb round trip, like `ADBClient.snapshot`.
+
+        Args:
+            fields (tuple|list|None): Fields to gather, any of [state | power | properties | ip_address | foreground_app].
+                Defaults to all of them.
+            properties (list|None): System properties to read for the `properties` field. Defaults to None (all the properties).
+            interface (str): Network interface of the `ip_address` field. Defaults to wlan0
+
+        Returns:
+            `DeviceSnapshot` of the selected device. `None` if no device found.
+
+        Raises:
+            ValueError: if a field is unknown.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().snapshot(fields, properties, interface)
+
+
+
+    # ------------------------------[ File Operations Commands ]------------------------------
+
+
+
+    async def push(self, local: str, remote: str='/data/local/tmp/') -> bool|None:
+        """
+        Copy files and directories from the computer to a remote location on the device.
+
+        Args:
+            local (str): Path of the local file or directory.
+            remote (str): Destination on the device. Defaults to /data/local/tmp/
+
+        Returns:
+            Boolean indicating whether the upload operation was successful. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().push(local, remote)
+
+
+
+    async def pull(self, remote: str, local: str, preserve_meta: bool=False) -> bool|None:
+        """
+        Copy remote files and directories from the device to the computer.
+
+        Args:
+            remote (str): Path of the file or directory on the device.
+            local (str): Local destination path.
+            preserve_meta (bool): Whether to preserve the file time stamp and mode. Defaults to False
+
+        Returns:
+            Boolean indicating whether the download operation was successful. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().pull(remote, local, preserve_meta)
+
+
+
+    # ------------------------------[ Apps Operations Commands ]------------------------------
+
+
+
+    async def is_installed(self, package_name: str, refresh: bool=False) -> bool|None:
+        """
+        The function checks if the specified package is installed or not, using the device package index
+        like `ADBClient.is_installed`.
+
+        Args:
+            package_name (str): The name of the package, for example 'com.google.chrome'
+            refresh (bool): If set to `True`, the package is checked on the device with `pm path <package>`
+                instead of trusting the index. Defaults to False.
+
+        Returns:
+            Boolean indicates if app is installed or not. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().is_installed(package_name, refresh)
+
+
+
+    async def refresh_package(self, package_name: str) -> bool|None:
+        """
+        The function checks a single package on the device with `pm path <package>` and updates the
+        device package index with the result.
+
+        Args:
+            package_name (str): The name of the package, for example 'com.google.chrome'
+
+        Returns:
+            Boolean indicates if app is installed or not. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().refresh_package(package_name)
+
+
+
+    def get_package_index(self, device_serial: str|None=None) -> PackageIndex:
+        """
+        The function returns the installed packages index of a device, creating it on first use.
+
+        Args:
+            device_serial (str|None): Serial of the device. Defaults to the selected device.
+
+        Returns:
+            The `PackageIndex` of the device.
+        """
+        return self.__get_device_state(device_serial or self.__selected_device).package_index
+
+
+
+    async def install(self, apk_file: str, replace: bool=True) -> bool|None:
+        """
+        The function installs an APK file on a device.
+
+        Args:
+            apk_file (str): The file path of the APK file.
+            replace (bool): Whether to replace an existing installation. Defaults to True
+
+        Returns:
+            Boolean indicates if installation process is successful. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().install(apk_file, replace)
+
+
+
+    async def uninstall(self, package: str, keep_data: bool=False) -> bool|None:
+        """
+        The function removes an app package from a device.
+
+        Args:
+            package (str): The app package name.
+            keep_data (bool): Whether to keep the data and cache directories. Defaults to False
+
+        Returns:
+            Boolean indicates if uninstalling process is successful. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().uninstall(package, keep_data)
+
+
+
+    async def start_app(self, package: str, activity: str|None=None, wait: bool=True, stop: bool=True, timeout: float|None=None) -> bool|None:
+        """
+        The function starts an Android app with the specified package and activity.
+
+        Args:
+            package (str): The package name of the app.
+            activity (str|None): The activity to start, `None` to resolve the app launcher activity with
+                `get_launcher_activity`. Defaults to None
+            wait (bool): Whether to wait for the launch to complete. Defaults to True
+            stop (bool): Whether to force stop the app before starting the activity. Defaults to True
+            timeout (float|None): Seconds the whole start may take (installation check, HOME press and
+                `am start`), the running command is cancelled when it expires. Defaults to None (no limit).
+
+        Returns:
+            Boolean indicates if app starting process is successful. `None` if no device found.
+
+        Raises:
+            DeadlineExceeded: if the app did not start in time.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().start_app(package, activity, wait, stop, timeout)
+
+
+
+    async def stop_app(self, package: str) -> bool|None:
+        """
+        The function stops an Android app with the specified package.
+
+        Args:
+            package (str): The package name of the app.
+
+        Returns:
+            Boolean indicates if app stopping process is successful. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().stop_app(package)
+
+
+
+    async def list_packages(self, package_type: str='all') -> list|None:
+        """
+        The function lists device android packages, you can also filter package type.
+
+        Args:
+            package_type (str): [all | enabled | disabled | system | third-party]. Defaults to all
+
+        Returns:
+            List of packages. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().list_packages(package_type)
+
+
+
+    async def get_package_activities(self, package: str) -> list|None:
+        """
+        The function retrieves the activities associated with a given package.
+
+        Args:
+            package (str): The package name.
+
+        Returns:
+            List of package activities. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().get_package_activities(package)
+
+
+
+    async def get_launcher_activity(self, package: str, refresh: bool=False) -> str|None:
+        """
+        The function returns the launcher activity of an app from the launcher catalog, like
+        `ADBClient.get_launcher_activity`.
+
+        Args:
+            package (str): The package name, for example 'com.netflix.ninja'
+            refresh (bool): If set to `True`, the device is queried even if the catalog knows the app. Defaults to False.
+
+        Returns:
+            The launcher component in form of package/activity. `None` if no device found or the app
+            has no launcher activity.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().get_launcher_activity(package, refresh)
+
+
+
+    # ------------------------------[ Device related Commands ]------------------------------
+
+
+
+    async def reboot(self, mode: str|None=None) -> bool|None:
+        """
+        The function reboots the device with the specified mode.
+
+        Args:
+            mode (str|None): [bootloader | recovery | sideload | sideload-auto-reboot]
+
+        Returns:
+            Boolean indicates if tv is rebooted successfully. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().reboot(mode)
+
+
+
+    async def is_powered_on(self) -> bool|None:
+        """
+        Check if device is working or not. (Power ON/OFF)
+
+        Return:
+            Statues of device power on or off.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().is_powered_on()
+
+
+
+    async def execute_shell_command(self, command: str, timeout: float|None=None) -> str:
+        """
+        The function executes an adb shell command.
+
+        Args:
+            command (str): The shell command.
+            timeout (float|None): Seconds to wait for the command. Defaults to the client `command_timeout`.
+
+        Returns:
+            String of the output results of executing the shell command.
+        """
+        return await self.device().execute_shell_command(command, timeout)
+
+
+
+    async def exec_out(self, command: str, sink: Any=None, timeout: float|None=None) -> memoryview|int|None:
+        """
+        The function executes a shell command with `adb exec-out` and returns its raw binary output,
+        like `ADBClient.exec_out`.
+
+        Args:
+            command (str): The shell command, for example `screencap -p`.
+            sink (Any): File-like object or writable buffer receiving the output. Defaults to None.
+            timeout (float|None): Seconds to wait for the command. Defaults to the client `command_timeout`.
+
+        Returns:
+            A `memoryview` of the output if no sink is given, otherwise the number of bytes written to the sink.
+            `None` if no device found.
+
+        Raises:
+            DeadlineExceeded: if the command did not complete in time or the current `deadline` passed.
+            BufferError: if the output does not fit in a buffer sink.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().exec_out(command, sink, timeout)
+
+
+
+    # ------------------------------[ Screen Commands ]------------------------------
+
+
+
+    async def screencap(self, format: str='png', sink: Any=None, display: int|None=None,
+                        timeout: float|None=None) -> memoryview|RawFrame|int|None:
+        """
+        The function captures the screen of the selected device, like `ADBClient.screencap`.
+
+        Args:
+            format (str): Capture format [png | raw]. Defaults to png
+            sink (Any): File-like object or writable buffer receiving the capture. Defaults to None.
+            display (int|None): Physical display id to capture, `None` for the default display.
+            timeout (float|None): Seconds to wait for the capture. Defaults to the client `command_timeout`.
+
+        Returns:
+            The PNG image as a `memoryview` for `png`, a `RawFrame` for `raw`, or the number of bytes
+            written if a sink is given. `None` if no device found.
+
+        Raises:
+            ValueError: if the format is unknown or the raw capture can not be parsed.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().screencap(format, sink, display, timeout)
+
+
+
+    async def screen_stream(self, duration: float|None=None, bit_rate: int|None=None, size: str|None=None, sink: Any=None,
+                            segment_time_limit: int=SEGMENT_TIME_LIMIT, capacity: int=64, policy: str='block') -> AsyncScreenStream|int|None:
+        """
+        The function records the screen of the selected device as a raw H.264 elementary stream, like
+        `ADBClient.screen_stream`.
+
+        Args:
+            duration (float|None): Seconds to record, at least 1 and rounded down to whole seconds. Defaults to
+                None (until the stream is closed).
+            bit_rate (int|None): Video bit rate in bits per second, for example 4000000. Defaults to the device default.
+            size (str|None): Video size as `WIDTHxHEIGHT`, for example '1280x720'. Defaults to the screen size.
+            sink (Any): File-like object the video is written into, the call then returns when the recording
+                ends. Defaults to None (return the stream).
+            segment_time_limit (int): Seconds of one `screenrecord` segment, at most 180. Defaults to 180
+            capacity (int): Maximum number of chunks waiting for the consumer. Defaults to 64
+            policy (str): What to do when the consumer is too slow [drop_oldest | drop_newest | block]. Defaults to block
+
+        Returns:
+            `AsyncScreenStream` async iterator of byte chunks. The number of bytes written if a sink is given.
+            `None` if no device found.
+
+        Raises:
+            ValueError: if the policy is unknown or the duration is shorter than 1 second.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().screen_stream(duration, bit_rate, size, sink, segment_time_limit, capacity, policy)
+
+
+
+    # ------------------------------[ UI Commands ]------------------------------
+
+
+
+    async def ui_snapshot(self, compressed: bool=False) -> UIIndex|None:
+        """
+        The function dumps the UI hierarchy of the selected device screen (`uiautomator dump`) in one
+        binary round trip and indexes its focusable nodes, like `ADBClient.ui_snapshot`.
+
+        Args:
+            compressed (bool): Whether to skip the views that are not important for accessibility. Defaults to False.
+
+        Returns:
+            `UIIndex` of the screen. `None` if no device found.
+
+        Raises:
+            ValueError: if the device did not return a UI hierarchy, for example while the screen is off.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().ui_snapshot(compressed)
+
+
+
+    # ------------------------------[ Inputs Commands ]------------------------------
+
+
+
+    async def send_keyevent_input(self, keycode: KeyCodes, long_press: bool=False):
+        """
+        The function sends a key event input that simulates pressing button keys.
+
+        Args:
+            keycode (KeyCodes): The keycode to send.
+            long_press (bool): Whether to simulate a long press. Defaults to False.
+        """
+        if self.__selected_device is None:
+            return
+        await self.device().send_keyevent_input(keycode, long_press)
+
+
+
+    async def send_keyevent_sequence(self, keys: list, inter_key_delay: float|None=None):
+        """
+        The function sends a whole sequence of key events in a single adb round trip.
+
+        Args:
+            keys (list): List of `KeyCodes` to press in order.
+            inter_key_delay (float|None): Seconds to wait on the device between two key presses. Defaults to None.
+        """
+        if self.__selected_device is None:
+            return
+        await self.device().send_keyevent_sequence(keys, inter_key_delay)
+
+
+
+    async def send_text_input(self, text: str, encode_spaces: bool=True, mode: str='auto', chunk_size: int=TEXT_CHUNK_SIZE):
+        """
+        The function types a text in the focused input field in one round trip, like `ADBClient.send_text_input`.
+
+        Args:
+            text (str): The text string to send.
+            encode_spaces (bool): Whether the text should be escaped, `False` sends it as is. Defaults to True.
+            mode (str): How the text is typed [auto | input | adbkeyboard]. Defaults to auto
+            chunk_size (int): Maximum characters of one `input text` call. Defaults to 256
+
+        Raises:
+            ValueError: if the mode is unknown, or the text is not ASCII and ADBKeyboard is not the current keyboard.
+        """
+        if self.__selected_device is None:
+            return
+        await self.device().send_text_input(text, encode_spaces, mode, chunk_size)
+
+
+
+    async def is_adb_keyboard_active(self, refresh: bool=False) -> bool|None:
+        """
+        The function checks whether ADBKeyboard is the current input method of the selected device.
+
+        Args:
+            refresh (bool): Whether to ask the device again, the answer is kept per device. Defaults to False.
+
+        Returns:
+            Boolean indicates if texts can be typed through ADBKeyboard. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().is_adb_keyboard_active(refresh)
+
+
+
+    async def enable_adb_keyboard(self) -> bool|None:
+        """
+        The function makes the installed ADBKeyboard the current input method, like `ADBClient.enable_adb_keyboard`.
+
+        Returns:
+            Boolean indicates if ADBKeyboard is now the current input method. `None` if no device found.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().enable_adb_keyboard()
+
+
+
+    # ------------------------------[ Volume Commands ]------------------------------
+
+
+
+    async def get_volume(self, stream: int|str='music', refresh: bool=True) -> Volume|None:
+        """
+        The function reads the volume of an audio stream in one command, like `ADBClient.get_volume`.
+
+        Args:
+            stream (int|str): Stream id or name [music | system | ring | alarm | notification | voice_call]. Defaults to music
+            refresh (bool): Whether to ask the device, otherwise the last known volume is returned when there
+                is one. Defaults to True.
+
+        Returns:
+            The `Volume` of the stream, with its level and range. `None` if no device found.
+
+        Raises:
+            ValueError: if the stream is unknown or the device reports no volume.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().get_volume(stream, refresh)
+
+
+
+    async def set_volume(self, level: int, stream: int|str='music') -> Volume|None:
+        """
+        The function sets the volume of an audio stream in one command, like `ADBClient.set_volume`.
+
+        Args:
+            level (int): The volume index, clamped into the stream range when it is known.
+            stream (int|str): Stream id or name [music | system | ring | alarm | notification | voice_call]. Defaults to music
+
+        Returns:
+            The `Volume` of the stream after the change. `None` if no device found.
+
+        Raises:
+            ValueError: if the stream is unknown or the device reports no volume.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().set_volume(level, stream)
+
+
+
+    # ------------------------------[ Logs Commands ]------------------------------
+
+
+
+    async def logcat_stream(self, filters: list|None=None, binary: bool=False, buffers: list|None=None, pid: int|None=None,
+                            regex: str|None=None, tail: int|None=None, capacity: int=10000, policy: str='drop_oldest') -> AsyncLogcatStream|None:
+        """
+        The function follows the log of the selected device, like `ADBClient.logcat_stream`.
+
+        Args:
+            filters (list|None): logcat filter specs, for example `['ActivityManager:I', '*:S']`.
+            binary (bool): Whether to read the binary log format (`logcat -B`) instead of `-v threadtime`. Defaults to False.
+            buffers (list|None): Log buffers to read, for example `['main', 'system']`. Defaults to the device defaults.
+            pid (int|None): Only read the entries of this process id.
+            regex (str|None): Only read the entries whose message matches this regular expression.
+            tail (int|None): Start with the last `tail` entries instead of the whole buffer.
+            capacity (int): Maximum number of records waiting for the consumer. Defaults to 10000
+            policy (str): What to do when the consumer is too slow [drop_oldest | drop_newest | block].
+                Defaults to drop_oldest
+
+        Returns:
+            `AsyncLogcatStream` async iterator of `LogcatRecord`. `None` if no device found.
+
+        Raises:
+            ValueError: if the policy is unknown.
+        """
+        if self.__selected_device is None:
+            return
+        return await self.device().logcat_stream(filters, binary, buffers, pid, regex, tail, capacity, policy)
+
+
+
+    # ------------------------------[ Watch Commands ]------------------------------
+
+
+
+    async def watch(self, serials: list|None=None, callback: Callable|None=None, reconnect_interval: float=1.0,
+                    max_reconnect_interval: float=30.0) -> DeviceWatcher|None:
+        """
+        The function watches devices for power changes, foreground app changes, disconnections and
+        reconnections, like `ADBClient.watch`. The watcher follows every device from its own thread with
+        a blocking client of the same adb server, so long lived streams never hold the event loop, and
+        its events are iterated with `async for`. The blocking client is created once, off the event loop.
+
+        Example:
+            with await client.watch() as watcher:
+                async for event in watcher:
+                    print(event.serial, event.type)
+
+        Args:
+            serials (list|None): Serials of the devices to watch. Defaults to the selected device.
+            callback (Callable|None): Listener called as `callback(event)` with every `DeviceEvent`, from the
+                watching thread. Defaults to None.
+            reconnect_interval (float): Seconds before the first reconnection attempt of a dropped device,
+                doubled after every failed attempt. Defaults to 1
+            max_reconnect_interval (float): Longest wait between reconnection attempts. Defaults to 30
+
+        Returns:
+            The running `DeviceWatcher`, close it (or use it as a context manager) to stop watching.
+            `None` if no device found.
+        """
+        if not serials and self.__selected_device is None:
+            return
+        if self.__watch_client is None:
+            # its constructor probes the adb server and may start it, which blocks
+            self.__watch_client = await asyncio.to_thread(
+                ADBClient, transport=self.__transport.name, server_host=self.__server_host, server_port=self.__server_port,
+                server_start_timeout=self.__server_start_timeout, package_cache_ttl=self.__package_cache_ttl,
+                launcher_catalog=self.__launcher_catalog, command_timeout=self.__command_timeout)
+        return DeviceWatcher(self.__watch_client, serials or [self.__selected_device], callback, reconnect_interval,
+                             max_reconnect_interval)
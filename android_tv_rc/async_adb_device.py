@@ -0,0 +1,885 @@
+import sys
+import shlex
+import asyncio
+import subprocess
+from typing import Any
+from .logger import Logger
+from .key_codes import KeyCodes
+from .adb_device import DeviceState
+from .package_index import PackageIndex
+from .launcher_catalog import LauncherCatalog
+from .device_snapshot import DeviceSnapshot
+from .logcat import build_logcat_command
+from .async_logcat import AsyncLogcatStream
+from .deadline import DeadlineExceeded, deadline, remaining_time
+from .metrics import command_kind, measure_command, measure_parse
+from .tracing import trace_command
+from .text_input import (TEXT_CHUNK_SIZE, INPUT_METHOD_QUERY, ENABLE_ADB_KEYBOARD_COMMAND, check_text_input_mode,
+                         prefers_adb_keyboard, is_adb_keyboard, build_text_input_command)
+from .volume import Volume, resolve_stream, build_volume_command, parse_volume
+from .adb_commands import (POWER_STATE_COMMAND, parse_connect_result, parse_properties, build_ip_address_command, parse_ip_address,
+                           build_push_command, build_pull_command, parse_transfer_result, build_install_command, build_uninstall_command,
+                           parse_package_manager_result, build_package_path_command, parse_package_path, resolve_package_type,
+                           build_list_packages_command, parse_packages, build_package_dump_command, parse_package_activities,
+                           build_start_app_command, build_stop_app_command, parse_activity_manager_result, build_reboot_command,
+                           parse_reboot_result, parse_power_state, build_keyevent_command, build_keyevent_sequence_command)
+from .screen_capture import RawFrame, build_screencap_command, parse_raw_frame
+from .screen_stream import SEGMENT_TIME_LIMIT, build_screenrecord_command
+from .async_screen_stream import AsyncScreenStream
+from .ui_index import UIIndex, build_ui_dump_command
+
+
+
+async def wait_command(execution: Any, timeout: float|None, command_str: str, semaphore: asyncio.Semaphore|None=None) -> Any:
+    """
+    The function awaits an adb command of the async transport, bounded by its timeout and by the
+    deadline of the running task, the wait for the semaphore included. Cancelling the execution kills
+    the child process or closes the connection.
+
+    Args:
+        execution (Coroutine): The transport coroutine running the command.
+        timeout (float|None): Seconds the command may take, `None` for no timeout of its own.
+        command_str (str): The command, for the timeout message.
+        semaphore (asyncio.Semaphore|None): Bounds the commands running at the same time. Defaults to None.
+
+    Returns:
+        The result of the execution.
+
+    Raises:
+        DeadlineExceeded: if the command did not complete in time or the current `deadline` passed.
+    """
+    try:
+        timeout = remaining_time(timeout)
+    except DeadlineExceeded:
+        execution.close()
+        raise
+
+    async def queued() -> Any:
+        # the wait for a free slot counts against the timeout too
+        try:
+            await semaphore.acquire()
+        except BaseException:
+            execution.close()
+            raise
+        try:
+            return await execution
+        finally:
+            semaphore.release()
+
+    try:
+        return await asyncio.wait_for(execution if semaphore is None else queued(), timeout)
+    except asyncio.TimeoutError as error:
+        raise DeadlineExceeded(f'Command timed out after {timeout:g}s: {command_str}') from error
+
+
+
+class AsyncADBDevice:
+    """
+    `asyncio` twin of `ADBDevice`, a handle bound to one device serial. Handles have no mutable state
+    of their own, so many tasks can use them at the same time. Get them from `AsyncADBClient.device(serial)`.
+
+    Example:
+        async with AsyncADBClient(transport='socket') as client:
+            await client.connect('192.168.1.28')
+            tv = client.device('192.168.1.28:5555')
+            await tv.send_keyevent_input(KeyCodes.KEYCODE_HOME)
+    """
+
+
+
+    def __init__(self, serial: str|None, transport: Any, state: DeviceState, launcher_catalog: LauncherCatalog,
+                 verbose: bool=False, show_command: bool=False, command_timeout: float|None=None,
+                 semaphore: asyncio.Semaphore|None=None):
+        """
+        Args:
+            serial (str|None): Serial of the device, `None` to let adb pick the only connected device.
+            transport (AsyncSubprocessTransport|AsyncSocketTransport): Transport the commands reach the adb server with.
+            state (DeviceState): State shared by the handles of the device.
+            launcher_catalog (LauncherCatalog): Catalog of the apps launcher activities.
+            verbose (bool): Whether to display additional information during the execution. Defaults to False.
+            show_command (bool): Whether to display the executed ADB commands. Defaults to False.
+            command_timeout (float|None): Default seconds an adb command may take, file transfers and installs
+                are only bounded by an explicit timeout or deadline. Defaults to None (no limit).
+            semaphore (asyncio.Semaphore|None): Bounds the commands of the client running at the same time.
+                Defaults to None (no limit).
+        """
+        self.__serial = serial
+        self.__transport = transport
+        self.__state = state
+        self.__launcher_catalog = launcher_catalog
+        self.__verbose = verbose
+        self.__show_command = show_command
+        self.__command_timeout = command_timeout
+        self.__semaphore = semaphore
+
+
+
+    @property
+    def serial(self) -> str|None:
+        """Serial of the device."""
+        return self.__serial
+
+
+
+    def __repr__(self) -> str:
+        return f'AsyncADBDevice({self.__serial!r}, transport={self.__transport.name!r})'
+
+
+
+    def __timeout(self, timeout: float|None=None, transfer: bool=False) -> float|None:
+        # explicit timeout, else the client default (except for transfers), the deadline caps it when awaited
+        if timeout is None and not transfer:
+            timeout = self.__command_timeout
+        return timeout
+
+
+
+    async def __execute_command(self, command_str: str|list, timeout: float|None=None, transfer: bool=False) -> str:
+        """
+        The function executes an adb command on the device and waits for its output without blocking the event loop.
+
+        Args:
+            command_str (str|list): The adb command, for example `shell getprop`, or its arguments list
+                which is passed as is.
+            timeout (float|None): Seconds the command may take. Defaults to the client `command_timeout`.
+            transfer (bool): Whether the command is a file transfer or install, which the client
+                `command_timeout` does not bound. Defaults to False.
+
+        Returns:
+            The stdout of the command as a string.
+
+        Raises:
+            CalledProcessError: if the called process returns a non-zero return code.
+            DeadlineExceeded: if the command did not complete in time, it is killed.
+        """
+        if isinstance(command_str, list):
+            command_parts, command_str = command_str, ' '.join(command_str)
+        else:
+            command_parts = shlex.split(command_str, posix="win" not in sys.platform)
+        if self.__verbose and self.__show_command:
+            command = ' '.join(['adb'] + (['-s', self.__serial] if self.__serial else []) + [command_str])
+            Logger.info('[bold]Command:[/bold] [blue]%s[/blue] [dim](%s, async)[/dim]', command, self.__transport.name)
+        with trace_command(command_parts, self.__serial), measure_command(command_kind(command_parts), self.__serial):
+            return await wait_command(self.__transport.execute(command_parts, self.__serial), self.__timeout(timeout, transfer),
+                                      command_str, self.__semaphore)
+
+
+
+    # ------------------------------[ Info Commands ]------------------------------
+
+
+
+    async def get_device_info(self) -> dict:
+        """
+        The function `get_device_info` retrieves device information.
+
+        Returns:
+            Dictionary containing device information.
+        """
+        output = await self.execute_shell_command('getprop')
+        with measure_parse('getprop', self.__serial):
+            return parse_properties(output)
+
+
+
+    async def get_state(self) -> str:
+        """
+        The function `get_state` returns the state of the device.
+
+        Returns:
+            String represents device state.
+        """
+        return await self.__execute_command('get-state')
+
+
+
+    async def reconnect(self) -> bool:
+        """
+        The function connects the network device again, after it dropped off.
+
+        Returns:
+            Boolean indicates if the device is connected.
+        """
+        return parse_connect_result(await self.__execute_command(['connect', self.__serial]))
+
+
+
+    async def get_serialno(self) -> str:
+        """
+        The function `get_serialno` returns the serial number of the device.
+
+        Returns:
+            String represents device serial number.
+        """
+        return await self.__execute_command('get-serialno')
+
+
+
+    async def get_devpath(self) -> str:
+        """
+        The function `get_devpath` retrieves the device path of the device.
+
+        Returns:
+            String represents the device path.
+        """
+        return await self.__execute_command('get-devpath')
+
+
+
+    async def get_ip_address(self, interface: str='wlan0') -> str:
+        """
+        The function `get_ip_address` returns the device IP address of a specified network interface.
+
+        Args:
+            interface (str): The network interface. Defaults to wlan0
+
+        Returns:
+            The IP address of the device.
+        """
+        return parse_ip_address(await self.execute_shell_command(build_ip_address_command(interface)))
+
+
+
+    async def snapshot(self, fields: tuple|list|None=None, properties: list|None=None, interface: str='wlan0') -> DeviceSnapshot:
+        """
+        The function gathers the state of the device in a single adb round trip, like `ADBDevice.snapshot`.
+
+        Args:
+            fields (tuple|list|None): Fields to gather, any of [state | power | properties | ip_address | foreground_app].
+                Defaults to all of them.
+            properties (list|None): System properties to read for the `properties` field. Defaults to None (all the properties).
+            interface (str): Network interface of the `ip_address` field. Defaults to wlan0
+
+        Returns:
+            `DeviceSnapshot` of the device.
+
+        Raises:
+            ValueError: if a field is unknown.
+        """
+        script = DeviceSnapshot.build_script(fields, properties, interface)
+        return DeviceSnapshot.parse(self.__serial, await self.execute_shell_command(script), fields)
+
+
+
+    # ------------------------------[ File Operations Commands ]------------------------------
+
+
+
+    async def push(self, local: str, remote: str='/data/local/tmp/') -> bool:
+        """
+        Copy files and directories from the computer to a remote location on the device.
+
+        Args:
+            local (str): Path of the local file or directory.
+            remote (str): Destination on the device. Defaults to /data/local/tmp/
+
+        Returns:
+            Boolean indicating whether the upload operation was successful.
+        """
+        Logger.info('Uploading: [bold green]%s[/bold green] to [bold green]%s[/bold green] ..', local, remote)
+        if parse_transfer_result(await self.__execute_command(build_push_command(local, remote), transfer=True), 'pushed'):
+            Logger.success('File [bold blue]%s[/bold blue] uploaded to [bold blue]%s[/bold blue] successfully', local, remote)
+            return True
+        Logger.error('Uploading [bold blue]%s[/bold blue] to [bold blue]%s[/bold blue] failed', local, remote)
+        return False
+
+
+
+    async def pull(self, remote: str, local: str, preserve_meta: bool=False) -> bool:
+        """
+        Copy remote files and directories from the device to the computer.
+
+        Args:
+            remote (str): Path of the file or directory on the device.
+            local (str): Local destination path.
+            preserve_meta (bool): Whether to preserve the file time stamp and mode. Defaults to False
+
+        Returns:
+            Boolean indicating whether the download operation was successful.
+        """
+        Logger.info('Downloading: [bold green]%s[/bold green] to [bold green]%s[/bold green] ..', remote, local)
+        if parse_transfer_result(await self.__execute_command(build_pull_command(remote, local, preserve_meta), transfer=True), 'pulled'):
+            Logger.success('File [bold blue]%s[/bold blue] downloaded to [bold blue]%s[/bold blue] successfully', remote, local)
+            return True
+        Logger.error('Downloading [bold blue]%s[/bold blue] to [bold blue]%s[/bold blue] failed', remote, local)
+        return False
+
+
+
+    # ------------------------------[ Apps Operations Commands ]------------------------------
+
+
+
+    async def is_installed(self, package_name: str, refresh: bool=False) -> bool:
+        """
+        The function checks if the specified package is installed or not, using the device package index
+        like `ADBDevice.is_installed`.
+
+        Args:
+            package_name (str): The name of the package, for example 'com.google.chrome'
+            refresh (bool): If set to `True`, the package is checked on the device with `pm path <package>`
+                instead of trusting the index. Defaults to False.
+
+        Returns:
+            Boolean indicates if app is installed or not.
+        """
+        index = self.__state.package_index
+        app_installed = None if refresh else index.contains(package_name)
+        if app_installed is None and not refresh and index.ttl != 0:
+            output = await self.execute_shell_command(PackageIndex.QUERY)
+            with measure_parse('pm', self.__serial):
+                index.update(PackageIndex.parse(output), PackageIndex.parse_version_codes(output))
+            app_installed = index.contains(package_name)
+        if not app_installed:
+            app_installed = await self.refresh_package(package_name)
+        if app_installed:
+            Logger.success('App [bold blue]%s[/bold blue] is installed', package_name)
+            return True
+        Logger.error('App [bold blue]%s[/bold blue] is not installed', package_name)
+        return False
+
+
+
+    async def refresh_package(self, package_name: str) -> bool:
+        """
+        The function checks a single package on the device with `pm path <package>` and updates the
+        device package index with the result.
+
+        Args:
+            package_name (str): The name of the package, for example 'com.google.chrome'
+
+        Returns:
+            Boolean indicates if app is installed or not.
+        """
+        try:
+            app_installed = parse_package_path(await self.execute_shell_command(build_package_path_command(package_name)))
+        except subprocess.CalledProcessError:
+            app_installed = False  # pm exits with 1 for unknown packages
+        self.__state.package_index.set_installed(package_name, app_installed)
+        return app_installed
+
+
+
+    async def install(self, apk_file: str, replace: bool=True) -> bool:
+        """
+        The function installs an APK file on the device.
+
+        Args:
+            apk_file (str): The file path of the APK file.
+            replace (bool): Whether to replace an existing installation. Defaults to True
+
+        Returns:
+            Boolean indicates if installation process is successful.
+        """
+        Logger.info('Installing APK file [bold green]%s[/bold green], it will took up to 2 minutes to complete..', apk_file)
+        result = await self.__execute_command(build_install_command(apk_file, replace), transfer=True)
+        # the package name of the apk is unknown here, so the whole index is outdated
+        self.__state.package_index.invalidate()
+        if parse_package_manager_result(result):
+            Logger.success('APK [bold blue]%s[/bold blue] is installed successfully', apk_file)
+            return True
+        Logger.error('Installation process failed')
+        return False
+
+
+
+    async def uninstall(self, package: str, keep_data: bool=False) -> bool:
+        """
+        The function removes an app package from the device.
+
+        Args:
+            package (str): The app package name.
+            keep_data (bool): Whether to keep the data and cache directories. Defaults to False
+
+        Returns:
+            Boolean indicates if uninstalling process is successful.
+        """
+        Logger.info('Uninstalling package [bold green]%s[/bold green]%s, it will took up to 2 minutes to complete..',
+                    package, ' while keeping the data' if keep_data else '')
+        if parse_package_manager_result(await self.__execute_command(build_uninstall_command(package, keep_data), transfer=True)):
+            self.__state.package_index.set_installed(package, False)
+            Logger.success('Package [bold blue]%s[/bold blue] is uninstalled successfully', package)
+            return True
+        Logger.error('Uninstalling process failed')
+        return False
+
+
+
+    async def start_app(self, package: str, activity: str|None=None, wait: bool=True, stop: bool=True, timeout: float|None=None) -> bool:
+        """
+        The function starts an Android app with the specified package and activity.
+
+        Args:
+            package (str): The package name of the app.
+            activity (str|None): The activity to start, `None` to resolve the app launcher activity with
+                `get_launcher_activity`. Defaults to None
+            wait (bool): Whether to wait for the launch to complete. Defaults to True
+            stop (bool): Whether to force stop the app before starting the activity. Defaults to True
+            timeout (float|None): Seconds the whole start may take (installation check, HOME press and
+                `am start`), the running command is cancelled when it expires. Defaults to None (no limit).
+
+        Returns:
+            Boolean indicates if app starting process is successful.
+
+        Raises:
+            DeadlineExceeded: if the app did not start in time.
+        """
+        with deadline(timeout):
+            if not await self.is_installed(package):
+                return False
+            component = f'{package}/{activity}' if activity else await self.get_launcher_activity(package)
+            if component is None:
+                Logger.error('App [bold blue]%s[/bold blue] has no launcher activity', package)
+                return False
+            await self.send_keyevent_input(KeyCodes.KEYCODE_HOME)
+            Logger.info('Starting app: [bold green]%s[/bold green] ..', package)
+            if not parse_activity_manager_result(await self.execute_shell_command(build_start_app_command(component, wait, stop))):
+                # the index may be outdated if the app was removed outside of this client
+                await self.refresh_package(package)
+                Logger.error('Starting app [bold blue]%s[/bold blue] failed', package)
+                return False
+            Logger.success('App: [bold blue]%s[/bold blue] started successfully', package)
+            return True
+
+
+
+    async def stop_app(self, package: str) -> bool:
+        """
+        The function stops an Android app with the specified package.
+
+        Args:
+            package (str): The package name of the app.
+
+        Returns:
+            Boolean indicates if app stopping process is successful.
+        """
+        Logger.info('Stopping app: [bold green]%s[/bold green] ..', package)
+        if not parse_activity_manager_result(await self.execute_shell_command(build_stop_app_command(package))):
+            Logger.error('Stopping app [bold blue]%s[/bold blue] failed', package)
+            return False
+        Logger.success('App: [bold blue]%s[/bold blue] stopped successfully', package)
+        return True
+
+
+
+    async def list_packages(self, package_type: str='all') -> list:
+        """
+        The function lists device android packages, you can also filter package type.
+
+        Args:
+            package_type (str): [all | enabled | disabled | system | third-party]. Defaults to all
+
+        Returns:
+            List of packages.
+        """
+        package_type = resolve_package_type(package_type)
+        output = await self.execute_shell_command(build_list_packages_command(package_type))
+        packages = parse_packages(output)
+        if package_type == 'all':
+            self.__state.package_index.update(PackageIndex.parse(output))
+        Logger.info('There are [bold green]%s[/bold green] [bold blue]%s[/bold blue] packages', len(packages), package_type)
+        return packages
+
+
+
+    async def get_package_activities(self, package: str) -> list:
+        """
+        The function retrieves the activities associated with a given package.
+
+        Args:
+            package (str): The package name.
+
+        Returns:
+            List of package activities.
+        """
+        return parse_package_activities(await self.execute_shell_command(build_package_dump_command(package)), package)
+
+
+
+    async def get_launcher_activity(self, package: str, refresh: bool=False) -> str|None:
+        """
+        The function returns the launcher activity of an app from the launcher catalog, like
+        `ADBDevice.get_launcher_activity`.
+
+        Args:
+            package (str): The package name, for example 'com.netflix.ninja'
+            refresh (bool): If set to `True`, the device is queried even if the catalog knows the app. Defaults to False.
+
+        Returns:
+            The launcher component in form of package/activity. `None` if the app has no launcher activity.
+        """
+        index = self.__state.package_index
+        fingerprint = self.__state.fingerprint
+        version_code = index.version_code(package)
+        # the version code is `None` on devices without `pm list packages --show-versioncode`
+        known = fingerprint is not None and index.contains(package) and self.__launcher_catalog.is_known(fingerprint, package, version_code)
+        if refresh or not known:
+            fingerprint, version_codes, components = LauncherCatalog.parse_query(await self.execute_shell_command(LauncherCatalog.QUERY))
+            self.__state.fingerprint = fingerprint
+            self.__launcher_catalog.update(fingerprint, version_codes, components)
+            if version_codes and index.ttl != 0:
+                index.update(version_codes, version_codes)
+            return components.get(package)
+        return self.__launcher_catalog.lookup(fingerprint, package, version_code)
+
+
+
+    # ------------------------------[ Device related Commands ]------------------------------
+
+
+
+    async def reboot(self, mode: str|None=None) -> bool:
+        """
+        The function reboots the device with the specified mode.
+
+        Args:
+            mode (str|None): [bootloader | recovery | sideload | sideload-auto-reboot]
+
+        Returns:
+            Boolean indicates if tv is rebooted successfully.
+        """
+        if mode:
+            Logger.info('Rebooting TV in mode [bold green]%s[/bold green] ..', mode)
+        else:
+            Logger.info('Rebooting TV ..')
+        if not parse_reboot_result(await self.__execute_command(build_reboot_command(mode))):
+            Logger.error('Rebooting failed')
+            return False
+        Logger.success('Rebooted successfully')
+        return True
+
+
+
+    async def is_powered_on(self) -> bool|None:
+        """
+        Check if device is working or not. (Power ON/OFF)
+
+        Return:
+            Statues of device power on or off.
+        """
+        try:
+            return parse_power_state(await self.execute_shell_command(POWER_STATE_COMMAND))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return
+
+
+
+    async def execute_shell_command(self, command: str, timeout: float|None=None) -> str:
+        """
+        The function executes an adb shell command.
+
+        Args:
+            command (str): The shell command.
+            timeout (float|None): Seconds to wait for the command. Defaults to the client `command_timeout`.
+
+        Returns:
+            String of the output results of executing the shell command.
+
+        Raises:
+            CalledProcessError: if the command returns a non-zero exit code.
+            DeadlineExceeded: if the command did not complete in time.
+        """
+        # the whole command goes to the device shell, its quoting is left to it
+        return await self.__execute_command(['shell', command], timeout=timeout)
+
+
+
+    async def exec_out(self, command: str, sink: Any=None, timeout: float|None=None) -> memoryview|int:
+        """
+        The function executes a shell command with `adb exec-out` and returns its raw binary output,
+        like `ADBDevice.exec_out`.
+
+        Args:
+            command (str): The shell command, for example `screencap -p`.
+            sink (Any): File-like object or writable buffer receiving the output. Defaults to None.
+            timeout (float|None): Seconds to wait for the command. Defaults to the client `command_timeout`.
+
+        Returns:
+            A `memoryview` of the output if no sink is given, otherwise the number of bytes written to the sink.
+
+        Raises:
+            DeadlineExceeded: if the command did not complete in time or the current `deadline` passed.
+            BufferError: if the output does not fit in a buffer sink.
+        """
+        if self.__verbose and self.__show_command:
+            Logger.info('[bold]Binary command:[/bold] [blue]%s[/blue] [dim](%s, async)[/dim]', command, self.__serial)
+        execution = self.__transport.execute_binary(['exec-out', command], self.__serial, sink)
+        with trace_command(['exec-out', command], self.__serial), measure_command(command_kind(['exec-out', command]), self.__serial):
+            return await wait_command(execution, self.__timeout(timeout), f'exec-out {command}', self.__semaphore)
+
+
+
+    # ------------------------------[ Screen Commands ]------------------------------
+
+
+
+    async def screencap(self, format: str='png', sink: Any=None, display: int|None=None,
+                        timeout: float|None=None) -> memoryview|RawFrame|int:
+        """
+        The function captures the screen of the device, like `ADBDevice.screencap`.
+
+        Args:
+            format (str): Capture format [png | raw]. Defaults to png
+            sink (Any): File-like object or writable buffer receiving the capture. Defaults to None.
+            display (int|None): Physical display id to capture, `None` for the default display.
+            timeout (float|None): Seconds to wait for the capture. Defaults to the client `command_timeout`.
+
+        Returns:
+            The PNG image as a `memoryview` for `png`, a `RawFrame` for `raw`, or the number of bytes
+            written if a sink is given.
+
+        Raises:
+            ValueError: if the format is unknown or the raw capture can not be parsed.
+        """
+        output = await self.exec_out(build_screencap_command(format, display), sink, timeout)
+        if isinstance(output, int) or format != 'raw':
+            return output
+        with measure_parse('screencap', self.__serial):
+            return parse_raw_frame(output)
+
+
+
+    async def screen_stream(self, duration: float|None=None, bit_rate: int|None=None, size: str|None=None, sink: Any=None,
+                            segment_time_limit: int=SEGMENT_TIME_LIMIT, capacity: int=64, policy: str='block') -> AsyncScreenStream|int:
+        """
+        The function records the screen as a raw H.264 elementary stream, like `ADBDevice.screen_stream`.
+
+        Args:
+            duration (float|None): Seconds to record, at least 1 and rounded down to whole seconds. Defaults to
+                None (until the stream is closed).
+            bit_rate (int|None): Video bit rate in bits per second, for example 4000000. Defaults to the device default.
+            size (str|None): Video size as `WIDTHxHEIGHT`, for example '1280x720'. Defaults to the screen size.
+            sink (Any): File-like object the video is written into, the call then returns when the recording
+                ends. Defaults to None (return the stream).
+            segment_time_limit (int): Seconds of one `screenrecord` segment, at most 180. Defaults to 180
+            capacity (int): Maximum number of chunks waiting for the consumer. Defaults to 64
+            policy (str): What to do when the consumer is too slow [drop_oldest | drop_newest | block]. Defaults to block
+
+        Returns:
+            `AsyncScreenStream` async iterator of byte chunks, close it (or use it as an async context manager)
+            to stop recording. The number of bytes written if a sink is given.
+
+        Raises:
+            ValueError: if the policy is unknown or the duration is shorter than 1 second.
+        """
+        async def open_segment(time_limit: int) -> Any:
+            command = build_screenrecord_command(time_limit, bit_rate, size)
+            if self.__verbose and self.__show_command:
+                Logger.info('[bold]Screen stream:[/bold] [blue]%s[/blue] [dim](%s, async)[/dim]', command, self.__serial)
+            return await self.__transport.open_stream(['exec-out', command], self.__serial)
+
+        stream = AsyncScreenStream(open_segment, duration, segment_time_limit, capacity, policy)
+        if sink is None:
+            return stream
+        async with stream:
+            return await stream.write_to(sink)
+
+
+
+    # ------------------------------[ UI Commands ]------------------------------
+
+
+
+    async def ui_snapshot(self, compressed: bool=False) -> UIIndex:
+        """
+        The function dumps the UI hierarchy of the screen (`uiautomator dump`) in one binary round trip
+        and indexes its focusable nodes, like `ADBDevice.ui_snapshot`.
+
+        Args:
+            compressed (bool): Whether to skip the views that are not important for accessibility. Defaults to False.
+
+        Returns:
+            `UIIndex` of the screen.
+
+        Raises:
+            ValueError: if the device did not return a UI hierarchy, for example while the screen is off.
+        """
+        output = await self.exec_out(build_ui_dump_command(compressed=compressed))
+        with measure_parse('uiautomator', self.__serial):
+            return UIIndex.parse(output)
+
+
+
+    # ------------------------------[ Inputs Commands ]------------------------------
+
+
+
+    async def send_keyevent_input(self, keycode: KeyCodes, long_press: bool=False):
+        """
+        The function sends a key event input that simulates pressing button keys.
+
+        Args:
+            keycode (KeyCodes): The keycode to send.
+            long_press (bool): Whether to simulate a long press. Defaults to False.
+        """
+        await self.execute_shell_command(build_keyevent_command(keycode, long_press))
+        self.__state.track_volume_keys([keycode], long_press)
+
+
+
+    async def send_keyevent_sequence(self, keys: list, inter_key_delay: float|None=None):
+        """
+        The function sends a whole sequence of key events in a single adb round trip.
+
+        Args:
+            keys (list): List of `KeyCodes` to press in order.
+            inter_key_delay (float|None): Seconds to wait on the device between two key presses. Defaults to None.
+        """
+        if not keys:
+            return
+        await self.execute_shell_command(build_keyevent_sequence_command(keys, inter_key_delay))
+        self.__state.track_volume_keys(keys)
+
+
+
+    async def send_text_input(self, text: str, encode_spaces: bool=True, mode: str='auto', chunk_size: int=TEXT_CHUNK_SIZE):
+        """
+        The function types a text in the focused input field in one round trip, like `ADBDevice.send_text_input`.
+
+        Args:
+            text (str): The text string to send.
+            encode_spaces (bool): Whether the text should be escaped, `False` sends it as is. Defaults to True.
+            mode (str): How the text is typed [auto | input | adbkeyboard]. Defaults to auto
+            chunk_size (int): Maximum characters of one `input text` call. Defaults to 256
+
+        Raises:
+            ValueError: if the mode is unknown, or the text is not ASCII and ADBKeyboard is not the current keyboard.
+        """
+        if not encode_spaces:
+            await self.execute_shell_command(f'input text {text}')
+            return
+        check_text_input_mode(mode)
+        if not text:
+            return
+        if mode == 'auto':
+            mode = 'adbkeyboard' if prefers_adb_keyboard(text) and await self.is_adb_keyboard_active() else 'input'
+        await self.execute_shell_command(build_text_input_command(text, mode, chunk_size))
+
+
+
+    async def is_adb_keyboard_active(self, refresh: bool=False) -> bool:
+        """
+        The function checks whether ADBKeyboard is the current input method of the device.
+
+        Args:
+            refresh (bool): Whether to ask the device again, the answer is kept per device. Defaults to False.
+
+        Returns:
+            Boolean indicates if texts can be typed through ADBKeyboard.
+        """
+        if refresh or self.__state.adb_keyboard is None:
+            self.__state.adb_keyboard = is_adb_keyboard(await self.execute_shell_command(INPUT_METHOD_QUERY))
+        return self.__state.adb_keyboard
+
+
+
+    async def enable_adb_keyboard(self) -> bool:
+        """
+        The function makes the installed ADBKeyboard the current input method, like `ADBDevice.enable_adb_keyboard`.
+
+        Returns:
+            Boolean indicates if ADBKeyboard is now the current input method, `False` if it is not installed.
+        """
+        try:
+            await self.execute_shell_command(ENABLE_ADB_KEYBOARD_COMMAND)
+        except subprocess.CalledProcessError:
+            pass
+        return await self.is_adb_keyboard_active(refresh=True)
+
+
+
+    # ------------------------------[ Volume Commands ]------------------------------
+
+
+
+    async def get_volume(self, stream: int|str='music', refresh: bool=True) -> Volume:
+        """
+        The function reads the volume of an audio stream in one command, like `ADBDevice.get_volume`.
+
+        Args:
+            stream (int|str): Stream id or name [music | system | ring | alarm | notification | voice_call]. Defaults to music
+            refresh (bool): Whether to ask the device, otherwise the last known volume is returned when there
+                is one. Defaults to True.
+
+        Returns:
+            The `Volume` of the stream, with its level and range.
+
+        Raises:
+            ValueError: if the stream is unknown or the device reports no volume.
+        """
+        stream = resolve_stream(stream)
+        volume = None if refresh else self.__state.volumes.get(stream)
+        if volume is None:
+            output = await self.execute_shell_command(build_volume_command(stream))
+            with measure_parse('cmd', self.__serial):
+                volume = parse_volume(output, stream)
+            self.__state.volumes[stream] = volume
+        return volume
+
+
+
+    async def set_volume(self, level: int, stream: int|str='music') -> Volume:
+        """
+        The function sets the volume of an audio stream in one command, like `ADBDevice.set_volume`.
+
+        Args:
+            level (int): The volume index, clamped into the stream range when it is known.
+            stream (int|str): Stream id or name [music | system | ring | alarm | notification | voice_call]. Defaults to music
+
+        Returns:
+            The `Volume` of the stream after the change.
+
+        Raises:
+            ValueError: if the stream is unknown or the device reports no volume.
+        """
+        stream = resolve_stream(stream)
+        known = self.__state.volumes.get(stream)
+        if known is not None:
+            level = min(max(level, known.min_level), known.max_level)
+        output = await self.execute_shell_command(build_volume_command(stream, level))
+        with measure_parse('cmd', self.__serial):
+            volume = parse_volume(output, stream)
+        self.__state.volumes[stream] = volume
+        return volume
+
+
+
+    # ------------------------------[ Logs Commands ]------------------------------
+
+
+
+    async def logcat_stream(self, filters: list|None=None, binary: bool=False, buffers: list|None=None, pid: int|None=None,
+                            regex: str|None=None, tail: int|None=None, capacity: int=10000, policy: str='drop_oldest') -> AsyncLogcatStream:
+        """
+        The function follows the log of the device, like `ADBDevice.logcat_stream`.
+
+        Args:
+            filters (list|None): logcat filter specs, for example `['ActivityManager:I', '*:S']`.
+            binary (bool): Whether to read the binary log format (`logcat -B`) instead of `-v threadtime`. Defaults to False.
+            buffers (list|None): Log buffers to read, for example `['main', 'system']`. Defaults to the device defaults.
+            pid (int|None): Only read the entries of this process id.
+            regex (str|None): Only read the entries whose message matches this regular expression.
+            tail (int|None): Start with the last `tail` entries instead of the whole buffer.
+            capacity (int): Maximum number of records waiting for the consumer. Defaults to 10000
+            policy (str): What to do when the consumer is too slow [drop_oldest | drop_newest | block].
+                Defaults to drop_oldest
+
+        Returns:
+            `AsyncLogcatStream` async iterator of `LogcatRecord`.
+
+        Raises:
+            ValueError: if the policy is unknown.
+        """
+        command = build_logcat_command(filters, binary, buffers, pid, regex, tail)
+        if self.__verbose and self.__show_command:
+            Logger.info('[bold]Log stream:[/bold] [blue]%s[/blue] [dim](%s, async)[/dim]', command, self.__serial)
+        # one argument keeps the shell quoting of the command, adb joins the arguments with spaces anyway
+        args = ['exec-out' if binary else 'shell', command]
+        stream = await self.__transport.open_stream(args, self.__serial)
+        try:
+            return AsyncLogcatStream(stream, binary, capacity, policy)
+        except ValueError:
+            await stream.close()
+            raise
@@ -0,0 +1,469 @@
+import time
+import asyncio
+import subprocess
+from typing import Any, Callable
+from .metrics import command_kind, observe_phase
+from .adb_transport import (ADB_SERVER_HOST, ADB_SERVER_PORT, ADBProtocolError, SubprocessTransport,
+                            encode_request, plan_socket_command, format_query_output, decode_shell_v2)
+
+
+
+async def probe_server_async(server_host: str=ADB_SERVER_HOST, server_port: int=ADB_SERVER_PORT, timeout: float=0.5) -> int|None:
+    """
+    `asyncio` twin of `probe_server`, it checks whether an adb server answers on its port.
+
+    Args:
+        server_host (str): Host of the adb server. Defaults to 127.0.0.1
+        server_port (int): Port of the adb server. Defaults to 5037
+        timeout (float): Seconds to wait for the connection and the answer. Defaults to 0.5
+
+    Returns:
+        The server version number. `None` if no server is answering.
+    """
+    async def ask_version():
+        reader, writer = await asyncio.open_connection(server_host, server_port)
+        try:
+            writer.write(encode_request('host:version'))
+            await writer.drain()
+            return await reader.readexactly(12)
+        finally:
+            writer.close()
+    try:
+        answer = await asyncio.wait_for(ask_version(), timeout)
+    except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+        return None
+    if not answer.startswith(b'OKAY'):
+        return None
+    try:
+        return int(answer[8:12], 16)
+    except ValueError:
+        return None
+
+
+
+async def read_into_async(read: Callable, sink: Any=None, chunk_size: int=1 << 20) -> memoryview|int:
+    """
+    `asyncio` twin of `read_into`, it reads a binary output until its end into its destination.
+
+    Args:
+        read (Callable): Coroutine function returning the next chunk of at most the given size, `b''` at the end.
+        sink (Any): `None`, a file-like object (with `write`) or a writable buffer, see `read_into`. Defaults to None.
+        chunk_size (int): Maximum size of the chunks read. Defaults to 1 MiB.
+
+    Returns:
+        A `memoryview` of the output if no sink is given, otherwise the number of bytes written to the sink.
+
+    Raises:
+        BufferError: if the output does not fit in a buffer sink.
+    """
+    if sink is not None and hasattr(sink, 'write'):
+        total = 0
+        while chunk := await read(chunk_size):
+            sink.write(chunk)
+            total += len(chunk)
+        return total
+    if sink is not None:
+        view, total = memoryview(sink).cast('B'), 0
+        while chunk := await read(chunk_size):
+            if total + len(chunk) > len(view):
+                raise BufferError(f'Output is larger than the {len(view)} bytes sink buffer')
+            view[total:total + len(chunk)] = chunk
+            total += len(chunk)
+        return total
+    buffer = bytearray()
+    while chunk := await read(chunk_size):
+        buffer += chunk
+    return memoryview(buffer)
+
+
+
+class AsyncStream:
+    """`asyncio` byte stream over the output of a long-lived adb command."""
+
+
+
+    def __init__(self, reader: asyncio.StreamReader, closer):
+        """
+        Args:
+            reader (asyncio.StreamReader): Output of the remote command.
+            closer: Coroutine function ending the remote command.
+        """
+        self.__reader = reader
+        self.__closer = closer
+
+
+
+    async def read(self, size: int=65536) -> bytes:
+        """Reads the bytes available up to `size`, `b''` once the remote command ended."""
+        return await self.__reader.read(size)
+
+
+
+    async def readline(self) -> bytes:
+        """Reads one line, `b''` once the remote command ended."""
+        return await self.__reader.readline()
+
+
+
+    async def close(self):
+        """Ends the remote command."""
+        await self.__closer()
+
+
+
+class AsyncSubprocessTransport:
+    """Runs every adb command as an `asyncio` subprocess of the `adb` command-line tool."""
+
+
+    name = 'subprocess'
+
+
+
+    def __init__(self, adb_path: str='adb', server_host: str=ADB_SERVER_HOST, server_port: int=ADB_SERVER_PORT):
+        """
+        Args:
+            adb_path (str): Path of the adb executable. Defaults to `adb` found on the PATH.
+            server_host (str): Host of the adb server the adb tool should talk to. Defaults to 127.0.0.1
+            server_port (int): Port of the adb server the adb tool should talk to. Defaults to 5037
+        """
+        self.__command_builder = SubprocessTransport(adb_path, server_host, server_port)
+        self.__server_host = server_host
+        self.__server_port = server_port
+
+
+
+    async def execute(self, args: list, serial: str|None=None) -> str:
+        """
+        The function runs an adb command and waits for its output without blocking the event loop.
+        If the awaiting task is cancelled (or times out) the adb process is killed.
+
+        Args:
+            args (list): adb command arguments, for example `['shell', 'getprop']`.
+            serial (str|None): Serial of the target device, `None` to let adb pick it.
+
+        Returns:
+            The stripped stdout of the command.
+
+        Raises:
+            CalledProcessError: if the called process returns a non-zero return code.
+        """
+        command = self.__command_builder.build_command(args, serial)
+        started = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        observe_phase('spawn', command_kind(args), serial, time.perf_counter() - started)
+        try:
+            stdout, stderr = await process.communicate()
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, command, stdout.decode('utf-8', errors='replace'), stderr)
+        return stdout.decode('utf-8', errors='replace').strip()
+
+
+
+    async def execute_binary(self, args: list, serial: str|None=None, sink: Any=None) -> memoryview|int:
+        """
+        The function runs an adb command and reads its raw binary stdout without blocking the event loop,
+        for `exec-out` commands like `screencap`.
+
+        Args:
+            args (list): adb command arguments, for example `['exec-out', 'screencap -p']`.
+            serial (str|None): Serial of the target device, `None` to let adb pick it.
+            sink (Any): File-like object or writable buffer receiving the output, see `read_into`. Defaults to None.
+
+        Returns:
+            A `memoryview` of the output if no sink is given, otherwise the number of bytes written to the sink.
+
+        Raises:
+            CalledProcessError: if the called process returns a non-zero return code.
+            BufferError: if the output does not fit in a buffer sink.
+        """
+        command = self.__command_builder.build_command(args, serial)
+        started = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(*command, stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE,
+                                                       stderr=asyncio.subprocess.PIPE, limit=1 << 20)
+        observe_phase('spawn', command_kind(args), serial, time.perf_counter() - started)
+        try:
+            output = await read_into_async(process.stdout.read, sink)
+            stderr = await process.stderr.read()
+            await process.wait()
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+            raise
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, command, None, stderr)
+        return output
+
+
+
+    async def open_stream(self, args: list, serial: str|None=None) -> AsyncStream:
+        """
+        The function runs a long-lived adb command, like a log stream, and returns its output stream.
+
+        Args:
+            args (list): adb command arguments, for example `['shell', 'logcat']`.
+            serial (str|None): Serial of the target device, `None` to let adb pick it.
+
+        Returns:
+            The `AsyncStream` of the running command.
+        """
+        command = self.__command_builder.build_command(args, serial)
+        process = await asyncio.create_subprocess_exec(*command, stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE,
+                                                       stderr=asyncio.subprocess.STDOUT, limit=1 << 20)
+
+        async def close():
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+
+        return AsyncStream(process.stdout, close)
+
+
+
+    async def server_version(self) -> int|None:
+        """
+        The function asks the adb server the adb tool talks to for its protocol version.
+
+        Returns:
+            The server version number. `None` if no server is answering.
+        """
+        return await probe_server_async(self.__server_host, self.__server_port)
+
+
+
+class AsyncSocketTransport:
+    """
+    `asyncio` twin of `SocketTransport`, it talks to the adb server over TCP using the adb host
+    protocol. Commands without a socket equivalent use the fallback transport.
+    """
+
+
+    name = 'socket'
+
+
+
+    def __init__(self, server_host: str=ADB_SERVER_HOST, server_port: int=ADB_SERVER_PORT, fallback: AsyncSubprocessTransport|None=None):
+        """
+        Args:
+            server_host (str): Host of the adb server. Defaults to 127.0.0.1
+            server_port (int): Port of the adb server. Defaults to 5037
+            fallback (AsyncSubprocessTransport|None): Transport used for commands that have no socket
+                equivalent. Defaults to an `AsyncSubprocessTransport` talking to the same server.
+        """
+        self.__server_host = server_host
+        self.__server_port = server_port
+        self.__fallback = fallback or AsyncSubprocessTransport(server_host=server_host, server_port=server_port)
+        self.__features = {}
+
+
+
+    @staticmethod
+    async def __read_payload(reader: asyncio.StreamReader) -> str:
+        length = int(await reader.readexactly(4), 16)
+        return (await reader.readexactly(length)).decode('utf-8', errors='replace')
+
+
+
+    async def __request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, service: str):
+        writer.write(encode_request(service))
+        await writer.drain()
+        try:
+            status = await reader.readexactly(4)
+        except asyncio.IncompleteReadError as error:
+            raise ADBProtocolError('Connection closed by adb server') from error
+        if status == b'OKAY':
+            return
+        if status == b'FAIL':
+            raise ADBProtocolError(await self.__read_payload(reader))
+        raise ADBProtocolError(f'Unexpected adb server status: {status!r}')
+
+
+
+    async def __run(self, kind: str, service: str, serial: str|None) -> bytes|str:
+        started = time.perf_counter()
+        reader, writer = await asyncio.open_connection(self.__server_host, self.__server_port)
+        try:
+            if kind in ('device', 'reboot'):
+                await self.__request(reader, writer, f'host:transport:{serial}' if serial else 'host:transport-any')
+                observe_phase('spawn', command_kind(service), serial, time.perf_counter() - started)
+                await self.__request(reader, writer, service)
+                return await reader.read()
+            await self.__request(reader, writer, service)
+            return '' if kind == 'command' else await self.__read_payload(reader)
+        finally:
+            writer.close()
+
+
+
+    def __forget_features(self, args: list):
+        # connecting or disconnecting may change the only connected device, or the device at an address
+        if len(args) < 2:
+            self.__features.clear()  # `disconnect` alone drops every device
+            return
+        host = args[1].split(':')[0]
+        for serial in list(self.__features):
+            if serial is None or serial.split(':')[0] == host:
+                self.__features.pop(serial, None)
+
+
+
+    async def features(self, serial: str|None=None) -> frozenset:
+        """
+        The function returns the features a device supports (`shell_v2`, `cmd` ..), asked once per device
+        until it is connected or disconnected again.
+
+        Args:
+            serial (str|None): Serial of the device, `None` for the only connected device.
+
+        Returns:
+            Set of the feature names, empty if the server does not know the device or the request.
+        """
+        features = self.__features.get(serial)
+        if features is None:
+            try:
+                payload = await self.__run('query', f'host-serial:{serial}:features' if serial else 'host:features', serial)
+            except ADBProtocolError:
+                return frozenset()  # not cached, the device may not be connected yet
+            self.__features[serial] = features = frozenset(payload.strip().split(','))
+        return features
+
+
+
+    async def open_stream(self, args: list, serial: str|None=None) -> AsyncStream:
+        """
+        The function runs a long-lived adb `shell`/`exec-out` command, like a log stream, keeping the
+        connection open. Other commands use the fallback transport.
+
+        Args:
+            args (list): adb command arguments, for example `['shell', 'logcat']`.
+            serial (str|None): Serial of the target device, `None` to let the server pick it.
+
+        Returns:
+            The `AsyncStream` of the running command.
+        """
+        if not args or args[0] not in ('shell', 'exec-out'):
+            return await self.__fallback.open_stream(args, serial)
+        service = ('shell:' if args[0] == 'shell' else 'exec:') + ' '.join(args[1:])
+        reader, writer = await asyncio.open_connection(self.__server_host, self.__server_port, limit=1 << 20)
+        try:
+            await self.__request(reader, writer, f'host:transport:{serial}' if serial else 'host:transport-any')
+            await self.__request(reader, writer, service)
+        except BaseException:
+            writer.close()
+            raise
+
+        async def close():
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass  # already disconnected
+
+        return AsyncStream(reader, close)
+
+
+
+    async def execute_binary(self, args: list, serial: str|None=None, sink: Any=None) -> memoryview|int:
+        """
+        The function runs an adb `shell`/`exec-out` command through the adb server socket and reads its
+        raw binary output. Other commands use the fallback transport.
+
+        Args:
+            args (list): adb command arguments, for example `['exec-out', 'screencap -p']`.
+            serial (str|None): Serial of the target device, `None` to let the server pick it.
+            sink (Any): File-like object or writable buffer receiving the output, see `read_into`. Defaults to None.
+
+        Returns:
+            A `memoryview` of the output if no sink is given, otherwise the number of bytes written to the sink.
+
+        Raises:
+            ADBProtocolError: if the adb server refuses the request.
+            BufferError: if the output does not fit in a buffer sink.
+        """
+        if not args or args[0] not in ('shell', 'exec-out'):
+            return await self.__fallback.execute_binary(args, serial, sink)
+        stream = await self.open_stream(args, serial)
+        try:
+            return await read_into_async(stream.read, sink)
+        finally:
+            await stream.close()
+
+
+
+    async def execute(self, args: list, serial: str|None=None) -> str:
+        """
+        The function runs an adb command through the adb server socket without blocking the event loop.
+        If the awaiting task is cancelled (or times out) the connection is closed.
+
+        Args:
+            args (list): adb command arguments, for example `['shell', 'getprop']`.
+            serial (str|None): Serial of the target device, `None` to let the server pick it.
+
+        Returns:
+            The stripped output of the command.
+
+        Raises:
+            ADBProtocolError: if the adb server refuses the request.
+            CalledProcessError: if a shell command returns a non-zero exit code, on devices with the shell protocol v2.
+        """
+        plan = plan_socket_command(args, serial)
+        if plan is None:
+            return await self.__fallback.execute(args, serial)
+        kind, service = plan
+        if args[0] in ('connect', 'disconnect'):
+            self.__forget_features(args)
+        if kind == 'device' and args[0] == 'shell' and 'shell_v2' in await self.features(serial):
+            # unlike `shell:`, the shell protocol v2 reports the exit status, so failures raise like the adb tool
+            stdout, stderr, exit_code = decode_shell_v2(await self.__run(kind, 'shell,v2,raw:' + service[len('shell:'):], serial))
+            if exit_code is None:
+                raise ADBProtocolError(f'Shell of {serial or "the device"} closed without an exit status: {" ".join(args)}')
+            stdout, stderr = stdout.decode('utf-8', errors='replace'), stderr.decode('utf-8', errors='replace')
+            if exit_code:
+                raise subprocess.CalledProcessError(exit_code, list(args), stdout, stderr)
+            return stdout.strip()
+        output = await self.__run(kind, service, serial)
+        if kind == 'device':
+            return output.decode('utf-8', errors='replace').strip()
+        if kind in ('reboot', 'command'):
+            return ''
+        return format_query_output(kind, output)
+
+
+
+    async def server_version(self) -> int|None:
+        """
+        The function asks the adb server for its protocol version.
+
+        Returns:
+            The server version number. `None` if no server is answering.
+        """
+        return await probe_server_async(self.__server_host, self.__server_port)
+
+
+
+def create_async_transport(transport: str|AsyncSubprocessTransport|AsyncSocketTransport='subprocess', server_host: str=ADB_SERVER_HOST,
+                           server_port: int=ADB_SERVER_PORT) -> AsyncSubprocessTransport|AsyncSocketTransport:
+    """
+    The function creates the transport used by `AsyncADBClient` to reach the adb server.
+
+    Args:
+        transport (str|AsyncSubprocessTransport|AsyncSocketTransport): Transport name [subprocess | socket]
+            or a ready transport object that is returned as is. Defaults to subprocess
+        server_host (str): Host of the adb server. Defaults to 127.0.0.1
+        server_port (int): Port of the adb server. Defaults to 5037
+
+    Returns:
+        The transport object.
+    """
+    if not isinstance(transport, str):
+        return transport
+    if transport == 'subprocess':
+        return AsyncSubprocessTransport(server_host=server_host, server_port=server_port)
+    if transport == 'socket':
+        return AsyncSocketTransport(server_host, server_port)
+    raise ValueError(f'Unknown adb transport: {transport}, use one of [subprocess | socket]')
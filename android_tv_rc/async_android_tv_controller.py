@@ -0,0 +1,377 @@
+from .async_adb_client import AsyncADBClient
+from .tv_apps import AndroidTVApps
+from .key_codes import KeyCodes
+from .deadline import deadline
+from .metrics import instrument_methods
+from .tracing import trace_methods
+
+
+@trace_methods
+@instrument_methods
+class AsyncAndroidTVController:
+    """
+    `asyncio` twin of `AndroidTVController`, every command is a coroutine built on `AsyncADBClient`.
+    Wrap any call with `asyncio.wait_for(..)` to give it a timeout, cancelling a call kills its adb commands.
+    """
+
+
+
+    def __init__(self, ip: str, verbose: bool=False, show_command: bool=False, **client_options):
+        """
+        The class has many important utils to interact with android TV using adb and asyncio.
+        
+        Args:
+            ip (str): the ip address of the Android TV device
+            verbose (bool): The `verbose` parameter is a boolean flag that determines whether or not to
+                enable verbose logging. If set to `True`, it will display additional information during the
+                execution of the code. If set to `False` (default), it will not display any additional
+                information. Defaults to False.
+            show_command (bool): The `show_command` parameter is a boolean flag that determines whether or
+                not to display the executed ADB commands. If `show_command` is set to `True`, the executed ADB
+                commands will be shown. If `show_command` is set to `False`, the executed ADB commands will.
+                Defaults to False.
+            client_options: Extra keyword arguments passed to `AsyncADBClient`, for example `transport='socket'`.
+        """
+        self.__adb_client = AsyncADBClient(verbose, show_command, **client_options)
+        self.__ip = ip
+    
+    
+    
+    async def connect(self) -> bool:
+        """
+        Start connection to TV IP.
+        """
+        return await self.__adb_client.connect(self.__ip)
+    
+    
+    
+    def is_connected(self) -> bool:
+        """
+        Check if connection is successfully established.
+        """
+        return self.__adb_client.is_connected(self.__ip)
+        
+        
+        
+    def get_adb_client(self):
+        """
+        Return the adb session client.
+        """
+        return self.__adb_client
+
+
+
+
+    @property
+    def serial(self) -> str|None:
+        """Serial of the TV the commands go to, `None` if not connected."""
+        return self.__adb_client.selected_device
+        
+
+
+    # ------------------------------[ Navigation Commands ]------------------------------
+
+
+
+    async def press_home(self):
+        """Simulates pressing home button on Android TV device remote control."""
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_HOME)
+
+
+
+    async def press_tv(self):
+        """Simulates pressing TV input button on Android TV device remote control."""
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_TV)
+        
+        
+        
+    async def press_back(self):
+        """Simulates pressing back button on Android TV device remote control."""
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_BACK)
+
+
+
+    async def press_dpad_up(self):
+        """Simulates pressing up button on Android TV device remote control."""
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_DPAD_UP)
+
+
+
+    async def press_dpad_down(self):
+        """Simulates pressing down button on Android TV device remote control."""
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_DPAD_DOWN)
+
+
+
+    async def press_dpad_left(self):
+        """Simulates pressing left button on Android TV device remote control."""
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_DPAD_LEFT)
+
+
+
+    async def press_dpad_right(self):
+        """Simulates pressing right button on Android TV device remote control."""
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_DPAD_RIGHT)
+
+
+
+    async def press_enter(self):
+        """Simulates pressing enter button on Android TV device remote control."""
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_ENTER)
+
+
+
+    async def press_keys(self, keys: list, inter_key_delay: float|None=None):
+        """
+        Simulates pressing a sequence of buttons on Android TV device remote control in a single adb round trip.
+        
+        Args:
+            keys (list): List of `KeyCodes` to press in order.
+            inter_key_delay (float|None): Seconds to wait between two key presses. Defaults to None.
+        """
+        await self.__adb_client.send_keyevent_sequence(keys, inter_key_delay)
+
+    
+    
+    # ------------------------------[ Volume Commands ]------------------------------
+    
+    
+    
+    async def press_volume_up(self):
+        """Simulates pressing volume up button on Android TV device remote control."""
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_VOLUME_UP)
+
+
+
+    async def press_volume_down(self):
+        """Simulates pressing volume down button on Android TV device remote control."""
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_VOLUME_DOWN)
+
+
+
+    async def press_volume_mute(self):
+        """Simulates pressing volume mute button on Android TV device remote control."""
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_VOLUME_MUTE)
+
+
+
+
+    async def set_volume(self, level: int, stream: int|str='music') -> int|None:
+        """
+        Set the volume to a level in one command, instead of pressing volume up or down once per step.
+        
+        Args:
+            level (int): The volume level, clamped into the TV range (often 0 to 15).
+            stream (int|str): Audio stream [music | system | ring | alarm | notification | voice_call]. Defaults to music
+        
+        Return:
+            The volume level after the change. `None` if not connected.
+        """
+        volume = await self.__adb_client.set_volume(level, stream)
+        return None if volume is None else volume.level
+
+
+
+    async def get_volume(self, stream: int|str='music', refresh: bool=True) -> int|None:
+        """
+        Get the volume level in one command.
+        
+        Args:
+            stream (int|str): Audio stream [music | system | ring | alarm | notification | voice_call]. Defaults to music
+            refresh (bool): Whether to ask the TV, otherwise the last known level is returned when there is one,
+                it follows the volume buttons pressed through this library. Defaults to True.
+        
+        Return:
+            The volume level. `None` if not connected.
+        """
+        volume = await self.__adb_client.get_volume(stream, refresh)
+        return None if volume is None else volume.level
+
+
+
+    # ------------------------------[ Power Commands ]------------------------------
+
+
+
+    async def is_powered_on(self) -> bool|None:
+        """
+        Check if TV is working or not. (Power ON/OFF)
+        
+        Return:
+            Statues of TV power on or off.
+        """
+        return await self.__adb_client.is_powered_on()
+    
+    
+    
+    async def press_power(self):
+        """
+        Simulates pressing power button on Android TV device remote control.
+        you can use it to power on/off the TV device.
+        """
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_POWER)
+        
+        
+        
+    async def press_sleep(self):
+        """
+        Puts the TV into a low-power state. The TV will still be able to receive
+        signals from the remote control, and it will wake up quickly when you press a button. 
+        """
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_SLEEP)
+        
+        
+        
+    async def press_soft_sleep(self):
+        """
+        This is a deeper sleep option than sleep, and it uses even less power.
+        The TV will not be able to receive signals from the remote control while in soft sleep,
+        and it will take a few seconds to wake up when you press a button.
+        """
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_SOFT_SLEEP)
+
+
+
+    async def press_wakeup(self):
+        """
+        Tell the TV when you want it to wake up from sleep.
+        """
+        await self.__adb_client.send_keyevent_input(KeyCodes.KEYCODE_WAKEUP)
+
+
+
+    async def snapshot(self, fields: tuple|list|None=None):
+        """
+        Get the TV state (power, foreground app, ip address, ..) in a single adb round trip.
+        
+        Args:
+            fields (tuple|list|None): Fields to gather, any of [state | power | properties | ip_address | foreground_app].
+                Defaults to all of them.
+        
+        Return:
+            `DeviceSnapshot` of the TV. `None` if not connected.
+        """
+        return await self.__adb_client.snapshot(fields)
+
+
+
+    async def screenshot(self, format: str='png', sink=None):
+        """
+        Capture the TV screen.
+        
+        Args:
+            format (str): Capture format [png | raw]. Defaults to png
+            sink: File-like object or writable buffer receiving the capture, for example `open('screen.png', 'wb')`.
+        
+        Return:
+            The PNG image as a `memoryview`, a `RawFrame` for `raw`, or the number of bytes written to the sink.
+            `None` if not connected.
+        """
+        return await self.__adb_client.screencap(format, sink)
+
+
+
+    # ------------------------------[ Channels Commands ]------------------------------
+
+
+
+    async def press_channel_up(self):
+        """Simulates pressing channel up button on Android TV device remote control."""
+        await self.__adb_client.send_keyevent_sequence([KeyCodes.KEYCODE_TV, KeyCodes.KEYCODE_CHANNEL_UP])
+
+
+
+    async def press_channel_down(self):
+        """Simulates pressing channel down button on Android TV device remote control."""
+        await self.__adb_client.send_keyevent_sequence([KeyCodes.KEYCODE_TV, KeyCodes.KEYCODE_CHANNEL_DOWN])
+        
+        
+        
+    async def press_channel_number(self, channel_number: str, timeout: float|None=None):
+        """
+        Simulates pressing channel number digits buttons on Android TV device remote control.
+
+        Args:
+            channel_number (str): The channel digits, for example '105'.
+            timeout (float|None): Seconds all the key presses may take together. Defaults to None (no limit).
+
+        Raises:
+            DeadlineExceeded: if the key presses did not complete in time.
+        """
+        numbers_key_codes = {
+            '0': KeyCodes.KEYCODE_0,
+            '1': KeyCodes.KEYCODE_1,
+            '2': KeyCodes.KEYCODE_2,
+            '3': KeyCodes.KEYCODE_3,
+            '4': KeyCodes.KEYCODE_4,
+            '5': KeyCodes.KEYCODE_5,
+            '6': KeyCodes.KEYCODE_6,
+            '7': KeyCodes.KEYCODE_7,
+            '8': KeyCodes.KEYCODE_8,
+            '9': KeyCodes.KEYCODE_9,
+        }
+        keys = [KeyCodes.KEYCODE_TV] + [numbers_key_codes[digit] for digit in channel_number]
+        with deadline(timeout):
+            await self.__adb_client.send_keyevent_sequence(keys)
+        
+    
+    
+    # ------------------------------[ Apps Commands ]------------------------------
+
+    
+    
+    async def open_app(self, app: AndroidTVApps|str, timeout: float|None=None) -> bool|None:
+        """
+        The function starts an app from its package name, its launcher activity is resolved
+        from the device launcher catalog.
+        
+        To get the package name for an app search for it on google, or
+        if the app is installed use `adb_client.list_packages()` method.
+    
+        Args:
+            app (AndroidTVApps|str): The app package name, for example 'com.netflix.ninja', or an app
+                in form of package/activity.
+            timeout (float|None): Seconds the whole start may take, every adb command of it included.
+                Defaults to None (no limit).
+        
+        Returns:
+            Boolean indicates if app starting process is successful. `None` if no device found.
+
+        Raises:
+            DeadlineExceeded: if the app did not start in time.
+        """
+        app = app.value if isinstance(app, AndroidTVApps) else app
+        package, _, activity = app.partition('/')
+        with deadline(timeout):
+            return await self.__adb_client.start_app(package, activity or None)
+
+    
+    
+    async def open_youtube(self):
+        """Opens Youtube TV application"""
+        await self.open_app(AndroidTVApps.YOUTUBE)
+    
+    
+    
+    async def open_netflix(self):
+        """Opens Netflix application"""
+        await self.open_app(AndroidTVApps.NETFLIX)
+
+    
+    
+    
+    async def open_amazon_prime(self):
+        """Opens Amazon Prime Video application"""
+        await self.open_app(AndroidTVApps.AMAZON_PRIME)
+        
+        
+        
+    async def open_watch_it(self):
+        """Opens Watch IT application"""
+        await self.open_app(AndroidTVApps.WATCH_IT)
+        
+    
+    
+    async def open_shahid(self):
+        """Opens Shahid application"""
+        await self.open_app(AndroidTVApps.SHAHID)
\ No newline at end of file
@@ -0,0 +1,206 @@
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator
+from .logger import Logger
+from .logcat import OVERFLOW_POLICIES, LogcatRecord, parse_binary_entries, parse_threadtime_line
+
+
+
+class AsyncRingBuffer:
+    """`asyncio` twin of `RingBuffer`, a bounded FIFO between a producer task and a slow consumer."""
+
+
+
+    def __init__(self, capacity: int=10000, policy: str='drop_oldest'):
+        """
+        Args:
+            capacity (int): Maximum number of items kept. Defaults to 10000
+            policy (str): What to do when full [drop_oldest | drop_newest | block]. Defaults to drop_oldest
+
+        Raises:
+            ValueError: if the policy is unknown or the capacity is not positive.
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f'Unknown overflow policy: {policy}, use one of [{" | ".join(OVERFLOW_POLICIES)}]')
+        if capacity < 1:
+            raise ValueError('Ring buffer capacity must be at least 1')
+        self.__items = deque()
+        self.__capacity = capacity
+        self.__policy = policy
+        self.__dropped = 0
+        self.__closed = False
+        self.__condition = asyncio.Condition()
+
+
+
+    @property
+    def dropped(self) -> int:
+        """Number of items dropped because the buffer was full."""
+        return self.__dropped
+
+
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+
+
+    async def put(self, item: Any) -> bool:
+        """
+        The function adds an item, applying the overflow policy when the buffer is full.
+
+        Args:
+            item (Any): The item.
+
+        Returns:
+            Boolean indicates if the item was added, `False` if it was dropped or the buffer is closed.
+        """
+        async with self.__condition:
+            if self.__closed:
+                return False
+            if len(self.__items) >= self.__capacity:
+                if self.__policy == 'drop_newest':
+                    self.__dropped += 1
+                    return False
+                if self.__policy == 'drop_oldest':
+                    self.__items.popleft()
+                    self.__dropped += 1
+                else:
+                    await self.__condition.wait_for(lambda: self.__closed or len(self.__items) < self.__capacity)
+                    if self.__closed:
+                        return False
+            self.__items.append(item)
+            self.__condition.notify_all()
+            return True
+
+
+
+    async def get(self) -> Any:
+        """
+        The function removes and returns the oldest item, waiting for one if the buffer is empty.
+
+        Returns:
+            The oldest item.
+
+        Raises:
+            EOFError: if the buffer is closed and empty.
+        """
+        async with self.__condition:
+            await self.__condition.wait_for(lambda: self.__items or self.__closed)
+            if not self.__items:
+                raise EOFError('Ring buffer is closed')
+            item = self.__items.popleft()
+            self.__condition.notify_all()
+            return item
+
+
+
+    async def close(self):
+        """Closes the buffer, the items already in it can still be read."""
+        async with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+
+
+
+class AsyncLogcatStream:
+    """
+    `asyncio` twin of `LogcatStream`, an async iterator over the log records of a device read
+    incrementally by a reader task into a bounded `AsyncRingBuffer`.
+
+    Example:
+        async with await client.logcat_stream(filters=['ActivityManager:I', '*:S']) as records:
+            async for record in records:
+                print(record.tag, record.message)
+    """
+
+
+
+    def __init__(self, stream: Any, binary: bool=False, capacity: int=10000, policy: str='drop_oldest'):
+        """
+        Args:
+            stream (AsyncStream): Stream of the running `logcat` command.
+            binary (bool): Whether the stream carries the binary format. Defaults to False.
+            capacity (int): Maximum number of records waiting for the consumer. Defaults to 10000
+            policy (str): What to do when the consumer is too slow [drop_oldest | drop_newest | block].
+                Defaults to drop_oldest
+        """
+        self.__stream = stream
+        self.__binary = binary
+        self.__buffer = AsyncRingBuffer(capacity, policy)
+        self.__reader = asyncio.get_running_loop().create_task(self.__read())
+
+
+
+    @property
+    def dropped(self) -> int:
+        """Number of records dropped because the consumer was too slow."""
+        return self.__buffer.dropped
+
+
+
+    async def __read(self):
+        try:
+            pending = bytearray()
+            while chunk := await (self.__stream.read() if self.__binary else self.__stream.readline()):
+                if self.__binary:
+                    pending += chunk
+                    records = parse_binary_entries(pending)
+                else:
+                    record = parse_threadtime_line(chunk.decode('utf-8', errors='replace'))
+                    records = [record] if record else []
+                for record in records:
+                    await self.__buffer.put(record)
+        except (OSError, ValueError):
+            Logger.warning('Logcat stream ended unexpectedly')
+        finally:
+            await self.__buffer.close()
+
+
+
+    def __aiter__(self) -> AsyncIterator[LogcatRecord]:
+        return self
+
+
+
+    async def __anext__(self) -> LogcatRecord:
+        try:
+            return await self.__buffer.get()
+        except EOFError:
+            raise StopAsyncIteration from None
+
+
+
+    async def get(self, timeout: float|None=None) -> LogcatRecord|None:
+        """
+        The function returns the next record, waiting at most `timeout` seconds.
+
+        Args:
+            timeout (float|None): Seconds to wait for a record. Defaults to None (wait forever).
+
+        Returns:
+            The next log record. `None` if the timeout expired or the stream ended.
+        """
+        try:
+            return await asyncio.wait_for(self.__buffer.get(), timeout)
+        except (EOFError, asyncio.TimeoutError):
+            return None
+
+
+
+    async def close(self):
+        """Stops `logcat` on the device and the reader task."""
+        self.__reader.cancel()
+        await asyncio.gather(self.__reader, return_exceptions=True)
+        await self.__buffer.close()
+        await self.__stream.close()
+
+
+
+    async def __aenter__(self):
+        return self
+
+
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
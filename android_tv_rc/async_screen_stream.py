@@ -0,0 +1,167 @@
+import math
+import asyncio
+from typing import Any, AsyncIterator, Callable
+from .logger import Logger
+from .async_logcat import AsyncRingBuffer
+from .screen_stream import SEGMENT_TIME_LIMIT, next_segment_time_limit
+
+
+
+class AsyncScreenStream:
+    """
+    `asyncio` twin of `ScreenStream`, an async iterator over the H.264 elementary stream of a device
+    screen read by a reader task into a bounded `AsyncRingBuffer`. Segments are chained like
+    `ScreenStream`, with the same whole seconds of recorded video.
+
+    Example:
+        async with await client.screen_stream(duration=600) as video:
+            async for chunk in video:
+                decoder.feed(chunk)
+    """
+
+
+
+    def __init__(self, open_segment: Callable, duration: float|None=None, segment_time_limit: int=SEGMENT_TIME_LIMIT,
+                 capacity: int=64, policy: str='block', chunk_size: int=65536):
+        """
+        Args:
+            open_segment (Callable): Coroutine function called as `open_segment(time_limit)`, starts one
+                `screenrecord` segment and returns its `AsyncStream`.
+            duration (float|None): Seconds to record in total, at least 1 and rounded down to whole seconds.
+                Defaults to None (until closed).
+            segment_time_limit (int): Seconds of one segment, at most 180. Defaults to 180
+            capacity (int): Maximum number of chunks waiting for the consumer. Defaults to 64
+            policy (str): What to do when the consumer is too slow [drop_oldest | drop_newest | block].
+                Dropping chunks corrupts the video until the next key frame. Defaults to block
+            chunk_size (int): Maximum size of one chunk. Defaults to 64 KiB.
+
+        Raises:
+            ValueError: if the policy is unknown or the duration is shorter than 1 second.
+        """
+        if duration is not None and duration < 1:
+            raise ValueError(f'screenrecord records whole seconds, the duration must be at least 1 second: {duration}')
+        self.__open_segment = open_segment
+        self.__duration = math.floor(duration) if duration is not None else None
+        self.__segment_time_limit = max(1, min(int(segment_time_limit), SEGMENT_TIME_LIMIT))
+        self.__chunk_size = chunk_size
+        self.__buffer = AsyncRingBuffer(capacity, policy)
+        self.__segments = 0
+        self.__bytes_read = 0
+        self.__closed = False
+        self.__reader = asyncio.get_running_loop().create_task(self.__read())
+
+
+
+    @property
+    def segments(self) -> int:
+        """Number of `screenrecord` segments completed so far."""
+        return self.__segments
+
+
+
+    @property
+    def bytes_read(self) -> int:
+        """Number of bytes read from the device so far."""
+        return self.__bytes_read
+
+
+
+    @property
+    def dropped(self) -> int:
+        """Number of chunks dropped because the consumer was too slow."""
+        return self.__buffer.dropped
+
+
+
+    async def __read(self):
+        recorded = 0
+        try:
+            while (time_limit := next_segment_time_limit(self.__duration, self.__segment_time_limit, recorded)) is not None:
+                stream = await self.__open_segment(time_limit)
+                received = 0
+                try:
+                    while chunk := await stream.read(self.__chunk_size):
+                        received += len(chunk)
+                        self.__bytes_read += len(chunk)
+                        await self.__buffer.put(chunk)
+                finally:
+                    await stream.close()
+                if not received:
+                    if not self.__closed:
+                        Logger.warning('screenrecord produced no output, the screen stream stopped')
+                    return
+                self.__segments += 1
+                recorded += time_limit
+        except (OSError, ValueError):
+            if not self.__closed:
+                Logger.warning('Screen stream ended unexpectedly')
+        finally:
+            await self.__buffer.close()
+
+
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self
+
+
+
+    async def __anext__(self) -> bytes:
+        try:
+            return await self.__buffer.get()
+        except EOFError:
+            raise StopAsyncIteration from None
+
+
+
+    async def get(self, timeout: float|None=None) -> bytes|None:
+        """
+        The function returns the next chunk, waiting at most `timeout` seconds.
+
+        Args:
+            timeout (float|None): Seconds to wait for a chunk. Defaults to None (wait forever).
+
+        Returns:
+            The next chunk. `None` if the timeout expired or the stream ended.
+        """
+        try:
+            return await asyncio.wait_for(self.__buffer.get(), timeout)
+        except (EOFError, asyncio.TimeoutError):
+            return None
+
+
+
+    async def write_to(self, sink: Any) -> int:
+        """
+        The function writes the stream into a file-like object until it ends.
+
+        Args:
+            sink (Any): Object with a `write` method, for example a file opened in `wb` mode.
+
+        Returns:
+            Number of bytes written.
+        """
+        written = 0
+        async for chunk in self:
+            sink.write(chunk)
+            written += len(chunk)
+        return written
+
+
+
+    async def close(self):
+        """Stops `screenrecord` on the device and the reader task."""
+        self.__closed = True
+        # cancelling the reader closes the running segment stream
+        self.__reader.cancel()
+        await asyncio.gather(self.__reader, return_exceptions=True)
+        await self.__buffer.close()
+
+
+
+    async def __aenter__(self):
+        return self
+
+
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
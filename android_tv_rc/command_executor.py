@@ -0,0 +1,99 @@
+import threading
+import concurrent.futures
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator
+
+
+
+SHARED_EXECUTOR_WORKERS = 32
+
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+
+@dataclass
+class CommandResult:
+    """
+    Outcome of one adb command run with `submit`, a non-zero `exit_code` is reported here instead of
+    raised. The socket transport reports the exit code of `shell` commands on devices with the shell
+    protocol v2 (Android 7 and newer), on older devices they report 0.
+    """
+
+
+    command: str
+    output: str
+    exit_code: int = 0
+    error_output: str = ''
+    duration: float = 0.0
+
+
+
+    @property
+    def ok(self) -> bool:
+        """Whether the command exited with code 0."""
+        return self.exit_code == 0
+
+
+
+def shared_executor() -> ThreadPoolExecutor:
+    """
+    The function returns the thread pool shared by every client for `submit`, created on first use.
+
+    Returns:
+        The shared `ThreadPoolExecutor`.
+    """
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(max_workers=SHARED_EXECUTOR_WORKERS, thread_name_prefix='atv-submit')
+        return _shared_executor
+
+
+
+def gather(futures: list, timeout: float|None=None, return_exceptions: bool=False) -> list:
+    """
+    The function waits for submitted commands and returns their results in submission order.
+
+    Args:
+        futures (list): Futures returned by `submit`.
+        timeout (float|None): Seconds to wait for all of them. Defaults to None (wait forever).
+        return_exceptions (bool): Whether failed futures give their exception as result instead of
+            raising it. Defaults to False.
+
+    Returns:
+        List of the results, in the order of `futures`.
+
+    Raises:
+        TimeoutError: if the futures did not all complete in time.
+        Exception: the exception of the first failed future, unless `return_exceptions`.
+    """
+    done, pending = concurrent.futures.wait(futures, timeout)
+    if pending:
+        raise TimeoutError(f'{len(pending)} of {len(futures)} submitted commands did not complete in time')
+    results = []
+    for future in futures:
+        error = future.exception()
+        if error is not None and not return_exceptions:
+            raise error
+        results.append(error if error is not None else future.result())
+    return results
+
+
+
+def as_completed(futures: list, timeout: float|None=None) -> Iterator[Future]:
+    """
+    The function yields submitted commands as soon as they complete, fastest first.
+
+    Args:
+        futures (list): Futures returned by `submit`.
+        timeout (float|None): Seconds to wait for all of them. Defaults to None (wait forever).
+
+    Returns:
+        Iterator of the completed futures.
+
+    Raises:
+        TimeoutError: if the futures did not all complete in time.
+    """
+    return concurrent.futures.as_completed(futures, timeout)
@@ -0,0 +1,71 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+
+
+# absolute time.monotonic() deadline of the running operation, `None` when unbounded
+_current_deadline = ContextVar('atv_rc_deadline', default=None)
+
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a command runs past its timeout or past the deadline of the current operation."""
+
+
+
+@contextmanager
+def deadline(seconds: float|None) -> Iterator[float|None]:
+    """
+    The function bounds every adb command run inside the block by one shared deadline, so composite
+    operations (check installation, press HOME, start the app ..) finish in `seconds` end to end.
+    Nested deadlines can only shorten the current one. The deadline follows `asyncio` tasks and the
+    commands given to `submit`.
+
+    Example:
+        with deadline(2.0):
+            client.start_app('com.netflix.ninja')
+
+    Args:
+        seconds (float|None): Seconds the block may take, `None` keeps the current deadline.
+
+    Returns:
+        Context manager giving the absolute `time.monotonic()` deadline, `None` if unbounded.
+    """
+    current = _current_deadline.get()
+    if seconds is None:
+        yield current
+        return
+    end = time.monotonic() + seconds
+    if current is not None:
+        end = min(end, current)
+    token = _current_deadline.set(end)
+    try:
+        yield end
+    finally:
+        _current_deadline.reset(token)
+
+
+
+def remaining_time(timeout: float|None=None) -> float|None:
+    """
+    The function computes how long the next command may take: its own timeout capped by the
+    deadline of the current operation.
+
+    Args:
+        timeout (float|None): Timeout of the command, `None` for no timeout of its own.
+
+    Returns:
+        Seconds the command may take. `None` if it is not bounded.
+
+    Raises:
+        DeadlineExceeded: if the current deadline already passed.
+    """
+    end = _current_deadline.get()
+    if end is None:
+        return timeout
+    left = end - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded('Deadline exceeded before the command started')
+    return left if timeout is None else min(timeout, left)
@@ -0,0 +1,123 @@
+import re
+from dataclasses import dataclass, field
+from .adb_commands import POWER_STATE_COMMAND, parse_properties, build_ip_address_command, parse_power_state
+
+
+
+@dataclass
+class DeviceSnapshot:
+    """
+    State of one device gathered by `ADBClient.snapshot` with a single shell round trip, fields that
+    were not requested (or could not be read) are `None`.
+    """
+
+
+    FIELDS = ('state', 'power', 'properties', 'ip_address', 'foreground_app')
+
+    SECTION_MARKER = '__ATV_RC_SNAPSHOT__'
+
+    serial: str
+    state: str|None = None
+    powered_on: bool|None = None
+    properties: dict|None = None
+    ip_address: str|None = None
+    foreground_app: str|None = None
+    requested_fields: tuple = field(default=(), repr=False)
+
+
+
+    @classmethod
+    def build_script(cls, fields: tuple|list|None=None, properties: list|None=None, interface: str='wlan0') -> str:
+        """
+        The function builds the shell script gathering the requested fields, every field output is
+        preceded by a marker line naming the field.
+
+        Args:
+            fields (tuple|list|None): Fields to gather, from `FIELDS`. Defaults to all of them.
+            properties (list|None): System properties to read for the `properties` field, `None` reads all of them.
+            interface (str): Network interface of the `ip_address` field. Defaults to wlan0
+
+        Returns:
+            The shell script.
+
+        Raises:
+            ValueError: if a field is unknown.
+        """
+        fields = cls.check_fields(fields)
+        sections = []
+        for name in fields:
+            if name == 'state':
+                # the script answering at all means the device is online
+                sections.append((name, 'echo device'))
+            elif name == 'power':
+                sections.append((name, POWER_STATE_COMMAND))
+            elif name == 'properties' and properties is None:
+                sections.append((name, 'getprop'))
+            elif name == 'properties':
+                sections += [(f'property {prop}', f'getprop {prop}') for prop in properties]
+            elif name == 'ip_address':
+                sections.append((name, build_ip_address_command(interface)))
+            elif name == 'foreground_app':
+                sections.append((name, 'dumpsys window | grep -e mCurrentFocus -e mFocusedApp'))
+        script = [f'echo "{cls.SECTION_MARKER} {name}"; {command}' for name, command in sections]
+        # grep exits with 1 when nothing matches, the snapshot itself must not fail
+        return '; '.join(script + ['true'])
+
+
+
+    @classmethod
+    def check_fields(cls, fields: tuple|list|None) -> tuple:
+        """
+        The function validates the requested fields.
+
+        Args:
+            fields (tuple|list|None): Fields to gather, `None` for all of them.
+
+        Returns:
+            Tuple of the requested fields.
+
+        Raises:
+            ValueError: if a field is unknown.
+        """
+        if fields is None:
+            return cls.FIELDS
+        unknown = [name for name in fields if name not in cls.FIELDS]
+        if unknown:
+            raise ValueError(f'Unknown snapshot fields: {", ".join(unknown)}, use any of [{" | ".join(cls.FIELDS)}]')
+        return tuple(fields)
+
+
+
+    @classmethod
+    def parse(cls, serial: str, output: str, fields: tuple|list|None=None) -> 'DeviceSnapshot':
+        """
+        The function parses the output of the script built by `build_script`.
+
+        Args:
+            serial (str): Serial of the device.
+            output (str): Output of the snapshot script.
+            fields (tuple|list|None): Fields passed to `build_script`. Defaults to all of them.
+
+        Returns:
+            The device snapshot.
+        """
+        fields = cls.check_fields(fields)
+        sections = {}
+        for chunk in output.split(cls.SECTION_MARKER)[1:]:
+            name, _, body = chunk.partition('\n')
+            sections[name.strip()] = body.strip()
+        snapshot = cls(serial, requested_fields=fields)
+        if 'state' in sections:
+            snapshot.state = sections['state'] or None
+        if 'power' in sections:
+            snapshot.powered_on = parse_power_state(sections['power']) if sections['power'] else None
+        if 'properties' in fields:
+            if 'properties' in sections:
+                snapshot.properties = parse_properties(sections['properties'])
+            else:
+                snapshot.properties = {name[len('property '):]: value for name, value in sections.items() if name.startswith('property ')}
+        if match := re.search(r'inet addr:(\S+)', sections.get('ip_address', '')):
+            snapshot.ip_address = match[1]
+        if match := re.search(r'\su0 ([\w.]+/[\w.$]+)', sections.get('foreground_app', '')):
+            snapshot.foreground_app = match[1]
+        return snapshot
@@ -0,0 +1,330 @@
+import re
+import time
+import threading
+from enum import Enum
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Callable, Iterator
+from .logger import Logger
+from .logcat import RingBuffer
+from .device_snapshot import DeviceSnapshot
+
+
+
+# events buffer tags of the screen state and of the resumed activity, across Android versions
+POWER_TAGS = ('power_screen_state', 'screen_toggled')
+RESUMED_ACTIVITY_TAGS = ('wm_set_resumed_activity', 'am_set_resumed_activity', 'wm_resume_activity', 'am_resume_activity')
+
+# every other tag is silenced on the device, only these entries cross the network
+EVENT_FILTERS = [f'{tag}:I' for tag in POWER_TAGS + RESUMED_ACTIVITY_TAGS] + ['*:S']
+
+COMPONENT_PATTERN = re.compile(r'([\w.]+/[\w.$]+)')
+
+# a stream that ended sooner without any record did not work, it is opened again after a backoff
+STABLE_STREAM_TIME = 10.0
+
+
+
+class DeviceEventType(Enum):
+    POWER_ON = 'power_on'
+    POWER_OFF = 'power_off'
+    FOREGROUND_APP = 'foreground_app'
+    DISCONNECTED = 'disconnected'
+    RECONNECTED = 'reconnected'
+
+
+
+@dataclass(frozen=True)
+class DeviceEvent:
+    """A change of the state of a watched device."""
+
+
+    type: DeviceEventType
+    serial: str
+    timestamp: float
+    foreground_app: str|None = None
+    previous_app: str|None = None
+
+
+
+class DeviceWatcher:
+    """
+    Watches the power state, the foreground app and the connection of devices through one streaming
+    `logcat -b events` per device, instead of polling them. The state is read once with a snapshot,
+    then every change arrives as a log event. A dropped stream is reported as `DISCONNECTED`, the
+    device is then connected again with an increasing interval and `RECONNECTED` is reported, followed
+    by the changes missed while it was away. A stream ending while the device stays online is opened
+    again with the same increasing interval, reset once a stream delivers events.
+
+    Events go to the listeners, called from the watching thread of the device in the order of the
+    changes, and can be iterated, with `for` or `async for`.
+
+    Example:
+        with client.watch(['192.168.1.28:5555', '192.168.1.29:5555']) as watcher:
+            watcher.add_listener(print, [DeviceEventType.POWER_OFF])
+            async for event in watcher:
+                print(event.serial, event.type, event.foreground_app)
+    """
+
+
+
+    def __init__(self, client: Any, serials: list, callback: Callable|None=None, reconnect_interval: float=1.0,
+                 max_reconnect_interval: float=30.0, capacity: int=1000):
+        """
+        Args:
+            client (ADBClient): Client the devices are connected with.
+            serials (list): Serials of the watched devices, for example `['192.168.1.28:5555']`.
+            callback (Callable|None): Listener of every event, called as `callback(event)`. Defaults to None.
+            reconnect_interval (float): Seconds before the first reconnection attempt, doubled after every
+                failed attempt. Defaults to 1
+            max_reconnect_interval (float): Longest wait between reconnection attempts. Defaults to 30
+            capacity (int): Maximum number of events waiting for the `for` iteration, the oldest are
+                dropped first. Defaults to 1000
+        """
+        self.__client = client
+        self.__reconnect_interval = reconnect_interval
+        self.__max_reconnect_interval = max_reconnect_interval
+        self.__listeners = []
+        self.__async_queues = []
+        self.__lock = threading.Lock()
+        self.__closed = threading.Event()
+        self.__buffer = RingBuffer(capacity, 'drop_oldest')
+        self.__states = {serial: DeviceSnapshot(serial) for serial in dict.fromkeys(serials)}
+        self.__streams = {}
+        if callback is not None:
+            self.add_listener(callback)
+        self.__threads = [threading.Thread(target=self.__watch, args=(serial,), name=f'atv-watch-{serial}', daemon=True)
+                          for serial in self.__states]
+        for thread in self.__threads:
+            thread.start()
+
+
+
+    def add_listener(self, callback: Callable, event_types: list|None=None):
+        """
+        The function registers a listener of the device events.
+
+        Args:
+            callback (Callable): Function called as `callback(event)` with a `DeviceEvent`, it runs in the
+                watching thread of the device so it should return quickly.
+            event_types (list|None): The `DeviceEventType` the listener wants. Defaults to all of them.
+        """
+        with self.__lock:
+            self.__listeners.append((callback, set(event_types) if event_types else None))
+
+
+
+    def remove_listener(self, callback: Callable):
+        """
+        The function unregisters a listener.
+
+        Args:
+            callback (Callable): The listener given to `add_listener`.
+        """
+        with self.__lock:
+            self.__listeners = [(listener, types) for listener, types in self.__listeners if listener is not callback]
+
+
+
+    def state(self, serial: str) -> DeviceSnapshot:
+        """
+        The function returns the last known state of a watched device, without any round trip.
+
+        Args:
+            serial (str): Serial of the device.
+
+        Returns:
+            `DeviceSnapshot` with the connection `state` (`device` or `offline`), `powered_on` and `foreground_app`.
+        """
+        with self.__lock:
+            return replace(self.__states[serial])
+
+
+
+    def __emit(self, event: DeviceEvent):
+        with self.__lock:
+            listeners = [callback for callback, types in self.__listeners if types is None or event.type in types]
+            queues = list(self.__async_queues)
+        self.__buffer.put(event)
+        for loop, queue in queues:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+        for callback in listeners:
+            try:
+                callback(event)
+            except Exception as error:
+                Logger.error('Device event listener failed on %s: %s', event.type.value, error)
+
+
+
+    def __update(self, serial: str, state: str|None=None, powered_on: bool|None=None, foreground_app: str|None=None):
+        # records the known parts of the new state and reports what changed
+        events = []
+        with self.__lock:
+            current = self.__states[serial]
+            if powered_on is not None and powered_on != current.powered_on:
+                # the first known value is the starting state, not a change
+                if current.powered_on is not None:
+                    events.append(DeviceEvent(DeviceEventType.POWER_ON if powered_on else DeviceEventType.POWER_OFF, serial, time.time()))
+                current.powered_on = powered_on
+            if foreground_app is not None and foreground_app != current.foreground_app:
+                if current.foreground_app is not None:
+                    events.append(DeviceEvent(DeviceEventType.FOREGROUND_APP, serial, time.time(), foreground_app, current.foreground_app))
+                current.foreground_app = foreground_app
+            if state is not None and state != current.state:
+                if current.state is not None:
+                    event_type = DeviceEventType.RECONNECTED if state == 'device' else DeviceEventType.DISCONNECTED
+                    # reported before the changes that were missed while the device was away
+                    events.insert(0, DeviceEvent(event_type, serial, time.time()))
+                current.state = state
+        for event in events:
+            self.__emit(event)
+
+
+
+    def __handle_record(self, serial: str, tag: str, message: str):
+        if tag in POWER_TAGS:
+            if match := re.search(r'\d+', message):
+                # 0 is off, 1 is on, 2 is dozing which keeps the screen off
+                self.__update(serial, powered_on=match[0] == '1')
+        elif tag in RESUMED_ACTIVITY_TAGS:
+            if match := COMPONENT_PATTERN.search(message):
+                self.__update(serial, foreground_app=match[1])
+
+
+
+    def __watch(self, serial: str):
+        device = self.__client.device(serial)
+        interval = self.__reconnect_interval
+        while not self.__closed.is_set():
+            try:
+                snapshot = device.snapshot(fields=['power', 'foreground_app'])
+                stream = device.logcat_stream(filters=EVENT_FILTERS, buffers=['events'], tail=1)
+            except Exception:
+                # unreachable, try to connect it again after a while
+                self.__update(serial, state='offline')
+                if self.__closed.wait(interval):
+                    break
+                interval = min(interval * 2, self.__max_reconnect_interval)
+                try:
+                    device.reconnect()
+                except Exception:
+                    pass  # the next snapshot fails too
+                continue
+            with self.__lock:
+                self.__streams[serial] = stream
+            if self.__closed.is_set():
+                # closed while the stream was opening, `close` did not see it
+                stream.close()
+            self.__update(serial, state='device', powered_on=snapshot.powered_on, foreground_app=snapshot.foreground_app)
+            opened, records = time.monotonic(), 0
+            for record in stream:
+                records += 1
+                self.__handle_record(serial, record.tag, record.message)
+            stream.close()
+            if self.__closed.is_set():
+                break
+            if records or time.monotonic() - opened >= STABLE_STREAM_TIME:
+                interval = self.__reconnect_interval
+            try:
+                # logcat itself may have ended while the device stayed online, for example when the
+                # events buffer is restricted, so the stream is opened again after the backoff too
+                online = device.get_state() == 'device'
+            except Exception:
+                online = False
+            if not online:
+                self.__update(serial, state='offline')
+            if self.__closed.wait(interval):
+                break
+            interval = min(interval * 2, self.__max_reconnect_interval)
+
+
+
+    def __iter__(self) -> Iterator[DeviceEvent]:
+        return self
+
+
+
+    def __next__(self) -> DeviceEvent:
+        try:
+            return self.__buffer.get()
+        except EOFError:
+            raise StopIteration from None
+
+
+
+    def get(self, timeout: float|None=None) -> DeviceEvent|None:
+        """
+        The function returns the next event, waiting at most `timeout` seconds.
+
+        Args:
+            timeout (float|None): Seconds to wait for an event. Defaults to None (wait forever).
+
+        Returns:
+            The next `DeviceEvent`. `None` if the timeout expired or the watcher is closed.
+        """
+        try:
+            return self.__buffer.get(timeout)
+        except (EOFError, TimeoutError):
+            return None
+
+
+
+    async def events(self, event_types: list|None=None) -> AsyncIterator[DeviceEvent]:
+        """
+        The function iterates over the events from asyncio, until the watcher is closed. Every
+        iteration receives all the events that happen while it runs.
+
+        Args:
+            event_types (list|None): The `DeviceEventType` to receive. Defaults to all of them.
+
+        Returns:
+            Async iterator of `DeviceEvent`.
+        """
+        import asyncio
+        entry = (asyncio.get_running_loop(), asyncio.Queue())
+        with self.__lock:
+            self.__async_queues.append(entry)
+        try:
+            while not self.__closed.is_set():
+                event = await entry[1].get()
+                if event is None:
+                    return
+                if event_types is None or event.type in event_types:
+                    yield event
+        finally:
+            with self.__lock:
+                self.__async_queues.remove(entry)
+
+
+
+    def __aiter__(self) -> AsyncIterator[DeviceEvent]:
+        return self.events()
+
+
+
+    def close(self):
+        """Stops the streams and the watching threads, and ends the iterations."""
+        self.__closed.set()
+        with self.__lock:
+            streams = list(self.__streams.values())
+            queues = list(self.__async_queues)
+        for stream in streams:
+            stream.close()
+        self.__buffer.close()
+        for loop, queue in queues:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+            except RuntimeError:
+                pass  # the loop is already closed
+        for thread in self.__threads:
+            if thread is not threading.current_thread():
+                thread.join(5)
+
+
+
+    def __enter__(self):
+        return self
+
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
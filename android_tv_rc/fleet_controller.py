@@ -0,0 +1,316 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from .logger import Logger
+from .tv_apps import AndroidTVApps
+from .deadline import deadline
+from .adb_client import ADBClient
+from .android_tv_controller import AndroidTVController
+
+
+
+@dataclass
+class FleetResult:
+    """Outcome of one fleet operation, keyed by device IP."""
+
+
+    operation: str
+    results: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+
+
+
+    @property
+    def ok(self) -> bool:
+        """Whether the operation succeeded on every device."""
+        return not self.errors
+
+
+
+    @property
+    def succeeded(self) -> list:
+        """IPs of the devices the operation succeeded on."""
+        return [ip for ip in self.timings if ip not in self.errors]
+
+
+
+    @property
+    def failed(self) -> list:
+        """IPs of the devices the operation failed on."""
+        return list(self.errors)
+
+
+
+    def summary(self) -> str:
+        """
+        The function describes the outcome of the operation in one line.
+
+        Returns:
+            Summary of the succeeded and failed devices and the slowest device time.
+        """
+        slowest = max(self.timings.values(), default=0.0)
+        return (f'{self.operation}: {len(self.succeeded)}/{len(self.timings)} devices succeeded, '
+                f'{len(self.errors)} failed, slowest device took {slowest:.3f}s')
+
+
+
+class _DeviceLane:
+    """FIFO of the pending operations of one device, drained by at most one pool worker at a time."""
+
+
+    def __init__(self):
+        self.pending = deque()
+        self.running = False
+
+
+
+class FleetController:
+    """
+    Drives many Android TV devices concurrently, every device has its own `AndroidTVController`
+    and all of them share one `ADBClient`, driving their TV through a device handle of it. The adb
+    server is probed once and connecting a device does not list all the others again.
+
+    Operations are fanned out over a bounded thread pool. Operations on the same device always run
+    one at a time in submission order, operations on different devices run in parallel. An operation
+    running past `operation_timeout` fails on its device, which frees the device lane.
+
+    Example:
+        with FleetController(['192.168.1.28', '192.168.1.29'], transport='socket') as fleet:
+            fleet.connect()
+            fleet.press_home()
+            result = fleet.snapshot(fields=['power', 'foreground_app'])
+    """
+
+
+
+    def __init__(self, ips: list, max_workers: int=16, verbose: bool=False, show_command: bool=False,
+                 operation_timeout: float|None=None, **client_options):
+        """
+        Args:
+            ips (list): IP addresses of the Android TV devices.
+            max_workers (int): Maximum number of devices driven at the same time. Defaults to 16
+            verbose (bool): Whether to display additional information during the execution. Defaults to False.
+            show_command (bool): Whether to display the executed ADB commands. Defaults to False.
+            operation_timeout (float|None): Seconds one operation may take on one device, its adb commands
+                are killed after. Defaults to the `command_timeout` client option (no limit without it).
+            client_options: Extra keyword arguments passed to the shared `ADBClient`, for example `transport='socket'`.
+        """
+        self.__verbose = verbose
+        self.__operation_timeout = operation_timeout if operation_timeout is not None else client_options.get('command_timeout')
+        self.__adb_client = ADBClient(verbose, show_command, **client_options)
+        self.__controllers = {ip: AndroidTVController(ip, adb_client=self.__adb_client) for ip in dict.fromkeys(ips)}
+        self.__groups = {}
+        self.__lanes = {ip: _DeviceLane() for ip in self.__controllers}
+        self.__lanes_lock = threading.Lock()
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='atv-fleet')
+
+
+
+    def __enter__(self):
+        return self
+
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+
+    def close(self):
+        """Waits for the running operations and stops the worker pool."""
+        self.__executor.shutdown(wait=True)
+
+
+
+    # ------------------------------[ Devices ]------------------------------
+
+
+
+    def get_adb_client(self) -> ADBClient:
+        """
+        The function returns the client shared by the fleet devices.
+
+        Returns:
+            The `ADBClient`.
+        """
+        return self.__adb_client
+
+
+
+    @property
+    def ips(self) -> list:
+        """IP addresses of all the fleet devices."""
+        return list(self.__controllers)
+
+
+
+    def get_controller(self, ip: str) -> AndroidTVController:
+        """
+        The function returns the controller of one fleet device.
+
+        Args:
+            ip (str): IP address of the device.
+
+        Returns:
+            The `AndroidTVController` of the device.
+        """
+        return self.__controllers[ip]
+
+
+
+    def add_group(self, name: str, ips: list):
+        """
+        The function names a group of devices, the name can then be passed as `devices` to any operation.
+
+        Args:
+            name (str): The group name, for example 'lobby'.
+            ips (list): IP addresses of the group devices, they must be part of the fleet.
+
+        Raises:
+            KeyError: if a device is not part of the fleet.
+        """
+        unknown = [ip for ip in ips if ip not in self.__controllers]
+        if unknown:
+            raise KeyError(f'Devices are not part of the fleet: {", ".join(unknown)}')
+        self.__groups[name] = list(dict.fromkeys(ips))
+
+
+
+    def __resolve_devices(self, devices: str|list|None) -> list:
+        if devices is None:
+            return self.ips
+        if isinstance(devices, str):
+            return self.__groups[devices] if devices in self.__groups else [devices]
+        return list(dict.fromkeys(devices))
+
+
+
+    # ------------------------------[ Execution ]------------------------------
+
+
+
+    def __drain(self, lane: _DeviceLane):
+        while True:
+            with self.__lanes_lock:
+                if not lane.pending:
+                    lane.running = False
+                    return
+                task, future = lane.pending.popleft()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(task())
+                except BaseException as error:
+                    future.set_exception(error)
+
+
+
+    def __enqueue(self, ip: str, task: Callable) -> Future:
+        future = Future()
+        lane = self.__lanes[ip]
+        with self.__lanes_lock:
+            lane.pending.append((task, future))
+            if lane.running:
+                return future
+            lane.running = True
+        self.__executor.submit(self.__drain, lane)
+        return future
+
+
+
+    def run(self, operation: str|Callable, *args, devices: str|list|None=None, **kwargs) -> FleetResult:
+        """
+        The function runs an operation on many devices concurrently and waits for all of them.
+
+        Args:
+            operation (str|Callable): Name of an `AndroidTVController` method, for example 'press_home', or
+                a function called as `operation(controller, *args, **kwargs)` for every device.
+            args: Positional arguments of the operation.
+            devices (str|list|None): IP addresses or a group name. Defaults to all the fleet devices.
+            kwargs: Keyword arguments of the operation.
+
+        Returns:
+            `FleetResult` with the result, error and duration of the operation on every device.
+
+        Raises:
+            KeyError: if a device is not part of the fleet.
+        """
+        name = operation if isinstance(operation, str) else getattr(operation, '__name__', repr(operation))
+        ips = self.__resolve_devices(devices)
+        unknown = [ip for ip in ips if ip not in self.__controllers]
+        if unknown:
+            raise KeyError(f'Devices are not part of the fleet: {", ".join(unknown)}')
+        result = FleetResult(name)
+
+        def timed(ip: str) -> Callable:
+            controller = self.__controllers[ip]
+            function = getattr(controller, operation) if isinstance(operation, str) else lambda *a, **kw: operation(controller, *a, **kw)
+            def task() -> Any:
+                started = time.perf_counter()
+                try:
+                    # a hung device fails its operation instead of holding its lane forever
+                    with deadline(self.__operation_timeout):
+                        return function(*args, **kwargs)
+                finally:
+                    result.timings[ip] = time.perf_counter() - started
+            return task
+
+        futures = {ip: self.__enqueue(ip, timed(ip)) for ip in ips}
+        wait(futures.values())
+        for ip, future in futures.items():
+            if future.exception() is not None:
+                result.errors[ip] = future.exception()
+            else:
+                result.results[ip] = future.result()
+        if result.errors:
+            Logger.warning('%s: [bold red]%s[/bold red]', result.summary(), ", ".join(result.failed))
+        elif self.__verbose:
+            Logger.success(result.summary())
+        return result
+
+
+
+    # ------------------------------[ Fleet Commands ]------------------------------
+
+
+
+    def connect(self, devices: str|list|None=None) -> FleetResult:
+        """
+        Start connection to the TV devices, devices that could not be connected are reported as errors.
+        """
+        def connect(controller: AndroidTVController) -> bool:
+            if not controller.connect():
+                raise ConnectionError('Device could not be connected')
+            return True
+        return self.run(connect, devices=devices)
+
+
+
+    def press_home(self, devices: str|list|None=None) -> FleetResult:
+        """Simulates pressing home button on the TV devices."""
+        return self.run('press_home', devices=devices)
+
+
+
+    def press_keys(self, keys: list, inter_key_delay: float|None=None, devices: str|list|None=None) -> FleetResult:
+        """Simulates pressing a sequence of buttons on the TV devices."""
+        return self.run('press_keys', keys, inter_key_delay, devices=devices)
+
+
+
+    def open_app(self, app: AndroidTVApps|str, devices: str|list|None=None) -> FleetResult:
+        """Opens an app on the TV devices, apps that could not be started are reported as errors."""
+        def open_app(controller: AndroidTVController) -> bool:
+            if not controller.open_app(app):
+                raise RuntimeError('App could not be started')
+            return True
+        return self.run(open_app, devices=devices)
+
+
+
+    def snapshot(self, fields: tuple|list|None=None, devices: str|list|None=None) -> FleetResult:
+        """Gets the state of the TV devices, a `DeviceSnapshot` per device."""
+        return self.run('snapshot', fields, devices=devices)
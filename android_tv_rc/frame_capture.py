@@ -0,0 +1,288 @@
+import time
+from typing import Any, Iterator
+from .screen_capture import build_screencap_command, parse_raw_frame
+
+
+
+def import_numpy() -> Any:
+    """
+    The function imports NumPy, which frame capture needs but the rest of the library does not.
+
+    Returns:
+        The `numpy` module.
+
+    Raises:
+        ImportError: if NumPy is not installed, with the command installing it.
+    """
+    try:
+        import numpy
+    except ImportError as error:
+        raise ImportError('Frame capture needs NumPy, install it with: pip install numpy') from error
+    return numpy
+
+
+
+def changed_fraction(frame: Any, other: Any, tolerance: int=16, step: int=2) -> float:
+    """
+    The function measures how much two frames differ, as the fraction of pixels where a color
+    channel moved by more than `tolerance`. Compression noise and dithering stay under the tolerance.
+
+    Args:
+        frame (numpy.ndarray): `(height, width, 4)` RGBA frame.
+        other (numpy.ndarray): Frame of the same shape.
+        tolerance (int): Channel difference (0-255) ignored as noise. Defaults to 16
+        step (int): Compare one pixel every `step` rows and columns, 1 compares them all. Defaults to 2
+
+    Returns:
+        Fraction of changed pixels, from 0.0 (identical) to 1.0.
+    """
+    numpy = import_numpy()
+    if frame.shape != other.shape:
+        return 1.0
+    frame, other = frame[::step, ::step, :3], other[::step, ::step, :3]
+    # max - min of the two frames is their absolute difference without leaving uint8
+    difference = numpy.maximum(frame, other) - numpy.minimum(frame, other)
+    return float((difference.max(axis=2) > tolerance).mean())
+
+
+
+def perceptual_hash(frame: Any, hash_size: int=8) -> int:
+    """
+    The function computes the difference hash (dHash) of a frame: the grayscale frame is shrunk to
+    `hash_size` rows of `hash_size + 1` block averages and every bit tells whether a block is brighter
+    than its right neighbour. Similar screens get hashes a few bits apart.
+
+    Args:
+        frame (numpy.ndarray): `(height, width, 4)` RGBA frame.
+        hash_size (int): Number of rows and bits per row of the hash. Defaults to 8
+
+    Returns:
+        The hash as a `hash_size * hash_size` bits integer.
+    """
+    numpy = import_numpy()
+    height, width = frame.shape[:2]
+    rows, columns = height // hash_size, width // (hash_size + 1)
+    pixels = frame[:rows * hash_size, :columns * (hash_size + 1), :3]
+    gray = pixels @ numpy.array([0.299, 0.587, 0.114], dtype=numpy.float32)
+    blocks = gray.reshape(hash_size, rows, hash_size + 1, columns).mean(axis=(1, 3))
+    bits = (blocks[:, 1:] > blocks[:, :-1]).ravel()
+    return int.from_bytes(numpy.packbits(bits).tobytes(), 'big')
+
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """
+    The function counts the bits two perceptual hashes differ in.
+
+    Args:
+        first (int): A perceptual hash.
+        second (int): Another perceptual hash.
+
+    Returns:
+        Number of different bits, 0 for identical hashes.
+    """
+    return bin(first ^ second).count('1')
+
+
+
+class FrameCapture:
+    """
+    Captures the screen of one device as NumPy arrays, built on raw `screencap`.
+
+    Frames are read straight into a few preallocated buffers that are reused in turn, a capture
+    allocates nothing once the screen size is known. A returned frame is a view of its buffer, it
+    stays valid until `buffers` more frames are captured, copy it to keep it longer.
+
+    Example:
+        capture = FrameCapture(client.device())
+        reference = capture.grab().copy()
+        client.send_keyevent_input(KeyCodes.KEYCODE_DPAD_DOWN)
+        capture.wait_for_change(reference)
+        capture.wait_for_settle()
+    """
+
+
+
+    def __init__(self, device: Any, fps: float=4.0, buffers: int=3, tolerance: int=16, step: int=2):
+        """
+        Args:
+            device (ADBDevice): Handle of the device to capture.
+            fps (float): Target capture rate of the frames iterator and of the wait functions. Defaults to 4
+            buffers (int): Number of preallocated frame buffers reused in turn, at least 2. Defaults to 3
+            tolerance (int): Channel difference (0-255) ignored as noise when comparing frames. Defaults to 16
+            step (int): Compare one pixel every `step` rows and columns. Defaults to 2
+
+        Raises:
+            ImportError: if NumPy is not installed.
+            ValueError: if less than 2 buffers are requested.
+        """
+        self.__numpy = import_numpy()
+        if buffers < 2:
+            raise ValueError('Frame capture needs at least 2 buffers')
+        self.__device = device
+        self.__command = build_screencap_command('raw')
+        self.__interval = 1.0 / fps
+        self.__tolerance = tolerance
+        self.__step = step
+        self.__buffer_count = buffers
+        self.__buffers = []
+        self.__frames = []
+        self.__next = 0
+        self.__reference = None
+
+
+
+    @property
+    def serial(self) -> str|None:
+        """Serial of the captured device."""
+        return self.__device.serial
+
+
+
+    @property
+    def shape(self) -> tuple|None:
+        """Shape `(height, width, 4)` of the frames, `None` before the first capture."""
+        return self.__frames[0].shape if self.__frames else None
+
+
+
+    def __allocate(self, output: memoryview):
+        frame = parse_raw_frame(output)
+        if frame.bytes_per_pixel != 4:
+            raise ValueError(f'Unsupported screencap pixel format: {frame.pixel_format}')
+        header_size = len(output) - len(frame.data)
+        self.__buffers = [bytearray(len(output)) for _ in range(self.__buffer_count)]
+        self.__buffers[0][:] = output
+        self.__frames = [self.__numpy.frombuffer(buffer, self.__numpy.uint8, offset=header_size).reshape(frame.height, frame.width, 4)
+                         for buffer in self.__buffers]
+        self.__next = 1 % self.__buffer_count
+        return self.__frames[0]
+
+
+
+    def grab(self) -> Any:
+        """
+        The function captures one frame.
+
+        Returns:
+            `(height, width, 4)` RGBA `numpy.ndarray`, a view of a reused buffer.
+
+        Raises:
+            ValueError: if the device pixel format is not 4 bytes per pixel.
+        """
+        if not self.__buffers:
+            return self.__allocate(self.__device.exec_out(self.__command))
+        index = self.__next
+        self.__next = (index + 1) % self.__buffer_count
+        buffer = self.__buffers[index]
+        try:
+            size = self.__device.exec_out(self.__command, sink=buffer)
+        except BufferError:
+            # the screen grew, for example after a resolution switch
+            return self.__allocate(self.__device.exec_out(self.__command))
+        if size != len(buffer):
+            return self.__allocate(memoryview(buffer)[:size])
+        return self.__frames[index]
+
+
+
+    def frames(self, count: int|None=None) -> Iterator[Any]:
+        """
+        The function yields frames at the target rate, a capture slower than the rate is followed
+        directly by the next one.
+
+        Args:
+            count (int|None): Number of frames to yield. Defaults to None (forever).
+
+        Returns:
+            Iterator of `(height, width, 4)` RGBA `numpy.ndarray`.
+        """
+        captured = 0
+        deadline = time.monotonic()
+        while count is None or captured < count:
+            yield self.grab()
+            captured += 1
+            deadline += self.__interval
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                deadline = time.monotonic()
+
+
+
+    def difference(self, frame: Any, other: Any) -> float:
+        """
+        The function measures how much two frames differ with the capture tolerance and step, see `changed_fraction`.
+
+        Returns:
+            Fraction of changed pixels, from 0.0 (identical) to 1.0.
+        """
+        return changed_fraction(frame, other, self.__tolerance, self.__step)
+
+
+
+    def snapshot_reference(self) -> Any:
+        """
+        The function captures a frame into the reference buffer, which the next captures never
+        overwrite, for `wait_for_change`.
+
+        Returns:
+            The reference `numpy.ndarray`.
+        """
+        frame = self.grab()
+        if self.__reference is None or self.__reference.shape != frame.shape:
+            self.__reference = self.__numpy.empty_like(frame)
+        self.__numpy.copyto(self.__reference, frame)
+        return self.__reference
+
+
+
+    def wait_for_change(self, reference: Any=None, threshold: float=0.001, timeout: float=5.0) -> Any|None:
+        """
+        The function captures frames until the screen differs from a reference frame.
+
+        Args:
+            reference (numpy.ndarray|None): The frame to compare with. Defaults to the last `snapshot_reference`,
+                or a frame captured now.
+            threshold (float): Fraction of changed pixels that counts as a change. Defaults to 0.001
+            timeout (float): Seconds to wait for a change. Defaults to 5
+
+        Returns:
+            The first changed frame. `None` if the screen did not change in time.
+        """
+        if reference is None:
+            reference = self.__reference if self.__reference is not None else self.snapshot_reference()
+        deadline = time.monotonic() + timeout
+        for frame in self.frames():
+            if self.difference(frame, reference) > threshold:
+                return frame
+            if time.monotonic() >= deadline:
+                return None
+
+
+
+    def wait_for_settle(self, stable_time: float=0.5, threshold: float=0.001, timeout: float=10.0) -> Any|None:
+        """
+        The function captures frames until the screen stops changing, for example once an animation
+        or a page load ended.
+
+        Args:
+            stable_time (float): Seconds the screen must stay unchanged. Defaults to 0.5
+            threshold (float): Fraction of changed pixels still counted as unchanged. Defaults to 0.001
+            timeout (float): Seconds to wait for the screen to settle. Defaults to 10
+
+        Returns:
+            The settled frame. `None` if the screen kept changing until the timeout.
+        """
+        deadline = time.monotonic() + timeout
+        previous, stable_since = None, time.monotonic()
+        for frame in self.frames():
+            now = time.monotonic()
+            if previous is None or self.difference(frame, previous) > threshold:
+                stable_since = now
+            elif now - stable_since >= stable_time:
+                return frame
+            if now >= deadline:
+                return None
+            previous = frame
@@ -0,0 +1,301 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable
+from .logger import Logger
+from .key_codes import KeyCodes
+
+
+
+# keys jumping ahead of the queued keys, they also make the queued navigation stale
+PRIORITY_KEYS = frozenset({KeyCodes.KEYCODE_POWER, KeyCodes.KEYCODE_TV_POWER, KeyCodes.KEYCODE_HOME,
+                           KeyCodes.KEYCODE_SLEEP, KeyCodes.KEYCODE_WAKEUP})
+
+NAVIGATION_KEYS = frozenset({KeyCodes.KEYCODE_DPAD_UP, KeyCodes.KEYCODE_DPAD_DOWN, KeyCodes.KEYCODE_DPAD_LEFT,
+                             KeyCodes.KEYCODE_DPAD_RIGHT, KeyCodes.KEYCODE_DPAD_CENTER})
+
+
+
+@dataclass
+class InputQueueStats:
+    """
+    Counters of an `InputScheduler`. `coalesced` is the number of adb round trips saved by sending
+    queued keys together, wait times are the seconds between a press and the key being sent.
+    """
+
+
+    queue_depth: int
+    peak_queue_depth: int
+    pressed: int
+    sent: int
+    batches: int
+    dropped: int
+    failed: int
+    mean_wait: float
+    max_wait: float
+
+
+
+    @property
+    def coalesced(self) -> int:
+        """Number of keys sent in the same adb call as a previous key."""
+        return self.sent - self.batches
+
+
+
+class _Press:
+    """Keys of one `press` call, its future completes when the last of them is sent or dropped."""
+
+
+
+    def __init__(self, count: int):
+        self.future = Future()
+        self.remaining = count
+        self.dropped = False
+
+
+
+    def settle(self, sent: bool):
+        self.remaining -= 1
+        self.dropped = self.dropped or not sent
+        if self.remaining == 0 and not self.future.done():
+            self.future.set_result(not self.dropped)
+
+
+
+class InputScheduler:
+    """
+    Per-device queue in front of the key input, for remotes pressed faster than adb can deliver.
+
+    A worker thread sends the queued keys: every key waiting when the device is free goes in one
+    `input keyevent K1 K2 ..` call, so a run of presses costs one round trip instead of one each.
+    Priority keys (`POWER`, `HOME` ..) jump ahead of the queue and drop the navigation keys still
+    queued, which would land on a screen that is about to change. A `press(.., supersede=True)`
+    drops them too, for a new intent replacing the previous one. With `max_rate` the keys of a
+    call are spaced on the device and the next call waits, so the rate is never exceeded.
+
+    Example:
+        queue = client.input_queue(max_rate=10)
+        queue.press(KeyCodes.KEYCODE_VOLUME_UP)
+        queue.press(KeyCodes.KEYCODE_HOME).result() # True once sent
+        print(queue.stats())
+    """
+
+
+
+    def __init__(self, send_keys: Callable, send_key: Callable, max_rate: float|None=None, max_batch: int=32):
+        """
+        Args:
+            send_keys (Callable): Called as `send_keys(keys, inter_key_delay)` to send keys in one call,
+                like `ADBDevice.send_keyevent_sequence`.
+            send_key (Callable): Called as `send_key(keycode, long_press)` for long presses, like
+                `ADBDevice.send_keyevent_input`.
+            max_rate (float|None): Maximum keys per second. Defaults to None (as fast as adb goes).
+            max_batch (int): Maximum keys sent in one call. Defaults to 32
+
+        Raises:
+            ValueError: if `max_rate` is not positive or `max_batch` is below 1.
+        """
+        if max_rate is not None and max_rate <= 0:
+            raise ValueError('Input scheduler max_rate must be positive')
+        if max_batch < 1:
+            raise ValueError('Input scheduler max_batch must be at least 1')
+        self.__send_keys = send_keys
+        self.__send_key = send_key
+        self.__max_rate = max_rate
+        self.__max_batch = max_batch
+        self.__urgent = deque()
+        self.__normal = deque()
+        self.__condition = threading.Condition()
+        self.__closed = False
+        self.__sending = False
+        self.__next_send = 0.0
+        self.__peak_queue_depth = 0
+        self.__pressed = 0
+        self.__sent = 0
+        self.__batches = 0
+        self.__dropped = 0
+        self.__failed = 0
+        self.__total_wait = 0.0
+        self.__max_wait = 0.0
+        self.__worker = threading.Thread(target=self.__run, name='atv-input-scheduler', daemon=True)
+        self.__worker.start()
+
+
+
+    @property
+    def max_rate(self) -> float|None:
+        """Maximum keys per second, `None` if not limited."""
+        return self.__max_rate
+
+
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of keys waiting to be sent."""
+        return len(self.__urgent) + len(self.__normal)
+
+
+
+    def press(self, keys: KeyCodes|list, long_press: bool=False, supersede: bool=False) -> Future:
+        """
+        The function queues key presses and returns right away.
+
+        Args:
+            keys (KeyCodes|list): Key, or list of keys pressed in order.
+            long_press (bool): Whether the keys are long pressed, they are then sent one by one. Defaults to False.
+            supersede (bool): Whether to drop the navigation keys still queued. Defaults to False.
+
+        Returns:
+            Future completing with `True` once the keys are sent, `False` if any of them was dropped
+            (superseded, or the scheduler closed).
+        """
+        keys = [keys] if isinstance(keys, KeyCodes) else list(keys)
+        press = _Press(len(keys))
+        if not keys:
+            press.future.set_result(True)
+            return press.future
+        now = time.monotonic()
+        with self.__condition:
+            if self.__closed:
+                for _ in keys:
+                    press.settle(False)
+                return press.future
+            if supersede or any(keycode in PRIORITY_KEYS for keycode in keys):
+                self.__drop_navigation()
+            for keycode in keys:
+                queue = self.__urgent if keycode in PRIORITY_KEYS else self.__normal
+                queue.append((keycode, long_press, now, press))
+            self.__pressed += len(keys)
+            self.__peak_queue_depth = max(self.__peak_queue_depth, self.queue_depth)
+            self.__condition.notify_all()
+        return press.future
+
+
+
+    def __drop_navigation(self):
+        kept = deque()
+        for entry in self.__normal:
+            if entry[0] in NAVIGATION_KEYS:
+                self.__dropped += 1
+                entry[3].settle(False)
+            else:
+                kept.append(entry)
+        self.__normal = kept
+
+
+
+    def __next_batch(self) -> list|None:
+        # waits under the lock for keys and for the rate limit, urgent keys arriving meanwhile go first
+        while True:
+            queue = self.__urgent or self.__normal
+            if self.__closed:
+                return None
+            if not queue:
+                self.__condition.wait()
+                continue
+            delay = self.__next_send - time.monotonic()
+            if delay > 0:
+                self.__condition.wait(delay)
+                continue
+            break
+        batch = [queue.popleft()]
+        if not batch[0][1]:
+            while queue and len(batch) < self.__max_batch and not queue[0][1]:
+                batch.append(queue.popleft())
+        if self.__max_rate is not None:
+            self.__next_send = time.monotonic() + len(batch) / self.__max_rate
+        self.__sending = True
+        return batch
+
+
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                batch = self.__next_batch()
+            if batch is None:
+                return
+            keys = [entry[0] for entry in batch]
+            sent_at = time.monotonic()
+            error = None
+            try:
+                if batch[0][1]:
+                    self.__send_key(keys[0], True)
+                else:
+                    inter_key_delay = 1 / self.__max_rate if self.__max_rate is not None and len(keys) > 1 else None
+                    self.__send_keys(keys, inter_key_delay)
+            except Exception as exception:
+                error = exception
+                Logger.warning('Sending keys %s failed: %s', " ".join(keycode.name for keycode in keys), exception)
+            with self.__condition:
+                self.__sending = False
+                self.__batches += 1
+                for _, _, enqueued, press in batch:
+                    wait = sent_at - enqueued
+                    self.__total_wait += wait
+                    self.__max_wait = max(self.__max_wait, wait)
+                    if error is None:
+                        self.__sent += 1
+                        press.settle(True)
+                    else:
+                        self.__failed += 1
+                        press.remaining -= 1
+                        if not press.future.done():
+                            press.future.set_exception(error)
+                self.__condition.notify_all()
+
+
+
+    def flush(self, timeout: float|None=None) -> bool:
+        """
+        The function waits until every queued key is sent.
+
+        Args:
+            timeout (float|None): Seconds to wait. Defaults to None (wait forever).
+
+        Returns:
+            Boolean indicates if the queue is empty, `False` if the timeout expired.
+        """
+        with self.__condition:
+            return self.__condition.wait_for(lambda: self.__closed or not (self.__urgent or self.__normal or self.__sending), timeout)
+
+
+
+    def stats(self) -> InputQueueStats:
+        """
+        The function returns the counters of the scheduler.
+
+        Returns:
+            `InputQueueStats` with the queue depth, key counts and wait times.
+        """
+        with self.__condition:
+            waited = self.__sent + self.__failed
+            return InputQueueStats(self.queue_depth, self.__peak_queue_depth, self.__pressed, self.__sent, self.__batches,
+                                   self.__dropped, self.__failed, self.__total_wait / waited if waited else 0.0, self.__max_wait)
+
+
+
+    def close(self):
+        """Stops the worker, the keys still queued are dropped."""
+        with self.__condition:
+            self.__closed = True
+            for queue in (self.__urgent, self.__normal):
+                while queue:
+                    self.__dropped += 1
+                    queue.popleft()[3].settle(False)
+            self.__condition.notify_all()
+        if threading.current_thread() is not self.__worker:
+            self.__worker.join()
+
+
+
+    def __enter__(self):
+        return self
+
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,125 @@
+import re
+import threading
+from .package_index import PackageIndex
+
+
+
+class LauncherCatalog:
+    """
+    Launcher activity of the apps of a device, for example `com.netflix.ninja/.MainActivity`.
+
+    Every leanback launcher activity of a device is resolved with a single shell query (`QUERY`), the
+    entries are keyed by the device build fingerprint and the package version code, so they stay valid
+    until the app or the system is updated.
+    """
+
+
+    SECTION_MARKER = '__ATV_RC_SECTION__'
+
+    QUERY = '; '.join([
+        'getprop ro.build.fingerprint',
+        f'echo {SECTION_MARKER}',
+        PackageIndex.QUERY,
+        f'echo {SECTION_MARKER}',
+        'cmd package query-activities --brief -a android.intent.action.MAIN -c android.intent.category.LEANBACK_LAUNCHER',
+        f'echo {SECTION_MARKER}',
+        'cmd package query-activities --brief -a android.intent.action.MAIN -c android.intent.category.LAUNCHER',
+        'true',  # older devices without `cmd package` still answer with the other sections
+    ])
+
+
+
+    def __init__(self):
+        self.__components = {}
+        self.__lock = threading.Lock()
+
+
+
+    @staticmethod
+    def parse_components(query_activities_output: str) -> dict:
+        """
+        The function parses the output of `cmd package query-activities --brief` into launcher components.
+
+        Args:
+            query_activities_output (str): Output of `cmd package query-activities --brief`.
+
+        Returns:
+            Dictionary of package name to its first launcher component.
+        """
+        components = {}
+        for match in re.finditer(r'^\s*([\w.]+)/([\w.$]+)\s*$', query_activities_output, re.MULTILINE):
+            components.setdefault(match.group(1), f'{match.group(1)}/{match.group(2)}')
+        return components
+
+
+
+    @classmethod
+    def parse_query(cls, query_output: str) -> tuple[str, dict, dict]:
+        """
+        The function parses the output of the catalog `QUERY`.
+
+        Args:
+            query_output (str): Output of the `QUERY` shell script.
+
+        Returns:
+            Tuple of the build fingerprint, the version code of every installed package and the launcher
+            component of every launchable package, leanback launcher activities first. The version codes
+            are `None` on devices without `pm list packages --show-versioncode` (before Android 9).
+        """
+        sections = (query_output.split(cls.SECTION_MARKER) + ['', '', ''])[:4]
+        fingerprint, packages, leanback, launcher = [section.strip() for section in sections]
+        components = cls.parse_components(launcher)
+        components.update(cls.parse_components(leanback))
+        # without version codes the entries are only invalidated by a system update
+        version_codes = PackageIndex.parse_version_codes(packages) or dict.fromkeys(PackageIndex.parse(packages))
+        return fingerprint, version_codes, components
+
+
+
+    def is_known(self, fingerprint: str, package: str, version_code: int|None) -> bool:
+        """
+        The function checks if a package version was already resolved, with or without a launcher activity.
+
+        Args:
+            fingerprint (str): The device build fingerprint.
+            package (str): The package name.
+            version_code (int|None): The installed version code of the package, `None` if the device does not report it.
+
+        Returns:
+            Boolean indicates if the package version is in the catalog.
+        """
+        with self.__lock:
+            return (fingerprint, package, version_code) in self.__components
+
+
+
+    def lookup(self, fingerprint: str, package: str, version_code: int|None) -> str|None:
+        """
+        The function returns the launcher component of a package version.
+
+        Args:
+            fingerprint (str): The device build fingerprint.
+            package (str): The package name.
+            version_code (int|None): The installed version code of the package, `None` if the device does not report it.
+
+        Returns:
+            The launcher component in form of package/activity. `None` if unknown or not launchable.
+        """
+        with self.__lock:
+            return self.__components.get((fingerprint, package, version_code))
+
+
+
+    def update(self, fingerprint: str, version_codes: dict, components: dict):
+        """
+        The function records the result of a catalog query, packages without launcher activity are
+        recorded too so they are not queried again.
+
+        Args:
+            fingerprint (str): The device build fingerprint.
+            version_codes (dict): Version code of every installed package, `None` if the device does not report it.
+            components (dict): Launcher component of every launchable package.
+        """
+        with self.__lock:
+            for package, version_code in version_codes.items():
+                self.__components[(fingerprint, package, version_code)] = components.get(package)
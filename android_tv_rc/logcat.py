@@ -0,0 +1,329 @@
+import re
+import time
+import struct
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Iterator
+from .logger import Logger
+
+
+
+LEVELS = ('V', 'D', 'I', 'W', 'E', 'F', 'S')
+
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+# logcat priorities of the binary format, 2 (verbose) to 8 (silent)
+BINARY_PRIORITIES = {2: 'V', 3: 'D', 4: 'I', 5: 'W', 6: 'E', 7: 'F', 8: 'S'}
+
+THREADTIME_PATTERN = re.compile(r'^(\d\d-\d\d \d\d:\d\d:\d\d\.\d+)\s+(\d+)\s+(\d+)\s+([VDIWEFS])\s+(.*?)\s*: (.*)$')
+
+
+
+@dataclass
+class LogcatRecord:
+    """One device log entry."""
+
+
+    timestamp: str
+    pid: int
+    tid: int
+    level: str
+    tag: str
+    message: str
+
+
+
+def parse_threadtime_line(line: str) -> LogcatRecord|None:
+    """
+    The function parses one line of `logcat -v threadtime`.
+
+    Args:
+        line (str): The log line, for example `10-17 12:00:00.123  1234  1256 I ActivityManager: Start proc`.
+
+    Returns:
+        The log record. `None` for lines that are not log entries, like `--------- beginning of main`.
+    """
+    match = THREADTIME_PATTERN.match(line.rstrip('\r\n'))
+    if match is None:
+        return None
+    timestamp, pid, tid, level, tag, message = match.groups()
+    return LogcatRecord(timestamp, int(pid), int(tid), level, tag, message)
+
+
+
+def parse_binary_entries(buffer: bytearray) -> list:
+    """
+    The function parses the complete `logcat -B` entries at the start of a buffer and removes them
+    from it, an incomplete entry stays in the buffer until more bytes arrive.
+
+    Args:
+        buffer (bytearray): Bytes read from `logcat -B`.
+
+    Returns:
+        List of the parsed log records.
+    """
+    records = []
+    while len(buffer) >= 20:
+        payload_size, header_size, pid, tid, seconds, nanoseconds = struct.unpack_from('<HHiIII', buffer)
+        # version 1 entries have no header size field, it is padding set to 0
+        header_size = header_size or 20
+        if len(buffer) < header_size + payload_size:
+            break
+        payload = bytes(buffer[header_size:header_size + payload_size])
+        del buffer[:header_size + payload_size]
+        level = BINARY_PRIORITIES.get(payload[0], 'V') if payload else 'V'
+        tag, _, message = payload[1:].partition(b'\0')
+        timestamp = time.strftime('%m-%d %H:%M:%S', time.localtime(seconds)) + f'.{nanoseconds // 1000000:03d}'
+        records.append(LogcatRecord(timestamp, pid, tid, level, tag.decode('utf-8', errors='replace'),
+                                    message.rstrip(b'\0').decode('utf-8', errors='replace')))
+    return records
+
+
+
+def build_logcat_command(filters: list|None=None, binary: bool=False, buffers: list|None=None, pid: int|None=None,
+                         regex: str|None=None, tail: int|None=None, dump: bool=False) -> str:
+    """
+    The function builds the `logcat` shell command, every filter is applied on the device so only
+    the matching entries cross the network.
+
+    Args:
+        filters (list|None): logcat filter specs, for example `['ActivityManager:I', '*:S']`.
+        binary (bool): Whether to read the binary format (`-B`) instead of `-v threadtime`. Defaults to False.
+        buffers (list|None): Log buffers to read, for example `['main', 'system']`. Defaults to the device defaults.
+        pid (int|None): Only read the entries of this process id.
+        regex (str|None): Only read the entries whose message matches this regular expression.
+        tail (int|None): Start with the last `tail` entries instead of the whole buffer.
+        dump (bool): Whether to exit once the buffer is read instead of following new entries. Defaults to False.
+
+    Returns:
+        The shell command.
+    """
+    command = ['logcat', '-B' if binary else '-v threadtime']
+    if dump:
+        command.append('-d')
+    if buffers:
+        command += [f'-b {buffer}' for buffer in buffers]
+    if tail is not None:
+        command.append(f'-T {int(tail)}')
+    if pid is not None:
+        command.append(f'--pid={int(pid)}')
+    if regex:
+        command.append("-e '" + regex.replace("'", "'\\''") + "'")
+    command += [str(spec) for spec in filters or []]
+    return ' '.join(command)
+
+
+
+class RingBuffer:
+    """
+    Bounded thread-safe FIFO between a producer and a slow consumer. When it is full the `policy`
+    decides: `drop_oldest` drops the oldest item, `drop_newest` drops the new item and `block` makes
+    the producer wait for room.
+    """
+
+
+
+    def __init__(self, capacity: int=10000, policy: str='drop_oldest'):
+        """
+        Args:
+            capacity (int): Maximum number of items kept. Defaults to 10000
+            policy (str): What to do when full [drop_oldest | drop_newest | block]. Defaults to drop_oldest
+
+        Raises:
+            ValueError: if the policy is unknown or the capacity is not positive.
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f'Unknown overflow policy: {policy}, use one of [{" | ".join(OVERFLOW_POLICIES)}]')
+        if capacity < 1:
+            raise ValueError('Ring buffer capacity must be at least 1')
+        self.__items = deque()
+        self.__capacity = capacity
+        self.__policy = policy
+        self.__dropped = 0
+        self.__closed = False
+        self.__condition = threading.Condition()
+
+
+
+    @property
+    def dropped(self) -> int:
+        """Number of items dropped because the buffer was full."""
+        return self.__dropped
+
+
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+
+
+    def put(self, item: Any) -> bool:
+        """
+        The function adds an item, applying the overflow policy when the buffer is full.
+
+        Args:
+            item (Any): The item.
+
+        Returns:
+            Boolean indicates if the item was added, `False` if it was dropped or the buffer is closed.
+        """
+        with self.__condition:
+            if self.__closed:
+                return False
+            if len(self.__items) >= self.__capacity:
+                if self.__policy == 'drop_newest':
+                    self.__dropped += 1
+                    return False
+                if self.__policy == 'drop_oldest':
+                    self.__items.popleft()
+                    self.__dropped += 1
+                else:
+                    self.__condition.wait_for(lambda: self.__closed or len(self.__items) < self.__capacity)
+                    if self.__closed:
+                        return False
+            self.__items.append(item)
+            self.__condition.notify_all()
+            return True
+
+
+
+    def get(self, timeout: float|None=None) -> Any:
+        """
+        The function removes and returns the oldest item, waiting for one if the buffer is empty.
+
+        Args:
+            timeout (float|None): Seconds to wait for an item. Defaults to None (wait forever).
+
+        Returns:
+            The oldest item.
+
+        Raises:
+            EOFError: if the buffer is closed and empty.
+            TimeoutError: if no item arrived within the timeout.
+        """
+        with self.__condition:
+            if not self.__condition.wait_for(lambda: self.__items or self.__closed, timeout):
+                raise TimeoutError('No item arrived in time')
+            if not self.__items:
+                raise EOFError('Ring buffer is closed')
+            item = self.__items.popleft()
+            self.__condition.notify_all()
+            return item
+
+
+
+    def close(self):
+        """Closes the buffer, the items already in it can still be read."""
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+
+
+
+class LogcatStream:
+    """
+    Iterator over the log records of a device, read incrementally from one long-lived `logcat`.
+
+    A reader thread parses the entries into a bounded `RingBuffer`, so memory stays bounded whatever
+    the log rate. With the `block` policy a slow consumer slows the reading down, the unread output
+    then waits in the adb connection (and on the device) instead of in memory.
+
+    Example:
+        with client.logcat_stream(filters=['ActivityManager:I', '*:S']) as records:
+            for record in records:
+                print(record.tag, record.message)
+    """
+
+
+
+    def __init__(self, stream: Any, binary: bool=False, capacity: int=10000, policy: str='drop_oldest'):
+        """
+        Args:
+            stream (SocketStream|ProcessStream): Stream of the running `logcat` command.
+            binary (bool): Whether the stream carries the binary format. Defaults to False.
+            capacity (int): Maximum number of records waiting for the consumer. Defaults to 10000
+            policy (str): What to do when the consumer is too slow [drop_oldest | drop_newest | block].
+                Defaults to drop_oldest
+        """
+        self.__stream = stream
+        self.__binary = binary
+        self.__buffer = RingBuffer(capacity, policy)
+        self.__closed = threading.Event()
+        self.__reader = threading.Thread(target=self.__read, name='atv-logcat', daemon=True)
+        self.__reader.start()
+
+
+
+    @property
+    def dropped(self) -> int:
+        """Number of records dropped because the consumer was too slow."""
+        return self.__buffer.dropped
+
+
+
+    def __read(self):
+        try:
+            pending = bytearray()
+            while chunk := (self.__stream.read() if self.__binary else self.__stream.readline()):
+                if self.__binary:
+                    pending += chunk
+                    records = parse_binary_entries(pending)
+                else:
+                    record = parse_threadtime_line(chunk.decode('utf-8', errors='replace'))
+                    records = [record] if record else []
+                for record in records:
+                    self.__buffer.put(record)
+        except (OSError, ValueError):
+            if not self.__closed.is_set():
+                Logger.warning('Logcat stream ended unexpectedly')
+        finally:
+            self.__buffer.close()
+
+
+
+    def __iter__(self) -> Iterator[LogcatRecord]:
+        return self
+
+
+
+    def __next__(self) -> LogcatRecord:
+        try:
+            return self.__buffer.get()
+        except EOFError:
+            raise StopIteration from None
+
+
+
+    def get(self, timeout: float|None=None) -> LogcatRecord|None:
+        """
+        The function returns the next record, waiting at most `timeout` seconds.
+
+        Args:
+            timeout (float|None): Seconds to wait for a record. Defaults to None (wait forever).
+
+        Returns:
+            The next log record. `None` if the timeout expired or the stream ended.
+        """
+        try:
+            return self.__buffer.get(timeout)
+        except (EOFError, TimeoutError):
+            return None
+
+
+
+    def close(self):
+        """Stops `logcat` on the device and the reader thread."""
+        self.__closed.set()
+        self.__buffer.close()
+        self.__stream.close()
+
+
+
+    def __enter__(self):
+        return self
+
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
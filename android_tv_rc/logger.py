@@ -1,62 +1,208 @@
-import cowsay
+import re
 import random
-from rich.console import Console
+import logging
+from typing import Any
+
+
+
+DEBUG = 10
+INFO = 20
+SUCCESS = 25
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVELS = {'debug': DEBUG, 'info': INFO, 'success': SUCCESS, 'warning': WARNING, 'error': ERROR, 'off': OFF}
+
+# levels of the records sent to the `logging` backend, a success is an info record
+LOGGING_LEVELS = {DEBUG: logging.DEBUG, INFO: logging.INFO, SUCCESS: logging.INFO, WARNING: logging.WARNING, ERROR: logging.ERROR, OFF: OFF}
+
+# Rich markup tags like [bold blue] and [/bold blue], removed from the `logging` records
+MARKUP_TAG = re.compile(r'\[/?(?:[a-z][\w .#,=-]*)?\]')
 
 
 
 class Logger:
-    """Pretty logging utils by the awesome Rich library"""
+    """
+    Pretty logging utils by the awesome Rich library, or structured records of the standard `logging` module.
+
+    Messages take `%` style arguments which are only formatted when the level of the message is enabled,
+    for example `Logger.info('Connecting to [bold green]%s[/bold green] ..', ip)`. Rich and cowsay are only
+    imported when the first message is printed. Only warnings and errors are shown until a client is created
+    with `verbose=True` or a level is set with `set_level`.
+    """
+
+
+    __level = WARNING
+    __level_set = False
+    __console = None
+    __logger = None
+
+
+
+    @classmethod
+    def set_level(cls, level: str|int):
+        """
+        The function sets the lowest level of the messages shown, the others are skipped before any formatting.
+
+        Args:
+            level (str|int): One of [debug | info | success | warning | error | off], or its number.
+        """
+        cls.__level = LEVELS[level.lower()] if isinstance(level, str) else level
+        cls.__level_set = True
+
+
+
+    @classmethod
+    def set_verbose(cls, verbose: bool=True):
+        """
+        The function shows the info and success messages, the clients created with `verbose=True` call it.
+        A quiet client never hides the messages of a verbose one, and a level set with `set_level` is kept.
+
+        Args:
+            verbose (bool): Whether the info and success messages are shown. Defaults to True
+        """
+        if verbose and not cls.__level_set:
+            cls.__level = INFO
+
+
+
+    @classmethod
+    def is_enabled(cls, level: str|int) -> bool:
+        """
+        The function checks whether messages of a level are shown, to skip building expensive messages.
+
+        Args:
+            level (str|int): One of [debug | info | success | warning | error], or its number.
+
+        Returns:
+            Boolean indicates if the messages of the level are shown.
+        """
+        level = LEVELS[level.lower()] if isinstance(level, str) else level
+        return level >= cls.__level and (cls.__logger is None or cls.__logger.isEnabledFor(LOGGING_LEVELS[level]))
+
+
 
+    @classmethod
+    def use_rich(cls, console: Any=None):
+        """
+        The function prints the messages with Rich, the default backend.
+
+        Args:
+            console (Any): The `rich.console.Console` to print to. Defaults to a console on the standard output.
+        """
+        cls.__console = console
+        cls.__logger = None
+
+
+
+    @classmethod
+    def use_logging(cls, logger: logging.Logger|str='android_tv_rc'):
+        """
+        The function sends the messages to the standard `logging` module instead of printing them. Records
+        have no Rich markup, their arguments are formatted by the handlers and their `atv_level` attribute
+        keeps the level name (successes are info records). The logger configuration decides which records
+        are kept, the level set with `set_level` still applies first.
+
+        Args:
+            logger (logging.Logger|str): The logger or its name. Defaults to android_tv_rc
+        """
+        cls.__logger = logging.getLogger(logger) if isinstance(logger, str) else logger
 
-    console = Console(force_jupyter=False)
+
+
+    @classmethod
+    def get_console(cls) -> Any:
+        """
+        The function returns the Rich console the messages are printed to, creating it on first use.
+
+        Returns:
+            The `rich.console.Console`.
+        """
+        if cls.__console is None:
+            from rich.console import Console
+            cls.__console = Console(force_jupyter=False)
+        return cls.__console
+
+
+
+    @classmethod
+    def __log(cls, level: int, message: str, args: tuple) -> bool:
+        # sends the message to the logging backend, returns False when Rich prints it
+        if cls.__logger is None:
+            return False
+        logging_level = LOGGING_LEVELS[level]
+        if cls.__logger.isEnabledFor(logging_level):
+            name = next(name for name, number in LEVELS.items() if number == level)
+            cls.__logger.log(logging_level, MARKUP_TAG.sub('', message), *args, extra={'atv_level': name}, stacklevel=3)
+        return True
+
+
+
+    @staticmethod
+    def __format(message: str, args: tuple) -> str:
+        return message % args if args else message
 
 
 
     @classmethod
     def welcome(cls, class_desc=''):
+        if cls.__level > INFO or cls.__log(INFO, 'Hello people of Earth, this class is to %s', (class_desc,)):
+            return
+        import cowsay
         welcome_message = f'''
             Hello people of Earth, this class is to
             {class_desc}
         '''
-        cls.console.print('\n\n[green bold]--------------------[ [yellow2]Made with [red]:heart:[/red] and :coffee: by [i sky_blue1]Jekso[/i sky_blue1][/yellow2] ]--------------------[/green bold]\n\n')
-        cls.console.print('[green bold]' + cowsay.get_output_string('cow', welcome_message) + '[/green bold]')
-        # cls.console.print('\n\n[green bold]--------------------[ [yellow2]Made with [red]:heart:[/red] and :coffee: by [i sky_blue1]Jekso[/i sky_blue1][/yellow2] ]--------------------[/green bold]\n\n')
-                
+        console = cls.get_console()
+        console.print('\n\n[green bold]--------------------[ [yellow2]Made with [red]:heart:[/red] and :coffee: by [i sky_blue1]Jekso[/i sky_blue1][/yellow2] ]--------------------[/green bold]\n\n')
+        console.print('[green bold]' + cowsay.get_output_string('cow', welcome_message) + '[/green bold]')
+        # console.print('\n\n[green bold]--------------------[ [yellow2]Made with [red]:heart:[/red] and :coffee: by [i sky_blue1]Jekso[/i sky_blue1][/yellow2] ]--------------------[/green bold]\n\n')
+
 
 
     @classmethod
-    def error(cls, message, exit_script=False):
-        emoji_list = ['face_with_rolling_eyes', 'sob', 'face_with_steam_from_nose', 'face_without_mouth', 'face_screaming_in_fear', 'face_with_head__bandage', 'tired_face']
-        err_emoji = random.choice(emoji_list)
-        err_message = f'\n[red bold]:{err_emoji}: Error: {message}![/red bold]\n'
-        cls.console.print(err_message) 
-        cls.console.print('\n') 
+    def error(cls, message, *args, exit_script=False):
+        if args and isinstance(args[0], bool):
+            # `error(message, exit_script)` of the earlier signature, a bool is never a message argument
+            exit_script, args = args[0] or exit_script, args[1:]
+        if cls.__level <= ERROR and not cls.__log(ERROR, message, args):
+            emoji_list = ['face_with_rolling_eyes', 'sob', 'face_with_steam_from_nose', 'face_without_mouth', 'face_screaming_in_fear', 'face_with_head__bandage', 'tired_face']
+            err_emoji = random.choice(emoji_list)
+            err_message = f'\n[red bold]:{err_emoji}: Error: {cls.__format(message, args)}![/red bold]\n'
+            cls.get_console().print(err_message)
+            cls.get_console().print('\n')
         if exit_script:
             exit()
-    
-    
-    
-    @classmethod
-    def success(cls, message):
-        cls.console.print(f'[bold green]:sunglasses: {message}.[/bold green]\n')
 
 
 
     @classmethod
-    def info(cls, message):
-        cls.console.print(f'[bold yellow1]:bulb: {message}.[/bold yellow1]\n')
-    
-    
-    
+    def success(cls, message, *args):
+        if cls.__level > SUCCESS or cls.__log(SUCCESS, message, args):
+            return
+        cls.get_console().print(f'[bold green]:sunglasses: {cls.__format(message, args)}.[/bold green]\n')
+
+
+
     @classmethod
-    def warning(cls, message):
-        cls.console.print(f'[bold orange1]:prohibited: {message}.[/bold orange1]\n')
-        
-        
-        
+    def info(cls, message, *args):
+        if cls.__level > INFO or cls.__log(INFO, message, args):
+            return
+        cls.get_console().print(f'[bold yellow1]:bulb: {cls.__format(message, args)}.[/bold yellow1]\n')
+
+
+
     @classmethod
-    def print(cls, message):
-        cls.console.print(f'{message}')
+    def warning(cls, message, *args):
+        if cls.__level > WARNING or cls.__log(WARNING, message, args):
+            return
+        cls.get_console().print(f'[bold orange1]:prohibited: {cls.__format(message, args)}.[/bold orange1]\n')
 
 
 
+    @classmethod
+    def print(cls, message, *args):
+        if cls.__level > INFO or cls.__log(INFO, message, args):
+            return
+        cls.get_console().print(cls.__format(message, args))
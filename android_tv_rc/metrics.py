@@ -0,0 +1,386 @@
+import time
+import inspect
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+
+
+# upper bounds of the histogram buckets in seconds, from a key press on the socket transport to an install
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+COMMAND_SECONDS = 'command_duration_seconds'
+COMMAND_FAILURES = 'command_failures_total'
+COMMAND_TIMEOUTS = 'command_timeouts_total'
+CONTROLLER_SECONDS = 'controller_call_duration_seconds'
+CONTROLLER_FAILURES = 'controller_call_failures_total'
+
+METRIC_HELP = {
+    COMMAND_SECONDS: 'Duration of adb commands by phase: spawn (process start or device connection), '
+                     'round_trip (whole command, spawn included) and parse (output parsing).',
+    COMMAND_FAILURES: 'adb commands that failed, timeouts included.',
+    COMMAND_TIMEOUTS: 'adb commands killed by their timeout or deadline.',
+    CONTROLLER_SECONDS: 'Duration of the controller methods.',
+    CONTROLLER_FAILURES: 'Controller methods that raised.',
+}
+
+# shell words skipped to find the tool a shell command runs
+SHELL_PUNCTUATION = ('{', '(', '!')
+
+
+
+class MetricsSink:
+    """
+    Receiver of the library metrics, the default one drops them. Subclass it to forward the metrics
+    to another system (StatsD, OpenTelemetry ..) and install it with `set_metrics_sink`. Methods are
+    called from many threads at the same time.
+    """
+
+
+
+    def observe(self, name: str, value: float, labels: dict):
+        """
+        The function records one observation of a histogram.
+
+        Args:
+            name (str): Metric name, for example `command_duration_seconds`.
+            value (float): The observed value, durations are in seconds.
+            labels (dict): Label names and values, for example `{'kind': 'input', 'device': '192.168.1.28:5555'}`.
+        """
+
+
+
+    def increment(self, name: str, labels: dict, value: float=1.0):
+        """
+        The function adds to a counter.
+
+        Args:
+            name (str): Metric name, for example `command_failures_total`.
+            labels (dict): Label names and values.
+            value (float): The amount to add. Defaults to 1
+        """
+
+
+
+class PrometheusMetrics(MetricsSink):
+    """
+    In-process metrics registry rendered in the Prometheus text exposition format, with cumulative
+    histogram buckets so `histogram_quantile(0.99, ..)` gives the p99 latency per command kind and device.
+
+    Example:
+        metrics = PrometheusMetrics()
+        set_metrics_sink(metrics)
+        metrics.serve(9464) # scrape http://host:9464/metrics
+    """
+
+
+
+    def __init__(self, buckets: tuple=DEFAULT_BUCKETS, namespace: str='atv'):
+        """
+        Args:
+            buckets (tuple): Increasing upper bounds of the histogram buckets. Defaults to 1 ms .. 30 s.
+            namespace (str): Prefix of the exported metric names. Defaults to atv
+        """
+        self.__buckets = tuple(sorted(buckets))
+        self.__namespace = namespace
+        self.__histograms = {}
+        self.__counters = {}
+        self.__lock = threading.Lock()
+
+
+
+    def observe(self, name: str, value: float, labels: dict):
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock:
+            histogram = self.__histograms.get(key)
+            if histogram is None:
+                # per bucket counts, then the sum and the count of the observations
+                histogram = self.__histograms[key] = [[0] * len(self.__buckets), 0.0, 0]
+            for index, bound in enumerate(self.__buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+                    break
+            histogram[1] += value
+            histogram[2] += 1
+
+
+
+    def increment(self, name: str, labels: dict, value: float=1.0):
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock:
+            self.__counters[key] = self.__counters.get(key, 0.0) + value
+
+
+
+    def count(self, name: str, **labels) -> float:
+        """
+        The function sums a counter, or the observation count of a histogram, over the series matching the labels.
+
+        Args:
+            name (str): Metric name, for example `command_timeouts_total`.
+            labels: Label values the series must have, for example `kind='input'`.
+
+        Returns:
+            The total.
+        """
+        wanted = set(labels.items())
+        with self.__lock:
+            total = sum(value for (metric, series), value in self.__counters.items() if metric == name and wanted <= set(series))
+            total += sum(histogram[2] for (metric, series), histogram in self.__histograms.items() if metric == name and wanted <= set(series))
+        return total
+
+
+
+    @staticmethod
+    def __format_labels(series: tuple) -> str:
+        pairs = []
+        for label, value in series:
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            pairs.append(f'{label}="{value}"')
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+
+    def render(self) -> str:
+        """
+        The function renders every metric in the Prometheus text exposition format (version 0.0.4).
+
+        Returns:
+            The exposition text.
+        """
+        with self.__lock:
+            histograms = {key: (list(buckets), total, count) for key, (buckets, total, count) in self.__histograms.items()}
+            counters = dict(self.__counters)
+        lines, described = [], set()
+        for (name, series), (buckets, total, count) in sorted(histograms.items()):
+            metric = f'{self.__namespace}_{name}'
+            if name not in described:
+                described.add(name)
+                lines += [f'# HELP {metric} {METRIC_HELP.get(name, name)}', f'# TYPE {metric} histogram']
+            cumulative = 0
+            for bound, bucket in zip(self.__buckets, buckets):
+                cumulative += bucket
+                lines.append(f'{metric}_bucket{self.__format_labels(series + (("le", f"{bound:g}"),))} {cumulative}')
+            lines.append(f'{metric}_bucket{self.__format_labels(series + (("le", "+Inf"),))} {count}')
+            lines.append(f'{metric}_sum{self.__format_labels(series)} {total:.9g}')
+            lines.append(f'{metric}_count{self.__format_labels(series)} {count}')
+        for (name, series), value in sorted(counters.items()):
+            metric = f'{self.__namespace}_{name}'
+            if name not in described:
+                described.add(name)
+                lines += [f'# HELP {metric} {METRIC_HELP.get(name, name)}', f'# TYPE {metric} counter']
+            lines.append(f'{metric}{self.__format_labels(series)} {value:g}')
+        return ''.join(f'{line}\n' for line in lines)
+
+
+
+    def serve(self, port: int=9464, host: str='0.0.0.0') -> Any:
+        """
+        The function serves the metrics over HTTP for Prometheus scrapes, from a daemon thread.
+
+        Args:
+            port (int): TCP port, 0 picks a free one. Defaults to 9464
+            host (str): Interface to listen on. Defaults to all interfaces.
+
+        Returns:
+            The running `http.server.ThreadingHTTPServer`, call its `shutdown()` to stop it.
+        """
+        # imported on use, it is slow to import and most programs never serve metrics
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='atv-metrics', daemon=True).start()
+        return server
+
+
+
+_sink = MetricsSink()
+
+
+
+def set_metrics_sink(sink: MetricsSink|None):
+    """
+    The function installs the sink receiving the metrics of every client and controller.
+
+    Args:
+        sink (MetricsSink|None): The sink, for example a `PrometheusMetrics`. `None` drops the metrics again.
+    """
+    global _sink
+    _sink = sink if sink is not None else MetricsSink()
+
+
+
+def get_metrics_sink() -> MetricsSink:
+    """
+    The function returns the installed metrics sink.
+
+    Returns:
+        The `MetricsSink`, the default one drops the metrics.
+    """
+    return _sink
+
+
+
+def command_kind(command: list|str) -> str:
+    """
+    The function names the kind of an adb command for the metric labels: the tool a shell command
+    runs (`input`, `dumpsys`, `am` ..), otherwise the adb command (`connect`, `push` ..).
+
+    Args:
+        command (list|str): adb command arguments like `['shell', 'input keyevent 3']`, or a device
+            service like `shell:input keyevent 3`.
+
+    Returns:
+        The command kind.
+    """
+    if isinstance(command, str):
+        # shell protocol options like `shell,v2,raw:` do not change the kind
+        service, _, params = command.partition(':')
+        command = [service.split(',', 1)[0]] + ([params] if params.strip() else [])
+    if not command:
+        return 'unknown'
+    if command[0] not in ('shell', 'exec', 'exec-out') or len(command) < 2:
+        return command[0]
+    words = [word for word in ' '.join(command[1:]).split() if word not in SHELL_PUNCTUATION]
+    return words[0].rsplit('/', 1)[-1] if words else command[0]
+
+
+
+def observe_command(kind: str, device: str|None, started: float, error: BaseException|None=None):
+    """
+    The function records the round trip of a finished adb command and counts its failure.
+
+    Args:
+        kind (str): The command kind, see `command_kind`.
+        device (str|None): Serial of the device, `None` for server commands.
+        started (float): `time.perf_counter()` when the command started.
+        error (BaseException|None): The exception the command raised, if any. Defaults to None.
+    """
+    labels = {'kind': kind, 'device': device or ''}
+    _sink.observe(COMMAND_SECONDS, time.perf_counter() - started, {**labels, 'phase': 'round_trip'})
+    if error is not None:
+        _sink.increment(COMMAND_FAILURES, labels)
+        # `DeadlineExceeded` and `asyncio.TimeoutError` are both `TimeoutError`
+        if isinstance(error, TimeoutError):
+            _sink.increment(COMMAND_TIMEOUTS, labels)
+
+
+
+def observe_phase(phase: str, kind: str, device: str|None, seconds: float):
+    """
+    The function records the duration of one phase (`spawn` or `parse`) of an adb command.
+
+    Args:
+        phase (str): The phase name.
+        kind (str): The command kind, see `command_kind`.
+        device (str|None): Serial of the device.
+        seconds (float): Duration of the phase.
+    """
+    _sink.observe(COMMAND_SECONDS, seconds, {'kind': kind, 'device': device or '', 'phase': phase})
+
+
+
+@contextmanager
+def measure_command(kind: str, device: str|None) -> Iterator[None]:
+    """
+    The function records the time the block takes as the `round_trip` of a command, and counts the
+    failure if it raises.
+
+    Args:
+        kind (str): The command kind, see `command_kind`.
+        device (str|None): Serial of the device, `None` for server commands.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException as error:
+        observe_command(kind, device, started, error)
+        raise
+    observe_command(kind, device, started)
+
+
+
+@contextmanager
+def measure_parse(kind: str, device: str|None) -> Iterator[None]:
+    """
+    The function records the time the block takes as the `parse` phase of a command.
+
+    Args:
+        kind (str): The command kind, see `command_kind`.
+        device (str|None): Serial of the device.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_phase('parse', kind, device, time.perf_counter() - started)
+
+
+
+def instrument_methods(cls: type) -> type:
+    """
+    Class decorator timing every public method of a controller, labelled by method name and by the
+    serial of the controller device. Coroutine methods are timed until they complete. Nothing is timed
+    while the default sink, which drops the metrics, is installed.
+
+    Args:
+        cls (type): The controller class, it must have a `serial` property.
+
+    Returns:
+        The same class, with its public methods wrapped.
+    """
+    def labels(controller: object, name: str) -> dict:
+        return {'method': name, 'device': controller.serial or ''}
+
+    def wrap(name: str, method: Callable) -> Callable:
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def timed(self, *args, **kwargs):
+                sink = _sink
+                if type(sink) is MetricsSink:
+                    # the default sink drops the metrics, the call is not timed
+                    return await method(self, *args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return await method(self, *args, **kwargs)
+                except BaseException:
+                    sink.increment(CONTROLLER_FAILURES, labels(self, name))
+                    raise
+                finally:
+                    sink.observe(CONTROLLER_SECONDS, time.perf_counter() - started, labels(self, name))
+            return timed
+
+        @functools.wraps(method)
+        def timed(self, *args, **kwargs):
+            sink = _sink
+            if type(sink) is MetricsSink:
+                return method(self, *args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            except BaseException:
+                sink.increment(CONTROLLER_FAILURES, labels(self, name))
+                raise
+            finally:
+                sink.observe(CONTROLLER_SECONDS, time.perf_counter() - started, labels(self, name))
+        return timed
+
+    for name, method in list(vars(cls).items()):
+        if not name.startswith('_') and name != 'get_adb_client' and callable(method):
+            setattr(cls, name, wrap(name, method))
+    return cls
@@ -0,0 +1,159 @@
+import re
+import time
+import threading
+
+
+
+class PackageIndex:
+    """
+    Set of the packages installed on one device. It is built from one full `pm list packages`
+    listing and trusted for `ttl` seconds, single packages can be refreshed in between with a
+    cheap `pm path <package>` and install/uninstall keep it up to date.
+    """
+
+
+    # the listing with the version codes, the launcher catalog is keyed by them. `--show-versioncode` only
+    # exists since Android 9, older devices reject it and answer with the plain listing instead
+    QUERY = 'pm list packages --show-versioncode 2>/dev/null | grep versionCode: || pm list packages'
+
+
+
+    def __init__(self, ttl: float|None=300.0):
+        """
+        Args:
+            ttl (float|None): Seconds a full listing stays valid, `None` keeps it until invalidated
+                and 0 disables the cache. Defaults to 300.
+        """
+        self.__ttl = ttl
+        self.__packages = None
+        self.__version_codes = {}
+        self.__built_at = 0.0
+        self.__lock = threading.Lock()
+
+
+
+    @staticmethod
+    def parse(pm_list_output: str) -> set:
+        """
+        The function parses the output of `pm list packages` into a set of package names.
+
+        Args:
+            pm_list_output (str): Output of `pm list packages`, one `package:<name>` per line.
+
+        Returns:
+            Set of package names.
+        """
+        packages = set()
+        for line in pm_list_output.splitlines():
+            line = line.strip()
+            if line.startswith('package:') and (words := line[len('package:'):].split()):
+                packages.add(words[0])
+        return packages
+
+
+
+    @staticmethod
+    def parse_version_codes(pm_list_output: str) -> dict:
+        """
+        The function parses the output of `pm list packages --show-versioncode` into package version codes,
+        the plain listing of the devices without `--show-versioncode` has none.
+
+        Args:
+            pm_list_output (str): Output of `pm list packages --show-versioncode`, one
+                `package:<name> versionCode:<code>` per line.
+
+        Returns:
+            Dictionary of package name to version code.
+        """
+        return {match.group(1): int(match.group(2)) for match in re.finditer(r'^package:(\S+)\s+versionCode:(\d+)', pm_list_output, re.MULTILINE)}
+
+
+
+    @property
+    def ttl(self) -> float|None:
+        """Seconds a full listing stays valid, `None` if it never expires."""
+        return self.__ttl
+
+
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the index holds a full listing that did not expire yet."""
+        if self.__packages is None:
+            return False
+        return self.__ttl is None or time.monotonic() - self.__built_at < self.__ttl
+
+
+
+    def contains(self, package: str) -> bool|None:
+        """
+        The function looks a package up in the index.
+
+        Args:
+            package (str): The package name.
+
+        Returns:
+            Boolean indicates if the package is installed. `None` if the index is not fresh.
+        """
+        with self.__lock:
+            if not self.is_fresh:
+                return None
+            return package in self.__packages
+
+
+
+    def version_code(self, package: str) -> int|None:
+        """
+        The function looks the version code of a package up in the index.
+
+        Args:
+            package (str): The package name.
+
+        Returns:
+            The package version code. `None` if the index is not fresh or the version is unknown.
+        """
+        with self.__lock:
+            if not self.is_fresh:
+                return None
+            return self.__version_codes.get(package)
+
+
+
+    def update(self, packages: set, version_codes: dict|None=None):
+        """
+        The function replaces the index with a full listing of the device packages.
+
+        Args:
+            packages (set): All the package names installed on the device.
+            version_codes (dict|None): Version code of the packages, from `pm list packages --show-versioncode`.
+        """
+        with self.__lock:
+            self.__packages = set(packages)
+            self.__version_codes = dict(version_codes or {})
+            self.__built_at = time.monotonic()
+
+
+
+    def set_installed(self, package: str, installed: bool):
+        """
+        The function records the state of a single package, without extending the index lifetime.
+
+        Args:
+            package (str): The package name.
+            installed (bool): Whether the package is installed.
+        """
+        with self.__lock:
+            if self.__packages is None:
+                return
+            if installed:
+                self.__packages.add(package)
+            else:
+                self.__packages.discard(package)
+                self.__version_codes.pop(package, None)
+
+
+
+    def invalidate(self):
+        """Drops the listing, the next lookup builds it again."""
+        with self.__lock:
+            self.__packages = None
@@ -0,0 +1,84 @@
+import struct
+from dataclasses import dataclass
+
+
+
+SCREENCAP_FORMATS = ('png', 'raw')
+
+# android PixelFormat values written in the raw screencap header, with their bytes per pixel
+PIXEL_FORMATS = {1: ('RGBA_8888', 4), 2: ('RGBX_8888', 4), 3: ('RGB_888', 3), 4: ('RGB_565', 2), 5: ('BGRA_8888', 4)}
+
+
+
+@dataclass
+class RawFrame:
+    """
+    One raw `screencap` frame, `data` is a view of the pixels inside the captured output (no copy),
+    row after row, `width * bytes_per_pixel` bytes per row.
+    """
+
+
+    width: int
+    height: int
+    pixel_format: str
+    bytes_per_pixel: int
+    data: memoryview
+
+
+
+    @property
+    def stride(self) -> int:
+        """Number of bytes of one pixel row."""
+        return self.width * self.bytes_per_pixel
+
+
+
+def build_screencap_command(format: str='png', display: int|None=None) -> str:
+    """
+    The function builds the `screencap` shell command.
+
+    Args:
+        format (str): Output format [png | raw]. Defaults to png
+        display (int|None): Physical display id to capture, `None` for the default display.
+
+    Returns:
+        The shell command.
+
+    Raises:
+        ValueError: if the format is unknown.
+    """
+    if format not in SCREENCAP_FORMATS:
+        raise ValueError(f'Unknown screencap format: {format}, use one of [{" | ".join(SCREENCAP_FORMATS)}]')
+    command = ['screencap']
+    if display is not None:
+        command.append(f'-d {int(display)}')
+    if format == 'png':
+        command.append('-p')
+    return ' '.join(command)
+
+
+
+def parse_raw_frame(output: memoryview|bytes) -> RawFrame:
+    """
+    The function parses the output of a raw `screencap`. The header is width, height and pixel format
+    as little-endian 32 bits integers, recent Android versions append a color space, so the header
+    size is deduced from the output size.
+
+    Args:
+        output (memoryview|bytes): The captured output.
+
+    Returns:
+        The `RawFrame`, its pixels are a view of `output`.
+
+    Raises:
+        ValueError: if the output is not a raw frame.
+    """
+    output = memoryview(output).cast('B')
+    if len(output) < 12:
+        raise ValueError('Raw screencap output is too short')
+    width, height, pixel_format = struct.unpack_from('<III', output)
+    name, bytes_per_pixel = PIXEL_FORMATS.get(pixel_format, (f'FORMAT_{pixel_format}', 4))
+    header_size = len(output) - width * height * bytes_per_pixel
+    if header_size not in (12, 16):
+        raise ValueError(f'Raw screencap output of {len(output)} bytes does not match a {width}x{height} {name} frame')
+    return RawFrame(width, height, name, bytes_per_pixel, output[header_size:])
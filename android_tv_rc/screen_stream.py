@@ -0,0 +1,228 @@
+import math
+import threading
+from typing import Any, Callable, Iterator
+from .logger import Logger
+from .logcat import RingBuffer
+
+
+
+# screenrecord stops by itself after 3 minutes, longer recordings are chained segments
+SEGMENT_TIME_LIMIT = 180
+
+
+
+def build_screenrecord_command(time_limit: int=SEGMENT_TIME_LIMIT, bit_rate: int|None=None, size: str|None=None) -> str:
+    """
+    The function builds the `screenrecord` shell command writing a raw H.264 elementary stream to stdout.
+
+    Args:
+        time_limit (int): Seconds to record, at most 180. Defaults to 180
+        bit_rate (int|None): Video bit rate in bits per second, for example 4000000. Defaults to the device default.
+        size (str|None): Video size as `WIDTHxHEIGHT`, for example '1280x720'. Defaults to the screen size.
+
+    Returns:
+        The shell command.
+    """
+    command = ['screenrecord', '--output-format=h264', f'--time-limit {max(1, min(int(time_limit), SEGMENT_TIME_LIMIT))}']
+    if bit_rate is not None:
+        command.append(f'--bit-rate {int(bit_rate)}')
+    if size is not None:
+        command.append(f'--size {size}')
+    command.append('-')
+    return ' '.join(command)
+
+
+
+def next_segment_time_limit(duration: int|None, segment_time_limit: int, recorded: int) -> int|None:
+    """
+    The function plans the next `screenrecord` segment of a recording. Segments are counted in
+    seconds of recorded video, the start of a segment process does not shorten the recording.
+
+    Args:
+        duration (int|None): Whole seconds to record in total, `None` records until closed.
+        segment_time_limit (int): Seconds of one segment, at most 180.
+        recorded (int): Seconds of video of the completed segments.
+
+    Returns:
+        Seconds of the next segment. `None` if the recording is complete.
+    """
+    if duration is None:
+        return segment_time_limit
+    remaining = duration - recorded
+    if remaining < 1:
+        return None
+    return min(segment_time_limit, remaining)
+
+
+
+class ScreenStream:
+    """
+    Iterator over the H.264 elementary stream of a device screen, as byte chunks.
+
+    A reader thread runs `screenrecord` and puts its output in a bounded `RingBuffer` of chunks.
+    The default `block` policy never drops video data, a slow consumer pauses the reading and the
+    unread output waits in the adb connection. When a segment reaches the `screenrecord` 3 minutes
+    limit the next one starts right away, every segment begins with its own SPS/PPS and key frame
+    so the chained segments form one playable stream. `screenrecord` only takes whole seconds, a
+    duration is recorded rounded down to whole seconds and split into segments by recorded video
+    time, so the start of every segment does not shorten the recording.
+
+    Example:
+        with client.screen_stream(duration=600) as video, open('screen.h264', 'wb') as file:
+            video.write_to(file)
+    """
+
+
+
+    def __init__(self, open_segment: Callable, duration: float|None=None, segment_time_limit: int=SEGMENT_TIME_LIMIT,
+                 capacity: int=64, policy: str='block', chunk_size: int=65536):
+        """
+        Args:
+            open_segment (Callable): Called as `open_segment(time_limit)`, starts one `screenrecord` segment
+                and returns its stream (`SocketStream` or `ProcessStream`).
+            duration (float|None): Seconds to record in total, at least 1 and rounded down to whole seconds.
+                Defaults to None (until closed).
+            segment_time_limit (int): Seconds of one segment, at most 180. Defaults to 180
+            capacity (int): Maximum number of chunks waiting for the consumer. Defaults to 64
+            policy (str): What to do when the consumer is too slow [drop_oldest | drop_newest | block].
+                Dropping chunks corrupts the video until the next key frame. Defaults to block
+            chunk_size (int): Maximum size of one chunk. Defaults to 64 KiB.
+
+        Raises:
+            ValueError: if the policy is unknown or the duration is shorter than 1 second.
+        """
+        if duration is not None and duration < 1:
+            raise ValueError(f'screenrecord records whole seconds, the duration must be at least 1 second: {duration}')
+        self.__open_segment = open_segment
+        self.__duration = math.floor(duration) if duration is not None else None
+        self.__segment_time_limit = max(1, min(int(segment_time_limit), SEGMENT_TIME_LIMIT))
+        self.__chunk_size = chunk_size
+        self.__buffer = RingBuffer(capacity, policy)
+        self.__segments = 0
+        self.__bytes_read = 0
+        self.__stream = None
+        self.__closed = False
+        self.__lock = threading.Lock()
+        self.__reader = threading.Thread(target=self.__read, name='atv-screen-stream', daemon=True)
+        self.__reader.start()
+
+
+
+    @property
+    def segments(self) -> int:
+        """Number of `screenrecord` segments completed so far."""
+        return self.__segments
+
+
+
+    @property
+    def bytes_read(self) -> int:
+        """Number of bytes read from the device so far."""
+        return self.__bytes_read
+
+
+
+    @property
+    def dropped(self) -> int:
+        """Number of chunks dropped because the consumer was too slow."""
+        return self.__buffer.dropped
+
+
+
+    def __read(self):
+        # seconds of video of the completed segments, the process start of a segment is not recorded time
+        recorded = 0
+        try:
+            while (time_limit := next_segment_time_limit(self.__duration, self.__segment_time_limit, recorded)) is not None:
+                with self.__lock:
+                    if self.__closed:
+                        return
+                    self.__stream = stream = self.__open_segment(time_limit)
+                received = 0
+                try:
+                    while chunk := stream.read(self.__chunk_size):
+                        received += len(chunk)
+                        self.__bytes_read += len(chunk)
+                        self.__buffer.put(chunk)
+                finally:
+                    stream.close()
+                if not received:
+                    if not self.__closed:
+                        Logger.warning('screenrecord produced no output, the screen stream stopped')
+                    return
+                self.__segments += 1
+                recorded += time_limit
+        except (OSError, ValueError):
+            if not self.__closed:
+                Logger.warning('Screen stream ended unexpectedly')
+        finally:
+            self.__buffer.close()
+
+
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+
+
+
+    def __next__(self) -> bytes:
+        try:
+            return self.__buffer.get()
+        except EOFError:
+            raise StopIteration from None
+
+
+
+    def get(self, timeout: float|None=None) -> bytes|None:
+        """
+        The function returns the next chunk, waiting at most `timeout` seconds.
+
+        Args:
+            timeout (float|None): Seconds to wait for a chunk. Defaults to None (wait forever).
+
+        Returns:
+            The next chunk. `None` if the timeout expired or the stream ended.
+        """
+        try:
+            return self.__buffer.get(timeout)
+        except (EOFError, TimeoutError):
+            return None
+
+
+
+    def write_to(self, sink: Any) -> int:
+        """
+        The function writes the stream into a file-like object until it ends.
+
+        Args:
+            sink (Any): Object with a `write` method, for example a file opened in `wb` mode.
+
+        Returns:
+            Number of bytes written.
+        """
+        written = 0
+        for chunk in self:
+            sink.write(chunk)
+            written += len(chunk)
+        return written
+
+
+
+    def close(self):
+        """Stops `screenrecord` on the device and the reader thread."""
+        with self.__lock:
+            self.__closed = True
+            stream = self.__stream
+        self.__buffer.close()
+        if stream is not None:
+            stream.close()
+
+
+
+    def __enter__(self):
+        return self
+
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
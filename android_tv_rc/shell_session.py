@@ -0,0 +1,136 @@
+import uuid
+import threading
+from .deadline import DeadlineExceeded
+from .adb_transport import SubprocessTransport, SocketTransport
+
+
+
+class ShellSessionError(Exception):
+    """Raised when the persistent shell of a device ends unexpectedly."""
+
+
+
+class ShellSession:
+    """
+    One long-lived `adb shell` for a device. Commands are written to the stdin of the open shell
+    instead of starting a new shell each time, and their output is framed by a unique end marker
+    carrying the exit code:
+
+        { <command>
+        } </dev/null 2>&1; printf "\\n<marker> %d\\n" $?
+
+    Calls are serialized by a lock, so one session can be shared by many threads. The shell is
+    started on the first command and restarted after it ends.
+    """
+
+
+
+    def __init__(self, transport: SubprocessTransport|SocketTransport, serial: str|None):
+        """
+        Args:
+            transport (SubprocessTransport|SocketTransport): Transport used to open the shell.
+            serial (str|None): Serial of the device, `None` to let adb pick it.
+        """
+        self.__transport = transport
+        self.__serial = serial
+        self.__stream = None
+        self.__lock = threading.Lock()
+
+
+
+    @property
+    def serial(self) -> str|None:
+        """Serial of the session device."""
+        return self.__serial
+
+
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the shell is currently running."""
+        return self.__stream is not None
+
+
+
+    def run(self, command: str, timeout: float|None=None) -> tuple[str, int]:
+        """
+        The function runs a shell command in the open shell, starting it if needed.
+
+        Args:
+            command (str): The shell command, it gets no stdin and its stderr is merged into the output.
+            timeout (float|None): Seconds to wait for the command. On timeout the shell is closed, which
+                ends the command, and the next command starts a new shell. Defaults to None (no limit).
+
+        Returns:
+            Tuple of the stripped output of the command and its exit code.
+
+        Raises:
+            ShellSessionError: if the shell ended before the command completed.
+            DeadlineExceeded: if the command did not complete in time.
+        """
+        marker = f'__ATVRC_{uuid.uuid4().hex}__'
+        script = f'{{ {command}\n}} </dev/null 2>&1; printf "\\n{marker} %d\\n" $?\n'.encode('utf-8')
+        with self.__lock:
+            reused = self.__stream is not None
+            try:
+                self.__write(script)
+            except OSError:
+                if not reused:
+                    raise
+                # the idle shell was closed on the device side, start a fresh one and retry once
+                self.__close()
+                self.__write(script)
+            # closing the stream ends a blocked read, streams have no read timeout of their own
+            expired = threading.Event()
+            stream = self.__stream
+            killer = threading.Timer(timeout, lambda: (expired.set(), stream.close())) if timeout is not None else None
+            if killer:
+                killer.start()
+            try:
+                result = self.__read_until(marker.encode('ascii'))
+            except BaseException as error:
+                # the shell is left in the middle of a command output, it can not be reused
+                self.__close()
+                if expired.is_set():
+                    raise DeadlineExceeded(f'Shell command timed out after {timeout:g}s: {command}') from error
+                raise
+            finally:
+                if killer:
+                    killer.cancel()
+            if expired.is_set():
+                # the timer closed the stream right after the command completed
+                self.__close()
+            return result
+
+
+
+    def __write(self, script: bytes):
+        if self.__stream is None:
+            self.__stream = self.__transport.open_stream(['shell', 'sh'], self.__serial)
+        self.__stream.write(script)
+
+
+
+    def __read_until(self, marker: bytes) -> tuple[str, int]:
+        lines = []
+        while line := self.__stream.readline():
+            if line.startswith(marker):
+                output = b''.join(lines).decode('utf-8', errors='replace')
+                return output.strip(), int(line[len(marker):].strip() or 0)
+            lines.append(line)
+        self.__close()
+        raise ShellSessionError(f'Shell of device {self.__serial} ended before the command completed')
+
+
+
+    def __close(self):
+        if self.__stream is not None:
+            stream, self.__stream = self.__stream, None
+            stream.close()
+
+
+
+    def close(self):
+        """Ends the shell, the next command starts a new one."""
+        with self.__lock:
+            self.__close()
@@ -0,0 +1,204 @@
+import base64
+import shlex
+from .key_codes import KeyCodes
+
+
+
+TEXT_INPUT_MODES = ('auto', 'input', 'adbkeyboard')
+
+# characters per `input text` call, longer calls lose characters on some devices
+TEXT_CHUNK_SIZE = 256
+
+# characters per ADBKeyboard broadcast, far below the binder transaction limit
+ADB_KEYBOARD_CHUNK_SIZE = 4096
+
+# in `auto` mode longer texts go through ADBKeyboard when it is the current keyboard
+ADB_KEYBOARD_MIN_LENGTH = 32
+
+ADB_KEYBOARD_IME = 'com.android.adbkeyboard/.AdbIME'
+
+INPUT_METHOD_QUERY = 'settings get secure default_input_method'
+
+ENABLE_ADB_KEYBOARD_COMMAND = f'ime enable {ADB_KEYBOARD_IME} && ime set {ADB_KEYBOARD_IME}'
+
+# characters `input text` can not type, they are sent as key presses
+TEXT_KEYS = {'\n': KeyCodes.KEYCODE_ENTER, '\t': KeyCodes.KEYCODE_TAB}
+
+
+
+def can_input_text(text: str) -> bool:
+    """
+    The function checks whether `input text` can type a text: printable ASCII, new lines and tabs.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        Boolean indicates if the text can be typed without ADBKeyboard.
+    """
+    return all(' ' <= character <= '~' or character in TEXT_KEYS for character in text)
+
+
+
+def check_text_input_mode(mode: str) -> str:
+    """
+    The function validates a text input mode.
+
+    Args:
+        mode (str): [auto | input | adbkeyboard]
+
+    Returns:
+        The mode.
+
+    Raises:
+        ValueError: if the mode is unknown.
+    """
+    if mode not in TEXT_INPUT_MODES:
+        raise ValueError(f'Unknown text input mode: {mode}, use one of [{" | ".join(TEXT_INPUT_MODES)}]')
+    return mode
+
+
+
+def prefers_adb_keyboard(text: str) -> bool:
+    """
+    The function tells whether the `auto` mode types a text through ADBKeyboard, when it is the
+    current keyboard: texts `input text` can not type and long texts.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        Boolean indicates if ADBKeyboard should type the text.
+    """
+    return not can_input_text(text) or len(text) >= ADB_KEYBOARD_MIN_LENGTH
+
+
+
+def is_adb_keyboard(input_method: str) -> bool:
+    """
+    The function checks the output of `INPUT_METHOD_QUERY`.
+
+    Args:
+        input_method (str): The current input method of the device.
+
+    Returns:
+        Boolean indicates if ADBKeyboard is the current input method.
+    """
+    return input_method.strip() == ADB_KEYBOARD_IME
+
+
+
+def escape_input_text(text: str) -> str:
+    """
+    The function escapes printable ASCII text for one `input text` argument: spaces become the `%s`
+    the tool turns back into spaces and the text is quoted for the device shell.
+
+    Args:
+        text (str): The text, without the `%s` sequence (see `split_input_text`).
+
+    Returns:
+        The escaped argument.
+    """
+    return shlex.quote(text.replace(' ', '%s'))
+
+
+
+def split_input_text(text: str, chunk_size: int=TEXT_CHUNK_SIZE) -> list:
+    """
+    The function splits a text into the pieces typed one after the other: chunks of at most
+    `chunk_size` characters and the new lines and tabs between them. A `%s` written in the text is
+    split between two chunks, `input text` would type it as a space.
+
+    Args:
+        text (str): The text.
+        chunk_size (int): Maximum characters of one chunk. Defaults to 256
+
+    Returns:
+        List of text chunks (str) and key presses (KeyCodes), in typing order.
+    """
+    pieces, chunk = [], ''
+    for character in text:
+        if character in TEXT_KEYS:
+            if chunk:
+                pieces.append(chunk)
+            pieces.append(TEXT_KEYS[character])
+            chunk = ''
+            continue
+        if len(chunk) >= chunk_size or (character == 's' and chunk.endswith('%')):
+            pieces.append(chunk)
+            chunk = ''
+        chunk += character
+    if chunk:
+        pieces.append(chunk)
+    return pieces
+
+
+
+def build_input_text_command(text: str, chunk_size: int=TEXT_CHUNK_SIZE) -> str:
+    """
+    The function builds the shell command typing a text with `input text`, in one round trip. Shell
+    metacharacters are escaped, long texts are chunked and new lines or tabs are pressed as keys.
+
+    Args:
+        text (str): Printable ASCII text, with new lines and tabs.
+        chunk_size (int): Maximum characters of one `input text` call. Defaults to 256
+
+    Returns:
+        The shell command.
+
+    Raises:
+        ValueError: if the text has characters `input text` can not type (use ADBKeyboard).
+    """
+    if not can_input_text(text):
+        raise ValueError('input text only types printable ASCII, use the adbkeyboard mode for other characters')
+    commands, keys = [], []
+    for piece in split_input_text(text, chunk_size) + [None]:
+        if isinstance(piece, KeyCodes):
+            keys.append(piece.name)
+            continue
+        if keys:
+            commands.append('input keyevent ' + ' '.join(keys))
+            keys = []
+        if piece is not None:
+            commands.append(f'input text {escape_input_text(piece)}')
+    return ' && '.join(commands)
+
+
+
+def build_adb_keyboard_command(text: str, chunk_size: int=ADB_KEYBOARD_CHUNK_SIZE) -> str:
+    """
+    The function builds the shell command typing a text through the ADBKeyboard input method, in one
+    round trip. The text is sent base64 encoded, so any Unicode text goes through the shell unharmed
+    and a whole chunk is committed at once instead of key by key.
+
+    Args:
+        text (str): Any text.
+        chunk_size (int): Maximum characters of one broadcast. Defaults to 4096
+
+    Returns:
+        The shell command.
+    """
+    chunks = [text[start:start + chunk_size] for start in range(0, len(text), chunk_size)]
+    return ' && '.join(f'am broadcast -a ADB_INPUT_B64 --es msg {base64.b64encode(chunk.encode("utf-8")).decode("ascii")}'
+                       for chunk in chunks)
+
+
+
+def build_text_input_command(text: str, mode: str='input', chunk_size: int=TEXT_CHUNK_SIZE) -> str:
+    """
+    The function builds the shell command typing a text with a resolved mode.
+
+    Args:
+        text (str): The text.
+        mode (str): [input | adbkeyboard]. Defaults to input
+        chunk_size (int): Maximum characters of one `input text` call. Defaults to 256
+
+    Returns:
+        The shell command.
+
+    Raises:
+        ValueError: if the mode is `input` and the text has characters `input text` can not type.
+    """
+    if mode == 'adbkeyboard':
+        return build_adb_keyboard_command(text)
+    return build_input_text_command(text, chunk_size)
@@ -0,0 +1,207 @@
+import inspect
+import functools
+import subprocess
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, Iterator
+from .metrics import command_kind
+
+
+
+class Span:
+    """
+    One traced operation, a controller method or an adb round trip. The default span drops its attributes.
+    """
+
+
+
+    def set_attribute(self, key: str, value: str|int|float|bool):
+        """
+        The function sets an attribute of the span.
+
+        Args:
+            key (str): Attribute name, for example `adb.exit_code`.
+            value (str|int|float|bool): Attribute value.
+        """
+
+
+
+class Tracer:
+    """
+    Receiver of the library spans, the default one drops them. Subclass it to forward the spans to a
+    tracing system and install it with `set_tracer`. A span started while another one is open in the
+    same thread or task must become its child, the spans of an operation run inside the operation span.
+    """
+
+
+
+    def start_span(self, name: str, attributes: dict) -> ContextManager[Span]:
+        """
+        The function starts a span, ended when the returned context manager exits. An exception leaving
+        the context manager marks the span as failed.
+
+        Args:
+            name (str): Span name, for example `AndroidTVController.open_app` or `adb am`.
+            attributes (dict): Initial attributes of the span.
+
+        Returns:
+            Context manager yielding the `Span`.
+        """
+        return _no_span()
+
+
+
+@contextmanager
+def _no_span() -> Iterator[Span]:
+    yield _NO_SPAN
+
+
+
+_NO_SPAN = Span()
+
+
+
+def import_opentelemetry() -> Any:
+    """
+    The function imports the OpenTelemetry tracing API, which the OpenTelemetry adapter needs but the
+    rest of the library does not.
+
+    Returns:
+        The `opentelemetry.trace` module.
+
+    Raises:
+        ImportError: if OpenTelemetry is not installed, with the command installing it.
+    """
+    try:
+        from opentelemetry import trace
+    except ImportError as error:
+        raise ImportError('OpenTelemetry tracing needs its API, install it with: pip install opentelemetry-api') from error
+    return trace
+
+
+
+class OpenTelemetryTracer(Tracer):
+    """
+    Adapter sending the spans to OpenTelemetry. Spans are started as the current span, so they nest
+    under the spans of the application and the adb round trips nest under their controller method,
+    across threads of `submit` and asyncio tasks too.
+
+    Example:
+        set_tracer(OpenTelemetryTracer())
+        controller.open_app('com.netflix.ninja') # one span, with a child span per adb call
+    """
+
+
+
+    def __init__(self, tracer: Any=None, tracer_provider: Any=None):
+        """
+        Args:
+            tracer (Any): An OpenTelemetry tracer, or any object with a compatible `start_as_current_span`
+                method. Defaults to the tracer `android_tv_rc` of the global tracer provider.
+            tracer_provider (Any): Tracer provider used when no tracer is given. Defaults to the global one.
+        """
+        if tracer is None:
+            tracer = import_opentelemetry().get_tracer('android_tv_rc', tracer_provider=tracer_provider)
+        self.__tracer = tracer
+
+
+
+    def start_span(self, name: str, attributes: dict) -> ContextManager[Span]:
+        # the OpenTelemetry span records the exception and sets the error status when it is left by one
+        return self.__tracer.start_as_current_span(name, attributes=attributes)
+
+
+
+_tracer = Tracer()
+
+
+
+def set_tracer(tracer: Tracer|None):
+    """
+    The function installs the tracer receiving the spans of every client and controller.
+
+    Args:
+        tracer (Tracer|None): The tracer, for example an `OpenTelemetryTracer`. `None` drops the spans again.
+    """
+    global _tracer
+    _tracer = tracer if tracer is not None else Tracer()
+
+
+
+def get_tracer() -> Tracer:
+    """
+    The function returns the installed tracer.
+
+    Returns:
+        The `Tracer`, the default one drops the spans.
+    """
+    return _tracer
+
+
+
+@contextmanager
+def trace_command(command: list|str, device: str|None) -> Iterator[Span]:
+    """
+    The function runs the block in the span of one adb round trip, with the command, its kind, the
+    device and the exit status as attributes.
+
+    Args:
+        command (list|str): adb command arguments like `['shell', 'input keyevent 3']`.
+        device (str|None): Serial of the device, `None` for server commands.
+    """
+    kind = command_kind(command)
+    command_str = command if isinstance(command, str) else ' '.join(command)
+    with _tracer.start_span(f'adb {kind}', {'adb.command': command_str, 'adb.command.kind': kind,
+                                            'adb.device': device or ''}) as span:
+        try:
+            yield span
+        except subprocess.CalledProcessError as error:
+            span.set_attribute('adb.exit_code', error.returncode)
+            raise
+        except TimeoutError:
+            # `DeadlineExceeded` and `asyncio.TimeoutError` are both `TimeoutError`
+            span.set_attribute('adb.timed_out', True)
+            raise
+        span.set_attribute('adb.exit_code', 0)
+
+
+
+def trace_methods(cls: type) -> type:
+    """
+    Class decorator running every public method of a controller in its own span, named after the class
+    and the method, with the serial of the controller device as attribute. The adb round
+    trips of a method become its child spans. Coroutine methods are traced until they complete. Nothing
+    is traced while the default tracer, which drops the spans, is installed.
+
+    Args:
+        cls (type): The controller class, it must have a `serial` property.
+
+    Returns:
+        The same class, with its public methods wrapped.
+    """
+    def span(controller: object, name: str) -> ContextManager[Span]:
+        device = controller.serial or ''
+        return _tracer.start_span(f'{cls.__name__}.{name}', {'adb.device': device})
+
+    def wrap(name: str, method: Callable) -> Callable:
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def traced(self, *args, **kwargs):
+                if type(_tracer) is Tracer:
+                    # the default tracer drops the spans, the call is not traced
+                    return await method(self, *args, **kwargs)
+                with span(self, name):
+                    return await method(self, *args, **kwargs)
+            return traced
+
+        @functools.wraps(method)
+        def traced(self, *args, **kwargs):
+            if type(_tracer) is Tracer:
+                return method(self, *args, **kwargs)
+            with span(self, name):
+                return method(self, *args, **kwargs)
+        return traced
+
+    for name, method in list(vars(cls).items()):
+        if not name.startswith('_') and name != 'get_adb_client' and callable(method):
+            setattr(cls, name, wrap(name, method))
+    return cls
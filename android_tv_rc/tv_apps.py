@@ -6,9 +6,8 @@ class AndroidTVApps(Enum):
     """
     Enum class for many famous used apps for Android TV
     
-    To get main activity name use `adb_client.get_package_activities(package_name)`
-    and try to interpret the output dump to extract the main launcher activity 
-    then you can use these values for `controller.open_app(package_name, activity_name)` method.
+    `controller.open_app(package_name)` resolves the launcher activity of any installed app,
+    these values skip that lookup for the most used apps.
     """
     YOUTUBE = 'com.google.android.youtube.tv/com.google.android.apps.youtube.tv.activity.ShellActivity'
     NETFLIX = 'com.netflix.ninja/.MainActivity'
@@ -18,6 +17,5 @@ class AndroidTVApps(Enum):
 
     # ..
     # feel free to add your own custom tv apps 'package/main_activity'
-    # to get main activity name use adb.get_package_activities(package_name)
-    # and try to interpret the output dump to extract the main launcher activity 
+    # to get main activity name use adb.get_launcher_activity(package_name)
     # then you can use these values for controller.open_app() method.
\ No newline at end of file
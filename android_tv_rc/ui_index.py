@@ -0,0 +1,265 @@
+import re
+import bisect
+from collections import deque
+from dataclasses import dataclass, field
+from xml.etree import ElementTree
+from .key_codes import KeyCodes
+
+
+
+UI_DUMP_PATH = '/data/local/tmp/atv_rc_ui.xml'
+
+BOUNDS_PATTERN = re.compile(r'\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]')
+
+DIRECTIONS = (KeyCodes.KEYCODE_DPAD_UP, KeyCodes.KEYCODE_DPAD_DOWN, KeyCodes.KEYCODE_DPAD_LEFT, KeyCodes.KEYCODE_DPAD_RIGHT)
+
+
+
+def build_ui_dump_command(path: str=UI_DUMP_PATH, compressed: bool=False) -> str:
+    """
+    The function builds the shell command dumping the UI hierarchy and printing it, in one round trip.
+
+    Args:
+        path (str): Device file the hierarchy is dumped into. Defaults to /data/local/tmp/atv_rc_ui.xml
+        compressed (bool): Whether to skip the views that are not important for accessibility. Defaults to False.
+
+    Returns:
+        The shell command.
+    """
+    return f'uiautomator dump {"--compressed " if compressed else ""}{path} && cat {path}'
+
+
+
+@dataclass
+class UINode:
+    """One view of the UI hierarchy, `bounds` are the screen pixels `(left, top, right, bottom)`."""
+
+
+    index: int
+    text: str
+    resource_id: str
+    content_desc: str
+    class_name: str
+    package: str
+    bounds: tuple
+    focusable: bool
+    focused: bool
+    clickable: bool
+    neighbors: dict = field(default_factory=dict, repr=False, compare=False)
+
+
+
+    @property
+    def center(self) -> tuple:
+        """Center point `(x, y)` of the node."""
+        left, top, right, bottom = self.bounds
+        return (left + right) / 2, (top + bottom) / 2
+
+
+
+    def matches(self, text: str|None=None, resource_id: str|None=None, content_desc: str|None=None) -> bool:
+        """
+        The function checks the node against the given criteria, a resource id matches with or without
+        its package prefix (`com.app:id/search` or `search`).
+
+        Returns:
+            Boolean indicates if every given criterion matches.
+        """
+        if text is not None and self.text != text:
+            return False
+        if content_desc is not None and self.content_desc != content_desc:
+            return False
+        if resource_id is not None and resource_id not in (self.resource_id, self.resource_id.rpartition('/')[2]):
+            return False
+        return True
+
+
+
+class UIIndex:
+    """
+    Spatial index of the focusable nodes of one UI hierarchy dump (`uiautomator dump`).
+
+    The D-pad neighbor of a node follows the rule of the Android focus search: candidates must lie
+    in the key direction, candidates overlapping the node on the other axis (its beam) win, then the
+    lowest `13 * major_distance² + minor_distance²`. Nodes are kept sorted by center on both axes so
+    a neighbor search only scans the nodes on the right side of the node.
+
+    Example:
+        ui = client.ui_snapshot()
+        keys = ui.path_to(ui.find(text='Settings'))
+        client.send_keyevent_sequence(keys)
+    """
+
+
+
+    def __init__(self, nodes: list):
+        """
+        Args:
+            nodes (list): All the `UINode` of the hierarchy.
+        """
+        self.nodes = nodes
+        self.focusable = [node for node in nodes if node.focusable and node.bounds[0] < node.bounds[2] and node.bounds[1] < node.bounds[3]]
+        self.__focusable_indexes = {node.index for node in self.focusable}
+        self.focused = next((node for node in self.focusable if node.focused), None)
+        self.__by_x = sorted(self.focusable, key=lambda node: node.center[0])
+        self.__by_y = sorted(self.focusable, key=lambda node: node.center[1])
+        self.__xs = [node.center[0] for node in self.__by_x]
+        self.__ys = [node.center[1] for node in self.__by_y]
+
+
+
+    @classmethod
+    def parse(cls, output: bytes|memoryview|str) -> 'UIIndex':
+        """
+        The function parses the output of `uiautomator dump`, text around the XML document (like the
+        `UI hierchary dumped to` message) is ignored.
+
+        Args:
+            output (bytes|memoryview|str): The dump output.
+
+        Returns:
+            The `UIIndex` of the hierarchy.
+
+        Raises:
+            ValueError: if the output has no UI hierarchy.
+        """
+        data = output.encode('utf-8') if isinstance(output, str) else bytes(output)
+        start, end = data.find(b'<hierarchy'), data.rfind(b'</hierarchy>')
+        if start < 0 or end < 0:
+            raise ValueError(f'No UI hierarchy in the uiautomator output: {data[:200].decode("utf-8", errors="replace")}')
+        try:
+            root = ElementTree.fromstring(data[start:end + len(b'</hierarchy>')])
+        except ElementTree.ParseError as error:
+            raise ValueError(f'Invalid UI hierarchy: {error}') from error
+        nodes = []
+        for element in root.iter('node'):
+            match = BOUNDS_PATTERN.match(element.get('bounds', ''))
+            nodes.append(UINode(len(nodes), element.get('text', ''), element.get('resource-id', ''), element.get('content-desc', ''),
+                                element.get('class', ''), element.get('package', ''), tuple(map(int, match.groups())) if match else (0, 0, 0, 0),
+                                element.get('focusable') == 'true', element.get('focused') == 'true', element.get('clickable') == 'true'))
+        return cls(nodes)
+
+
+
+    def find(self, text: str|None=None, resource_id: str|None=None, content_desc: str|None=None) -> UINode|None:
+        """
+        The function finds the node to navigate to. A matching node that is not focusable itself (like
+        the label inside a card) resolves to the smallest focusable node containing it.
+
+        Args:
+            text (str|None): Exact text of the node.
+            resource_id (str|None): Resource id of the node, with or without its package prefix.
+            content_desc (str|None): Exact content description of the node.
+
+        Returns:
+            The focusable `UINode`. `None` if no node matches.
+        """
+        for node in self.nodes:
+            if not node.matches(text, resource_id, content_desc):
+                continue
+            if node.index in self.__focusable_indexes:
+                return node
+            containers = [candidate for candidate in self.focusable if self.__contains(candidate.bounds, node.bounds)]
+            if containers:
+                return min(containers, key=lambda candidate: self.__area(candidate.bounds))
+        return None
+
+
+
+    @staticmethod
+    def __contains(outer: tuple, inner: tuple) -> bool:
+        return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
+
+
+
+    @staticmethod
+    def __area(bounds: tuple) -> int:
+        return (bounds[2] - bounds[0]) * (bounds[3] - bounds[1])
+
+
+
+    def __candidates(self, node: UINode, direction: KeyCodes) -> list:
+        x, y = node.center
+        if direction == KeyCodes.KEYCODE_DPAD_LEFT:
+            return self.__by_x[:bisect.bisect_left(self.__xs, x)]
+        if direction == KeyCodes.KEYCODE_DPAD_RIGHT:
+            return self.__by_x[bisect.bisect_right(self.__xs, x):]
+        if direction == KeyCodes.KEYCODE_DPAD_UP:
+            return self.__by_y[:bisect.bisect_left(self.__ys, y)]
+        return self.__by_y[bisect.bisect_right(self.__ys, y):]
+
+
+
+    def neighbor(self, node: UINode, direction: KeyCodes) -> UINode|None:
+        """
+        The function finds the node the focus moves to when a D-pad key is pressed on a node.
+
+        Args:
+            node (UINode): The focused node.
+            direction (KeyCodes): One of the `KEYCODE_DPAD_UP/DOWN/LEFT/RIGHT` keys.
+
+        Returns:
+            The next focused `UINode`. `None` if the focus can not move that way.
+        """
+        if direction in node.neighbors:
+            return node.neighbors[direction]
+        left, top, right, bottom = node.bounds
+        horizontal = direction in (KeyCodes.KEYCODE_DPAD_LEFT, KeyCodes.KEYCODE_DPAD_RIGHT)
+        best, best_score = None, None
+        for candidate in self.__candidates(node, direction):
+            c_left, c_top, c_right, c_bottom = candidate.bounds
+            if direction == KeyCodes.KEYCODE_DPAD_LEFT:
+                major, in_direction = left - c_right, c_left < left
+            elif direction == KeyCodes.KEYCODE_DPAD_RIGHT:
+                major, in_direction = c_left - right, c_right > right
+            elif direction == KeyCodes.KEYCODE_DPAD_UP:
+                major, in_direction = top - c_bottom, c_top < top
+            else:
+                major, in_direction = c_top - bottom, c_bottom > bottom
+            if not in_direction:
+                continue
+            if horizontal:
+                in_beam = c_top < bottom and c_bottom > top
+                minor = abs(candidate.center[1] - node.center[1])
+            else:
+                in_beam = c_left < right and c_right > left
+                minor = abs(candidate.center[0] - node.center[0])
+            score = (not in_beam, 13 * max(major, 0) ** 2 + minor ** 2)
+            if best_score is None or score < best_score:
+                best, best_score = candidate, score
+        node.neighbors[direction] = best
+        return best
+
+
+
+    def path_to(self, target: UINode|None, start: UINode|None=None) -> list|None:
+        """
+        The function computes the shortest D-pad key sequence moving the focus to a node.
+
+        Args:
+            target (UINode|None): The node to focus, usually from `find`.
+            start (UINode|None): The node the focus starts on. Defaults to the focused node.
+
+        Returns:
+            List of `KeyCodes` to press in order, empty if the target is already focused. `None` if the
+            target is not reachable or there is no focused node.
+        """
+        start = start or self.focused
+        if target is None or start is None:
+            return None
+        previous = {start.index: None}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if node is target:
+                keys = []
+                while previous[node.index] is not None:
+                    node, key = previous[node.index]
+                    keys.append(key)
+                return keys[::-1]
+            for direction in DIRECTIONS:
+                neighbor = self.neighbor(node, direction)
+                if neighbor is not None and neighbor.index not in previous:
+                    previous[neighbor.index] = (node, direction)
+                    queue.append(neighbor)
+        return None
@@ -0,0 +1,114 @@
+import re
+from dataclasses import dataclass, replace
+from .key_codes import KeyCodes
+
+
+
+# audio streams of `AudioManager`, TV apps play on the music stream
+VOLUME_STREAMS = {
+    'voice_call': 0,
+    'system': 1,
+    'ring': 2,
+    'music': 3,
+    'alarm': 4,
+    'notification': 5,
+}
+
+VOLUME_KEYS = frozenset({KeyCodes.KEYCODE_VOLUME_UP, KeyCodes.KEYCODE_VOLUME_DOWN, KeyCodes.KEYCODE_VOLUME_MUTE})
+
+VOLUME_PATTERN = re.compile(r'volume is (\d+) in range \[(\d+)\.\.(\d+)\]')
+
+
+
+@dataclass(frozen=True)
+class Volume:
+    """Volume index of one audio stream and the range it can take, as reported by the device."""
+
+
+    stream: int
+    level: int
+    min_level: int
+    max_level: int
+
+
+
+    def step(self, keycode: KeyCodes) -> 'Volume|None':
+        """
+        The function predicts the volume after a volume key press, without asking the device.
+
+        Args:
+            keycode (KeyCodes): The pressed key.
+
+        Returns:
+            The predicted `Volume`, the same volume for other keys. `None` if it can not be predicted (mute).
+        """
+        if keycode == KeyCodes.KEYCODE_VOLUME_UP:
+            return replace(self, level=min(self.level + 1, self.max_level))
+        if keycode == KeyCodes.KEYCODE_VOLUME_DOWN:
+            return replace(self, level=max(self.level - 1, self.min_level))
+        if keycode == KeyCodes.KEYCODE_VOLUME_MUTE:
+            return None
+        return self
+
+
+
+def resolve_stream(stream: int|str) -> int:
+    """
+    The function resolves an audio stream name to its id.
+
+    Args:
+        stream (int|str): Stream id, or one of the names of `VOLUME_STREAMS`, for example 'music'.
+
+    Returns:
+        The stream id.
+
+    Raises:
+        ValueError: if the stream name is unknown.
+    """
+    if isinstance(stream, int):
+        return stream
+    if stream not in VOLUME_STREAMS:
+        raise ValueError(f'Unknown audio stream: {stream}, use one of [{" | ".join(VOLUME_STREAMS)}]')
+    return VOLUME_STREAMS[stream]
+
+
+
+def build_volume_command(stream: int, level: int|None=None) -> str:
+    """
+    The function builds the shell command reading (and first setting, if `level` is given) the volume
+    of a stream in one round trip. It uses `cmd media_session` and falls back on the `media` tool of
+    older Android versions.
+
+    Args:
+        stream (int): The stream id, for example 3 for music.
+        level (int|None): Volume index to set. Defaults to None (only read it).
+
+    Returns:
+        The shell command.
+    """
+    commands = [f'--stream {stream} --get']
+    if level is not None:
+        commands.insert(0, f'--stream {stream} --set {level}')
+    return '; '.join(f'{{ cmd media_session volume {args} || media volume {args}; }} 2>/dev/null' for args in commands)
+
+
+
+def parse_volume(output: str, stream: int) -> Volume:
+    """
+    The function parses the `volume is 7 in range [0..15]` line of the volume command output.
+
+    Args:
+        output (str): Output of the command built by `build_volume_command`.
+        stream (int): The stream id the command was built for.
+
+    Returns:
+        The `Volume` of the stream.
+
+    Raises:
+        ValueError: if the output has no volume.
+    """
+    matches = VOLUME_PATTERN.findall(output)
+    if not matches:
+        raise ValueError(f'No volume in the output: {output.strip()[:200]}')
+    level, min_level, max_level = map(int, matches[-1])
+    return Volume(stream, level, min_level, max_level)
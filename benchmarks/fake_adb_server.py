@@ -0,0 +1,1010 @@
+import re
+import time
+import shlex
+import socket
+import select
+import zlib
+import random
+import base64
+import struct
+import threading
+import socketserver
+from typing import Callable, Iterator
+from android_tv_rc.key_codes import KeyCodes
+from android_tv_rc.adb_transport import encode_request, SHELL_V2_STDOUT, SHELL_V2_EXIT
+from android_tv_rc.text_input import ADB_KEYBOARD_IME
+
+
+
+class FakeDevice:
+    """
+    In-memory stand-in for an Android TV device, used together with `FakeADBServer` to exercise
+    the adb protocol path offline.
+
+    The device understands a small subset of the Android shell: command sequences (`;`, `&&`, `||`),
+    pipes, `{ }` groups, `$?` and the usual commands the library sends (`input`, `getprop`, `pm`,
+    `am`, `cmd media_session`, `ime`, `settings`, `dumpsys`, `ifconfig`, `screencap`, `screenrecord`, `uiautomator`, `cat`, `echo`, `printf`, `grep`, `sleep` ..). Extra commands can be added
+    with `register_command`.
+
+    The latency, jitter and failures of a real device on the network can be simulated for benchmarks.
+    """
+
+
+    LAUNCHER_PACKAGE = 'com.google.android.tvlauncher'
+
+    MAX_VOLUME = 15
+
+    DEFAULT_INPUT_METHOD = 'com.google.android.inputmethod.latin/com.android.inputmethod.latin.LatinIME'
+
+    DEFAULT_PACKAGES = {
+        'com.google.android.tvlauncher': ('com.google.android.tvlauncher/.MainActivity', 1010900212),
+        'com.google.android.youtube.tv': ('com.google.android.youtube.tv/com.google.android.apps.youtube.tv.activity.ShellActivity', 40121),
+        'com.netflix.ninja': ('com.netflix.ninja/.MainActivity', 60130),
+        'com.android.settings': ('com.android.settings/.Settings', 30),
+    }
+
+
+
+    def __init__(self, serial: str, properties: dict|None=None, packages: dict|None=None, screen_size: tuple=(1920, 1080),
+                 latency: float=0.0, jitter: float=0.0, failure_rate: float=0.0, seed: int|None=None,
+                 features: tuple=('shell_v2', 'cmd', 'stat_v2')):
+        """
+        Args:
+            serial (str): Device serial, for network devices it is `ip:port`, for example `192.168.1.28:5555`.
+            properties (dict|None): Extra system properties, merged over the default ones.
+            packages (dict|None): Installed packages as `{package: (launcher_component, version_code)}`.
+                Defaults to a launcher, YouTube, Netflix and Settings.
+            screen_size (tuple): Width and height of the frames `screencap` renders. Defaults to (1920, 1080)
+            latency (float): Seconds added to every shell round trip, like the network and adbd of a real TV. Defaults to 0
+            jitter (float): Up to this many more seconds, drawn at random for every round trip. Defaults to 0
+            failure_rate (float): Probability of a round trip failing as if the device went offline. Defaults to 0
+            seed (int|None): Seed of the jitter and failure draws, for reproducible runs. Defaults to None.
+            features (tuple): Features the device advertises, without `shell_v2` shell commands report no exit
+                status like on devices older than Android 7. Defaults to shell_v2, cmd and stat_v2.
+        """
+        self.serial = serial
+        self.state = 'device'
+        self.connected = False
+        self.__powered_on = True
+        self.screen_size = screen_size
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.features = list(features)
+        self.files = {}
+        self.focus = (0, 0)
+        self.volumes = dict.fromkeys(range(6), 8)
+        self.input_methods = [self.DEFAULT_INPUT_METHOD]
+        self.input_method = self.DEFAULT_INPUT_METHOD
+        self.__foreground = self.DEFAULT_PACKAGES[self.LAUNCHER_PACKAGE][0]
+        self.key_events = []
+        self.text_inputs = []
+        self.shell_commands = []
+        self.packages = dict(self.DEFAULT_PACKAGES if packages is None else packages)
+        self.properties = {
+            'ro.product.manufacturer': 'Fake',
+            'ro.product.model': 'Fake Android TV',
+            'ro.product.name': 'fake_atv',
+            'ro.build.version.release': '11',
+            'ro.build.version.sdk': '30',
+            'ro.build.fingerprint': 'fake/fake_atv/fake_atv:11/RTT1.000000.001/1:user/release-keys',
+            'ro.serialno': re.sub(r'\W', '', serial).upper(),
+        }
+        self.properties.update(properties or {})
+        self.__lock = threading.RLock()
+        self.__random = random.Random(seed)
+        self.__commands = {
+            'true': lambda args, stdin: ('', 0),
+            'false': lambda args, stdin: ('', 1),
+            'echo': self.__echo,
+            'printf': self.__printf,
+            'sleep': self.__sleep,
+            'grep': self.__grep,
+            'getprop': self.__getprop,
+            'input': self.__input,
+            'pm': self.__pm,
+            'am': self.__am,
+            'cmd': self.__cmd,
+            'dumpsys': self.__dumpsys,
+            'ifconfig': self.__ifconfig,
+            'logcat': self.__logcat,
+            'screencap': self.__screencap,
+            'screenrecord': self.__screenrecord,
+            'uiautomator': self.__uiautomator,
+            'cat': self.__cat,
+            'settings': self.__settings,
+            'ime': self.__ime,
+        }
+        self.__sleeper = threading.Event()
+        self.logs = []
+        self.__logs_condition = threading.Condition()
+
+
+
+    @property
+    def ip(self) -> str:
+        """The IP address part of the device serial."""
+        return self.serial.split(':')[0]
+
+
+
+    @property
+    def powered_on(self) -> bool:
+        """Whether the screen is on, changes are logged to the events buffer like on a real device."""
+        return self.__powered_on
+
+
+
+    @powered_on.setter
+    def powered_on(self, powered_on: bool):
+        changed, self.__powered_on = powered_on != self.__powered_on, powered_on
+        if changed:
+            self.log('power_screen_state', f'[{int(powered_on)},2,0,0,0]')
+
+
+
+    @property
+    def foreground(self) -> str:
+        """Component of the resumed activity, changes are logged to the events buffer like on a real device."""
+        return self.__foreground
+
+
+
+    @foreground.setter
+    def foreground(self, component: str):
+        changed, self.__foreground = component != self.__foreground, component
+        if changed:
+            self.log('wm_set_resumed_activity', f'[0,{component},resumeTopActivity]')
+
+
+
+    def register_command(self, name: str, handler: Callable):
+        """
+        The function adds or replaces a shell command of the fake device.
+
+        Args:
+            name (str): The command name, for example `screencap`.
+            handler (Callable): Called as `handler(args, stdin)` with the command arguments list and the
+                piped input bytes. It returns `(output, exit_code)` where output is `str`, `bytes` or an
+                iterator of `bytes` chunks for streaming commands.
+        """
+        self.__commands[name] = handler
+
+
+
+    # ------------------------------[ Shell Interpreter ]------------------------------
+
+
+
+    @staticmethod
+    def __tokenize(script: str) -> list:
+        # drop redirections, the fake commands never read stdin nor write stderr
+        script = re.sub(r'(?<![\w$])\d?(>>?|<)&?\s*(&\d|/dev/\w+)', ' ', script)
+        lexer = shlex.shlex(script.replace('\n', ' ; '), posix=True, punctuation_chars=';&|')
+        lexer.whitespace_split = True
+        return [token for token in lexer if token not in ('{', '}')]
+
+
+
+    @staticmethod
+    def __parse(tokens: list) -> list:
+        # list of (connector, pipeline) where connector is how it chains to the previous pipeline
+        statements, pipeline, command, connector = [], [], [], ';'
+        for token in tokens + [';']:
+            if token in (';', '&', '&&', '||'):
+                if command:
+                    pipeline.append(command)
+                if pipeline:
+                    statements.append((connector, pipeline))
+                pipeline, command = [], []
+                connector = ';' if token == '&' else token
+            elif token == '|':
+                pipeline.append(command)
+                command = []
+            else:
+                command.append(token)
+        return statements
+
+
+
+    def simulate_round_trip(self) -> bool:
+        """
+        The function waits the latency and jitter of one round trip and draws whether it fails.
+
+        Returns:
+            Boolean indicates if the round trip fails.
+        """
+        with self.__lock:
+            delay = self.latency + (self.__random.uniform(0, self.jitter) if self.jitter > 0 else 0)
+            failed = self.failure_rate > 0 and self.__random.random() < self.failure_rate
+        if delay > 0:
+            time.sleep(delay)
+        return failed
+
+
+
+    def execute(self, script: str) -> Iterator[bytes]:
+        """
+        The function runs a shell script on the fake device.
+
+        Args:
+            script (str): The shell script.
+
+        Returns:
+            Iterator of the output chunks of the script, the generator returns the exit code of the
+            last command.
+        """
+        with self.__lock:
+            self.shell_commands.append(script)
+        exit_code = 0
+        for connector, pipeline in self.__parse(self.__tokenize(script)):
+            if (connector == '&&' and exit_code != 0) or (connector == '||' and exit_code == 0):
+                continue
+            stdin = b''
+            for index, command in enumerate(pipeline):
+                args = [arg.replace('$?', str(exit_code)) for arg in command]
+                handler = self.__commands.get(args[0])
+                if handler is None:
+                    output, exit_code = f'/system/bin/sh: {args[0]}: inaccessible or not found\n', 127
+                else:
+                    output, exit_code = handler(args[1:], stdin)
+                if index < len(pipeline) - 1:
+                    stdin = self.__collect(output)
+                elif isinstance(output, (str, bytes, bytearray)):
+                    yield self.__collect(output)
+                else:
+                    yield from output
+        return exit_code
+
+
+
+    def run(self, script: str) -> tuple[bytes, int]:
+        """
+        The function runs a shell script on the fake device and collects its output.
+
+        Args:
+            script (str): The shell script.
+
+        Returns:
+            Tuple of the output bytes and the exit code of the last command.
+        """
+        chunks, execution = [], self.execute(script)
+        while True:
+            try:
+                chunks.append(next(execution))
+            except StopIteration as stop:
+                return b''.join(chunks), stop.value
+
+
+
+    @staticmethod
+    def __collect(output) -> bytes:
+        if isinstance(output, str):
+            return output.encode('utf-8')
+        if isinstance(output, (bytes, bytearray)):
+            return bytes(output)
+        return b''.join(output)
+
+
+
+    def __echo(self, args, stdin):
+        if args and args[0] == '-n':
+            return ' '.join(args[1:]), 0
+        return ' '.join(args) + '\n', 0
+
+
+
+    def __printf(self, args, stdin):
+        if not args:
+            return '', 1
+        fmt = args[0].replace('\\n', '\n').replace('\\t', '\t')
+        values = [int(value) if value.lstrip('-').isdigit() else value for value in args[1:]]
+        fmt = re.sub(r'%d', '%s', fmt)
+        return fmt % tuple(values) if values else fmt, 0
+
+
+
+    def __sleep(self, args, stdin):
+        self.__sleeper.wait(float(args[0]) if args else 0)
+        return '', 0
+
+
+
+    def __grep(self, args, stdin):
+        patterns, max_count, ignore_case, invert = [], None, False, False
+        index = 0
+        while index < len(args):
+            arg = args[index]
+            if arg == '-e':
+                patterns.append(args[index + 1])
+                index += 1
+            elif arg == '-m':
+                max_count = int(args[index + 1])
+                index += 1
+            elif arg == '-i':
+                ignore_case = True
+            elif arg == '-v':
+                invert = True
+            elif not patterns:
+                patterns.append(arg)
+            index += 1
+        flags = re.I if ignore_case else 0
+        lines = []
+        for line in stdin.decode('utf-8', errors='replace').splitlines():
+            if any(re.search(pattern, line, flags) for pattern in patterns) != invert:
+                lines.append(line)
+                if max_count and len(lines) >= max_count:
+                    break
+        return ''.join(f'{line}\n' for line in lines), 0 if lines else 1
+
+
+
+    def __getprop(self, args, stdin):
+        if args:
+            return self.properties.get(args[0], '') + '\n', 0
+        return ''.join(f'[{key}]: [{value}]\n' for key, value in sorted(self.properties.items())), 0
+
+
+
+    def __input(self, args, stdin):
+        if not args:
+            return 'Usage: input [<source>] <command> [<arg>...]\n', 1
+        if args[0] == 'keyevent':
+            for key in args[1:]:
+                if key.startswith('--'):
+                    continue
+                self.press_key(KeyCodes(int(key)).name if key.isdigit() else key)
+        elif args[0] == 'text':
+            with self.__lock:
+                self.text_inputs.append(' '.join(args[1:]).replace('%s', ' '))
+        return '', 0
+
+
+
+    def press_key(self, key_name: str):
+        """
+        The function applies the side effects of a key press on the fake device state.
+
+        Args:
+            key_name (str): Key code name, for example `KEYCODE_HOME`.
+        """
+        with self.__lock:
+            self.key_events.append(key_name)
+            if key_name == 'KEYCODE_HOME':
+                self.foreground = self.packages.get(self.LAUNCHER_PACKAGE, (self.foreground, 0))[0]
+            elif key_name == 'KEYCODE_POWER':
+                self.powered_on = not self.powered_on
+            elif key_name in ('KEYCODE_SLEEP', 'KEYCODE_SOFT_SLEEP'):
+                self.powered_on = False
+            elif key_name == 'KEYCODE_WAKEUP':
+                self.powered_on = True
+            elif key_name in ('KEYCODE_VOLUME_UP', 'KEYCODE_VOLUME_DOWN'):
+                step = 1 if key_name == 'KEYCODE_VOLUME_UP' else -1
+                self.volumes[3] = min(max(self.volumes[3] + step, 0), self.MAX_VOLUME)
+            elif key_name in ('KEYCODE_DPAD_LEFT', 'KEYCODE_DPAD_RIGHT'):
+                row, column = self.focus
+                step = 1 if key_name == 'KEYCODE_DPAD_RIGHT' else -1
+                self.focus = (row, min(max(column + step, 0), len(self.ui_rows()[row]) - 1))
+            elif key_name in ('KEYCODE_DPAD_UP', 'KEYCODE_DPAD_DOWN'):
+                rows = self.ui_rows()
+                row, column = self.focus
+                target = min(max(row + (1 if key_name == 'KEYCODE_DPAD_DOWN' else -1), 0), len(rows) - 1)
+                # the focus goes to the element of the next row closest to the current one
+                x = sum(rows[row][column][2][0::2]) / 2
+                self.focus = (target, min(range(len(rows[target])), key=lambda index: abs(sum(rows[target][index][2][0::2]) / 2 - x)))
+
+
+
+    def log(self, tag: str, message: str, level: str='I', pid: int=1000, tid: int|None=None):
+        """
+        The function appends an entry to the fake device log, followers of `logcat` receive it at once.
+
+        Args:
+            tag (str): The log tag, for example `ActivityManager`.
+            message (str): The log message.
+            level (str): The log level [V | D | I | W | E | F]. Defaults to I
+            pid (int): Process id of the entry. Defaults to 1000
+            tid (int|None): Thread id of the entry. Defaults to the pid.
+        """
+        with self.__logs_condition:
+            self.logs.append((time.time(), pid, pid if tid is None else tid, level, tag, message))
+            self.__logs_condition.notify_all()
+
+
+
+    def __logcat(self, args, stdin):
+        binary, dump, tail, pid, regex, specs, index = False, False, None, None, None, [], 0
+        while index < len(args):
+            arg = args[index]
+            if arg == '-B':
+                binary = True
+            elif arg == '-d':
+                dump = True
+            elif arg in ('-v', '-b', '-T', '-e'):
+                index += 1
+                tail = int(args[index]) if arg == '-T' else tail
+                regex = re.compile(args[index]) if arg == '-e' else regex
+            elif arg.startswith('--pid='):
+                pid = int(arg.split('=', 1)[1])
+            elif ':' in arg:
+                specs.append(arg.split(':', 1))
+            index += 1
+        levels = 'VDIWEFS'
+
+        def wanted(entry) -> bool:
+            _, entry_pid, _, level, tag, message = entry
+            if (pid is not None and entry_pid != pid) or (regex and not regex.search(message)):
+                return False
+            minimum = next((spec_level for spec_tag, spec_level in specs if spec_tag == tag), None)
+            if minimum is None:
+                minimum = next((spec_level for spec_tag, spec_level in specs if spec_tag == '*'), 'V')
+            return levels.index(level) >= levels.index(minimum)
+
+        def encode(entry) -> bytes:
+            timestamp, entry_pid, entry_tid, level, tag, message = entry
+            if binary:
+                payload = bytes([levels.index(level) + 2]) + tag.encode() + b'\0' + message.encode() + b'\0'
+                header = struct.pack('<HHiIIIII', len(payload), 28, entry_pid, entry_tid, int(timestamp),
+                                     int(timestamp % 1 * 1e9), 0, 1000)
+                return header + payload
+            clock = time.strftime('%m-%d %H:%M:%S', time.localtime(timestamp)) + f'.{int(timestamp % 1 * 1000):03d}'
+            return f'{clock} {entry_pid:5d} {entry_tid:5d} {level} {tag}: {message}\n'.encode()
+
+        def follow():
+            with self.__logs_condition:
+                position = len(self.logs) - tail if tail is not None else 0
+                position = max(position, 0)
+            while True:
+                with self.__logs_condition:
+                    if position >= len(self.logs):
+                        if dump:
+                            return
+                        self.__logs_condition.wait(0.1)
+                    entries, position = self.logs[position:], len(self.logs)
+                chunk = b''.join(encode(entry) for entry in entries if wanted(entry))
+                # an empty chunk lets the server check if the client is still there
+                yield chunk
+
+        return follow(), 0
+
+
+
+    def __pm(self, args, stdin):
+        if args[:2] == ['list', 'packages']:
+            show_version = '--show-versioncode' in args
+            if show_version and int(self.properties['ro.build.version.sdk']) < 28:
+                # the flag only exists since Android 9
+                return 'Error: Unknown option: --show-versioncode\n', 1
+            lines = []
+            for package, (_, version_code) in sorted(self.packages.items()):
+                lines.append(f'package:{package}' + (f' versionCode:{version_code}' if show_version else ''))
+            return ''.join(f'{line}\n' for line in lines), 0
+        if args[:1] == ['path'] and len(args) == 2:
+            if args[1] in self.packages:
+                return f'package:/data/app/{args[1]}-1/base.apk\n', 0
+            return '', 1
+        return f'Unknown command: {" ".join(args)}\n', 1
+
+
+
+    def __am(self, args, stdin):
+        if args[:1] == ['start']:
+            component = args[-1]
+            package = component.split('/')[0]
+            if package not in self.packages:
+                return f'Starting: Intent {{ cmp={component} }}\nError: Activity class {{{component}}} does not exist.\n', 0
+            with self.__lock:
+                self.foreground = component
+            return (f'Starting: Intent {{ cmp={component} }}\nStatus: ok\nLaunchState: COLD\nActivity: {component}\n'
+                    'TotalTime: 412\nWaitTime: 418\nComplete\n'), 0
+        if args[:1] == ['broadcast']:
+            options = dict(zip(args[1::2], args[2::2]))
+            action = options.get('-a', '')
+            if action in ('ADB_INPUT_B64', 'ADB_INPUT_TEXT') and self.input_method == ADB_KEYBOARD_IME:
+                message = args[-1]
+                with self.__lock:
+                    self.text_inputs.append(base64.b64decode(message).decode('utf-8') if action == 'ADB_INPUT_B64' else message)
+            return f'Broadcasting: Intent {{ act={action} flg=0x400000 (has extras) }}\nBroadcast completed: result=0\n', 0
+        if args[:1] == ['force-stop'] and len(args) == 2:
+            with self.__lock:
+                if self.foreground.split('/')[0] == args[1]:
+                    self.foreground = self.packages.get(self.LAUNCHER_PACKAGE, (self.foreground, 0))[0]
+            return '', 0
+        return f'Error: unknown command \'{" ".join(args)}\'\n', 1
+
+
+
+    def __cmd(self, args, stdin):
+        if args[:2] == ['package', 'query-activities']:
+            # every fake app has a leanback launcher activity
+            if 'android.intent.category.LEANBACK_LAUNCHER' not in args:
+                return 'No activities found\n', 0
+            components = [component for component, _ in self.packages.values()]
+            lines = [f'{len(components)} activities found:']
+            for number, component in enumerate(components):
+                lines += [f'  Activity #{number}:', '    priority=0 preferredOrder=0 match=0x108000 specificIndex=-1 isDefault=false',
+                          f'    {component}']
+            return ''.join(f'{line}\n' for line in lines), 0
+        if args[:2] == ['media_session', 'volume']:
+            return self.__volume(args[2:])
+        return f'Unknown command: {" ".join(args)}\n', 1
+
+
+
+    def __settings(self, args, stdin):
+        if args == ['get', 'secure', 'default_input_method']:
+            return f'{self.input_method}\n', 0
+        return f'Unknown settings: {" ".join(args)}\n', 1
+
+
+
+    def __ime(self, args, stdin):
+        if len(args) != 2 or args[0] not in ('enable', 'set'):
+            return f'Unknown ime command: {" ".join(args)}\n', 1
+        if args[1] not in self.input_methods:
+            return f'Unknown input method {args[1]} cannot be {"enabled" if args[0] == "enable" else "selected"} for user #0\n', 255
+        if args[0] == 'enable':
+            return f'Input method {args[1]}: now enabled for user #0\n', 0
+        with self.__lock:
+            self.input_method = args[1]
+        return f'Input method {args[1]} selected for user #0\n', 0
+
+
+
+    def __volume(self, args):
+        options = dict(zip(args[::2], args[1::2]))
+        stream = int(options.get('--stream', 3))
+        if stream not in self.volumes:
+            return f'Error: invalid stream {stream}\n', 1
+        with self.__lock:
+            if '--set' in options:
+                self.volumes[stream] = min(max(int(options['--set']), 0), self.MAX_VOLUME)
+                return f'[V] will set volume to index={self.volumes[stream]}\n', 0
+        return f'[V] will get volume\nvolume is {self.volumes[stream]} in range [0..{self.MAX_VOLUME}]\n', 0
+
+
+
+    def __dumpsys(self, args, stdin):
+        service = args[0] if args else ''
+        if service == 'power':
+            wakefulness = 'Awake' if self.powered_on else 'Asleep'
+            display = 'ON' if self.powered_on else 'OFF'
+            return (f'POWER MANAGER (dumpsys power)\n\nPower Manager State:\n  mWakefulness={wakefulness}\n'
+                    f'  mHoldingDisplaySuspendBlocker={str(self.powered_on).lower()}\nDisplay Power: state={display}\n'), 0
+        if service == 'package' and len(args) == 2:
+            package = args[1]
+            if package not in self.packages:
+                return '', 0
+            component, version_code = self.packages[package]
+            return (f'Activity Resolver Table:\n  Non-Data Actions:\n      android.intent.action.MAIN:\n'
+                    f'        5e1c2f1 {component} filter 8a3b4c2\n          Action: "android.intent.action.MAIN"\n'
+                    f'          Category: "android.intent.category.LEANBACK_LAUNCHER"\n\nPackages:\n'
+                    f'  Package [{package}] (3f2a1b0):\n    versionCode={version_code} minSdk=21 targetSdk=30\n'), 0
+        if service == 'window':
+            return f'  mCurrentFocus=Window{{1a2b3c u0 {self.foreground}}}\n  mFocusedApp=ActivityRecord{{4d5e6f u0 {self.foreground} t12}}\n', 0
+        if service == 'activity' and args[1:2] == ['activities']:
+            return f'  mResumedActivity: ActivityRecord{{4d5e6f u0 {self.foreground} t12}}\n', 0
+        return f'Can\'t find service: {service}\n', 0
+
+
+
+    def render_screen(self) -> bytes:
+        """
+        The function renders the current screen as RGBA pixels: black when powered off, otherwise a
+        background color derived from the foreground app with a highlighted band that moves with the
+        D-pad focus, so captures change exactly when the device state does.
+
+        Returns:
+            The `width * height * 4` bytes of the frame, row after row.
+        """
+        width, height = self.screen_size
+        with self.__lock:
+            if not self.powered_on:
+                return bytes(width * height * 4)
+            seed = zlib.crc32(self.foreground.encode('utf-8'))
+            moves = sum(1 if key == 'KEYCODE_DPAD_DOWN' else -1 for key in self.key_events if key in ('KEYCODE_DPAD_UP', 'KEYCODE_DPAD_DOWN'))
+        background = bytes(((seed >> 16) & 0xFF, (seed >> 8) & 0xFF, seed & 0xFF, 0xFF)) * width
+        highlight = bytes(255 - value for value in background[:3]) + b'\xff'
+        band_height = max(height // 10, 1)
+        band_top = (moves % 10) * band_height
+        band = highlight * width
+        return b''.join(band if band_top <= row < band_top + band_height else background for row in range(height))
+
+
+
+    def __screencap(self, args, stdin):
+        width, height = self.screen_size
+        pixels = self.render_screen()
+        if '-p' not in args:
+            # raw header: width, height, pixel format (RGBA_8888) and color space (sRGB)
+            return struct.pack('<IIII', width, height, 1, 1) + pixels, 0
+        stride = width * 4
+        rows = b''.join(b'\0' + pixels[row * stride:(row + 1) * stride] for row in range(height))
+
+        def chunk(kind: bytes, data: bytes) -> bytes:
+            return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+        return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+                + chunk(b'IDAT', zlib.compress(rows, 1)) + chunk(b'IEND', b'')), 0
+
+
+
+    def __screenrecord(self, args, stdin):
+        if '--output-format=h264' not in args or args[-1] != '-':
+            return 'screenrecord: only the h264 stream to stdout is supported by the fake device\n', 1
+        time_limit = float(args[args.index('--time-limit') + 1]) if '--time-limit' in args else 180.0
+        bit_rate = int(args[args.index('--bit-rate') + 1]) if '--bit-rate' in args else 4000000
+        frame_size = max(bit_rate // 8 // 30, 16)
+
+        def record():
+            # annex B stream: SPS, PPS and a key frame, then one predicted frame every 1/30 second
+            started = time.monotonic()
+            yield b'\0\0\0\x01\x67' + bytes(8) + b'\0\0\0\x01\x68' + bytes(4) + b'\0\0\0\x01\x65' + b'\xaa' * frame_size
+            while time.monotonic() - started < time_limit:
+                time.sleep(1 / 30)
+                # an empty chunk lets the server check if the client is still there
+                yield b''
+                yield b'\0\0\0\x01\x41' + b'\x55' * frame_size
+
+        return record(), 0
+
+
+
+    def ui_rows(self) -> list:
+        """
+        The function lays out the fake launcher: a row of menu buttons above a grid of app cards, one
+        card per installed package.
+
+        Returns:
+            List of rows, every row a list of `(text, resource_id, (left, top, right, bottom))`.
+        """
+        width, height = self.screen_size
+        menu = ['Search', 'Home', 'Apps', 'Settings']
+        rows = [[(label, f'{self.LAUNCHER_PACKAGE}:id/menu_{label.lower()}', (100 + 200 * index, 40, 280 + 200 * index, 100))
+                 for index, label in enumerate(menu)]]
+        packages = sorted(self.packages)
+        columns = 5
+        card_width = (width - 200) // columns
+        for start in range(0, len(packages), columns):
+            top = 200 + (start // columns) * (height // 4)
+            rows.append([(package, f'{self.LAUNCHER_PACKAGE}:id/app_card',
+                          (100 + card_width * index, top, 100 + card_width * (index + 1) - 20, top + height // 4 - 20))
+                         for index, package in enumerate(packages[start:start + columns])])
+        return rows
+
+
+
+    def __uiautomator(self, args, stdin):
+        if not args or args[0] != 'dump':
+            return 'Usage: uiautomator dump [--compressed] [file]\n', 1
+        path = ([arg for arg in args[1:] if not arg.startswith('--')] or ['/sdcard/window_dump.xml'])[0]
+        if not self.powered_on:
+            return 'ERROR: null root node returned by UiTestAutomationBridge.\n', 1
+        width, height = self.screen_size
+        with self.__lock:
+            focus_row, focus_column = self.focus
+        nodes = []
+        for row_index, row in enumerate(self.ui_rows()):
+            for column_index, (text, resource_id, (left, top, right, bottom)) in enumerate(row):
+                focused = str((row_index, column_index) == (focus_row, focus_column)).lower()
+                bounds = f'[{left},{top}][{right},{bottom}]'
+                attributes = (f'class="android.widget.FrameLayout" package="{self.LAUNCHER_PACKAGE}" '
+                              f'focusable="true" focused="{focused}" clickable="true" bounds="{bounds}"')
+                if row_index == 0:
+                    nodes.append(f'<node index="{column_index}" text="{text}" resource-id="{resource_id}" content-desc="" {attributes} />')
+                else:
+                    # app cards carry their label in a child text view, like the real launcher
+                    label = (f'<node index="0" text="{text}" resource-id="{self.LAUNCHER_PACKAGE}:id/title" content-desc="" '
+                             f'class="android.widget.TextView" package="{self.LAUNCHER_PACKAGE}" focusable="false" focused="false" '
+                             f'clickable="false" bounds="[{left + 10},{bottom - 50}][{right - 10},{bottom - 10}]" />')
+                    nodes.append(f'<node index="{column_index}" text="" resource-id="{resource_id}" content-desc="{text}" {attributes}>{label}</node>')
+        self.files[path] = ("<?xml version='1.0' encoding='UTF-8' standalone='yes' ?><hierarchy rotation=\"0\">"
+                            f'<node index="0" text="" resource-id="" content-desc="" class="android.widget.FrameLayout" package="{self.LAUNCHER_PACKAGE}" '
+                            f'focusable="false" focused="false" clickable="false" bounds="[0,0][{width},{height}]">{"".join(nodes)}</node></hierarchy>')
+        return f'UI hierchary dumped to: {path}\n', 0
+
+
+
+    def __cat(self, args, stdin):
+        if not args:
+            return stdin, 0
+        missing = [path for path in args if path not in self.files]
+        if missing:
+            return f'cat: {missing[0]}: No such file or directory\n', 1
+        return ''.join(self.files[path] for path in args), 0
+
+
+
+    def __ifconfig(self, args, stdin):
+        interface = args[0] if args else 'wlan0'
+        if interface != 'wlan0':
+            return f'ifconfig: {interface}: No such device\n', 1
+        return (f'wlan0     Link encap:UNSPEC    Driver wlan\n'
+                f'          inet addr:{self.ip}  Bcast:{".".join(self.ip.split(".")[:3])}.255  Mask:255.255.255.0 \n'
+                f'          UP BROADCAST RUNNING MULTICAST  MTU:1500  Metric:1\n'), 0
+
+
+
+class FakeADBServer:
+    """
+    Local fake of the adb server speaking the adb host protocol on a TCP port, backed by
+    `FakeDevice` objects. It makes it possible to test and benchmark `ADBClient` with
+    `transport='socket'` without real TV devices, and even the adb tool itself with `adb -P <port>`.
+
+    Example:
+        with FakeADBServer([FakeDevice('192.168.1.28:5555')]) as server:
+            client = ADBClient(transport='socket', server_port=server.port)
+            client.connect('192.168.1.28')
+    """
+
+
+    VERSION = 41
+
+
+
+    def __init__(self, devices: list|None=None, host: str='127.0.0.1', port: int=0):
+        """
+        Args:
+            devices (list|None): Fake devices reachable by the server. They have to be connected
+                (`adb connect`) before use unless their `connected` flag is already set.
+            host (str): Host to listen on. Defaults to 127.0.0.1
+            port (int): Port to listen on, 0 picks a free port. Defaults to 0
+        """
+        self.devices = {device.serial: device for device in devices or []}
+        self.__host = host
+        self.__port = port
+        self.__server = None
+        self.__thread = None
+
+
+
+    @property
+    def port(self) -> int:
+        """The port the server listens on."""
+        return self.__server.server_address[1] if self.__server else self.__port
+
+
+
+    def add_device(self, device: FakeDevice, connected: bool=False) -> FakeDevice:
+        """
+        The function makes a fake device reachable by the server.
+
+        Args:
+            device (FakeDevice): The fake device.
+            connected (bool): Whether the device is already connected. Defaults to False.
+
+        Returns:
+            The added device.
+        """
+        device.connected = connected or device.connected
+        self.devices[device.serial] = device
+        return device
+
+
+
+    def start(self) -> 'FakeADBServer':
+        """Starts serving in a background thread."""
+        handle_connection = self.__handle
+
+        class RequestHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                handle_connection(self.request)
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            # many clients connect at once when driving a fleet of fake devices
+            request_queue_size = 1024
+
+        self.__server = Server((self.__host, self.__port), RequestHandler)
+        self.__server.daemon_threads = True
+        self.__thread = threading.Thread(target=self.__server.serve_forever, name='fake-adb-server', daemon=True)
+        self.__thread.start()
+        return self
+
+
+
+    def stop(self):
+        """Stops serving."""
+        if self.__server:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
+
+
+
+    def __enter__(self):
+        return self.start()
+
+
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+
+    # ------------------------------[ Protocol ]------------------------------
+
+
+
+    @staticmethod
+    def __read_request(sock: socket.socket) -> str|None:
+        header = b''
+        while len(header) < 4:
+            chunk = sock.recv(4 - len(header))
+            if not chunk:
+                return None
+            header += chunk
+        length, payload = int(header, 16), b''
+        while len(payload) < length:
+            chunk = sock.recv(length - len(payload))
+            if not chunk:
+                return None
+            payload += chunk
+        return payload.decode('utf-8')
+
+
+
+    @staticmethod
+    def __okay(sock: socket.socket, payload: str|None=None):
+        sock.sendall(b'OKAY' + (encode_request(payload) if payload is not None else b''))
+
+
+
+    @staticmethod
+    def __fail(sock: socket.socket, message: str):
+        sock.sendall(b'FAIL' + encode_request(message))
+
+
+
+    def __connected_devices(self) -> list:
+        return [device for device in self.devices.values() if device.connected]
+
+
+
+    def __find_device(self, serial: str|None) -> FakeDevice|str:
+        devices = self.__connected_devices()
+        if serial is None:
+            if len(devices) != 1:
+                return 'no devices/emulators found' if not devices else 'more than one device/emulator'
+            return devices[0]
+        for device in devices:
+            if device.serial == serial:
+                return device
+        return f'device \'{serial}\' not found'
+
+
+
+    def __handle(self, sock: socket.socket):
+        device = None
+        while (service := self.__read_request(sock)) is not None:
+            if service.startswith('host:transport'):
+                serial = service.split(':', 2)[2] if service.startswith('host:transport:') else None
+                device = self.__find_device(serial)
+                if isinstance(device, str):
+                    return self.__fail(sock, device)
+                self.__okay(sock)
+                continue
+            if device is not None:
+                return self.__device_service(sock, device, service)
+            return self.__host_service(sock, service)
+
+
+
+    def __host_service(self, sock: socket.socket, service: str):
+        serial = None
+        if service.startswith('host-serial:'):
+            # serials contain ':' themselves, the request name is always the last part
+            serial, service = service[len('host-serial:'):].rsplit(':', 1)
+            service = 'host:' + service
+        if service == 'host:version':
+            return self.__okay(sock, f'{self.VERSION:04x}')
+        if service == 'host:kill':
+            return self.__okay(sock)
+        if service in ('host:devices', 'host:devices-l'):
+            lines = []
+            for device in self.__connected_devices():
+                line = f'{device.serial}\t{device.state}'
+                if service.endswith('-l'):
+                    line = f'{device.serial:<22} {device.state} product:{device.properties["ro.product.name"]} model:{device.properties["ro.product.model"].replace(" ", "_")} device:{device.properties["ro.product.name"]} transport_id:1'
+                lines.append(line)
+            return self.__okay(sock, ''.join(f'{line}\n' for line in lines))
+        if service.startswith('host:connect:'):
+            address = service[len('host:connect:'):]
+            address = address if ':' in address else f'{address}:5555'
+            target = self.devices.get(address)
+            if target is None:
+                return self.__okay(sock, f'failed to connect to {address}')
+            already = target.connected
+            target.connected = True
+            return self.__okay(sock, f'already connected to {address}' if already else f'connected to {address}')
+        if service.startswith('host:disconnect:'):
+            address = service[len('host:disconnect:'):]
+            targets = [d for d in self.__connected_devices() if not address or d.serial == address or d.ip == address]
+            for target in targets:
+                target.connected = False
+            return self.__okay(sock, f'disconnected {address}' if targets or not address else f'error: no such device \'{address}\'')
+        if service == 'host:features':
+            device = self.__find_device(serial)
+            if isinstance(device, str):
+                return self.__fail(sock, device)
+            return self.__okay(sock, ','.join(device.features))
+        if service in ('host:get-state', 'host:get-serialno', 'host:get-devpath'):
+            device = self.__find_device(serial)
+            if isinstance(device, str):
+                return self.__fail(sock, device)
+            values = {'host:get-state': device.state, 'host:get-serialno': device.serial, 'host:get-devpath': 'unknown'}
+            return self.__okay(sock, values[service])
+        return self.__fail(sock, f'unknown host service \'{service}\'')
+
+
+
+    def __device_service(self, sock: socket.socket, device: FakeDevice, service: str):
+        if service.startswith('reboot:'):
+            self.__okay(sock)
+            device.powered_on = True
+            return
+        name, _, command = service.partition(':')
+        name, *options = name.split(',')
+        if name in ('exec', 'shell'):
+            # the shell protocol v2 wraps the output in packets and ends with the exit status
+            v2 = 'v2' in options and 'shell_v2' in device.features
+            if command.strip() in ('', 'sh'):
+                self.__okay(sock)
+                return self.__interactive_shell(sock, device)
+            if device.simulate_round_trip():
+                return self.__fail(sock, 'device offline')
+            self.__okay(sock)
+            execution = device.execute(command)
+            try:
+                while True:
+                    try:
+                        chunk = next(execution)
+                    except StopIteration as stop:
+                        if v2:
+                            sock.sendall(struct.pack('<BIB', SHELL_V2_EXIT, 1, stop.value & 0xff))
+                        break
+                    if not device.connected:
+                        break  # the transport of a dropped device closes its streams
+                    if chunk:
+                        sock.sendall(struct.pack('<BI', SHELL_V2_STDOUT, len(chunk)) + chunk if v2 else chunk)
+                    elif self.__client_closed(sock):
+                        break
+            except OSError:
+                pass  # client went away in the middle of a stream
+            finally:
+                execution.close()
+            return
+        return self.__fail(sock, f'unknown device service \'{service}\'')
+
+
+
+    @staticmethod
+    def __client_closed(sock: socket.socket) -> bool:
+        readable, _, _ = select.select([sock], [], [], 0)
+        try:
+            return bool(readable) and sock.recv(1, socket.MSG_PEEK) == b''
+        except OSError:
+            return True
+
+
+
+    @staticmethod
+    def __interactive_shell(sock: socket.socket, device: FakeDevice):
+        # run every complete script received on stdin, a script is complete at a line end
+        # once its `{ }` groups are balanced
+        reader, pending = sock.makefile('rb'), ''
+        try:
+            while line := reader.readline():
+                pending += line.decode('utf-8')
+                depth = len(re.findall(r'(?:^|\s)\{(?=\s)', pending)) - len(re.findall(r'(?:^|\s)\}', pending))
+                if depth > 0:
+                    continue
+                script, pending = pending, ''
+                if device.simulate_round_trip():
+                    return  # the dropped connection ends the shell like an offline device
+                for chunk in device.execute(script):
+                    sock.sendall(chunk)
+        except OSError:
+            pass  # client closed the shell
+        finally:
+            reader.close()
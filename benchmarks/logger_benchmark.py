@@ -0,0 +1,114 @@
+"""
+Measures what logging costs: the import time of the library, one `Logger.info` call and whole client
+commands, with Rich output, with the messages disabled and with the `logging` backend.
+
+    python -m benchmarks.logger_benchmark
+    python -m benchmarks.logger_benchmark --imports 20 --calls 20000 --commands 500
+
+Rich output goes to an in-memory console, so the terminal speed is not measured. `is_installed`
+answers from the package cache without a round trip, it shows the logging overhead of a command
+alone, `start_app` adds its round trips to the fake server.
+"""
+import io
+import sys
+import time
+import logging
+import argparse
+import statistics
+import subprocess
+from android_tv_rc import ADBClient
+from android_tv_rc.logger import Logger
+from benchmarks.fake_adb_server import FakeADBServer, FakeDevice
+
+
+
+IMPORT_SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start, int('rich' in sys.modules))
+'''
+
+
+
+def measure_import(module: str, runs: int) -> tuple:
+    times, rich_loaded = [], False
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT.format(module=module)], capture_output=True, text=True, check=True)
+        seconds, loaded = output.stdout.split()
+        times.append(float(seconds))
+        rich_loaded = loaded == '1'
+    return statistics.median(times), rich_loaded
+
+
+
+def use_backend(backend: str):
+    if backend == 'rich':
+        from rich.console import Console
+        Logger.use_rich(Console(file=io.StringIO(), force_jupyter=False))
+        Logger.set_level('info')
+    elif backend == 'disabled':
+        Logger.use_rich()
+        Logger.set_level('warning')
+    else:
+        logger = logging.getLogger('android_tv_rc.benchmark')
+        logger.propagate = False
+        logger.handlers = [logging.StreamHandler(io.StringIO())]
+        logger.setLevel(logging.INFO if backend == 'logging' else logging.WARNING)
+        Logger.use_logging(logger)
+        Logger.set_level('debug')
+
+
+
+def measure_calls(calls: int) -> float:
+    start = time.perf_counter()
+    for number in range(calls):
+        Logger.info('Connecting to [bold green]%s[/bold green] ..', number)
+    return (time.perf_counter() - start) / calls
+
+
+
+def measure_commands(client: ADBClient, command: str, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        if command == 'is_installed':
+            client.is_installed('com.netflix.ninja')
+        else:
+            client.start_app('com.netflix.ninja')
+    return (time.perf_counter() - start) / runs
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--imports', type=int, default=10, help='fresh interpreters timing the import')
+    parser.add_argument('--calls', type=int, default=10000, help='Logger.info calls per backend')
+    parser.add_argument('--commands', type=int, default=300, help='client commands per backend')
+    args = parser.parse_args()
+
+    library, rich_loaded = measure_import('android_tv_rc', args.imports)
+    eager, _ = measure_import('rich.console, cowsay', args.imports)
+    print(f'{"import android_tv_rc":>32}: {library * 1000:8.1f} ms (rich imported: {rich_loaded})')
+    print(f'{"import rich.console, cowsay":>32}: {eager * 1000:8.1f} ms (saved until the first message)')
+
+    backends = ('rich', 'disabled', 'logging', 'logging disabled')
+    print(f'\n{"":>32}' + ''.join(f'{backend:>18}' for backend in backends) + '   (microseconds)')
+    serial = '192.168.1.28:5555'
+    with FakeADBServer([FakeDevice(serial)]) as server:
+        client = ADBClient(transport='socket', server_port=server.port)
+        client.connect(serial.split(':')[0])
+        rows = {'Logger.info': [], 'is_installed': [], 'start_app': []}
+        for backend in backends:
+            use_backend(backend)
+            rows['Logger.info'].append(measure_calls(args.calls))
+            rows['is_installed'].append(measure_commands(client, 'is_installed', args.commands))
+            rows['start_app'].append(measure_commands(client, 'start_app', args.commands))
+        Logger.use_rich()
+        Logger.set_level('info')
+    for name, seconds in rows.items():
+        print(f'{name:>32}' + ''.join(f'{value * 1e6:18.1f}' for value in seconds))
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""
+Offline benchmark suite of `ADBClient`, `AndroidTVController` and `FleetController` against the local
+fake adb server, with simulated device latency, jitter and failures. No TV is needed, the results are
+written as JSON and can be compared with a baseline run to catch regressions in CI.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --latency 0.02 --jitter 0.01 --failure-rate 0.01 --fleet-sizes 1 10 100
+    python -m benchmarks.suite --output results.json --baseline baseline.json --tolerance 0.25
+
+Benchmarks:
+    key_presses  key presses per second on the socket transport, with and without a persistent shell
+    start_app    latency of `start_app` (is_installed, am start -W -S), percentiles in seconds
+    device_info  `get_device_info` round trip and getprop parse time, from the metrics sink
+    fleet        `FleetController.press_home` on 1, 10, 100 and 1000 TVs: wall time and presses per second
+
+Every fake TV answers a shell round trip after `--latency` seconds plus up to `--jitter` more, and
+fails it with `--failure-rate` probability. Failed operations are counted, not timed. With
+`--baseline` the exit status is 1 when a result is worse than the baseline by more than `--tolerance`.
+"""
+import sys
+import json
+import time
+import platform
+import argparse
+from collections import defaultdict
+from android_tv_rc import ADBClient, FleetController, KeyCodes
+from android_tv_rc.logger import Logger
+from android_tv_rc.metrics import MetricsSink, set_metrics_sink
+from benchmarks.fake_adb_server import FakeADBServer, FakeDevice
+
+
+
+class PhaseSamples(MetricsSink):
+    """Keeps every command duration observation, by phase and command kind."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def observe(self, name: str, value: float, labels: dict):
+        self.samples[labels.get('phase'), labels.get('kind')].append(value)
+
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))] if ordered else 0.0
+
+
+
+def fake_ip(index: int) -> str:
+    return f'10.0.{index // 250}.{index % 250 + 1}'
+
+
+
+def fake_device(index: int, args: argparse.Namespace) -> FakeDevice:
+    # a real TV reports hundreds of properties, the parse time depends on it
+    properties = {f'persist.fake.property{number}': f'value{number}' for number in range(args.properties)}
+    return FakeDevice(f'{fake_ip(index)}:5555', properties, latency=args.latency, jitter=args.jitter,
+                      failure_rate=args.failure_rate, seed=args.seed + index)
+
+
+
+def record(results: dict, name: str, value: float, unit: str, better: str|None):
+    results[name] = {'value': value, 'unit': unit, 'better': better}
+
+
+
+def bench_key_presses(server: FakeADBServer, args: argparse.Namespace, results: dict):
+    for persistent_shell in (False, True):
+        client = ADBClient(transport='socket', server_port=server.port, persistent_shell=persistent_shell)
+        client.connect(fake_ip(0))
+        failures, start = 0, time.perf_counter()
+        for _ in range(args.presses):
+            try:
+                client.send_keyevent_input(KeyCodes.KEYCODE_DPAD_DOWN)
+            except Exception:
+                failures += 1
+        elapsed = time.perf_counter() - start
+        client.clean()
+        name = 'key_presses.' + ('persistent_shell' if persistent_shell else 'socket')
+        record(results, f'{name}.per_second', (args.presses - failures) / elapsed, 'presses/s', 'higher')
+        record(results, f'{name}.failures', failures, 'presses', None)
+
+
+
+def bench_start_app(server: FakeADBServer, args: argparse.Namespace, results: dict):
+    client = ADBClient(transport='socket', server_port=server.port)
+    client.connect(fake_ip(0))
+    latencies, failures = [], 0
+    for _ in range(args.launches):
+        start = time.perf_counter()
+        try:
+            launched = client.start_app('com.netflix.ninja')
+        except Exception:
+            launched = False
+        if launched:
+            latencies.append(time.perf_counter() - start)
+        else:
+            failures += 1
+    for label, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+        record(results, f'start_app.{label}_seconds', percentile(latencies, fraction), 's', 'lower')
+    record(results, 'start_app.failures', failures, 'launches', None)
+
+
+
+def bench_device_info(server: FakeADBServer, args: argparse.Namespace, results: dict):
+    client = ADBClient(transport='socket', server_port=server.port)
+    client.connect(fake_ip(0))
+    phases = PhaseSamples()
+    set_metrics_sink(phases)
+    try:
+        for _ in range(args.launches):
+            try:
+                client.get_device_info()
+            except Exception:
+                pass  # counted by the round trips missing from the samples
+    finally:
+        set_metrics_sink(None)
+    parse, round_trip = phases.samples['parse', 'getprop'], phases.samples['round_trip', 'getprop']
+    record(results, 'device_info.parse_p50_seconds', percentile(parse, 0.5), 's', 'lower')
+    record(results, 'device_info.parse_p95_seconds', percentile(parse, 0.95), 's', 'lower')
+    record(results, 'device_info.round_trip_p50_seconds', percentile(round_trip, 0.5), 's', 'lower')
+    record(results, 'device_info.properties', len(server.devices[f'{fake_ip(0)}:5555'].properties), 'properties', None)
+
+
+
+def bench_fleet(server: FakeADBServer, args: argparse.Namespace, results: dict):
+    for size in args.fleet_sizes:
+        with FleetController([fake_ip(index) for index in range(size)], max_workers=args.max_workers,
+                             transport='socket', server_port=server.port) as fleet:
+            fleet.connect()
+            walls, failures = [], 0
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                result = fleet.press_home()
+                walls.append(time.perf_counter() - start)
+                failures += len(result.errors)
+            wall = percentile(walls, 0.5)
+            record(results, f'fleet.{size}.wall_seconds', wall, 's', 'lower')
+            record(results, f'fleet.{size}.presses_per_second', size / wall, 'presses/s', 'higher')
+            record(results, f'fleet.{size}.failures', failures, 'presses', None)
+
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Returns the names of the results worse than the baseline by more than the tolerance."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or result['better'] is None or not base['value']:
+            continue
+        change = (result['value'] - base['value']) / base['value']
+        if (result['better'] == 'higher' and change < -tolerance) or (result['better'] == 'lower' and change > tolerance):
+            regressions.append(name)
+            print(f'REGRESSION {name}: {base["value"]:.6g} -> {result["value"]:.6g} {result["unit"]} ({change:+.1%})')
+    return regressions
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='JSON file the results are written to')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative change before a regression')
+    parser.add_argument('--benchmarks', nargs='+', default=['key_presses', 'start_app', 'device_info', 'fleet'],
+                        help='benchmarks to run')
+    parser.add_argument('--latency', type=float, default=0.005, help='seconds of every simulated round trip')
+    parser.add_argument('--jitter', type=float, default=0.002, help='random extra seconds of a round trip, at most')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='probability of a round trip failing')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the jitter and failure draws')
+    parser.add_argument('--presses', type=int, default=200, help='key presses per transport')
+    parser.add_argument('--launches', type=int, default=50, help='start_app and get_device_info calls')
+    parser.add_argument('--properties', type=int, default=500, help='extra system properties of the fake TVs')
+    parser.add_argument('--fleet-sizes', type=int, nargs='+', default=[1, 10, 100, 1000], help='simulated fleet sizes')
+    parser.add_argument('--max-workers', type=int, default=64, help='fleet worker threads')
+    parser.add_argument('--rounds', type=int, default=3, help='press_home rounds per fleet size')
+    args = parser.parse_args()
+
+    # the library logs every connection and command, it would be timed along
+    Logger.set_level('off')
+    benchmarks = {'key_presses': bench_key_presses, 'start_app': bench_start_app,
+                  'device_info': bench_device_info, 'fleet': bench_fleet}
+    devices = [fake_device(index, args) for index in range(max(args.fleet_sizes + [1]))]
+    results = {}
+    with FakeADBServer(devices) as server:
+        for name in args.benchmarks:
+            start = time.perf_counter()
+            benchmarks[name](server, args, results)
+            print(f'{name} done in {time.perf_counter() - start:.1f}s', file=sys.stderr)
+    Logger.set_level('info')
+
+    for name, result in results.items():
+        print(f'{name:>40}: {result["value"]:14.6g} {result["unit"]}')
+    report = {
+        'environment': {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+                        'platform': platform.platform(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z')},
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Compares the text input modes of `ADBClient.send_text_input` in characters per second.
+
+    python -m benchmarks.text_input_benchmark --lengths 16 256 2048
+    python -m benchmarks.text_input_benchmark --device 192.168.1.28
+
+Modes:
+    legacy       the whole text in one `input text` call, spaces as `%s` and nothing else escaped
+    input        escaped `input text` calls of at most `--chunk-size` characters, in one round trip
+    adbkeyboard  base64 ADBKeyboard broadcasts, the text is committed at once
+
+Against the fake server the device side is modeled: every `input` or `am` call costs the start of
+an Android tool process (`--process-start`), `input text` injects its characters one key event at a
+time (`--key-event`) and ADBKeyboard commits a broadcast at once (`--commit`). With `--device` the
+modes run on a real TV, focus a text field first, `adbkeyboard` needs ADBKeyboard installed.
+"""
+import time
+import string
+import random
+import argparse
+from android_tv_rc import ADBClient
+from android_tv_rc.text_input import ADB_KEYBOARD_IME
+from benchmarks.fake_adb_server import FakeADBServer, FakeDevice
+
+
+
+MODES = ('legacy', 'input', 'adbkeyboard')
+
+
+
+def model_device(device: FakeDevice, process_start: float, key_event: float, commit: float):
+    def input_tool(args, stdin):
+        typed = len(' '.join(args[1:]).replace('%s', ' ')) if args[:1] == ['text'] else len(args) - 1
+        time.sleep(process_start + typed * key_event)
+        return '', 0
+
+    def am_tool(args, stdin):
+        time.sleep(process_start + commit)
+        return 'Broadcast completed: result=0\n', 0
+
+    device.register_command('input', input_tool)
+    device.register_command('am', am_tool)
+    device.input_methods.append(ADB_KEYBOARD_IME)
+    device.input_method = ADB_KEYBOARD_IME
+
+
+
+def measure_text_input(client: ADBClient, mode: str, text: str, chunk_size: int) -> float:
+    start = time.perf_counter()
+    if mode == 'legacy':
+        client.send_text_input(text.replace(' ', '%s'), encode_spaces=False)
+    else:
+        client.send_text_input(text, mode=mode, chunk_size=chunk_size)
+    return len(text) / (time.perf_counter() - start)
+
+
+
+def run(client: ADBClient, lengths: list, chunk_size: int):
+    modes = MODES if client.device().is_adb_keyboard_active(refresh=True) else MODES[:2]
+    # letters, digits and spaces only, so the legacy mode types the same text
+    alphabet = string.ascii_letters + string.digits + ' '
+    print(f'{"characters":>12}' + ''.join(f'{mode:>16}' for mode in modes) + '   (characters/s)')
+    for length in lengths:
+        text = ''.join(random.choice(alphabet) for _ in range(length)).strip() or 'x'
+        rates = [measure_text_input(client, mode, text, chunk_size) for mode in modes]
+        print(f'{length:>12}' + ''.join(f'{rate:>16.1f}' for rate in rates))
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lengths', type=int, nargs='+', default=[16, 256, 2048], help='text lengths to type')
+    parser.add_argument('--chunk-size', type=int, default=256, help='characters per input text call')
+    parser.add_argument('--device', help='IP of a real TV, instead of the modeled fake device')
+    parser.add_argument('--process-start', type=float, default=0.25, help='modeled seconds to start input or am')
+    parser.add_argument('--key-event', type=float, default=0.008, help='modeled seconds per injected character')
+    parser.add_argument('--commit', type=float, default=0.01, help='modeled seconds of an ADBKeyboard commit')
+    args = parser.parse_args()
+
+    if args.device:
+        client = ADBClient()
+        client.connect(args.device)
+        run(client, args.lengths, args.chunk_size)
+        return
+    serial = '192.168.1.28:5555'
+    device = FakeDevice(serial)
+    model_device(device, args.process_start, args.key_event, args.commit)
+    with FakeADBServer([device]) as server:
+        client = ADBClient(transport='socket', server_port=server.port)
+        client.connect(serial.split(':')[0])
+        run(client, args.lengths, args.chunk_size)
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Compares the adb transports of `ADBClient`, with and without a persistent shell, against
+the local fake adb server.
+
+    python -m benchmarks.transport_benchmark --presses 500
+
+The subprocess transport is only measured when the adb tool is on the PATH, it is pointed
+to the fake server with `adb -P <port>`.
+"""
+import time
+import shutil
+import argparse
+from android_tv_rc import ADBClient, KeyCodes
+from benchmarks.fake_adb_server import FakeADBServer, FakeDevice
+
+
+
+def measure_key_presses(transport: str, port: int, serial: str, presses: int, persistent_shell: bool=False) -> float:
+    client = ADBClient(transport=transport, server_port=port, persistent_shell=persistent_shell)
+    client.connect(serial.split(':')[0])
+    start = time.perf_counter()
+    for _ in range(presses):
+        client.send_keyevent_input(KeyCodes.KEYCODE_DPAD_DOWN)
+    return presses / (time.perf_counter() - start)
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--presses', type=int, default=200, help='key presses per transport')
+    args = parser.parse_args()
+
+    serial = '192.168.1.28:5555'
+    with FakeADBServer([FakeDevice(serial)]) as server:
+        transports = ['socket'] + (['subprocess'] if shutil.which('adb') else [])
+        for transport in transports:
+            for persistent_shell in (False, True):
+                rate = measure_key_presses(transport, server.port, serial, args.presses, persistent_shell)
+                label = transport + (' + persistent shell' if persistent_shell else '')
+                print(f'{label:>30}: {rate:10.1f} key presses/s')
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import contextvars
+import pytest
+from android_tv_rc import ADBClient, deadline, DeadlineExceeded
+from android_tv_rc.deadline import remaining_time
+from android_tv_rc.launcher_catalog import LauncherCatalog
+from benchmarks.fake_adb_server import FakeADBServer, FakeDevice
+
+
+
+SERIAL = '10.0.0.5:5555'
+
+REQUEST_ID = contextvars.ContextVar('request_id', default=None)
+
+
+
+def connected_client(server: FakeADBServer) -> ADBClient:
+    client = ADBClient(transport='socket', server_port=server.port)
+    client.connect('10.0.0.5')
+    return client
+
+
+
+@pytest.fixture
+def device():
+    return FakeDevice(SERIAL)
+
+
+
+@pytest.fixture
+def client(device):
+    with FakeADBServer([device]) as server:
+        yield connected_client(server)
+
+
+
+# ------------------------------[ Background Commands ]------------------------------
+
+
+
+def test_submit_runs_commands_on_the_selected_device(client):
+    result = client.submit('shell echo hi').result(5)
+    assert (result.output, result.exit_code) == ('hi', 0)
+    assert client.submit(lambda a, b=0: a + b, 1, b=2).result(5) == 3
+
+
+
+def test_submit_propagates_the_context(client):
+    token = REQUEST_ID.set('request-1')
+    try:
+        with deadline(1.0):
+            remaining = client.submit(remaining_time)
+            request_id = client.submit(REQUEST_ID.get)
+    finally:
+        REQUEST_ID.reset(token)
+    assert 0.5 < remaining.result(5) <= 1.0
+    assert request_id.result(5) == 'request-1'
+    # the deadline ends with the block, not with the submission
+    assert client.submit(remaining_time).result(5) is None
+
+
+
+def test_submitted_command_keeps_the_deadline(client):
+    with deadline(0.2):
+        future = client.submit('shell sleep 5')
+    with pytest.raises(DeadlineExceeded):
+        future.result(5)
+
+
+
+# ------------------------------[ Packages ]------------------------------
+
+
+
+@pytest.mark.parametrize('sdk', ['30', '26'])
+def test_package_listing_falls_back_before_android_9(sdk):
+    device = FakeDevice(SERIAL, properties={'ro.build.version.sdk': sdk})
+    with FakeADBServer([device]) as server:
+        client = connected_client(server)
+        assert client.is_installed('com.netflix.ninja') is True
+        assert client.get_launcher_activity('com.netflix.ninja') == 'com.netflix.ninja/.MainActivity'
+        commands = len(device.shell_commands)
+        # the second lookup is answered by the catalog
+        assert client.get_launcher_activity('com.netflix.ninja') == 'com.netflix.ninja/.MainActivity'
+        assert len(device.shell_commands) == commands
+    assert LauncherCatalog.QUERY in device.shell_commands
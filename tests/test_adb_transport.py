@@ -0,0 +1,120 @@
+import struct
+import subprocess
+import pytest
+from android_tv_rc import ADBClient
+from android_tv_rc.adb_transport import (SHELL_V2_STDOUT, SHELL_V2_STDERR, SHELL_V2_EXIT, SocketTransport, encode_request,
+                                         decode_shell_v2)
+from benchmarks.fake_adb_server import FakeADBServer, FakeDevice
+
+
+
+SERIAL = '10.0.0.5:5555'
+
+
+
+def packet(packet_id: int, payload: bytes) -> bytes:
+    return struct.pack('<BI', packet_id, len(payload)) + payload
+
+
+
+@pytest.fixture
+def server():
+    with FakeADBServer([FakeDevice(SERIAL), FakeDevice('10.0.0.6:5555', features=('cmd',))]) as server:
+        yield server
+
+
+
+@pytest.fixture
+def transport(server):
+    transport = SocketTransport(server_port=server.port)
+    transport.execute(['connect', '10.0.0.5'])
+    transport.execute(['connect', '10.0.0.6'])
+    return transport
+
+
+
+# ------------------------------[ Framing ]------------------------------
+
+
+
+def test_encode_request_prefixes_the_hex_length():
+    assert encode_request('host:version') == b'000chost:version'
+    assert encode_request('') == b'0000'
+    # the length counts the encoded bytes, not the characters
+    assert encode_request('shell:echo é') == b'000dshell:echo \xc3\xa9'
+
+
+
+def test_decode_shell_v2_splits_the_streams():
+    data = (packet(SHELL_V2_STDOUT, b'hello ') + packet(SHELL_V2_STDERR, b'oops') + packet(SHELL_V2_STDOUT, b'world')
+            + packet(SHELL_V2_EXIT, b'\x02'))
+    assert decode_shell_v2(data) == (b'hello world', b'oops', 2)
+
+
+
+def test_decode_shell_v2_without_exit_packet():
+    assert decode_shell_v2(packet(SHELL_V2_STDOUT, b'partial')) == (b'partial', b'', None)
+    # a truncated header or payload at the end is not a packet
+    assert decode_shell_v2(packet(SHELL_V2_STDOUT, b'ok') + b'\x03\x01') == (b'ok', b'', None)
+    assert decode_shell_v2(b'') == (b'', b'', None)
+
+
+
+def test_decode_shell_v2_empty_payloads():
+    data = packet(SHELL_V2_STDOUT, b'') + packet(SHELL_V2_EXIT, b'\x00')
+    assert decode_shell_v2(data) == (b'', b'', 0)
+
+
+
+# ------------------------------[ Exit Status ]------------------------------
+
+
+
+def test_socket_shell_returns_the_output(transport):
+    assert transport.execute(['shell', 'echo hi; true'], SERIAL).strip() == 'hi'
+
+
+
+@pytest.mark.parametrize('command, exit_code', [('false', 1), ('nosuchcommand', 127)])
+def test_socket_shell_raises_on_exit_status(transport, command, exit_code):
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        transport.execute(['shell', command], SERIAL)
+    assert error.value.returncode == exit_code
+    assert error.value.cmd == ['shell', command]
+
+
+
+def test_socket_shell_without_shell_v2_cannot_report_the_status(transport):
+    assert 'shell_v2' not in transport.features('10.0.0.6:5555')
+    assert transport.execute(['shell', 'false'], '10.0.0.6:5555') == ''
+
+
+
+def test_client_reports_the_exit_status(server):
+    client = ADBClient(transport='socket', server_port=server.port)
+    client.connect('10.0.0.5')
+    with pytest.raises(subprocess.CalledProcessError):
+        client.execute_shell_command('false')
+    assert client.execute_shell_command('echo ok').strip() == 'ok'
+
+
+
+# ------------------------------[ Features ]------------------------------
+
+
+
+def test_features_are_cached_until_reconnected():
+    device = FakeDevice(SERIAL)
+    with FakeADBServer([device]) as server:
+        transport = SocketTransport(server_port=server.port)
+        transport.execute(['connect', '10.0.0.5'])
+        assert 'shell_v2' in transport.features() and 'shell_v2' in transport.features(SERIAL)
+        device.features.remove('shell_v2')
+        assert 'shell_v2' in transport.features() and 'shell_v2' in transport.features(SERIAL)
+        # connecting the device again asks for the features of the only device and of the device again
+        transport.execute(['connect', '10.0.0.5'])
+        assert 'shell_v2' not in transport.features() and 'shell_v2' not in transport.features(SERIAL)
+        device.features.append('shell_v2')
+        transport.execute(['disconnect'])
+        transport.execute(['connect', '10.0.0.5'])
+        assert 'shell_v2' in transport.features(SERIAL)
@@ -0,0 +1,70 @@
+import time
+import asyncio
+import pytest
+from android_tv_rc import ADBClient, deadline, DeadlineExceeded
+from android_tv_rc.deadline import remaining_time
+from benchmarks.fake_adb_server import FakeADBServer, FakeDevice
+
+
+
+def test_remaining_time_without_deadline():
+    assert remaining_time() is None
+    assert remaining_time(3.0) == 3.0
+    with deadline(None) as end:
+        assert end is None
+        assert remaining_time(3.0) == 3.0
+
+
+
+def test_remaining_time_is_capped_by_the_deadline():
+    with deadline(1.0) as end:
+        assert end == pytest.approx(time.monotonic() + 1.0, abs=0.05)
+        assert 0.9 < remaining_time() <= 1.0
+        assert 0.9 < remaining_time(5.0) <= 1.0
+        assert remaining_time(0.1) == 0.1
+    assert remaining_time() is None
+
+
+
+def test_nested_deadlines_only_shorten():
+    with deadline(0.5) as outer:
+        with deadline(10.0) as inner:
+            assert inner == outer
+        with deadline(0.1) as inner:
+            assert inner < outer
+        with deadline(None) as inner:
+            assert inner == outer
+
+
+
+def test_expired_deadline_raises():
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            remaining_time()
+    assert issubclass(DeadlineExceeded, TimeoutError)
+
+
+
+def test_deadline_follows_asyncio_tasks():
+    async def task_remaining_time():
+        return remaining_time()
+
+    async def main():
+        with deadline(1.0):
+            return await asyncio.create_task(task_remaining_time())
+
+    assert 0.9 < asyncio.run(main()) <= 1.0
+
+
+
+def test_deadline_bounds_the_commands():
+    with FakeADBServer([FakeDevice('10.0.0.5:5555')]) as server:
+        client = ADBClient(transport='socket', server_port=server.port)
+        client.connect('10.0.0.5')
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded), deadline(0.2):
+            client.execute_shell_command('sleep 2')
+        assert time.monotonic() - start < 1.5
+        with pytest.raises(DeadlineExceeded):
+            client.execute_shell_command('sleep 2', timeout=0.2)
@@ -0,0 +1,63 @@
+import pytest
+from android_tv_rc.device_snapshot import DeviceSnapshot
+
+
+
+SERIAL = '10.0.0.5:5555'
+
+MARKER = DeviceSnapshot.SECTION_MARKER
+
+OUTPUT = (f'{MARKER} state\ndevice\n'
+          f'{MARKER} power\nDisplay Power: state=ON\n'
+          f'{MARKER} properties\n[ro.product.model]: [Fake Android TV]\n[ro.build.version.sdk]: [30]\n'
+          '[ro.build.description]: [fake_atv-user 11 [test-keys]]\n'
+          f'{MARKER} ip_address\nwlan0     Link encap:UNSPEC\n          inet addr:10.0.0.5  Bcast:10.0.0.255  Mask:255.255.255.0\n'
+          f'{MARKER} foreground_app\n  mCurrentFocus=Window{{1a2b3c u0 com.netflix.ninja/.MainActivity}}\n')
+
+
+
+def test_build_script_has_one_section_per_field():
+    script = DeviceSnapshot.build_script(['state', 'power'])
+    assert script == f'echo "{MARKER} state"; echo device; echo "{MARKER} power"; dumpsys power | grep "Display Power"; true'
+
+
+
+def test_build_script_reads_single_properties():
+    script = DeviceSnapshot.build_script(['properties'], properties=['ro.product.model', 'ro.build.version.sdk'])
+    assert f'echo "{MARKER} property ro.product.model"; getprop ro.product.model' in script
+    assert 'getprop ro.build.version.sdk' in script
+    assert 'eth0' in DeviceSnapshot.build_script(['ip_address'], interface='eth0')
+
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError):
+        DeviceSnapshot.build_script(['state', 'battery'])
+    with pytest.raises(ValueError):
+        DeviceSnapshot.parse(SERIAL, OUTPUT, ['battery'])
+
+
+
+def test_parse_every_field():
+    snapshot = DeviceSnapshot.parse(SERIAL, OUTPUT)
+    assert snapshot.serial == SERIAL and snapshot.state == 'device' and snapshot.powered_on is True
+    # a value holding brackets is kept whole
+    assert snapshot.properties == {'ro.product.model': 'Fake Android TV', 'ro.build.version.sdk': '30',
+                                   'ro.build.description': 'fake_atv-user 11 [test-keys]'}
+    assert snapshot.ip_address == '10.0.0.5'
+    assert snapshot.foreground_app == 'com.netflix.ninja/.MainActivity'
+    assert snapshot.requested_fields == DeviceSnapshot.FIELDS
+
+
+
+def test_parse_single_properties():
+    output = f'{MARKER} property ro.product.model\nFake Android TV\n{MARKER} property ro.serialno\n\n'
+    snapshot = DeviceSnapshot.parse(SERIAL, output, ['properties'])
+    assert snapshot.properties == {'ro.product.model': 'Fake Android TV', 'ro.serialno': ''}
+
+
+
+def test_missing_sections_are_none():
+    snapshot = DeviceSnapshot.parse(SERIAL, f'{MARKER} power\n{MARKER} foreground_app\n', ['power', 'ip_address', 'foreground_app'])
+    assert snapshot.state is None and snapshot.powered_on is None
+    assert snapshot.ip_address is None and snapshot.foreground_app is None and snapshot.properties is None
@@ -0,0 +1,224 @@
+import time
+import queue
+import asyncio
+import threading
+from android_tv_rc import DeviceWatcher, DeviceEventType
+from android_tv_rc.device_snapshot import DeviceSnapshot
+from android_tv_rc.logcat import LogcatRecord
+
+
+
+SERIAL = '10.0.0.5:5555'
+
+
+
+class FakeEventStream:
+    """`LogcatStream` stand-in giving the records put in it until it is ended or closed."""
+
+
+    def __init__(self):
+        self.__records = queue.Queue()
+
+
+
+    def put(self, tag: str, message: str):
+        self.__records.put(LogcatRecord('', 0, 0, 'I', tag, message))
+
+
+
+    def end(self):
+        self.__records.put(None)
+
+
+
+    def __iter__(self):
+        while (record := self.__records.get()) is not None:
+            yield record
+
+
+
+    def close(self):
+        self.end()
+
+
+
+class FakeWatchedDevice:
+    """`ADBDevice` stand-in with the calls the watcher makes."""
+
+
+    def __init__(self, serial: str, stream_factory=FakeEventStream):
+        self.serial = serial
+        self.online = True
+        self.powered_on = True
+        self.foreground_app = 'com.google.android.tvlauncher/.MainActivity'
+        self.opened = []
+        self.streams = queue.Queue()
+        self.__stream_factory = stream_factory
+
+
+
+    def snapshot(self, fields=None) -> DeviceSnapshot:
+        if not self.online:
+            raise ConnectionError(f'{self.serial} is offline')
+        return DeviceSnapshot(self.serial, powered_on=self.powered_on, foreground_app=self.foreground_app)
+
+
+
+    def logcat_stream(self, **kwargs):
+        if not self.online:
+            raise ConnectionError(f'{self.serial} is offline')
+        self.opened.append(time.monotonic())
+        stream = self.__stream_factory()
+        self.streams.put(stream)
+        return stream
+
+
+
+    def get_state(self) -> str:
+        return 'device' if self.online else 'offline'
+
+
+
+    def reconnect(self) -> bool:
+        return self.online
+
+
+
+class FakeClient:
+    def __init__(self, *devices):
+        self.__devices = {device.serial: device for device in devices}
+
+
+
+    def device(self, serial: str) -> FakeWatchedDevice:
+        return self.__devices[serial]
+
+
+
+def wait_for(condition, timeout: float=5.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, 'condition not met in time'
+        time.sleep(0.01)
+
+
+
+# ------------------------------[ Events ]------------------------------
+
+
+
+def test_watcher_reports_the_changes():
+    device = FakeWatchedDevice(SERIAL)
+    with DeviceWatcher(FakeClient(device), [SERIAL]) as watcher:
+        stream = device.streams.get(timeout=5)
+        wait_for(lambda: watcher.state(SERIAL).state == 'device')
+        assert watcher.state(SERIAL).powered_on is True
+        stream.put('wm_set_resumed_activity', '[0,42,com.netflix.ninja/.MainActivity,resumeTopActivity]')
+        stream.put('power_screen_state', '[0,2,0,0,0]')
+        stream.put('screen_toggled', '0')  # no change, no event
+        event = watcher.get(timeout=5)
+        assert (event.type, event.serial) == (DeviceEventType.FOREGROUND_APP, SERIAL)
+        assert event.foreground_app == 'com.netflix.ninja/.MainActivity'
+        assert event.previous_app == 'com.google.android.tvlauncher/.MainActivity'
+        assert watcher.get(timeout=5).type == DeviceEventType.POWER_OFF
+        assert watcher.get(timeout=0.2) is None
+        assert watcher.state(SERIAL).powered_on is False
+
+
+
+def test_watcher_reports_disconnections_and_reconnections():
+    device = FakeWatchedDevice(SERIAL)
+    events = []
+    with DeviceWatcher(FakeClient(device), [SERIAL], callback=events.append, reconnect_interval=0.05) as watcher:
+        stream = device.streams.get(timeout=5)
+        device.online = False
+        stream.end()
+        assert watcher.get(timeout=5).type == DeviceEventType.DISCONNECTED
+        assert watcher.state(SERIAL).state == 'offline'
+        device.powered_on = False
+        device.online = True
+        assert watcher.get(timeout=5).type == DeviceEventType.RECONNECTED
+        # the change missed while the device was away comes after the reconnection
+        assert watcher.get(timeout=5).type == DeviceEventType.POWER_OFF
+    assert [event.type for event in events] == [DeviceEventType.DISCONNECTED, DeviceEventType.RECONNECTED, DeviceEventType.POWER_OFF]
+
+
+
+def test_watcher_events_from_asyncio():
+    device = FakeWatchedDevice(SERIAL)
+
+    async def main(watcher):
+        stream = await asyncio.to_thread(device.streams.get, timeout=5)
+
+        async def first_event():
+            async for event in watcher.events([DeviceEventType.POWER_OFF]):
+                return event
+
+        task = asyncio.create_task(first_event())
+        await asyncio.sleep(0.1)  # the iteration only receives the events emitted once it runs
+        stream.put('wm_set_resumed_activity', '[0,42,com.netflix.ninja/.MainActivity]')
+        stream.put('power_screen_state', '0')
+        return await asyncio.wait_for(task, 5)
+
+    with DeviceWatcher(FakeClient(device), [SERIAL]) as watcher:
+        wait_for(lambda: watcher.state(SERIAL).state == 'device')
+        event = asyncio.run(main(watcher))
+    assert event.type == DeviceEventType.POWER_OFF
+
+
+
+def test_close_ends_the_iterations():
+    device = FakeWatchedDevice(SERIAL)
+    watcher = DeviceWatcher(FakeClient(device), [SERIAL])
+    device.streams.get(timeout=5)
+    threading.Timer(0.1, watcher.close).start()
+    assert list(watcher) == []
+
+
+
+# ------------------------------[ Backoff ]------------------------------
+
+
+
+class EndedEventStream(FakeEventStream):
+    """Stream of a device whose logcat ends at once without any record."""
+
+
+    def __init__(self):
+        super().__init__()
+        self.end()
+
+
+
+class ChattyEventStream(FakeEventStream):
+    """Stream delivering one record before it ends."""
+
+
+    def __init__(self):
+        super().__init__()
+        self.put('screen_toggled', '1')
+        self.end()
+
+
+
+def test_ended_stream_is_reopened_with_backoff():
+    device = FakeWatchedDevice(SERIAL, EndedEventStream)
+    with DeviceWatcher(FakeClient(device), [SERIAL], reconnect_interval=0.05, max_reconnect_interval=0.2) as watcher:
+        time.sleep(0.8)
+        assert watcher.state(SERIAL).state == 'device'  # still online, no disconnection reported
+        assert watcher.get(timeout=0) is None
+    gaps = [later - earlier for earlier, later in zip(device.opened, device.opened[1:])]
+    # 0.05, 0.1, 0.2, 0.2 .. instead of reopening in a tight loop
+    assert 3 <= len(device.opened) <= 7
+    for attempt, gap in enumerate(gaps):
+        assert gap >= min(0.05 * 2 ** attempt, 0.2) * 0.9
+
+
+
+def test_backoff_resets_once_a_stream_delivers():
+    device = FakeWatchedDevice(SERIAL, ChattyEventStream)
+    with DeviceWatcher(FakeClient(device), [SERIAL], reconnect_interval=0.05, max_reconnect_interval=1.0):
+        time.sleep(0.5)
+    gaps = [later - earlier for earlier, later in zip(device.opened, device.opened[1:])]
+    assert len(gaps) >= 4
+    assert max(gaps) < 0.2
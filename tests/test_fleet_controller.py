@@ -0,0 +1,117 @@
+import time
+import threading
+import pytest
+from android_tv_rc import FleetController, KeyCodes, DeadlineExceeded
+from benchmarks.fake_adb_server import FakeADBServer, FakeDevice
+
+
+
+IPS = ['10.0.0.5', '10.0.0.6']
+
+
+
+class Overlap:
+    """Counts the operations running at the same time, per device and over the whole fleet."""
+
+
+    def __init__(self):
+        self.running = {}
+        self.peak = {}
+        self.peak_total = 0
+        self.order = []
+        self.__lock = threading.Lock()
+
+
+
+    def __call__(self, controller, label: str, seconds: float=0.1) -> str:
+        ip = controller.serial.partition(':')[0]
+        with self.__lock:
+            self.running[ip] = self.running.get(ip, 0) + 1
+            self.peak[ip] = max(self.peak.get(ip, 0), self.running[ip])
+            self.peak_total = max(self.peak_total, sum(self.running.values()))
+            self.order.append((ip, label))
+        time.sleep(seconds)
+        with self.__lock:
+            self.running[ip] -= 1
+        return label
+
+
+
+@pytest.fixture
+def server():
+    with FakeADBServer([FakeDevice(f'{ip}:5555') for ip in IPS]) as server:
+        yield server
+
+
+
+@pytest.fixture
+def fleet(server):
+    with FleetController(IPS, transport='socket', server_port=server.port, operation_timeout=0.5) as fleet:
+        assert fleet.connect().ok
+        yield fleet
+
+
+
+def test_results_are_keyed_by_device(fleet, server):
+    result = fleet.press_home()
+    assert result.ok and sorted(result.succeeded) == IPS and result.failed == []
+    assert result.summary().startswith('press_home: 2/2 devices succeeded, 0 failed')
+    assert all(device.shell_commands[-1] == 'input keyevent KEYCODE_HOME' for device in server.devices.values())
+
+
+
+def test_unknown_devices_and_groups(fleet):
+    with pytest.raises(KeyError):
+        fleet.run('press_home', devices=['10.0.0.9'])
+    with pytest.raises(KeyError):
+        fleet.add_group('lobby', ['10.0.0.5', '10.0.0.9'])
+    fleet.add_group('lobby', ['10.0.0.6'])
+    assert list(fleet.run('press_home', devices='lobby').timings) == ['10.0.0.6']
+
+
+
+def test_devices_run_in_parallel(fleet):
+    overlap = Overlap()
+    started = time.monotonic()
+    result = fleet.run(overlap, 'first', 0.2)
+    assert time.monotonic() - started < 0.35
+    assert result.results == {ip: 'first' for ip in IPS}
+    assert overlap.peak_total == 2
+
+
+
+def test_operations_on_one_device_run_in_order(fleet):
+    overlap = Overlap()
+    runs = [threading.Thread(target=fleet.run, args=(overlap, label), kwargs={'devices': ['10.0.0.5']}) for label in 'abcd']
+    for run in runs:
+        run.start()
+        # submissions are ordered, the operations queue on the device lane
+        time.sleep(0.02)
+    for run in runs:
+        run.join()
+    assert overlap.peak['10.0.0.5'] == 1
+    assert [label for ip, label in overlap.order] == list('abcd')
+
+
+
+def test_operation_timeout_frees_the_device(fleet, server):
+    started = time.monotonic()
+    result = fleet.press_keys([KeyCodes.KEYCODE_HOME] * 5, inter_key_delay=1, devices=['10.0.0.5'])
+    assert time.monotonic() - started < 2
+    assert result.failed == ['10.0.0.5']
+    assert isinstance(result.errors['10.0.0.5'], DeadlineExceeded)
+    # the lane is free again for the next operation
+    assert fleet.press_home(devices=['10.0.0.5']).ok
+
+
+
+def test_failed_operation_does_not_stop_the_others(fleet):
+    def fail_on_first(controller):
+        if controller.serial.startswith('10.0.0.5:'):
+            raise RuntimeError('remote unplugged')
+        return True
+
+    result = fleet.run(fail_on_first)
+    assert not result.ok
+    assert result.results == {'10.0.0.6': True}
+    assert str(result.errors['10.0.0.5']) == 'remote unplugged'
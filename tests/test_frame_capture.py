@@ -0,0 +1,49 @@
+import pytest
+from android_tv_rc.frame_capture import changed_fraction, perceptual_hash, hamming_distance
+
+
+
+numpy = pytest.importorskip('numpy')
+
+
+
+def frame(height: int=72, width: int=128, value: int=40) -> 'numpy.ndarray':
+    return numpy.full((height, width, 4), value, dtype=numpy.uint8)
+
+
+
+def test_changed_fraction_ignores_noise():
+    first, second = frame(), frame(value=50)
+    assert changed_fraction(first, second) == 0.0
+    second[:, :, 3] = 0
+    # alpha is not compared
+    assert changed_fraction(first, second) == 0.0
+
+
+
+def test_changed_fraction_counts_changed_pixels():
+    first, second = frame(), frame()
+    second[:36] = 200
+    assert changed_fraction(first, second, step=1) == 0.5
+    assert changed_fraction(first, second) == 0.5
+    # the difference does not wrap around in uint8
+    assert changed_fraction(second, first, step=1) == 0.5
+    assert changed_fraction(first, frame(36)) == 1.0
+
+
+
+def test_perceptual_hash_of_similar_frames():
+    gradient = frame()
+    gradient[:, :, :3] = numpy.linspace(0, 255, 128, dtype=numpy.uint8)[None, :, None]
+    brighter = numpy.minimum(gradient.astype(numpy.int32) + 10, 255).astype(numpy.uint8)
+    flipped = gradient[:, ::-1].copy()
+    assert perceptual_hash(gradient) == perceptual_hash(brighter)
+    assert perceptual_hash(gradient).bit_length() <= 64
+    assert hamming_distance(perceptual_hash(gradient), perceptual_hash(flipped)) > 32
+    assert perceptual_hash(frame(), hash_size=4) == 0
+
+
+
+def test_hamming_distance():
+    assert hamming_distance(0b1011, 0b1011) == 0
+    assert hamming_distance(0b1011, 0b0010) == 2
@@ -0,0 +1,181 @@
+import time
+import threading
+import pytest
+from android_tv_rc import KeyCodes
+from android_tv_rc.adb_commands import build_keyevent_command, build_keyevent_sequence_command
+from android_tv_rc.input_scheduler import InputScheduler
+
+
+
+HOME, UP, DOWN, RIGHT = KeyCodes.KEYCODE_HOME, KeyCodes.KEYCODE_DPAD_UP, KeyCodes.KEYCODE_DPAD_DOWN, KeyCodes.KEYCODE_DPAD_RIGHT
+
+VOLUME_UP = KeyCodes.KEYCODE_VOLUME_UP
+
+
+
+class FakeKeys:
+    """Records the sent keys, `busy` holds the sender like a slow adb round trip."""
+
+
+    def __init__(self):
+        self.calls = []
+        self.busy = threading.Event()
+        self.busy.set()
+        self.sending = threading.Event()
+        self.error = None
+
+
+
+    def send_keys(self, keys: list, inter_key_delay: float|None):
+        self.sending.set()
+        self.busy.wait(5)
+        if self.error is not None:
+            raise self.error
+        self.calls.append((list(keys), inter_key_delay))
+
+
+
+    def send_key(self, keycode: KeyCodes, long_press: bool):
+        self.calls.append((keycode, long_press))
+
+
+
+@pytest.fixture
+def keys():
+    return FakeKeys()
+
+
+
+def hold(keys: FakeKeys, scheduler: InputScheduler):
+    # the first press keeps the sender busy, the next presses queue up behind it
+    keys.busy.clear()
+    scheduler.press(HOME)
+    assert keys.sending.wait(5)
+
+
+
+# ------------------------------[ Commands ]------------------------------
+
+
+
+def test_build_keyevent_command():
+    assert build_keyevent_command(HOME) == 'input keyevent KEYCODE_HOME'
+    assert build_keyevent_command(HOME, long_press=True) == 'input keyevent KEYCODE_HOME --longpress'
+
+
+
+def test_build_keyevent_sequence_command():
+    assert build_keyevent_sequence_command([UP, UP, RIGHT]) == 'input keyevent KEYCODE_DPAD_UP KEYCODE_DPAD_UP KEYCODE_DPAD_RIGHT'
+    assert (build_keyevent_sequence_command([UP, RIGHT], 0.25)
+            == 'input keyevent KEYCODE_DPAD_UP; sleep 0.25; input keyevent KEYCODE_DPAD_RIGHT')
+    assert build_keyevent_sequence_command([UP], 0.25) == 'input keyevent KEYCODE_DPAD_UP'
+
+
+
+# ------------------------------[ Scheduler ]------------------------------
+
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        InputScheduler(print, print, max_rate=0)
+    with pytest.raises(ValueError):
+        InputScheduler(print, print, max_batch=0)
+
+
+
+def test_queued_keys_are_sent_in_one_call(keys):
+    with InputScheduler(keys.send_keys, keys.send_key) as scheduler:
+        hold(keys, scheduler)
+        futures = [scheduler.press(UP), scheduler.press([UP, RIGHT]), scheduler.press(VOLUME_UP)]
+        keys.busy.set()
+        assert all(future.result(5) for future in futures)
+        assert scheduler.flush(5)
+        stats = scheduler.stats()
+    assert keys.calls == [([HOME], None), ([UP, UP, RIGHT, VOLUME_UP], None)]
+    assert (stats.pressed, stats.sent, stats.batches, stats.coalesced) == (5, 5, 2, 3)
+    assert stats.peak_queue_depth == 4 and stats.queue_depth == 0
+
+
+
+def test_max_batch_splits_the_calls(keys):
+    with InputScheduler(keys.send_keys, keys.send_key, max_batch=2) as scheduler:
+        hold(keys, scheduler)
+        scheduler.press([UP, UP, UP])
+        keys.busy.set()
+        assert scheduler.flush(5)
+    assert [call[0] for call in keys.calls] == [[HOME], [UP, UP], [UP]]
+
+
+
+def test_long_presses_are_sent_alone(keys):
+    with InputScheduler(keys.send_keys, keys.send_key) as scheduler:
+        hold(keys, scheduler)
+        scheduler.press(UP)
+        scheduler.press(RIGHT, long_press=True)
+        scheduler.press(DOWN)
+        keys.busy.set()
+        assert scheduler.flush(5)
+    assert keys.calls == [([HOME], None), ([UP], None), (RIGHT, True), ([DOWN], None)]
+
+
+
+def test_priority_keys_drop_the_queued_navigation(keys):
+    with InputScheduler(keys.send_keys, keys.send_key) as scheduler:
+        hold(keys, scheduler)
+        navigation = scheduler.press([UP, UP])
+        volume = scheduler.press(VOLUME_UP)
+        home = scheduler.press(HOME)
+        keys.busy.set()
+        assert navigation.result(5) is False
+        assert volume.result(5) is True and home.result(5) is True
+        stats = scheduler.stats()
+    assert keys.calls == [([HOME], None), ([HOME], None), ([VOLUME_UP], None)]
+    assert stats.dropped == 2
+
+
+
+def test_supersede_drops_the_queued_navigation(keys):
+    with InputScheduler(keys.send_keys, keys.send_key) as scheduler:
+        hold(keys, scheduler)
+        stale = scheduler.press([DOWN, DOWN])
+        scheduler.press(RIGHT, supersede=True)
+        keys.busy.set()
+        assert stale.result(5) is False
+        assert scheduler.flush(5)
+    assert keys.calls[1:] == [([RIGHT], None)]
+
+
+
+def test_failed_send_fails_the_press(keys):
+    keys.error = RuntimeError('device offline')
+    with InputScheduler(keys.send_keys, keys.send_key) as scheduler:
+        with pytest.raises(RuntimeError):
+            scheduler.press([UP, RIGHT]).result(5)
+        assert scheduler.stats().failed == 2
+
+
+
+def test_max_rate_spaces_the_keys(keys):
+    with InputScheduler(keys.send_keys, keys.send_key, max_rate=20) as scheduler:
+        scheduler.press([UP, RIGHT])
+        assert scheduler.flush(5)
+        started = time.monotonic()
+        scheduler.press(DOWN)
+        assert scheduler.flush(5)
+        elapsed = time.monotonic() - started
+    assert keys.calls == [([UP, RIGHT], 0.05), ([DOWN], None)]
+    # the 2 keys of the previous call use the rate of the next 0.1s
+    assert elapsed >= 0.08
+
+
+
+def test_closed_scheduler_drops_the_keys(keys):
+    scheduler = InputScheduler(keys.send_keys, keys.send_key)
+    hold(keys, scheduler)
+    queued = scheduler.press(UP)
+    keys.busy.set()
+    scheduler.close()
+    assert scheduler.press(DOWN).result(5) is False
+    assert scheduler.press([]).result(5) is True
+    assert queued.done()
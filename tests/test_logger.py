@@ -0,0 +1,84 @@
+import logging
+import pytest
+from android_tv_rc.logger import Logger, DEBUG, INFO, WARNING, ERROR, OFF
+
+
+
+@pytest.fixture
+def log(monkeypatch, caplog):
+    # the level is shared by the whole process, every test starts from the defaults
+    monkeypatch.setattr(Logger, '_Logger__level', WARNING)
+    monkeypatch.setattr(Logger, '_Logger__level_set', False)
+    monkeypatch.setattr(Logger, '_Logger__console', None)
+    monkeypatch.setattr(Logger, '_Logger__logger', None)
+    Logger.use_logging('android_tv_rc.tests')
+    caplog.set_level(logging.DEBUG, 'android_tv_rc.tests')
+    return caplog
+
+
+
+def test_only_warnings_and_errors_by_default(log):
+    Logger.info('info %s', 1)
+    Logger.success('success')
+    Logger.print('print')
+    Logger.warning('warning %s', 2)
+    Logger.error('error %s', 3)
+    assert [record.getMessage() for record in log.records] == ['warning 2', 'error 3']
+    assert not Logger.is_enabled('info')
+    assert Logger.is_enabled(WARNING)
+
+
+
+def test_verbose_shows_info_messages(log):
+    Logger.set_verbose(True)
+    Logger.info('Connecting to [bold green]%s[/bold green] ..', '10.0.0.5')
+    Logger.success('done')
+    Logger.print('printed')
+    assert [record.getMessage() for record in log.records] == ['Connecting to 10.0.0.5 ..', 'done', 'printed']
+    assert [record.atv_level for record in log.records] == ['info', 'success', 'info']
+
+
+
+def test_quiet_client_does_not_hide_a_verbose_one(log):
+    Logger.set_verbose(False)
+    assert not Logger.is_enabled(INFO)
+    Logger.set_verbose(True)
+    Logger.set_verbose(False)
+    assert Logger.is_enabled(INFO)
+
+
+
+def test_set_level_wins_over_verbose(log):
+    Logger.set_level('error')
+    Logger.set_verbose(True)
+    Logger.info('info')
+    Logger.warning('warning')
+    Logger.error('error')
+    assert [record.getMessage() for record in log.records] == ['error']
+    Logger.set_level(DEBUG)
+    assert Logger.is_enabled('debug')
+    Logger.set_level('off')
+    Logger.error('hidden')
+    assert not Logger.is_enabled(ERROR) and not Logger.is_enabled(OFF - 1)
+    assert len(log.records) == 1
+
+
+
+def test_skipped_messages_are_not_formatted(log):
+    class Expensive:
+        def __str__(self):
+            raise AssertionError('formatted a skipped message')
+
+    Logger.info('value %s', Expensive())
+    assert log.records == []
+
+
+
+def test_error_exit_script(log):
+    Logger.error('value %s is %s', 'x', 1)
+    assert log.records[-1].getMessage() == 'value x is 1'
+    with pytest.raises(SystemExit):
+        Logger.error('fatal', True)
+    with pytest.raises(SystemExit):
+        Logger.error('fatal %s', 'reason', exit_script=True)
+    assert [record.getMessage() for record in log.records[1:]] == ['fatal', 'fatal reason']
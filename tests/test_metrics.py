@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import pytest
+from android_tv_rc import AndroidTVController, PrometheusMetrics, set_metrics_sink
+from android_tv_rc.logger import Logger, WARNING
+from android_tv_rc.metrics import CONTROLLER_SECONDS, CONTROLLER_FAILURES, COMMAND_SECONDS, command_kind, instrument_methods
+from benchmarks.fake_adb_server import FakeADBServer, FakeDevice
+
+
+
+SERIAL = '10.0.0.5:5555'
+
+
+
+@instrument_methods
+class FakeController:
+    """Controller with a `serial` counting its reads."""
+
+
+    def __init__(self):
+        self.serial_reads = 0
+
+
+
+    @property
+    def serial(self) -> str|None:
+        self.serial_reads += 1
+        return SERIAL
+
+
+
+    def press(self, fail: bool=False) -> bool:
+        if fail:
+            raise RuntimeError('device offline')
+        return True
+
+
+
+    async def press_async(self) -> bool:
+        await asyncio.sleep(0)
+        return True
+
+
+
+@pytest.fixture
+def metrics():
+    metrics = PrometheusMetrics()
+    set_metrics_sink(metrics)
+    yield metrics
+    set_metrics_sink(None)
+
+
+
+@pytest.fixture
+def log(monkeypatch, caplog):
+    monkeypatch.setattr(Logger, '_Logger__level', WARNING)
+    monkeypatch.setattr(Logger, '_Logger__level_set', False)
+    monkeypatch.setattr(Logger, '_Logger__console', None)
+    monkeypatch.setattr(Logger, '_Logger__logger', None)
+    Logger.use_logging('android_tv_rc.tests')
+    caplog.set_level(logging.DEBUG, 'android_tv_rc.tests')
+    return caplog
+
+
+
+def test_command_kind():
+    assert command_kind(['shell', 'input keyevent KEYCODE_HOME']) == 'input'
+    assert command_kind(['shell', '{ /system/bin/cmd media_session volume --get; }']) == 'cmd'
+    assert command_kind('shell,v2,raw:am start -W com.app/.Main') == 'am'
+    assert command_kind(['connect', '10.0.0.5']) == 'connect'
+
+
+
+# ------------------------------[ Controller Methods ]------------------------------
+
+
+
+def test_default_sink_does_not_read_the_serial():
+    controller = FakeController()
+    assert controller.press() is True
+    assert asyncio.run(controller.press_async()) is True
+    assert controller.serial_reads == 0
+
+
+
+def test_methods_are_timed_by_name_and_device(metrics):
+    controller = FakeController()
+    controller.press()
+    with pytest.raises(RuntimeError):
+        controller.press(fail=True)
+    asyncio.run(controller.press_async())
+    assert metrics.count(CONTROLLER_SECONDS, method='press', device=SERIAL) == 2
+    assert metrics.count(CONTROLLER_FAILURES, method='press') == 1
+    assert metrics.count(CONTROLLER_SECONDS, method='press_async') == 1
+    assert FakeController.press.__name__ == 'press'
+
+
+
+def test_controller_labels_do_not_log(log, metrics):
+    with FakeADBServer([FakeDevice(SERIAL)]) as server:
+        controller = AndroidTVController('10.0.0.5', verbose=True, transport='socket', server_port=server.port)
+        assert controller.connect()
+        log.clear()
+        controller.press_home()
+    # the serial label must not go through the logging `get_selected_device`
+    assert [record.getMessage() for record in log.records if 'device' in record.getMessage().lower()] == []
+    assert metrics.count(CONTROLLER_SECONDS, method='press_home', device=SERIAL) == 1
+    assert metrics.count(COMMAND_SECONDS, kind='input', device=SERIAL, phase='round_trip') == 1
+
+
+
+def test_render_exposition_format(metrics):
+    metrics.observe(COMMAND_SECONDS, 0.003, {'kind': 'input', 'device': SERIAL})
+    metrics.increment(CONTROLLER_FAILURES, {'method': 'open_app', 'device': 'quote"d'})
+    text = metrics.render()
+    assert '# TYPE atv_command_duration_seconds histogram\n' in text
+    assert f'atv_command_duration_seconds_bucket{{device="{SERIAL}",kind="input",le="0.0025"}} 0\n' in text
+    assert f'atv_command_duration_seconds_bucket{{device="{SERIAL}",kind="input",le="0.005"}} 1\n' in text
+    assert f'atv_command_duration_seconds_count{{device="{SERIAL}",kind="input"}} 1\n' in text
+    assert 'atv_controller_call_failures_total{device="quote\\"d",method="open_app"} 1\n' in text
@@ -0,0 +1,115 @@
+import time
+from android_tv_rc.package_index import PackageIndex
+from android_tv_rc.launcher_catalog import LauncherCatalog
+
+
+
+FINGERPRINT = 'fake/fake_atv/fake_atv:11/RTT1.000000.001/1:user/release-keys'
+
+PACKAGES = 'package:com.netflix.ninja\npackage:com.google.android.youtube.tv\n  package:com.android.tv.settings  \npackage:\n'
+
+VERSIONED_PACKAGES = 'package:com.netflix.ninja versionCode:73\npackage:com.google.android.youtube.tv versionCode:20410\n'
+
+
+
+def query_output(packages: str) -> str:
+    marker = LauncherCatalog.SECTION_MARKER
+    return (f'{FINGERPRINT}\n{marker}\n{packages}{marker}\n'
+            'com.netflix.ninja/.MainActivity\n'
+            f'{marker}\n'
+            'com.netflix.ninja/.LegacyActivity\ncom.google.android.youtube.tv/com.google.android.apps.youtube.tv.activity.ShellActivity\n')
+
+
+
+# ------------------------------[ Package Index ]------------------------------
+
+
+
+def test_parse_skips_bare_package_lines():
+    assert PackageIndex.parse(PACKAGES) == {'com.netflix.ninja', 'com.google.android.youtube.tv', 'com.android.tv.settings'}
+    assert PackageIndex.parse(VERSIONED_PACKAGES) == {'com.netflix.ninja', 'com.google.android.youtube.tv'}
+    assert PackageIndex.parse('') == set()
+
+
+
+def test_parse_version_codes():
+    assert PackageIndex.parse_version_codes(VERSIONED_PACKAGES) == {'com.netflix.ninja': 73, 'com.google.android.youtube.tv': 20410}
+    assert PackageIndex.parse_version_codes(PACKAGES) == {}
+
+
+
+def test_index_is_unknown_until_updated():
+    index = PackageIndex()
+    assert not index.is_fresh
+    assert index.contains('com.netflix.ninja') is None
+    index.set_installed('com.netflix.ninja', True)
+    assert index.contains('com.netflix.ninja') is None
+    index.update(PackageIndex.parse(VERSIONED_PACKAGES), PackageIndex.parse_version_codes(VERSIONED_PACKAGES))
+    assert index.contains('com.netflix.ninja') is True
+    assert index.contains('com.shahid.tv') is False
+    assert index.version_code('com.netflix.ninja') == 73
+
+
+
+def test_set_installed_keeps_the_index_up_to_date():
+    index = PackageIndex(ttl=None)
+    index.update(PackageIndex.parse(VERSIONED_PACKAGES), PackageIndex.parse_version_codes(VERSIONED_PACKAGES))
+    index.set_installed('com.shahid.tv', True)
+    index.set_installed('com.netflix.ninja', False)
+    assert index.contains('com.shahid.tv') and not index.contains('com.netflix.ninja')
+    assert index.version_code('com.netflix.ninja') is None
+    index.invalidate()
+    assert index.contains('com.shahid.tv') is None
+
+
+
+def test_index_expires_after_ttl():
+    index = PackageIndex(ttl=0.05)
+    index.update({'com.netflix.ninja'})
+    assert index.is_fresh and index.ttl == 0.05
+    time.sleep(0.06)
+    assert not index.is_fresh
+    assert index.contains('com.netflix.ninja') is None
+    disabled = PackageIndex(ttl=0)
+    disabled.update({'com.netflix.ninja'})
+    assert disabled.contains('com.netflix.ninja') is None
+
+
+
+# ------------------------------[ Launcher Catalog ]------------------------------
+
+
+
+def test_parse_components_keeps_the_first_activity():
+    components = LauncherCatalog.parse_components('com.app/.Main\n  com.app/.Other\nNo activities found\ncom.other/com.other.Home$Inner\n')
+    assert components == {'com.app': 'com.app/.Main', 'com.other': 'com.other/com.other.Home$Inner'}
+
+
+
+def test_parse_query_prefers_leanback_activities():
+    fingerprint, version_codes, components = LauncherCatalog.parse_query(query_output(VERSIONED_PACKAGES))
+    assert fingerprint == FINGERPRINT
+    assert version_codes == {'com.netflix.ninja': 73, 'com.google.android.youtube.tv': 20410}
+    assert components['com.netflix.ninja'] == 'com.netflix.ninja/.MainActivity'
+    assert components['com.google.android.youtube.tv'].endswith('/com.google.android.apps.youtube.tv.activity.ShellActivity')
+
+
+
+def test_parse_query_without_version_codes():
+    # devices before Android 9 answer the query with the plain listing
+    _, version_codes, _ = LauncherCatalog.parse_query(query_output(PACKAGES))
+    assert version_codes == dict.fromkeys(['com.netflix.ninja', 'com.google.android.youtube.tv', 'com.android.tv.settings'])
+    assert LauncherCatalog.parse_query('') == ('', {}, {})
+
+
+
+def test_catalog_is_keyed_by_fingerprint_and_version():
+    catalog = LauncherCatalog()
+    fingerprint, version_codes, components = LauncherCatalog.parse_query(query_output(VERSIONED_PACKAGES + 'package:com.android.vending versionCode:1\n'))
+    catalog.update(fingerprint, version_codes, components)
+    assert catalog.lookup(FINGERPRINT, 'com.netflix.ninja', 73) == 'com.netflix.ninja/.MainActivity'
+    # packages without launcher activity are known too, they are not queried again
+    assert catalog.is_known(FINGERPRINT, 'com.android.vending', 1)
+    assert catalog.lookup(FINGERPRINT, 'com.android.vending', 1) is None
+    assert not catalog.is_known(FINGERPRINT, 'com.netflix.ninja', 74)
+    assert not catalog.is_known('other/fingerprint', 'com.netflix.ninja', 73)
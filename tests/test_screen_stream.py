@@ -0,0 +1,121 @@
+import io
+import asyncio
+import pytest
+from android_tv_rc.screen_stream import SEGMENT_TIME_LIMIT, ScreenStream, build_screenrecord_command, next_segment_time_limit
+from android_tv_rc.async_screen_stream import AsyncScreenStream
+
+
+
+class FakeSegments:
+    """Opens fake `screenrecord` segments giving one chunk per second of video."""
+
+
+    def __init__(self):
+        self.time_limits = []
+
+
+
+    def __call__(self, time_limit: int) -> io.BytesIO:
+        self.time_limits.append(time_limit)
+        return io.BytesIO(b'x' * time_limit)
+
+
+
+class AsyncFakeSegment:
+    """`AsyncStream` stand-in over bytes."""
+
+
+    def __init__(self, data: bytes):
+        self.__data = io.BytesIO(data)
+
+
+
+    async def read(self, size: int) -> bytes:
+        return self.__data.read(size)
+
+
+
+    async def close(self):
+        pass
+
+
+
+# ------------------------------[ Segment Math ]------------------------------
+
+
+
+@pytest.mark.parametrize('duration, segment_time_limit, plan', [
+    (1, 180, [1]),
+    (180, 180, [180]),
+    (181, 180, [180, 1]),
+    (600, 180, [180, 180, 180, 60]),
+    (5, 2, [2, 2, 1]),
+])
+def test_segments_add_up_to_the_duration(duration, segment_time_limit, plan):
+    recorded, limits = 0, []
+    while (time_limit := next_segment_time_limit(duration, segment_time_limit, recorded)) is not None:
+        limits.append(time_limit)
+        recorded += time_limit
+    assert limits == plan
+    assert sum(limits) == duration
+
+
+
+def test_unbounded_recording_never_ends():
+    assert next_segment_time_limit(None, SEGMENT_TIME_LIMIT, 10 ** 6) == SEGMENT_TIME_LIMIT
+
+
+
+def test_build_screenrecord_command():
+    assert build_screenrecord_command(3) == 'screenrecord --output-format=h264 --time-limit 3 -'
+    assert build_screenrecord_command(bit_rate=4000000, size='1280x720') == \
+        'screenrecord --output-format=h264 --time-limit 180 --bit-rate 4000000 --size 1280x720 -'
+
+
+
+# ------------------------------[ Streams ]------------------------------
+
+
+
+@pytest.mark.parametrize('duration', [0, 0.5, 0.999])
+def test_duration_under_one_second_is_rejected(duration):
+    with pytest.raises(ValueError):
+        ScreenStream(FakeSegments(), duration=duration)
+
+
+
+@pytest.mark.parametrize('duration, segment_time_limit, plan', [(2.9, 180, [2]), (5, 2, [2, 2, 1]), (3, 500, [3])])
+def test_stream_records_whole_seconds(duration, segment_time_limit, plan):
+    segments = FakeSegments()
+    with ScreenStream(segments, duration=duration, segment_time_limit=segment_time_limit) as stream:
+        assert b''.join(stream) == b'x' * sum(plan)
+    assert segments.time_limits == plan
+    assert stream.segments == len(plan)
+    assert stream.bytes_read == sum(plan)
+
+
+
+def test_stream_stops_on_an_empty_segment():
+    with ScreenStream(lambda time_limit: io.BytesIO(b''), duration=10) as stream:
+        assert list(stream) == []
+    assert stream.segments == 0
+
+
+
+def test_async_stream_records_whole_seconds():
+    time_limits = []
+
+    async def open_segment(time_limit):
+        time_limits.append(time_limit)
+        return AsyncFakeSegment(b'x' * time_limit)
+
+    async def main():
+        with pytest.raises(ValueError):
+            AsyncScreenStream(open_segment, duration=0.5)
+        async with AsyncScreenStream(open_segment, duration=5, segment_time_limit=2) as stream:
+            sink = io.BytesIO()
+            assert await stream.write_to(sink) == 5
+            return stream.segments
+
+    assert asyncio.run(main()) == 3
+    assert time_limits == [2, 2, 1]
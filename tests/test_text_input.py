@@ -0,0 +1,83 @@
+import base64
+import pytest
+from android_tv_rc import KeyCodes
+from android_tv_rc.text_input import (can_input_text, check_text_input_mode, prefers_adb_keyboard, escape_input_text, split_input_text,
+                                      build_input_text_command, build_adb_keyboard_command, build_text_input_command)
+
+
+
+# ------------------------------[ Modes ]------------------------------
+
+
+
+def test_can_input_text():
+    assert can_input_text('Hello, world!\n\tdone ~')
+    assert not can_input_text('café')
+    assert not can_input_text('bell \x07')
+
+
+
+def test_check_text_input_mode():
+    assert check_text_input_mode('auto') == 'auto'
+    with pytest.raises(ValueError):
+        check_text_input_mode('keyboard')
+
+
+
+def test_prefers_adb_keyboard_for_unicode_and_long_texts():
+    assert not prefers_adb_keyboard('netflix')
+    assert prefers_adb_keyboard('مسلسل')
+    assert prefers_adb_keyboard('a' * 32)
+
+
+
+# ------------------------------[ Input Text ]------------------------------
+
+
+
+@pytest.mark.parametrize('text, escaped', [
+    ('hello', 'hello'),
+    ('hello world', 'hello%sworld'),
+    ("it's $HOME", "'it'\"'\"'s%s$HOME'"),
+    ('a;b|c&d', "'a;b|c&d'"),
+])
+def test_escape_input_text(text, escaped):
+    assert escape_input_text(text) == escaped
+
+
+
+def test_split_input_text_chunks_and_keys():
+    assert split_input_text('abcdefg', 3) == ['abc', 'def', 'g']
+    assert split_input_text('one\ntwo\t', 256) == ['one', KeyCodes.KEYCODE_ENTER, 'two', KeyCodes.KEYCODE_TAB]
+    assert split_input_text('\n\nx') == [KeyCodes.KEYCODE_ENTER, KeyCodes.KEYCODE_ENTER, 'x']
+
+
+
+def test_split_input_text_breaks_a_written_percent_s():
+    # `input text 100%s` would type `100 `
+    assert split_input_text('100%s') == ['100%', 's']
+    assert ''.join(split_input_text('a%sb%s', 256)) == 'a%sb%s'
+
+
+
+def test_build_input_text_command():
+    assert build_input_text_command('hi there') == 'input text hi%sthere'
+    assert (build_input_text_command('user\n\npass', 256)
+            == 'input text user && input keyevent KEYCODE_ENTER KEYCODE_ENTER && input text pass')
+    assert build_input_text_command('abcd', 2) == 'input text ab && input text cd'
+    with pytest.raises(ValueError):
+        build_input_text_command('café')
+
+
+
+def test_build_adb_keyboard_command_encodes_the_chunks():
+    command = build_adb_keyboard_command('café ☕', 3)
+    chunks = [part.rpartition(' ')[2] for part in command.split(' && ')]
+    assert [base64.b64decode(chunk).decode('utf-8') for chunk in chunks] == ['caf', 'é ☕']
+    assert command.startswith('am broadcast -a ADB_INPUT_B64 --es msg ')
+
+
+
+def test_build_text_input_command_follows_the_mode():
+    assert build_text_input_command('ok') == 'input text ok'
+    assert build_text_input_command('ok', 'adbkeyboard') == build_adb_keyboard_command('ok')
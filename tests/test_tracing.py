@@ -0,0 +1,147 @@
+import asyncio
+import subprocess
+from contextlib import contextmanager
+import pytest
+from android_tv_rc import AndroidTVController, Span, Tracer, set_tracer
+from android_tv_rc.tracing import trace_command, trace_methods
+from benchmarks.fake_adb_server import FakeADBServer, FakeDevice
+
+
+
+SERIAL = '10.0.0.5:5555'
+
+
+
+class RecordedSpan(Span):
+    """Span keeping its attributes and the span it was started in."""
+
+
+    def __init__(self, name: str, attributes: dict, parent: 'RecordedSpan|None'):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.parent = parent
+        self.failed = False
+
+
+
+    def set_attribute(self, key: str, value: str|int|float|bool):
+        self.attributes[key] = value
+
+
+
+class RecordingTracer(Tracer):
+    """Tracer recording the finished spans, nested spans become children of the open one."""
+
+
+    def __init__(self):
+        self.spans = []
+        self.__open = []
+
+
+
+    @contextmanager
+    def start_span(self, name: str, attributes: dict):
+        span = RecordedSpan(name, attributes, self.__open[-1] if self.__open else None)
+        self.__open.append(span)
+        try:
+            yield span
+        except BaseException:
+            span.failed = True
+            raise
+        finally:
+            self.__open.pop()
+            self.spans.append(span)
+
+
+
+@trace_methods
+class FakeController:
+    """Controller with a `serial` counting its reads."""
+
+
+    def __init__(self):
+        self.serial_reads = 0
+
+
+
+    @property
+    def serial(self) -> str|None:
+        self.serial_reads += 1
+        return SERIAL
+
+
+
+    def press(self, fail: bool=False) -> bool:
+        if fail:
+            raise RuntimeError('device offline')
+        return True
+
+
+
+    async def press_async(self) -> bool:
+        await asyncio.sleep(0)
+        return True
+
+
+
+@pytest.fixture
+def tracer():
+    tracer = RecordingTracer()
+    set_tracer(tracer)
+    yield tracer
+    set_tracer(None)
+
+
+
+# ------------------------------[ Controller Methods ]------------------------------
+
+
+
+def test_default_tracer_does_not_read_the_serial():
+    controller = FakeController()
+    assert controller.press() is True
+    assert asyncio.run(controller.press_async()) is True
+    assert controller.serial_reads == 0
+
+
+
+def test_methods_run_in_their_span(tracer):
+    controller = FakeController()
+    controller.press()
+    with pytest.raises(RuntimeError):
+        controller.press(fail=True)
+    asyncio.run(controller.press_async())
+    assert [(span.name, span.failed) for span in tracer.spans] == [('FakeController.press', False), ('FakeController.press', True),
+                                                                  ('FakeController.press_async', False)]
+    assert all(span.attributes == {'adb.device': SERIAL} for span in tracer.spans)
+
+
+
+def test_commands_are_children_of_the_method_span(tracer):
+    with FakeADBServer([FakeDevice(SERIAL)]) as server:
+        controller = AndroidTVController('10.0.0.5', transport='socket', server_port=server.port)
+        controller.connect()
+        tracer.spans.clear()
+        controller.press_home()
+    command, method = tracer.spans
+    assert method.name == 'AndroidTVController.press_home' and method.attributes['adb.device'] == SERIAL
+    assert command.name == 'adb input' and command.parent is method
+    assert command.attributes['adb.command.kind'] == 'input'
+    assert command.attributes['adb.exit_code'] == 0
+
+
+
+# ------------------------------[ Commands ]------------------------------
+
+
+
+def test_trace_command_records_the_exit_status(tracer):
+    with pytest.raises(subprocess.CalledProcessError):
+        with trace_command(['shell', 'false'], SERIAL):
+            raise subprocess.CalledProcessError(1, ['shell', 'false'])
+    with pytest.raises(TimeoutError):
+        with trace_command('shell:sleep 5', SERIAL):
+            raise TimeoutError()
+    failed, timed_out = tracer.spans
+    assert failed.attributes == {'adb.command': 'shell false', 'adb.command.kind': 'false', 'adb.device': SERIAL, 'adb.exit_code': 1}
+    assert timed_out.name == 'adb sleep' and timed_out.attributes['adb.timed_out'] is True
@@ -0,0 +1,90 @@
+import pytest
+from android_tv_rc import KeyCodes
+from android_tv_rc.ui_index import UINode, UIIndex, build_ui_dump_command
+
+
+
+UP, DOWN, LEFT, RIGHT = KeyCodes.KEYCODE_DPAD_UP, KeyCodes.KEYCODE_DPAD_DOWN, KeyCodes.KEYCODE_DPAD_LEFT, KeyCodes.KEYCODE_DPAD_RIGHT
+
+
+
+def node(bounds: str, text: str='', resource_id: str='', focusable: bool=True, focused: bool=False, children: str='') -> str:
+    return (f'<node text="{text}" resource-id="{resource_id}" content-desc="" class="android.widget.FrameLayout" package="com.app" '
+            f'focusable="{str(focusable).lower()}" focused="{str(focused).lower()}" clickable="true" bounds="{bounds}">{children}</node>')
+
+
+
+# a search bar above a row of three cards, the cards hold a label that is not focusable
+DUMP = ('UI hierchary dumped to: /data/local/tmp/atv_rc_ui.xml\n<?xml version="1.0" encoding="UTF-8"?><hierarchy rotation="0">'
+        + node('[0,0][1920,1080]', focusable=False, children=(
+            node('[100,50][500,150]', resource_id='com.app:id/search', focused=True)
+            + node('[100,300][500,600]', text='Home', children=node('[120,500][480,580]', text='Home label', focusable=False))
+            + node('[600,300][1000,600]', text='Movies')
+            + node('[1100,300][1500,600]', text='Settings', children=node('[1120,500][1480,580]', text='Settings label', focusable=False))
+            + node('[0,0][0,0]', text='Hidden')))
+        + '</hierarchy>')
+
+
+
+def replay(ui: UIIndex, start: UINode, keys: list) -> UINode:
+    for key in keys:
+        start = ui.neighbor(start, key)
+    return start
+
+
+
+@pytest.fixture
+def ui():
+    return UIIndex.parse(DUMP)
+
+
+
+def test_build_ui_dump_command():
+    assert build_ui_dump_command() == 'uiautomator dump /data/local/tmp/atv_rc_ui.xml && cat /data/local/tmp/atv_rc_ui.xml'
+    assert build_ui_dump_command('/sdcard/ui.xml', compressed=True) == 'uiautomator dump --compressed /sdcard/ui.xml && cat /sdcard/ui.xml'
+
+
+
+def test_parse_keeps_the_focusable_nodes(ui):
+    assert len(ui.nodes) == 8
+    assert [node.text for node in ui.focusable] == ['', 'Home', 'Movies', 'Settings']
+    assert ui.focused.resource_id == 'com.app:id/search'
+    assert ui.find(text='Movies').center == (800, 450)
+
+
+
+def test_parse_rejects_output_without_hierarchy():
+    with pytest.raises(ValueError):
+        UIIndex.parse('ERROR: could not get idle state.')
+    with pytest.raises(ValueError):
+        UIIndex.parse(b'<hierarchy><node></hierarchy>')
+
+
+
+def test_find_resolves_labels_to_their_card(ui):
+    assert ui.find(text='Settings label').text == 'Settings'
+    assert ui.find(resource_id='search') is ui.focused
+    assert ui.find(resource_id='com.app:id/search') is ui.focused
+    assert ui.find(text='Nothing') is None
+
+
+
+def test_neighbor_follows_the_focus_search(ui):
+    home, movies, settings = ui.find(text='Home'), ui.find(text='Movies'), ui.find(text='Settings')
+    assert ui.neighbor(home, RIGHT) is movies
+    assert ui.neighbor(movies, RIGHT) is settings
+    assert ui.neighbor(settings, RIGHT) is None
+    assert ui.neighbor(movies, LEFT) is home
+    assert ui.neighbor(movies, UP) is ui.focused
+    assert ui.neighbor(ui.focused, DOWN) is home
+
+
+
+def test_path_to(ui):
+    assert ui.path_to(ui.find(text='Settings')) == [RIGHT, RIGHT]
+    assert ui.path_to(ui.focused) == []
+    # up then down is as short as left twice, the path only has to land on the target
+    keys = ui.path_to(ui.find(text='Home'), start=ui.find(text='Settings'))
+    assert len(keys) == 2
+    assert replay(ui, ui.find(text='Settings'), keys) is ui.find(text='Home')
+    assert ui.path_to(None) is None
@@ -0,0 +1,43 @@
+import pytest
+from android_tv_rc import KeyCodes
+from android_tv_rc.volume import Volume, resolve_stream, build_volume_command, parse_volume
+
+
+
+def test_resolve_stream():
+    assert resolve_stream('music') == 3
+    assert resolve_stream(5) == 5
+    with pytest.raises(ValueError):
+        resolve_stream('radio')
+
+
+
+def test_build_volume_command_only_reads_without_level():
+    assert build_volume_command(3) == '{ cmd media_session volume --stream 3 --get || media volume --stream 3 --get; } 2>/dev/null'
+
+
+
+def test_build_volume_command_sets_then_reads():
+    command = build_volume_command(3, 7)
+    assert command.index('--stream 3 --set 7') < command.index('--stream 3 --get')
+    assert command.count('2>/dev/null') == 2
+
+
+
+def test_parse_volume_reads_the_last_volume_line():
+    output = ('[V] volume is 4 in range [0..15]\n'
+              '[V] Setting volume of stream 3 to 7\n'
+              '[V] volume is 7 in range [0..15]\n')
+    assert parse_volume(output, 3) == Volume(3, 7, 0, 15)
+    with pytest.raises(ValueError):
+        parse_volume('Error: Unknown command: media_session', 3)
+
+
+
+def test_volume_step_stays_in_range():
+    volume = Volume(3, 15, 0, 15)
+    assert volume.step(KeyCodes.KEYCODE_VOLUME_UP) == volume
+    assert volume.step(KeyCodes.KEYCODE_VOLUME_DOWN).level == 14
+    assert Volume(3, 0, 0, 15).step(KeyCodes.KEYCODE_VOLUME_DOWN).level == 0
+    assert volume.step(KeyCodes.KEYCODE_VOLUME_MUTE) is None
+    assert volume.step(KeyCodes.KEYCODE_HOME) is volume